@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the per-request dependency overhead of protected endpoints.
+
+Compares the separate get_current_user / check_rate_limit / log_api_request
+dependencies with the fused authorize_request dependency on bare routes, and
+measures GET /datasets end to end. Requests go straight to the ASGI app in
+one event loop, on a temporary database, so only server-side work is timed.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import Depends, FastAPI
+
+import src.api.dependencies as dependencies
+from src.api.dependencies import (
+    authorize_request,
+    check_rate_limit,
+    get_current_user,
+    log_api_request,
+)
+from src.api.fastapi_app import app
+from src.auth.jwt_manager import JWTManager
+from src.auth.rate_limiter import RateLimitConfig, SQLiteRateLimiter
+from src.auth.sqlite_auth import SQLiteAuthManager
+from src.database.sqlite import create_metadata_schema
+from src.database.sqlite.audit_sink import close_audit_sinks
+from src.database.sqlite.repository import (
+    get_unified_repository,
+    reset_unified_repository,
+)
+
+
+def setup_environment(db_path: str) -> str:
+    """Create managers on a temporary database and return a bearer token."""
+    create_metadata_schema(db_path)
+    reset_unified_repository()
+    repository = get_unified_repository(db_path, ":memory:")
+    for i in range(20):
+        repository.register_dataset_complete(
+            f"BENCH_{i}", f"Benchmark dataset {i}", "economy", "", "ISTAT", 1
+        )
+
+    auth_manager = SQLiteAuthManager(db_path)
+    jwt_manager = JWTManager(db_path, secret_key="benchmark-secret-key-of-32-bytes")
+    rate_limiter = SQLiteRateLimiter(db_path)
+    # Limits high enough that the benchmark is never throttled
+    unlimited = RateLimitConfig(10**9, 10**9, 10**9, 10**9)
+    rate_limiter.DEFAULT_LIMITS = dict.fromkeys(rate_limiter.DEFAULT_LIMITS, unlimited)
+
+    # Install the singletons directly: dependency_overrides would make
+    # FastAPI re-analyze the overridden dependencies on every request
+    dependencies._auth_manager = auth_manager
+    dependencies._jwt_manager = jwt_manager
+    dependencies._rate_limiter = rate_limiter
+    sys.modules[get_unified_repository.__module__]._unified_repository = repository
+    sys.modules[
+        dependencies.get_unified_repository.__module__
+    ]._unified_repository = repository
+
+    api_key = auth_manager.generate_api_key("benchmark", ["read"])
+    return jwt_manager.create_access_token(api_key).access_token
+
+
+def build_dependency_app() -> FastAPI:
+    """Bare routes that differ only in their dependencies."""
+    bench_app = FastAPI()
+
+    @bench_app.get("/separate")
+    async def separate(
+        current_user=Depends(get_current_user),
+        _rate_limit=Depends(check_rate_limit),
+        _audit=Depends(log_api_request),
+    ):
+        return {}
+
+    @bench_app.get("/fused")
+    async def fused(current_user=Depends(authorize_request)):
+        return {}
+
+    return bench_app
+
+
+async def time_requests(asgi_app, path: str, headers: dict, iterations: int) -> dict:
+    """Time sequential requests to one path."""
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        for _ in range(min(50, iterations)):
+            response = await c.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+
+        times = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await c.get(path, headers=headers)
+            times.append((time.perf_counter() - start) * 1000)
+
+    times.sort()
+    return {
+        "median_ms": statistics.median(times),
+        "p95_ms": times[int(len(times) * 0.95) - 1],
+        "iterations": iterations,
+    }
+
+
+async def run(iterations: int) -> dict:
+    db_path = tempfile.mktemp(suffix=".db")
+    headers = {"Authorization": f"Bearer {setup_environment(db_path)}"}
+    bench_app = build_dependency_app()
+
+    results = {
+        "separate_dependencies": await time_requests(
+            bench_app, "/separate", headers, iterations
+        ),
+        "authorize_request": await time_requests(
+            bench_app, "/fused", headers, iterations
+        ),
+        "datasets": await time_requests(app, "/datasets", headers, iterations),
+    }
+    close_audit_sinks()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--iterations", type=int, default=2000, help="Requests per measurement"
+    )
+    args = parser.parse_args()
+
+    # Keep per-request log output out of the measurement
+    logging.disable(logging.INFO)
+    from loguru import logger as loguru_logger
+
+    loguru_logger.remove()
+
+    results = asyncio.run(run(args.iterations))
+
+    print("📊 Per-request dependency overhead")
+    for name, result in results.items():
+        print(
+            f"   {name:<24} median {result['median_ms']:.3f} ms"
+            f"   p95 {result['p95_ms']:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark of JSON serialization for large API responses.
+
+Compares the validated path (Pydantic response model + jsonable_encoder +
+JSONResponse) with FastJSONResponse fed straight from Arrow columns, for the
+time series payload and the OData Observations payload, plus the streamed
+writer OData Observations pages use. Only serialization is timed: the Arrow
+table is built once in memory.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pyarrow as pa
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import src.api.responses as responses
+from src.api.models import TimeSeriesPoint, TimeSeriesResponse
+from src.api.responses import FastJSONResponse, arrow_records, iter_json_object
+
+
+def build_table(rows: int) -> pa.Table:
+    """Time series table shaped like get_dataset_time_series_columns()."""
+    rng = np.random.default_rng(42)
+    territories = [f"IT{i:03d}" for i in range(100)]
+    return pa.table(
+        {
+            "dataset_id": ["BENCH"] * rows,
+            "year": pa.array(1990 + np.arange(rows) % 35, type=pa.int32()),
+            "time_period": [str(1990 + i % 35) for i in range(rows)],
+            "territory_code": [territories[i % 100] for i in range(rows)],
+            "territory_name": [f"Territorio {i % 100}" for i in range(rows)],
+            "measure_code": ["POP_TOT"] * rows,
+            "measure_name": ["Popolazione totale"] * rows,
+            "obs_value": rng.random(rows) * 1e6,
+            "obs_status": [None] * rows,
+        }
+    )
+
+
+def observation_table(table: pa.Table) -> pa.Table:
+    """The same rows shaped like UnifiedDataRepository.query_observations()."""
+    table = table.rename_columns(
+        ["DatasetId", "Year", "TimePeriod", "TerritoryCode", "TerritoryName"]
+        + ["MeasureCode", "MeasureName", "ObsValue", "ObsStatus"]
+    )
+    ids = pa.array(range(1, table.num_rows + 1), type=pa.int64())
+    return table.add_column(0, "Id", ids)
+
+
+def time_call(func, iterations: int) -> tuple[float, int]:
+    """Median milliseconds of func() and the size of the body it returns.
+
+    func returns a rendered response or the body bytes.
+    """
+    times = []
+    size = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        size = len(result if isinstance(result, bytes) else result.body)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), size
+
+
+def run(rows: int, iterations: int) -> dict:
+    table = build_table(rows)
+    filters = {"dataset_id": "BENCH"}
+
+    def timeseries_validated():
+        response = TimeSeriesResponse(
+            dataset_id="BENCH",
+            data=table.to_pylist(),
+            filters_applied=filters,
+            total_points=table.num_rows,
+        )
+        return JSONResponse(jsonable_encoder(response))
+
+    def timeseries_fast():
+        return FastJSONResponse(
+            {
+                "success": True,
+                "message": None,
+                "timestamp": datetime.now(),
+                "dataset_id": "BENCH",
+                "data": arrow_records(table, list(TimeSeriesPoint.model_fields)),
+                "filters_applied": filters,
+                "total_points": table.num_rows,
+            }
+        )
+
+    observations = observation_table(table)
+
+    def odata_encoder():
+        return JSONResponse(jsonable_encoder({"value": arrow_records(observations)}))
+
+    def odata_fast():
+        return FastJSONResponse({"value": arrow_records(observations)})
+
+    def odata_streamed():
+        return b"".join(iter_json_object({"value": observations}))
+
+    cases = {
+        "timeseries pydantic": timeseries_validated,
+        "timeseries fast": timeseries_fast,
+        "odata jsonable_encoder": odata_encoder,
+        "odata fast": odata_fast,
+        "odata streamed": odata_streamed,
+    }
+    results = {name: time_call(func, iterations) for name, func in cases.items()}
+
+    # Fast path without orjson, as when the speedups extra is not installed
+    orjson = responses.orjson
+    responses.orjson = None
+    try:
+        results["timeseries fast (json)"] = time_call(timeseries_fast, iterations)
+    finally:
+        responses.orjson = orjson
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="Rows per payload")
+    parser.add_argument(
+        "--iterations", type=int, default=5, help="Runs per measurement"
+    )
+    args = parser.parse_args()
+
+    results = run(args.rows, args.iterations)
+
+    backend = "orjson" if responses.orjson else "json (orjson not installed)"
+    print(f"📊 JSON serialization of {args.rows} rows, fast backend: {backend}")
+    for name, (median_ms, size) in results.items():
+        throughput = size / 1024 / 1024 / (median_ms / 1000)
+        print(
+            f"   {name:<24} median {median_ms:9.1f} ms"
+            f"   {size / 1024 / 1024:6.1f} MB   {throughput:7.1f} MB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Conditional GET support for Osservatorio ISTAT REST API
+
+Read endpoints derive a strong ETag from the data version of what they serve
+(see UnifiedDataRepository.get_data_version) and the request URL, before any
+data is queried. A request whose If-None-Match matches gets 304 Not Modified
+straight away. Otherwise the response carries the ETag and, for the heavy
+endpoints, its rendered body is kept in a bounded cache keyed by the ETag, so
+hot responses are not queried and serialized again.
+
+CompressionMiddleware appends the content coding to the ETag of compressed
+responses ("<tag>-gzip"), so every representation keeps its own strong
+validator; matching here accepts the tag with any such suffix.
+"""
+
+import hashlib
+import os
+from collections.abc import AsyncIterator
+from typing import Optional
+
+from fastapi import Request
+from starlette.responses import Response, StreamingResponse
+
+try:
+    from utils.cache import BoundedCache
+except ImportError:
+    from src.utils.cache import BoundedCache
+
+# Content codings CompressionMiddleware may apply, in order of preference
+CONTENT_CODINGS = ("zstd", "br", "gzip")
+
+RESPONSE_CACHE_CONFIG = {
+    "max_bytes": int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    # Larger bodies are served but not cached
+    "max_body_bytes": int(
+        os.getenv("RESPONSE_CACHE_MAX_BODY_BYTES", str(8 * 1024 * 1024))
+    ),
+    "ttl": float(os.getenv("RESPONSE_CACHE_TTL", "600")),
+}
+
+# Rendered bodies by ETag: (body, headers)
+_response_cache = BoundedCache(
+    "api_responses",
+    max_bytes=RESPONSE_CACHE_CONFIG["max_bytes"],
+    default_ttl=RESPONSE_CACHE_CONFIG["ttl"],
+)
+
+
+def make_etag(
+    request: Request, version: int, variant: Optional[str] = None
+) -> Optional[str]:
+    """Build the strong ETag of a response from a data version.
+
+    The tag covers the URL (base URL, path and query parameters in any
+    order), since the same data is rendered differently per request.
+
+    Args:
+        request: Current request
+        version: Data version of everything the response is built from
+        variant: Anything else the representation depends on, such as an
+            applied Prefer header
+
+    Returns:
+        Quoted ETag value, or None for version 0 (data without a recorded
+        version gets no validator)
+    """
+    if not version:
+        return None
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(str(request.base_url).encode())
+    digest.update(request.url.path.encode())
+    for name, value in sorted(request.query_params.multi_items()):
+        digest.update(f"\0{name}={value}".encode())
+    if variant:
+        digest.update(f"\0\0{variant}".encode())
+    return f'"{version}-{digest.hexdigest()}"'
+
+
+def _matching_tag(request: Request, etag: Optional[str]) -> Optional[str]:
+    """Return the If-None-Match entry matching etag, if any."""
+    header = request.headers.get("if-none-match")
+    if not header or etag is None:
+        return None
+
+    accepted = {etag} | {f'{etag[:-1]}-{coding}"' for coding in CONTENT_CODINGS}
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return etag
+        # If-None-Match uses weak comparison
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in accepted:
+            return tag
+    return None
+
+
+def not_modified_response(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """Return 304 Not Modified if the client already has this representation.
+
+    Args:
+        request: Current request
+        etag: ETag of the response the request would get
+
+    Returns:
+        304 response, or None if the response has to be built
+    """
+    tag = _matching_tag(request, etag)
+    if tag is None:
+        return None
+    return Response(status_code=304, headers={"ETag": tag, "Vary": "Accept-Encoding"})
+
+
+def get_cached_response(etag: Optional[str]) -> Optional[Response]:
+    """Return a copy of the response cached under etag, if any."""
+    if etag is None:
+        return None
+    entry = _response_cache.get(etag)
+    if entry is None:
+        return None
+    body, headers = entry
+    return Response(content=body, headers=headers)
+
+
+def conditional_response(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """Return the response for etag if it does not have to be built.
+
+    Args:
+        request: Current request
+        etag: ETag from make_etag()
+
+    Returns:
+        304 if the client has the representation, else the cached response,
+        else None
+    """
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    return get_cached_response(etag)
+
+
+def set_etag(etag: Optional[str], response: Response) -> Response:
+    """Tag a response (e.g. a streamed one) with its ETag, if it has one."""
+    if etag is not None:
+        response.headers["ETag"] = etag
+    return response
+
+
+def cache_response(etag: Optional[str], response: Response) -> Response:
+    """Tag a rendered response with its ETag and cache its body.
+
+    Args:
+        etag: ETag from make_etag() (None leaves the response as it is)
+        response: Response with a rendered body (not a streaming response)
+
+    Returns:
+        The same response
+    """
+    if etag is None:
+        return response
+    set_etag(etag, response)
+    body = response.body
+    if (
+        response.status_code == 200
+        and len(body) <= RESPONSE_CACHE_CONFIG["max_body_bytes"]
+    ):
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name != "content-length"
+        }
+        _response_cache.set(etag, (body, headers))
+    return response
+
+
+def cache_streaming_response(
+    etag: Optional[str], response: StreamingResponse
+) -> StreamingResponse:
+    """Tag a streaming response with its ETag and cache its body as it is sent.
+
+    The chunks are collected while they are streamed; the body is cached
+    once the stream completes, unless it grew past max_body_bytes, in which
+    case collection stops early.
+
+    Args:
+        etag: ETag from make_etag() (None leaves the response as it is)
+        response: Streaming response
+
+    Returns:
+        The same response
+    """
+    if etag is None:
+        return response
+    set_etag(etag, response)
+    if response.status_code != 200:
+        return response
+
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name != "content-length"
+    }
+    body_iterator = response.body_iterator
+    limit = RESPONSE_CACHE_CONFIG["max_body_bytes"]
+
+    async def tee() -> AsyncIterator[bytes]:
+        chunks: Optional[list[bytes]] = []
+        size = 0
+        async for chunk in body_iterator:
+            if chunks is not None:
+                size += len(chunk)
+                if size <= limit:
+                    chunks.append(chunk)
+                else:
+                    chunks = None
+            yield chunk
+        if chunks is not None:
+            _response_cache.set(etag, (b"".join(chunks), headers))
+
+    response.body_iterator = tee()
+    return response
+
+
+def clear_response_cache() -> None:
+    """Drop all cached response bodies."""
+    _response_cache.clear()
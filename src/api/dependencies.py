@@ -12,12 +12,21 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette.concurrency import run_in_threadpool
 
 from auth.jwt_manager import JWTManager
 from auth.models import APIKey, TokenClaims
 from auth.rate_limiter import SQLiteRateLimiter
 from auth.sqlite_auth import SQLiteAuthManager
 from database.sqlite.repository import get_unified_repository
+from src.database.duckdb.executor import (
+    QueryCancelledError,
+    QueryQueueFullError,
+    QueryTimeoutError,
+    get_query_executor,
+    get_query_timeout,
+)
+from src.database.sqlite.audit_sink import get_audit_sink
 from src.utils.config import get_config
 
 try:
@@ -37,14 +46,16 @@ security = HTTPBearer(
     auto_error=False,
 )
 
-# Global instances
+# Global instances. The providers used on every request are coroutines so
+# that FastAPI resolves them on the event loop; plain functions would each
+# cost a threadpool round trip per request just to return a singleton.
 _jwt_manager: Optional[JWTManager] = None
 _auth_manager: Optional[SQLiteAuthManager] = None
 _rate_limiter: Optional[SQLiteRateLimiter] = None
 _istat_client: Optional[ProductionIstatClient] = None
 
 
-def get_jwt_manager() -> JWTManager:
+async def get_jwt_manager() -> JWTManager:
     """Get JWT manager instance (singleton)"""
     global _jwt_manager
     if _jwt_manager is None:
@@ -58,7 +69,7 @@ def get_jwt_manager() -> JWTManager:
     return _jwt_manager
 
 
-def get_auth_manager() -> SQLiteAuthManager:
+async def get_auth_manager() -> SQLiteAuthManager:
     """Get authentication manager instance (singleton)"""
     global _auth_manager
     if _auth_manager is None:
@@ -68,7 +79,7 @@ def get_auth_manager() -> SQLiteAuthManager:
     return _auth_manager
 
 
-def get_rate_limiter() -> SQLiteRateLimiter:
+async def get_rate_limiter() -> SQLiteRateLimiter:
     """Get rate limiter instance (singleton)"""
     global _rate_limiter
     if _rate_limiter is None:
@@ -87,11 +98,15 @@ def get_istat_client() -> ProductionIstatClient:
     return _istat_client
 
 
+async def get_repository():
+    """Dependency to get unified data repository"""
+    return get_unified_repository()
+
+
 async def get_current_user(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     jwt_manager: JWTManager = Depends(get_jwt_manager),
-    auth_manager: SQLiteAuthManager = Depends(get_auth_manager),
 ) -> TokenClaims:
     """
     Dependency to get current authenticated user from JWT token.
@@ -100,7 +115,6 @@ async def get_current_user(
         request: FastAPI request object
         credentials: Authorization credentials from header
         jwt_manager: JWT manager instance
-        auth_manager: Authentication manager instance
 
     Returns:
         TokenClaims: Validated token claims
@@ -148,6 +162,9 @@ def require_scope(required_scope: APIScope):
     """
     Dependency factory for scope-based authorization.
 
+    The returned dependency builds on authorize_request, so the request is
+    also rate limited and audited.
+
     Args:
         required_scope: Required API scope
 
@@ -155,8 +172,8 @@ def require_scope(required_scope: APIScope):
         Dependency function that validates scope
     """
 
-    def scope_dependency(
-        current_user: TokenClaims = Depends(get_current_user),
+    async def scope_dependency(
+        current_user: TokenClaims = Depends(authorize_request),
     ) -> TokenClaims:
         user_scopes = current_user.scope.split()
 
@@ -186,13 +203,43 @@ def require_write():
     return require_scope(APIScope.WRITE)
 
 
+async def authorize_request(
+    request: Request,
+    current_user: TokenClaims = Depends(get_current_user),
+    rate_limiter: SQLiteRateLimiter = Depends(get_rate_limiter),
+    repository=Depends(get_repository),
+) -> TokenClaims:
+    """
+    Per-request dependency for protected endpoints.
+
+    Verifies the token once (through get_current_user), checks the rate
+    limits in memory and queues the audit event, replacing the separate
+    get_current_user, check_rate_limit and log_api_request dependencies.
+
+    Args:
+        request: FastAPI request object
+        current_user: Current authenticated user
+        rate_limiter: Rate limiter instance
+        repository: Unified data repository
+
+    Returns:
+        TokenClaims: Validated token claims
+
+    Raises:
+        HTTPException: If authentication fails or the rate limit is exceeded
+    """
+    _enforce_rate_limit(request, current_user, rate_limiter)
+    _submit_audit_event(request, current_user, repository)
+    return current_user
+
+
 async def check_rate_limit(
     request: Request,
     current_user: TokenClaims = Depends(get_current_user),
     rate_limiter: SQLiteRateLimiter = Depends(get_rate_limiter),
 ):
     """
-    Rate limiting dependency.
+    Rate limiting dependency (authorize_request also covers this).
 
     Args:
         request: FastAPI request object
@@ -202,6 +249,13 @@ async def check_rate_limit(
     Raises:
         HTTPException: If rate limit exceeded
     """
+    _enforce_rate_limit(request, current_user, rate_limiter)
+
+
+def _enforce_rate_limit(
+    request: Request, current_user: TokenClaims, rate_limiter: SQLiteRateLimiter
+) -> None:
+    """Check the limits of a request and keep its headers for the response"""
     try:
         # Create API key object for rate limiting based on token claims
         api_key = APIKey(
@@ -214,7 +268,7 @@ async def check_rate_limit(
         # Check rate limit
         result = rate_limiter.check_rate_limit(
             api_key=api_key,
-            ip_address=request.client.host,
+            ip_address=request.client.host if request.client else None,
             endpoint=request.url.path,
             user_agent=request.headers.get("user-agent"),
         )
@@ -227,29 +281,20 @@ async def check_rate_limit(
             )
 
         # Add rate limit headers to response (will be handled by middleware)
-        rate_headers = result.to_headers()
-        request.state.rate_limit_headers = rate_headers
-        logger.info(f"Set rate limit headers: {rate_headers}")
+        request.state.rate_limit_headers = result.to_headers()
 
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Rate limiting error: {e}", exc_info=True)
         # Set default rate limit headers even if rate limiting fails
-        default_headers = {
+        request.state.rate_limit_headers = {
             "X-RateLimit-Limit": "100",
             "X-RateLimit-Remaining": "99",
             "X-RateLimit-Reset": str(
                 int((datetime.now() + timedelta(hours=1)).timestamp())
             ),
         }
-        request.state.rate_limit_headers = default_headers
-        logger.info(f"Set default rate limit headers: {default_headers}")
-
-
-def get_repository():
-    """Dependency to get unified data repository"""
-    return get_unified_repository()
 
 
 def validate_pagination(page: int = 1, page_size: int = 50) -> tuple[int, int]:
@@ -459,34 +504,38 @@ async def log_api_request(
     repository=Depends(get_repository),
 ):
     """
-    Dependency to log API requests for audit purposes.
+    Dependency to log API requests for audit purposes (authorize_request
+    also covers this).
 
     Args:
         request: FastAPI request object
         current_user: Current authenticated user
         repository: Unified data repository
     """
+    _submit_audit_event(request, current_user, repository)
+
+
+def _submit_audit_event(request: Request, current_user: TokenClaims, repository):
+    """Queue the audit event of a request.
+
+    The event is handed to the audit sink, which writes it in a batch from
+    a background thread; the request never waits for SQLite.
+    """
     try:
-        # Extract request details
-        method = request.method
-        str(request.url)
         endpoint = request.url.path
-        query_params = dict(request.query_params)
-
-        # Log the request
-        repository.metadata_manager.log_audit(
+        get_audit_sink(repository.audit_manager).submit(
             user_id=current_user.api_key_name or current_user.sub,
             action="api_request",
             resource_type="api_endpoint",
             resource_id=endpoint,
             details={
-                "method": method,
+                "method": request.method,
                 "endpoint": endpoint,
-                "query_params": query_params,
-                "client_ip": request.client.host,
-                "user_agent": request.headers.get("user-agent"),
+                "query_params": dict(request.query_params),
                 "api_key_id": current_user.sub,
             },
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
         )
 
     except Exception as e:
@@ -494,6 +543,74 @@ async def log_api_request(
         # Don't fail the request on logging errors
 
 
+async def run_query(
+    request: Optional[Request],
+    fn,
+    *args,
+    endpoint_class: str = "interactive",
+    **kwargs,
+):
+    """
+    Run a blocking repository/DuckDB call on the shared query executor.
+
+    Keeps the event loop free while the query runs, bounds it by the time
+    budget of its endpoint class, and cancels it if the client disconnects.
+
+    Args:
+        request: Current request, used for disconnect detection (optional)
+        fn: Blocking callable
+        *args: Positional arguments for fn
+        endpoint_class: Time budget class (see QUERY_TIMEOUT_CONFIG)
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        Result of fn
+    """
+    try:
+        return await get_query_executor().run(
+            fn,
+            *args,
+            disconnect_check=request.is_disconnected if request else None,
+            query_timeout=get_query_timeout(endpoint_class),
+            **kwargs,
+        )
+    except QueryTimeoutError as e:
+        logger.warning(f"Query timed out on {request.url.path if request else fn}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Query took too long, please narrow the request",
+        )
+    except QueryQueueFullError as e:
+        logger.warning(f"Query rejected: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    except QueryCancelledError:
+        # Nobody is listening; 499 is the conventional "client closed request"
+        raise HTTPException(status_code=499, detail="Client closed request")
+
+
+async def run_metadata_query(fn, *args, **kwargs):
+    """
+    Run a blocking SQLite metadata call off the event loop.
+
+    Metadata lookups (dataset registry, precomputed stats) go to Starlette's
+    threadpool instead of the DuckDB query executor, so they never take a
+    DuckDB concurrency slot or queue behind analytics queries.
+
+    Args:
+        fn: Blocking callable
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        Result of fn
+    """
+    return await run_in_threadpool(fn, *args, **kwargs)
+
+
 def handle_api_errors(func):
     """
     Decorator for consistent API error handling.
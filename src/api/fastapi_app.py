@@ -16,41 +16,46 @@ Performance targets:
 - Authentication: <50ms per request
 """
 
-import time
 from datetime import datetime
 from typing import Optional
 
 from fastapi import Depends, FastAPI, HTTPException, Path, Query, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import JSONResponse
 
 from src.auth.security_middleware import SecurityHeadersMiddleware
+from src.database.duckdb.adaptive_optimizer import get_adaptive_optimizer
+from src.database.sqlite.dataset_manager import DatasetManager
 from src.database.sqlite.repository import get_unified_repository
 from src.export.endpoints import export_router
 from src.ingestion.simple_pipeline import create_simple_pipeline
+from src.utils.cache import get_cache_stats
 from src.utils.config import get_config
+from src.utils.pagination import decode_cursor, encode_cursor
 
 try:
     from utils.logger import get_logger
 except ImportError:
     from src.utils.logger import get_logger
 
+from .conditional import cache_response, conditional_response, make_etag
 from .dependencies import (
-    check_rate_limit,
+    authorize_request,
     get_auth_manager,
     get_current_user,
     get_istat_client,
     get_jwt_manager,
     get_repository,
     handle_api_errors,
-    log_api_request,
     require_admin,
     require_write,
+    run_metadata_query,
+    run_query,
     validate_dataset_id,
 )
+from .middleware import CompressionMiddleware, ResponseHeadersMiddleware
 from .models import (
     APIKeyCreate,
     APIKeyListResponse,
@@ -58,8 +63,10 @@ from .models import (
     Dataset,
     DatasetDetailResponse,
     DatasetListResponse,
+    DatasetSort,
     ErrorResponse,
     HealthCheckResponse,
+    TimeSeriesPoint,
     TimeSeriesResponse,
     UsageAnalyticsResponse,
     UserAuthResponse,
@@ -67,10 +74,14 @@ from .models import (
     UserRegisterRequest,
 )
 from .odata import create_odata_router
+from .responses import FastJSONResponse, arrow_records
 
 logger = get_logger(__name__)
 config = get_config()
 
+# Columns of the time series table returned in each point, in model order
+TIME_SERIES_POINT_FIELDS = list(TimeSeriesPoint.model_fields)
+
 # FastAPI application
 app = FastAPI(
     title="Osservatorio ISTAT Data Platform API",
@@ -125,7 +136,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(CompressionMiddleware)
+
+# Outermost: processing time and rate limit headers
+app.add_middleware(ResponseHeadersMiddleware)
 
 
 # Global exception handler
@@ -160,27 +174,6 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
-# Middleware for response headers and timing
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """Add processing time and rate limit headers"""
-    start_time = time.time()
-
-    # Process request
-    response = await call_next(request)
-
-    # Add timing header
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(round(process_time * 1000, 2))
-
-    # Add rate limit headers if available
-    if hasattr(request.state, "rate_limit_headers"):
-        for header, value in request.state.rate_limit_headers.items():
-            response.headers[header] = value
-
-    return response
-
-
 # Health Check Endpoint
 @app.get("/health", response_model=HealthCheckResponse, tags=["System"])
 async def health_check(repository=Depends(get_repository)):
@@ -377,6 +370,8 @@ async def metrics_health(repository=Depends(get_repository)):
                     "stats", {}
                 ),
             },
+            # In-process cache hit rates (API keys, verified tokens, ...)
+            "caches": get_cache_stats(),
         }
     except Exception as e:
         logger.error(f"Metrics health check failed: {e}")
@@ -683,69 +678,119 @@ async def get_user_profile(
             }
 
 
+def _dataset_cursor(dataset: dict, sort: str = "priority") -> str:
+    """Build the continuation token pointing after a dataset row."""
+    keys = DatasetManager.sort_keys(sort)
+    return encode_cursor([dataset.get(key) for key in keys], keys)
+
+
+def _decode_dataset_cursor(cursor: str, sort: str = "priority") -> list:
+    """Decode a dataset continuation token, mapping errors to HTTP 400."""
+    keys = DatasetManager.sort_keys(sort)
+    try:
+        return decode_cursor(cursor, keys)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def _dataset_list_response(
+    result: dict, page: int, page_size: int, sort: str
+) -> DatasetListResponse:
+    """Convert a repository query_datasets() result into the API response."""
+    datasets = result["datasets"]
+
+    # Convert to response format
+    dataset_models = []
+    for dataset in datasets:
+        dataset_model = Dataset(
+            dataset_id=dataset["dataset_id"],
+            name=dataset["name"],
+            category=dataset["category"],
+            description=dataset.get("description"),
+            istat_agency=dataset.get("istat_agency"),
+            priority=dataset.get("priority", 5),
+            id=dataset.get("id"),
+            status=dataset.get("status", "active"),
+            analytics_stats=dataset.get("analytics_stats"),
+            has_analytics_data=dataset.get("has_analytics_data", False),
+            created_at=dataset.get("created_at"),
+            updated_at=dataset.get("updated_at"),
+        )
+        dataset_models.append(dataset_model)
+
+    return DatasetListResponse(
+        datasets=dataset_models,
+        total_count=result["total_count"],
+        page=page,
+        page_size=page_size,
+        has_next=result["has_next"],
+        next_cursor=(
+            _dataset_cursor(datasets[-1], sort)
+            if result["has_next"] and datasets
+            else None
+        ),
+    )
+
+
 # Dataset Endpoints
 @app.get("/datasets", response_model=DatasetListResponse, tags=["Datasets"])
 @handle_api_errors
 async def list_datasets(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by dataset category"),
     with_analytics: Optional[bool] = Query(
         None, description="Filter by analytics data presence"
     ),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(
+        None, description="Continuation token from a previous page (next_cursor)"
+    ),
+    sort: DatasetSort = Query(DatasetSort.PRIORITY, description="Result ordering"),
     include_metadata: bool = Query(False, description="Include dataset metadata"),
     repository=Depends(get_repository),
-    current_user=Depends(get_current_user),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
+    current_user=Depends(authorize_request),
 ):
     """
     List datasets with filtering and pagination.
 
     Supports filtering by category and analytics data presence.
-    Results are paginated with configurable page size.
+    Results are paginated with configurable page size. Pass the returned
+    `next_cursor` as `cursor` to page by keyset instead of page number.
+    Responses carry an ETag; unchanged pages return 304 to If-None-Match.
+    Cached pages keep the timestamp of the time they were built.
 
     **Performance**: Target <100ms for 1000 datasets
     """
     try:
-        # Get datasets from repository
-        datasets = repository.list_datasets_complete(
-            category=category, with_analytics=with_analytics
+        etag = make_etag(request, repository.get_catalog_version())
+        cached = conditional_response(request, etag)
+        if cached is not None:
+            return cached
+
+        # Filtering, sorting, counting and paging all run in one SQL query
+        sort_order = DatasetManager.resolve_sort(sort.value)
+        result = await run_metadata_query(
+            repository.query_datasets,
+            category=category,
+            with_analytics=with_analytics,
+            page=page,
+            page_size=page_size,
+            sort=sort_order,
+            after=_decode_dataset_cursor(cursor, sort_order) if cursor else None,
         )
 
-        # Apply pagination
-        total_count = len(datasets)
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_datasets = datasets[start_idx:end_idx]
-
-        # Convert to response format
-        dataset_models = []
-        for dataset in paginated_datasets:
-            dataset_model = Dataset(
-                dataset_id=dataset["dataset_id"],
-                name=dataset["name"],
-                category=dataset["category"],
-                description=dataset.get("description"),
-                istat_agency=dataset.get("istat_agency"),
-                priority=dataset.get("priority", 5),
-                id=dataset.get("id"),
-                status=dataset.get("status", "active"),
-                analytics_stats=dataset.get("analytics_stats"),
-                has_analytics_data=dataset.get("has_analytics_data", False),
-                created_at=dataset.get("created_at"),
-                updated_at=dataset.get("updated_at"),
+        response = FastJSONResponse(
+            jsonable_encoder(
+                _dataset_list_response(result, page, page_size, sort_order)
             )
-            dataset_models.append(dataset_model)
-
-        return DatasetListResponse(
-            datasets=dataset_models,
-            total_count=total_count,
-            page=page,
-            page_size=page_size,
-            has_next=end_idx < total_count,
         )
+        return cache_response(etag, response)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to list datasets: {e}")
         raise HTTPException(
@@ -757,24 +802,27 @@ async def list_datasets(
 @app.get("/search", response_model=DatasetListResponse, tags=["Datasets"])
 @handle_api_errors
 async def search_datasets(
+    request: Request,
     q: str = Query(..., min_length=1, description="Search query string"),
     category: Optional[str] = Query(None, description="Filter by dataset category"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(
+        None, description="Continuation token from a previous page (next_cursor)"
+    ),
+    sort: DatasetSort = Query(
+        DatasetSort.RELEVANCE, description="Result ordering (default: best match)"
+    ),
     repository=Depends(get_repository),
-    current_user=Depends(get_current_user),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
+    current_user=Depends(authorize_request),
 ):
     """
-    Search datasets by name, description, or dataset ID.
+    Search datasets by name, description, dataset ID, category or the
+    keywords of its category's categorization rules.
 
-    Performs case-insensitive full-text search across:
-    - Dataset name
-    - Dataset description
-    - Dataset ID
-
-    Returns paginated results matching the query.
+    Uses a full-text index: every word of the query must match the start of
+    a word in the dataset, ignoring case and accents (`citta` finds `città`).
+    Results are ranked by BM25 relevance unless another sort is requested.
 
     **Example queries**:
     - `q=popolazione` - Find datasets about population
@@ -784,55 +832,22 @@ async def search_datasets(
     **Performance**: Target <200ms for 1000 datasets
     """
     try:
-        # Get all datasets (with optional category filter)
-        datasets = repository.list_datasets_complete(category=category)
-
-        # Perform case-insensitive search
-        search_query = q.lower().strip()
-        filtered_datasets = []
-
-        for dataset in datasets:
-            # Search in name, description, and dataset_id
-            name_match = search_query in dataset.get("name", "").lower()
-            desc_match = search_query in dataset.get("description", "").lower()
-            id_match = search_query in dataset.get("dataset_id", "").lower()
-
-            if name_match or desc_match or id_match:
-                filtered_datasets.append(dataset)
-
-        # Apply pagination
-        total_count = len(filtered_datasets)
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_datasets = filtered_datasets[start_idx:end_idx]
-
-        # Convert to response format
-        dataset_models = []
-        for dataset in paginated_datasets:
-            dataset_model = Dataset(
-                dataset_id=dataset["dataset_id"],
-                name=dataset["name"],
-                category=dataset["category"],
-                description=dataset.get("description"),
-                istat_agency=dataset.get("istat_agency"),
-                priority=dataset.get("priority", 5),
-                id=dataset.get("id"),
-                status=dataset.get("status", "active"),
-                analytics_stats=dataset.get("analytics_stats"),
-                has_analytics_data=dataset.get("has_analytics_data", False),
-                created_at=dataset.get("created_at"),
-                updated_at=dataset.get("updated_at"),
-            )
-            dataset_models.append(dataset_model)
-
-        return DatasetListResponse(
-            datasets=dataset_models,
-            total_count=total_count,
+        # Matching, ranking, counting and paging all run in one SQL query
+        sort_order = DatasetManager.resolve_sort(sort.value, q)
+        result = await run_metadata_query(
+            repository.query_datasets,
+            category=category,
+            q=q,
             page=page,
             page_size=page_size,
-            has_next=end_idx < total_count,
+            sort=sort_order,
+            after=_decode_dataset_cursor(cursor, sort_order) if cursor else None,
         )
 
+        return _dataset_list_response(result, page, page_size, sort_order)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to search datasets: {e}")
         raise HTTPException(
@@ -846,15 +861,14 @@ async def search_datasets(
 )
 @handle_api_errors
 async def get_dataset_detail(
+    request: Request,
     dataset_id: str = Path(..., description="ISTAT dataset identifier"),
     include_data: bool = Query(False, description="Include actual data observations"),
     limit: Optional[int] = Query(
         None, ge=1, le=10000, description="Limit number of observations"
     ),
     repository=Depends(get_repository),
-    current_user=Depends(get_current_user),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
+    current_user=Depends(authorize_request),
 ):
     """
     Get detailed information about a specific dataset.
@@ -868,7 +882,7 @@ async def get_dataset_detail(
         dataset_id = validate_dataset_id(dataset_id)
 
         # Get dataset details
-        dataset = repository.get_dataset_complete(dataset_id)
+        dataset = await run_metadata_query(repository.get_dataset_complete, dataset_id)
         if not dataset:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -893,10 +907,12 @@ async def get_dataset_detail(
         # Get data if requested
         data = None
         if include_data and dataset.get("has_analytics_data"):
-            time_series = repository.get_dataset_time_series(dataset_id=dataset_id)
-            if limit:
-                time_series = time_series[:limit]
-            data = time_series
+            data = await run_query(
+                request,
+                repository.get_dataset_time_series,
+                dataset_id=dataset_id,
+                limit=limit,
+            )
 
         return DatasetDetailResponse(dataset=dataset_model, data=data)
 
@@ -917,6 +933,7 @@ async def get_dataset_detail(
 )
 @handle_api_errors
 async def get_dataset_timeseries(
+    request: Request,
     dataset_id: str = Path(..., description="ISTAT dataset identifier"),
     territory_code: Optional[str] = Query(None, description="Filter by territory code"),
     measure_code: Optional[str] = Query(None, description="Filter by measure code"),
@@ -927,15 +944,16 @@ async def get_dataset_timeseries(
         None, ge=1900, le=2100, description="End year filter"
     ),
     repository=Depends(get_repository),
-    current_user=Depends(get_current_user),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
+    current_user=Depends(authorize_request),
 ):
     """
     Get time series data for a dataset with flexible filtering.
 
     Supports filtering by territory, measure, and time period.
     Results include all available metadata for each data point.
+    Responses carry an ETag and are cached under it; their timestamp is
+    the time the cached representation was built. Only complete results of
+    the data version the ETag names are cached.
     """
     try:
         # Validate parameters
@@ -947,8 +965,17 @@ async def get_dataset_timeseries(
                 detail="end_year must be greater than or equal to start_year",
             )
 
-        # Get time series data
-        time_series = repository.get_dataset_time_series(
+        version = repository.get_data_version(dataset_id)
+        etag = make_etag(request, version)
+        cached = conditional_response(request, etag)
+        if cached is not None:
+            return cached
+
+        # Get time series data as Arrow columns; timeouts and cancellations
+        # raise, so they never reach the cache
+        table = await run_query(
+            request,
+            repository.get_dataset_time_series_columns,
             dataset_id=dataset_id,
             territory_code=territory_code,
             measure_code=measure_code,
@@ -965,12 +992,24 @@ async def get_dataset_timeseries(
             "end_year": end_year,
         }
 
-        return TimeSeriesResponse(
-            dataset_id=dataset_id,
-            data=time_series,
-            filters_applied=filters_applied,
-            total_points=len(time_series),
+        # Same shape as TimeSeriesResponse, without validating every point.
+        # The body is cached under its ETag, so timestamp is the build time
+        # of this representation, replayed as is on cache hits.
+        response = FastJSONResponse(
+            {
+                "success": True,
+                "message": None,
+                "timestamp": datetime.now(),
+                "dataset_id": dataset_id,
+                "data": arrow_records(table, TIME_SERIES_POINT_FIELDS),
+                "filters_applied": filters_applied,
+                "total_points": table.num_rows,
+            }
         )
+        # Data ingested while the query ran may or may not be in the result
+        if repository.get_data_version(dataset_id) != version:
+            return response
+        return cache_response(etag, response)
 
     except HTTPException:
         raise
@@ -991,8 +1030,6 @@ async def create_auth_token(
     current_user=Depends(require_admin()),
     auth_manager=Depends(get_auth_manager),
     jwt_manager=Depends(get_jwt_manager),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
 ):
     """
     Create a new API key and return JWT token.
@@ -1053,8 +1090,6 @@ async def list_api_keys(
     repository=Depends(get_repository),
     current_user=Depends(require_admin()),
     auth_manager=Depends(get_auth_manager),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
 ):
     """
     List all API keys with usage statistics.
@@ -1103,8 +1138,6 @@ async def get_usage_analytics(
     group_by: str = Query("day", description="Group by period (day, week, month)"),
     repository=Depends(get_repository),
     current_user=Depends(require_admin()),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
 ):
     """
     Get usage analytics and statistics.
@@ -1158,6 +1191,64 @@ async def get_usage_analytics(
         )
 
 
+@app.get("/analytics/query-optimizer", tags=["Analytics"])
+@handle_api_errors
+async def get_query_optimizer_report(
+    request: Request,
+    current_user=Depends(require_admin()),
+):
+    """
+    Report of hot query shapes and materializations.
+
+    **Admin only**: Lists frequent, slow query fingerprints with their latest
+    EXPLAIN ANALYZE summary, and the latency of each materialized query type
+    before and after the materialization was applied.
+    """
+    try:
+        optimizer = get_adaptive_optimizer()
+        return await run_query(
+            request, optimizer.get_report, endpoint_class="analytics"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to build query optimizer report: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to build query optimizer report",
+        )
+
+
+@app.post("/analytics/query-optimizer/cycle", tags=["Analytics"])
+@handle_api_errors
+async def run_query_optimizer_cycle(
+    request: Request,
+    apply: Optional[bool] = Query(
+        None, description="Apply proposed materializations (default: config)"
+    ),
+    current_user=Depends(require_admin()),
+):
+    """
+    Run one adaptive optimization cycle.
+
+    **Admin only**: Proposes materializations for hot, slow query shapes,
+    refreshes stale ones and optionally applies the proposals.
+    """
+    try:
+        optimizer = get_adaptive_optimizer()
+        return await run_query(
+            request, optimizer.run_cycle, apply, endpoint_class="analytics"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Query optimizer cycle failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Query optimizer cycle failed",
+        )
+
+
 # Include OData router for export capabilities
 odata_router = create_odata_router()
 app.include_router(odata_router, prefix="/odata", tags=["OData"])
@@ -1209,10 +1300,8 @@ app.openapi = custom_openapi
 @app.get("/api/istat/status", tags=["ISTAT API"], summary="Get ISTAT API client status")
 @handle_api_errors
 async def get_istat_status(
-    current_user=Depends(get_current_user),
+    current_user=Depends(authorize_request),
     istat_client=Depends(get_istat_client),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
 ):
     """
     Get current status of the production ISTAT API client.
@@ -1253,10 +1342,8 @@ async def fetch_istat_dataset(
     dataset_id: str = Path(..., description="ISTAT dataset identifier"),
     include_data: bool = Query(True, description="Include dataset data in response"),
     with_quality: bool = Query(False, description="Include data quality validation"),
-    current_user=Depends(get_current_user),
+    current_user=Depends(authorize_request),
     istat_client=Depends(get_istat_client),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
 ):
     """
     Fetch specific dataset from ISTAT API.
@@ -1303,10 +1390,8 @@ async def fetch_istat_dataset(
 @handle_api_errors
 async def sync_istat_dataset(
     dataset_id: str = Path(..., description="ISTAT dataset identifier"),
-    current_user=Depends(require_write),  # Requires write permissions
+    current_user=Depends(require_write()),  # Requires write permissions
     istat_client=Depends(get_istat_client),
-    _rate_limit=Depends(check_rate_limit),
-    _audit=Depends(log_api_request),
 ):
     """
     Synchronize ISTAT dataset to local repository.
@@ -1553,7 +1638,10 @@ async def shutdown_event():
         # Force close database connections to prevent reload hanging
         import gc
 
-        from src.database.sqlite import reset_unified_repository
+        from src.database.sqlite import close_audit_sinks, reset_unified_repository
+
+        # Write queued audit events before the connections go away
+        close_audit_sinks()
 
         # Reset repository singletons
         reset_unified_repository()
@@ -0,0 +1,300 @@
+"""
+ASGI middleware for Osservatorio ISTAT REST API
+
+- ResponseHeadersMiddleware adds per-request response headers: processing
+  time and the rate limit headers recorded by the authorize_request
+  dependency.
+- CompressionMiddleware compresses textual responses with zstd, brotli or
+  gzip, whichever the client prefers and is available.
+
+Both are pure ASGI middleware that never buffer streamed bodies.
+"""
+
+import os
+import time
+import zlib
+from typing import Any, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    from utils.cache import BoundedCache
+except ImportError:
+    from src.utils.cache import BoundedCache
+
+from .conditional import CONTENT_CODINGS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional speedups extra
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional speedups extra
+    zstandard = None
+
+COMPRESSION_CONFIG = {
+    "minimum_size": int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000")),
+    # Levels tuned for large JSON/CSV payloads: gzip 6 compresses 3-4x
+    # faster than gzip 9 for a few percent larger bodies
+    "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    "brotli_quality": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5")),
+    "zstd_level": int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+    # Compressed bodies of responses with an ETag, reused for hot responses
+    "cache_max_bytes": int(
+        os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+    ),
+}
+
+# Media types worth compressing besides text/*; Parquet and other binary
+# formats are already compact
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "application/json",
+        "application/xml",
+        "application/javascript",
+        "application/x-ndjson",
+        "application/csv",
+    }
+)
+
+
+class ResponseHeadersMiddleware:
+    """Add X-Process-Time and rate limit headers to every HTTP response."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        # Shared with request.state, where dependencies leave the headers
+        state = scope.setdefault("state", {})
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                # Time until the response starts, in milliseconds
+                process_time = (time.perf_counter() - start_time) * 1000
+                headers["X-Process-Time"] = str(round(process_time, 2))
+                for name, value in state.get("rate_limit_headers", {}).items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def available_codings() -> list[str]:
+    """Content codings supported by the installed packages, best first."""
+    installed = {"zstd": zstandard is not None, "br": brotli is not None}
+    return [coding for coding in CONTENT_CODINGS if installed.get(coding, True)]
+
+
+def is_compressible(content_type: str) -> bool:
+    """Check whether a Content-Type is textual and worth compressing."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+class _Encoder:
+    """Incremental compressor for one content coding."""
+
+    def __init__(self, coding: str, config: dict[str, Any]):
+        self.coding = coding
+        if coding == "zstd":
+            compressor = zstandard.ZstdCompressor(level=config["zstd_level"])
+            self._compressor = compressor.compressobj()
+        elif coding == "br":
+            self._compressor = brotli.Compressor(quality=config["brotli_quality"])
+        else:
+            # wbits 31: gzip container
+            self._compressor = zlib.compressobj(config["gzip_level"], zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.coding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far, keeping the stream open."""
+        if self.coding == "zstd":
+            return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if self.coding == "br":
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """Emit the rest of the stream and end it."""
+        if self.coding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Compress textual responses with the client's preferred coding.
+
+    zstd and brotli are offered when their packages are installed (the
+    speedups extra), gzip always. Binary media types, already encoded
+    responses and bodies below minimum_size are sent as they are. Streamed
+    bodies are compressed chunk by chunk and flushed after every chunk.
+    Compressed bodies of responses with a strong ETag are cached per coding,
+    and the coding is appended to the ETag of the compressed representation.
+    """
+
+    def __init__(self, app: ASGIApp, config: Optional[dict[str, Any]] = None):
+        self.app = app
+        self.config = {**COMPRESSION_CONFIG, **(config or {})}
+        self.codings = available_codings()
+        self._cache = BoundedCache(
+            "compressed_responses", max_bytes=self.config["cache_max_bytes"]
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSend(self, coding, send))
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Pick the content coding for an Accept-Encoding header.
+
+        Returns:
+            Coding with the highest q-value (ties go to the preferred coding),
+            or None to send the body unencoded
+        """
+        weights = {}
+        for item in accept_encoding.split(","):
+            name, _, params = item.partition(";")
+            name = name.strip().lower()
+            if not name:
+                continue
+            weight = 1.0
+            params = params.strip().lower()
+            if params.startswith("q="):
+                try:
+                    weight = float(params[2:])
+                except ValueError:
+                    weight = 0.0
+            weights[name] = weight
+
+        best, best_weight = None, 0.0
+        for coding in self.codings:
+            weight = weights.get(coding, weights.get("*", 0.0))
+            if weight > best_weight:
+                best, best_weight = coding, weight
+        return best
+
+    def should_compress(
+        self, status: int, headers: Headers, size: int, more_body: bool
+    ) -> bool:
+        """Decide from the first body message whether to compress a response."""
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        if not is_compressible(headers.get("content-type", "")):
+            return False
+        return more_body or size >= self.config["minimum_size"]
+
+    def compress(self, body: bytes, coding: str, etag: Optional[str]) -> bytes:
+        """Compress a complete body, reusing the cached result for its ETag."""
+        key = (etag, coding) if etag and not etag.startswith("W/") else None
+        if key is not None:
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                return compressed
+
+        encoder = _Encoder(coding, self.config)
+        compressed = encoder.compress(body) + encoder.finish()
+        if key is not None:
+            self._cache.set(key, compressed)
+        return compressed
+
+
+class _CompressingSend:
+    """send() of one response, compressing its body.
+
+    http.response.start is held back until the first body message shows
+    whether the response is worth compressing.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send):
+        self.middleware = middleware
+        self.coding = coding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+        elif message["type"] == "http.response.start":
+            self.start = message
+        elif self.encoder is not None:
+            await self._send_chunk(message)
+        elif message["type"] == "http.response.body":
+            await self._send_first_body(message)
+        else:
+            self.passthrough = True
+            if self.start is not None:
+                await self.send(self.start)
+            await self.send(message)
+
+    async def _send_first_body(self, message: Message) -> None:
+        start = self.start
+        headers = MutableHeaders(scope=start)
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.middleware.should_compress(
+            start["status"], headers, len(body), more_body
+        ):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        etag = headers.get("etag")
+        headers["Content-Encoding"] = self.coding
+        headers.add_vary_header("Accept-Encoding")
+        if etag and not etag.startswith("W/"):
+            # Each representation gets its own strong validator
+            headers["ETag"] = f'{etag[:-1]}-{self.coding}"'
+
+        if more_body:
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            self.encoder = _Encoder(self.coding, self.middleware.config)
+            await self.send(start)
+            await self._send_chunk(message)
+            return
+
+        compressed = self.middleware.compress(body, self.coding, etag)
+        headers["Content-Length"] = str(len(compressed))
+        self.passthrough = True
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    async def _send_chunk(self, message: Message) -> None:
+        more_body = message.get("more_body", False)
+        data = self.encoder.compress(message.get("body", b""))
+        data += self.encoder.flush() if more_body else self.encoder.finish()
+        await self.send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
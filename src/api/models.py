@@ -52,13 +52,28 @@ class DatasetStatus(str, Enum):
     ERROR = "error"
 
 
+class DatasetSort(str, Enum):
+    """Dataset list ordering (see DatasetManager.SORT_ORDERS)"""
+
+    PRIORITY = "priority"
+    NAME = "name"
+    UPDATED = "updated"
+    RELEVANCE = "relevance"
+
+
 # Base Response Models
 class APIResponse(BaseModel):
     """Base API response model"""
 
     success: bool = True
     message: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(
+        default_factory=datetime.now,
+        description=(
+            "Time the response was built. Responses replayed from the "
+            "ETag response cache keep the time they were first built"
+        ),
+    )
 
     model_config = ConfigDict(json_encoders={datetime: lambda v: v.isoformat()})
 
@@ -133,10 +148,15 @@ class DatasetListResponse(APIResponse):
     """Dataset list response"""
 
     datasets: list[Dataset] = Field(..., description="List of datasets")
-    total_count: int = Field(..., description="Total number of datasets")
+    total_count: Optional[int] = Field(
+        None, description="Total number of datasets (omitted for cursor pages)"
+    )
     page: int = Field(1, description="Current page number")
     page_size: int = Field(50, description="Number of items per page")
     has_next: bool = Field(False, description="Whether there are more pages")
+    next_cursor: Optional[str] = Field(
+        None, description="Continuation token for the next page (pass as cursor)"
+    )
 
 
 class DatasetDetailResponse(APIResponse):
@@ -8,30 +8,62 @@ Features:
 - OData v4 compliant metadata and query endpoints
 - Universal entity models for data export
 - Efficient query translation to DuckDB
-- Automatic pagination and filtering
-- Performance optimizations for large datasets
+- Server-driven paging: pages are capped at ODATA_CONFIG["max_page_size"]
+  (or a smaller Prefer: odata.maxpagesize) and continue via @odata.nextLink
+  with a keyset $skiptoken; $top limits the whole result across pages
+- Observation pages are streamed to the client one record batch at a time
+- $apply groupby/aggregate on Observations runs as a DuckDB GROUP BY
+- Territories and Measures are served from DuckDB dimension tables that
+  ingestion maintains; the CSDL metadata document is built once
 
 Performance target: <500ms for 10k records
 """
 
-from typing import Optional
+import hashlib
+import os
+from typing import Any, Callable, Optional
 from xml.etree.ElementTree import Element, SubElement, tostring
 
+import pyarrow as pa
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 
 try:
     from utils.logger import get_logger
+    from utils.pagination import decode_cursor, encode_cursor
 except ImportError:
     from src.utils.logger import get_logger
+    from src.utils.pagination import decode_cursor, encode_cursor
 
+
+from .conditional import (
+    cache_response,
+    cache_streaming_response,
+    conditional_response,
+    make_etag,
+    not_modified_response,
+)
 from .dependencies import (
-    check_rate_limit,
-    get_current_user,
+    authorize_request,
     get_repository,
-    log_api_request,
+    run_metadata_query,
+    run_query,
+)
+from .odata_query import (
+    Apply,
+    FilterNode,
+    ODataQueryError,
+    and_filters,
+    compile_aggregates,
+    compile_filter,
+    matches,
+    parse_apply,
+    parse_filter,
+    parse_orderby,
+    parse_select,
+    required_value,
 )
+from .responses import FastJSONResponse, StreamingJSONResponse
 
 logger = get_logger(__name__)
 
@@ -40,6 +72,76 @@ ODATA_VERSION = "4.0"
 ODATA_NAMESPACE = "Osservatorio.ISTAT"
 ODATA_CONTAINER = "ISTATDataContainer"
 
+ODATA_CONFIG = {
+    # Largest page an entity set returns before continuing via nextLink
+    "max_page_size": int(os.getenv("ODATA_MAX_PAGE_SIZE", "10000")),
+    # Rows serialized per chunk of a streamed page
+    "stream_batch_size": int(os.getenv("ODATA_STREAM_BATCH_SIZE", "1000")),
+}
+
+# Entity set properties and their EDM types, for query option parsing
+DATASET_PROPERTIES = {
+    "DatasetId": "Edm.String",
+    "Name": "Edm.String",
+    "Category": "Edm.String",
+    "Description": "Edm.String",
+    "IstatAgency": "Edm.String",
+    "Priority": "Edm.Int32",
+    "RecordCount": "Edm.Int64",
+    "MinYear": "Edm.Int32",
+    "MaxYear": "Edm.Int32",
+    "TerritoryCount": "Edm.Int32",
+    "MeasureCount": "Edm.Int32",
+    "CreatedAt": "Edm.DateTimeOffset",
+    "UpdatedAt": "Edm.DateTimeOffset",
+}
+
+# Columns of UnifiedDataRepository.query_observations()
+OBSERVATION_PROPERTIES = {
+    "Id": "Edm.Int64",
+    "DatasetId": "Edm.String",
+    "Year": "Edm.Int32",
+    "TimePeriod": "Edm.String",
+    "TerritoryCode": "Edm.String",
+    "TerritoryName": "Edm.String",
+    "MeasureCode": "Edm.String",
+    "MeasureName": "Edm.String",
+    "ObsValue": "Edm.Double",
+    "ObsStatus": "Edm.String",
+}
+
+# Columns of UnifiedDataRepository.query_territories()
+TERRITORY_PROPERTIES = {
+    "TerritoryCode": "Edm.String",
+    "TerritoryName": "Edm.String",
+    "Level": "Edm.String",
+    "ParentCode": "Edm.String",
+}
+
+# Columns of UnifiedDataRepository.query_measures()
+MEASURE_PROPERTIES = {
+    "DatasetId": "Edm.String",
+    "MeasureCode": "Edm.String",
+    "MeasureName": "Edm.String",
+    "Unit": "Edm.String",
+    "DataType": "Edm.String",
+}
+
+# Entity sets of the service: name -> (entity type, properties, key)
+ENTITY_SETS = {
+    "Datasets": ("Dataset", DATASET_PROPERTIES, ("DatasetId",)),
+    "Observations": ("Observation", OBSERVATION_PROPERTIES, ("Id",)),
+    "Territories": ("Territory", TERRITORY_PROPERTIES, ("TerritoryCode",)),
+    "Measures": ("Measure", MEASURE_PROPERTIES, ("DatasetId", "MeasureCode")),
+}
+
+# Order of list_datasets_complete() (see DatasetManager.KEYSET_COLUMNS)
+DATASET_REGISTRY_ORDER = [("Priority", True), ("Name", False), ("DatasetId", False)]
+
+# Time series order of the observations of a dataset; both keys are stored
+# columns, so $skiptoken conditions seek in the scan
+OBSERVATION_ORDER = [("TimePeriod", False), ("Id", False)]
+
 
 def create_odata_router() -> APIRouter:
     """Create OData v4 router for universal data export"""
@@ -60,14 +162,8 @@ def create_odata_router() -> APIRouter:
             service_doc = {
                 "@odata.context": f"{base_url}/$metadata",
                 "value": [
-                    {"name": "Datasets", "kind": "EntitySet", "url": "Datasets"},
-                    {
-                        "name": "Observations",
-                        "kind": "EntitySet",
-                        "url": "Observations",
-                    },
-                    {"name": "Territories", "kind": "EntitySet", "url": "Territories"},
-                    {"name": "Measures", "kind": "EntitySet", "url": "Measures"},
+                    {"name": name, "kind": "EntitySet", "url": name}
+                    for name in ENTITY_SETS
                 ],
             }
 
@@ -86,207 +182,28 @@ def create_odata_router() -> APIRouter:
                 detail="Failed to generate service document",
             )
 
+    # The model is static: build the CSDL document once per router
+    metadata_document = _csdl_document()
+    metadata_etag = f'"{hashlib.blake2b(metadata_document, digest_size=8).hexdigest()}"'
+
     @router.get("/$metadata", response_class=PlainTextResponse)
     async def odata_metadata(request: Request):
         """
         OData v4 metadata document (CSDL) describing the data model.
 
         This XML document defines the entity types, properties, and relationships
-        that PowerBI uses to understand the data structure.
+        that PowerBI uses to understand the data structure. It is generated
+        once from the entity set properties and revalidated via its ETag.
         """
-        try:
-            str(request.base_url).rstrip("/") + "/odata"
-
-            # Create CSDL XML document
-            edmx = Element(
-                "edmx:Edmx",
-                {
-                    "Version": "4.0",
-                    "xmlns:edmx": "http://docs.oasis-open.org/odata/ns/edmx",
-                },
-            )
-
-            # Data Services
-            data_services = SubElement(edmx, "edmx:DataServices")
-
-            # Schema
-            schema = SubElement(
-                data_services,
-                "Schema",
-                {
-                    "Namespace": ODATA_NAMESPACE,
-                    "xmlns": "http://docs.oasis-open.org/odata/ns/edm",
-                },
-            )
-
-            # Dataset EntityType
-            dataset_type = SubElement(schema, "EntityType", {"Name": "Dataset"})
-            dataset_key = SubElement(dataset_type, "Key")
-            SubElement(dataset_key, "PropertyRef", {"Name": "DatasetId"})
-            SubElement(
-                dataset_type,
-                "Property",
-                {"Name": "DatasetId", "Type": "Edm.String", "Nullable": "false"},
-            )
-            SubElement(dataset_type, "Property", {"Name": "Name", "Type": "Edm.String"})
-            SubElement(
-                dataset_type, "Property", {"Name": "Category", "Type": "Edm.String"}
-            )
-            SubElement(
-                dataset_type, "Property", {"Name": "Description", "Type": "Edm.String"}
-            )
-            SubElement(
-                dataset_type, "Property", {"Name": "IstatAgency", "Type": "Edm.String"}
-            )
-            SubElement(
-                dataset_type, "Property", {"Name": "Priority", "Type": "Edm.Int32"}
-            )
-            SubElement(
-                dataset_type, "Property", {"Name": "RecordCount", "Type": "Edm.Int64"}
-            )
-            SubElement(
-                dataset_type, "Property", {"Name": "MinYear", "Type": "Edm.Int32"}
-            )
-            SubElement(
-                dataset_type, "Property", {"Name": "MaxYear", "Type": "Edm.Int32"}
-            )
-            SubElement(
-                dataset_type,
-                "Property",
-                {"Name": "TerritoryCount", "Type": "Edm.Int32"},
-            )
-            SubElement(
-                dataset_type, "Property", {"Name": "MeasureCount", "Type": "Edm.Int32"}
-            )
-            SubElement(
-                dataset_type,
-                "Property",
-                {"Name": "CreatedAt", "Type": "Edm.DateTimeOffset"},
-            )
-            SubElement(
-                dataset_type,
-                "Property",
-                {"Name": "UpdatedAt", "Type": "Edm.DateTimeOffset"},
-            )
-
-            # Observation EntityType
-            obs_type = SubElement(schema, "EntityType", {"Name": "Observation"})
-            obs_key = SubElement(obs_type, "Key")
-            SubElement(obs_key, "PropertyRef", {"Name": "Id"})
-            SubElement(
-                obs_type,
-                "Property",
-                {"Name": "Id", "Type": "Edm.Int64", "Nullable": "false"},
-            )
-            SubElement(
-                obs_type, "Property", {"Name": "DatasetId", "Type": "Edm.String"}
-            )
-            SubElement(obs_type, "Property", {"Name": "Year", "Type": "Edm.Int32"})
-            SubElement(
-                obs_type, "Property", {"Name": "TimePeriod", "Type": "Edm.String"}
-            )
-            SubElement(
-                obs_type, "Property", {"Name": "TerritoryCode", "Type": "Edm.String"}
-            )
-            SubElement(
-                obs_type, "Property", {"Name": "TerritoryName", "Type": "Edm.String"}
-            )
-            SubElement(
-                obs_type, "Property", {"Name": "MeasureCode", "Type": "Edm.String"}
-            )
-            SubElement(
-                obs_type, "Property", {"Name": "MeasureName", "Type": "Edm.String"}
-            )
-            SubElement(obs_type, "Property", {"Name": "ObsValue", "Type": "Edm.Double"})
-            SubElement(
-                obs_type, "Property", {"Name": "ObsStatus", "Type": "Edm.String"}
-            )
-
-            # Territory EntityType
-            territory_type = SubElement(schema, "EntityType", {"Name": "Territory"})
-            territory_key = SubElement(territory_type, "Key")
-            SubElement(territory_key, "PropertyRef", {"Name": "TerritoryCode"})
-            SubElement(
-                territory_type,
-                "Property",
-                {"Name": "TerritoryCode", "Type": "Edm.String", "Nullable": "false"},
-            )
-            SubElement(
-                territory_type,
-                "Property",
-                {"Name": "TerritoryName", "Type": "Edm.String"},
-            )
-            SubElement(
-                territory_type, "Property", {"Name": "Level", "Type": "Edm.String"}
-            )
-            SubElement(
-                territory_type, "Property", {"Name": "ParentCode", "Type": "Edm.String"}
-            )
-
-            # Measure EntityType
-            measure_type = SubElement(schema, "EntityType", {"Name": "Measure"})
-            measure_key = SubElement(measure_type, "Key")
-            SubElement(measure_key, "PropertyRef", {"Name": "MeasureCode"})
-            SubElement(
-                measure_type,
-                "Property",
-                {"Name": "MeasureCode", "Type": "Edm.String", "Nullable": "false"},
-            )
-            SubElement(
-                measure_type, "Property", {"Name": "MeasureName", "Type": "Edm.String"}
-            )
-            SubElement(measure_type, "Property", {"Name": "Unit", "Type": "Edm.String"})
-            SubElement(
-                measure_type, "Property", {"Name": "DataType", "Type": "Edm.String"}
-            )
-
-            # Entity Container
-            container = SubElement(schema, "EntityContainer", {"Name": ODATA_CONTAINER})
-
-            SubElement(
-                container,
-                "EntitySet",
-                {"Name": "Datasets", "EntityType": f"{ODATA_NAMESPACE}.Dataset"},
-            )
-
-            SubElement(
-                container,
-                "EntitySet",
-                {
-                    "Name": "Observations",
-                    "EntityType": f"{ODATA_NAMESPACE}.Observation",
-                },
-            )
-
-            SubElement(
-                container,
-                "EntitySet",
-                {"Name": "Territories", "EntityType": f"{ODATA_NAMESPACE}.Territory"},
-            )
-
-            SubElement(
-                container,
-                "EntitySet",
-                {"Name": "Measures", "EntityType": f"{ODATA_NAMESPACE}.Measure"},
-            )
-
-            # Convert to string
-            xml_string = tostring(edmx, encoding="unicode")
+        not_modified = not_modified_response(request, metadata_etag)
+        if not_modified is not None:
+            return not_modified
 
-            return PlainTextResponse(
-                content=xml_string,
-                headers={
-                    "OData-Version": ODATA_VERSION,
-                    "Content-Type": "application/xml",
-                },
-            )
-
-        except Exception as e:
-            logger.error(f"Failed to generate OData metadata: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to generate metadata document",
-            )
+        return Response(
+            content=metadata_document,
+            media_type="application/xml",
+            headers={"OData-Version": ODATA_VERSION, "ETag": metadata_etag},
+        )
 
     @router.get("/Datasets", summary="OData Datasets Entity Set")
     async def odata_datasets(
@@ -309,10 +226,11 @@ def create_odata_router() -> APIRouter:
         count: Optional[bool] = Query(
             None, alias="$count", description="Include count in response"
         ),
+        skiptoken: Optional[str] = Query(
+            None, alias="$skiptoken", description="Continuation token"
+        ),
         repository=Depends(get_repository),
-        current_user=Depends(get_current_user),
-        _rate_limit=Depends(check_rate_limit),
-        _audit=Depends(log_api_request),
+        current_user=Depends(authorize_request),
     ):
         """
         OData Datasets entity set for PowerBI Direct Query.
@@ -324,56 +242,73 @@ def create_odata_router() -> APIRouter:
         - $select: Select specific properties
         - $orderby: Order results
         - $count: Include total count
+        - $skiptoken: Continuation token from @odata.nextLink (keyset paging)
+
+        $top limits the whole result. Pages are capped by the server page
+        size and a Prefer: odata.maxpagesize header; when that cuts a result
+        short, @odata.nextLink continues it (with the remaining $top).
         """
         try:
-            base_url = str(request.base_url).rstrip("/") + "/odata"
+            page_size, preference = _page_size(request)
+            etag = make_etag(request, repository.get_catalog_version(), preference)
+            cached = conditional_response(request, etag)
+            if cached is not None:
+                return cached
 
-            # Get datasets from repository
-            datasets = repository.list_datasets_complete()
+            base_url = str(request.base_url).rstrip("/") + "/odata"
+            next_token = None
 
-            # Apply OData filters
-            filtered_datasets = (
-                _apply_odata_filter(datasets, filter) if filter else datasets
+            filter_node, sort_spec, selected = _parse_query_options(
+                DATASET_PROPERTIES, filter, orderby, select, DATASET_REGISTRY_ORDER
             )
 
-            # Apply ordering
-            if orderby:
-                filtered_datasets = _apply_odata_orderby(filtered_datasets, orderby)
-
-            # Apply pagination
-            total_count = len(filtered_datasets)
-            if skip:
-                filtered_datasets = filtered_datasets[skip:]
-            if top:
-                filtered_datasets = filtered_datasets[:top]
-
-            # Convert to OData format
-            odata_records = []
-            for dataset in filtered_datasets:
-                analytics_stats = dataset.get("analytics_stats", {})
-
-                record = {
-                    "DatasetId": dataset["dataset_id"],
-                    "Name": dataset["name"],
-                    "Category": dataset["category"],
-                    "Description": dataset.get("description"),
-                    "IstatAgency": dataset.get("istat_agency"),
-                    "Priority": dataset.get("priority", 5),
-                    "RecordCount": analytics_stats.get("record_count", 0),
-                    "MinYear": analytics_stats.get("min_year"),
-                    "MaxYear": analytics_stats.get("max_year"),
-                    "TerritoryCount": analytics_stats.get("territory_count", 0),
-                    "MeasureCount": analytics_stats.get("measure_count", 0),
-                    "CreatedAt": dataset.get("created_at"),
-                    "UpdatedAt": dataset.get("updated_at"),
-                }
-
-                # Apply $select if specified
-                if select:
-                    selected_props = [prop.strip() for prop in select.split(",")]
-                    record = {k: v for k, v in record.items() if k in selected_props}
+            if skiptoken and not filter and not orderby and not count:
+                # Registry order: seek in SQLite
+                datasets = await run_metadata_query(
+                    repository.list_datasets_complete,
+                    limit=_page_rows(page_size, top),
+                    after=_decode_skiptoken(skiptoken, sort_spec),
+                )
+                odata_records = [_dataset_entity(dataset) for dataset in datasets]
+                total_count = None
+                if len(odata_records) > page_size:
+                    odata_records = odata_records[:page_size]
+                    next_token = _odata_skiptoken_for(odata_records[-1], sort_spec)
+            else:
+                # Get datasets from repository
+                datasets = await run_metadata_query(repository.list_datasets_complete)
+                odata_records = [_dataset_entity(dataset) for dataset in datasets]
+
+                # Apply OData filters
+                if filter_node:
+                    odata_records = [
+                        record
+                        for record in odata_records
+                        if matches(filter_node, record)
+                    ]
+
+                # Apply ordering
+                if orderby:
+                    odata_records = _apply_odata_orderby(odata_records, sort_spec)
+
+                # Apply pagination
+                total_count = len(odata_records)
+                if skiptoken:
+                    odata_records = _apply_odata_skiptoken(
+                        odata_records, skiptoken, sort_spec
+                    )
+                elif skip:
+                    odata_records = odata_records[skip:]
+                odata_records = odata_records[: _page_rows(page_size, top)]
+                if len(odata_records) > page_size:
+                    next_token = _odata_skiptoken_for(
+                        odata_records[page_size - 1], sort_spec
+                    )
+                    odata_records = odata_records[:page_size]
 
-                odata_records.append(record)
+            # Apply $select if specified
+            if selected:
+                odata_records = _select_properties(odata_records, selected)
 
             # Build response
             response_data = {
@@ -382,17 +317,21 @@ def create_odata_router() -> APIRouter:
             }
 
             # Add count if requested
-            if count:
+            if count and total_count is not None:
                 response_data["@odata.count"] = total_count
 
-            return JSONResponse(
-                content=jsonable_encoder(response_data),
-                headers={
-                    "OData-Version": ODATA_VERSION,
-                    "Content-Type": "application/json;odata.metadata=minimal",
-                },
+            if next_token:
+                response_data["@odata.nextLink"] = _odata_next_link(
+                    request, next_token, top, len(odata_records)
+                )
+
+            response = FastJSONResponse(
+                content=response_data, headers=_paged_headers(preference)
             )
+            return cache_response(etag, response)
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to process OData Datasets query: {e}")
             raise HTTPException(
@@ -421,90 +360,117 @@ def create_odata_router() -> APIRouter:
         count: Optional[bool] = Query(
             None, alias="$count", description="Include count in response"
         ),
+        skiptoken: Optional[str] = Query(
+            None, alias="$skiptoken", description="Continuation token"
+        ),
+        apply: Optional[str] = Query(
+            None, alias="$apply", description="Aggregation transformations"
+        ),
         repository=Depends(get_repository),
-        current_user=Depends(get_current_user),
-        _rate_limit=Depends(check_rate_limit),
-        _audit=Depends(log_api_request),
+        current_user=Depends(authorize_request),
     ):
         """
         OData Observations entity set for PowerBI Direct Query.
 
         Provides access to time series observations with full OData query capabilities.
-        Optimized for large datasets with efficient pagination and filtering.
+        Optimized for large datasets with efficient pagination and filtering:
+        each page is bounded by the server page size (see Datasets), fetched
+        from DuckDB as Arrow and streamed to the client in record batches.
+
+        $apply aggregates in DuckDB, e.g.
+        ``filter(DatasetId eq 'DS')/groupby((Year),aggregate(ObsValue with sum as Total))``;
+        $filter, $orderby, $select and $count then apply to the aggregated rows.
 
         **Performance**: Target <500ms for 10k records
         """
         try:
-            base_url = str(request.base_url).rstrip("/") + "/odata"
-
-            # Parse filter to extract dataset constraint (required for performance)
-            dataset_id = _extract_dataset_filter(filter) if filter else None
+            page_size, preference = _page_size(request)
+
+            transformations = _parse_apply(apply, OBSERVATION_PROPERTIES)
+            grouped = transformations.grouped
+            filter_node, sort_spec, selected = _parse_query_options(
+                transformations.properties,
+                filter,
+                orderby,
+                select,
+                [(name, False) for name in transformations.groupby]
+                if grouped
+                else OBSERVATION_ORDER,
+            )
+
+            if grouped:
+                # $filter applies to the aggregated rows; it can only pin the
+                # dataset when the rows are grouped by it
+                scope = transformations.filter
+                if "DatasetId" in transformations.groupby:
+                    scope = and_filters(scope, transformations.having, filter_node)
+            else:
+                filter_node = and_filters(transformations.filter, filter_node)
+                scope = filter_node
+
+            # Dataset constraint from the filter (required for performance)
+            dataset_id = required_value(scope, "DatasetId")
 
             if not dataset_id:
                 # For performance, require dataset filter for observations
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Filter by DatasetId is required for Observations queries. Example: $filter=DatasetId eq 'DCIS_POPRES1'",
+                    detail="Filter by DatasetId is required for Observations queries. Example: $filter=DatasetId eq 'DCIS_POPRES1' (or filter(DatasetId eq 'DCIS_POPRES1') in $apply)",
                 )
 
-            # Get time series data for the dataset
-            time_series = repository.get_dataset_time_series(dataset_id=dataset_id)
-
-            # Convert to OData format with synthetic IDs
-            odata_records = []
-            for idx, obs in enumerate(time_series):
-                record = {
-                    "Id": idx + 1,  # Synthetic ID for OData
-                    "DatasetId": dataset_id,
-                    "Year": obs.get("year"),
-                    "TimePeriod": obs.get("time_period"),
-                    "TerritoryCode": obs.get("territory_code"),
-                    "TerritoryName": obs.get("territory_name"),
-                    "MeasureCode": obs.get("measure_code"),
-                    "MeasureName": obs.get("measure_name"),
-                    "ObsValue": obs.get("obs_value"),
-                    "ObsStatus": obs.get("obs_status"),
+            etag = make_etag(
+                request, repository.get_data_version(dataset_id), preference
+            )
+            cached = conditional_response(request, etag)
+            if cached is not None:
+                return cached
+
+            # Filter, aggregate, order and page in DuckDB; fetch one extra row
+            # to know whether there is a next page
+            if grouped:
+                having = and_filters(transformations.having, filter_node)
+                query_args = {
+                    "group_by": transformations.groupby,
+                    "aggregates": compile_aggregates(transformations),
+                    "condition": compile_filter(transformations.filter)
+                    if transformations.filter
+                    else None,
+                    "having": compile_filter(having) if having else None,
                 }
-
-                # Apply additional filters
-                if _matches_odata_filter(record, filter):
-                    odata_records.append(record)
-
-            # Apply ordering
-            if orderby:
-                odata_records = _apply_odata_orderby(odata_records, orderby)
-
-            # Apply pagination
-            total_count = len(odata_records)
-            if skip:
-                odata_records = odata_records[skip:]
-            if top:
-                odata_records = odata_records[:top]
-
-            # Apply $select if specified
-            if select:
-                selected_props = [prop.strip() for prop in select.split(",")]
-                odata_records = [
-                    {k: v for k, v in record.items() if k in selected_props}
-                    for record in odata_records
-                ]
-
-            # Build response
-            response_data = {
-                "@odata.context": f"{base_url}/$metadata#Observations",
-                "value": odata_records,
-            }
-
-            # Add count if requested
-            if count:
-                response_data["@odata.count"] = total_count
-
-            return JSONResponse(
-                content=jsonable_encoder(response_data),
-                headers={
-                    "OData-Version": ODATA_VERSION,
-                    "Content-Type": "application/json;odata.metadata=minimal",
-                },
+                query = repository.aggregate_observations
+                count_query = repository.count_observation_groups
+                page_args = {}
+                context = f"Observations({','.join(transformations.properties)})"
+            else:
+                query_args = {"condition": compile_filter(filter_node)}
+                query = repository.query_observations
+                count_query = repository.count_observations
+                page_args = {"columns": _page_columns(selected, sort_spec)}
+                context = "Observations"
+
+            table, total_count, next_token = await _query_page(
+                request,
+                query,
+                count_query,
+                {"dataset_id": dataset_id, **query_args},
+                page_args,
+                sort_spec,
+                page_size,
+                top,
+                skip,
+                skiptoken,
+                count,
+            )
+            return _stream_page(
+                request,
+                context,
+                table,
+                selected,
+                total_count,
+                next_token,
+                top,
+                preference,
+                etag,
             )
 
         except HTTPException:
@@ -525,82 +491,33 @@ def create_odata_router() -> APIRouter:
         select: Optional[str] = Query(None, alias="$select"),
         orderby: Optional[str] = Query(None, alias="$orderby"),
         count: Optional[bool] = Query(None, alias="$count"),
+        skiptoken: Optional[str] = Query(None, alias="$skiptoken"),
         repository=Depends(get_repository),
-        current_user=Depends(get_current_user),
-        _rate_limit=Depends(check_rate_limit),
-        _audit=Depends(log_api_request),
+        current_user=Depends(authorize_request),
     ):
-        """OData Territories entity set with territory hierarchy information"""
-        try:
-            base_url = str(request.base_url).rstrip("/") + "/odata"
-
-            # Mock territory data (in real implementation, query from DuckDB)
-            territories = [
-                {
-                    "TerritoryCode": "IT",
-                    "TerritoryName": "Italia",
-                    "Level": "Country",
-                    "ParentCode": None,
-                },
-                {
-                    "TerritoryCode": "ITC1",
-                    "TerritoryName": "Piemonte",
-                    "Level": "Region",
-                    "ParentCode": "IT",
-                },
-                {
-                    "TerritoryCode": "ITH1",
-                    "TerritoryName": "Provincia Autonoma di Bolzano/Bozen",
-                    "Level": "Province",
-                    "ParentCode": "ITH",
-                },
-            ]
-
-            # Apply OData query options
-            filtered_territories = (
-                _apply_odata_filter(territories, filter) if filter else territories
-            )
-
-            if orderby:
-                filtered_territories = _apply_odata_orderby(
-                    filtered_territories, orderby
-                )
-
-            total_count = len(filtered_territories)
-            if skip:
-                filtered_territories = filtered_territories[skip:]
-            if top:
-                filtered_territories = filtered_territories[:top]
-
-            if select:
-                selected_props = [prop.strip() for prop in select.split(",")]
-                filtered_territories = [
-                    {k: v for k, v in territory.items() if k in selected_props}
-                    for territory in filtered_territories
-                ]
-
-            response_data = {
-                "@odata.context": f"{base_url}/$metadata#Territories",
-                "value": filtered_territories,
-            }
-
-            if count:
-                response_data["@odata.count"] = total_count
-
-            return JSONResponse(
-                content=jsonable_encoder(response_data),
-                headers={
-                    "OData-Version": ODATA_VERSION,
-                    "Content-Type": "application/json;odata.metadata=minimal",
-                },
-            )
+        """
+        OData Territories entity set with territory hierarchy information.
 
-        except Exception as e:
-            logger.error(f"Failed to process OData Territories query: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to process OData query",
-            )
+        Lists the distinct territories of all ingested datasets with their
+        NUTS Level and ParentCode. Query options run in DuckDB on an indexed
+        dimension table that ingestion keeps current; pages are bounded by
+        the server page size (see Datasets).
+        """
+        return await _dimension_page(
+            request,
+            "Territories",
+            [("TerritoryCode", False)],
+            repository.query_territories,
+            repository.count_territories,
+            repository.get_catalog_version(),
+            top,
+            skip,
+            filter,
+            select,
+            orderby,
+            count,
+            skiptoken,
+        )
 
     @router.get("/Measures", summary="OData Measures Entity Set")
     async def odata_measures(
@@ -611,198 +528,448 @@ def create_odata_router() -> APIRouter:
         select: Optional[str] = Query(None, alias="$select"),
         orderby: Optional[str] = Query(None, alias="$orderby"),
         count: Optional[bool] = Query(None, alias="$count"),
+        skiptoken: Optional[str] = Query(None, alias="$skiptoken"),
         repository=Depends(get_repository),
-        current_user=Depends(get_current_user),
-        _rate_limit=Depends(check_rate_limit),
-        _audit=Depends(log_api_request),
+        current_user=Depends(authorize_request),
     ):
-        """OData Measures entity set with measure definitions and metadata"""
-        try:
-            base_url = str(request.base_url).rstrip("/") + "/odata"
-
-            # Mock measures data (in real implementation, query from DuckDB)
-            measures = [
-                {
-                    "MeasureCode": "POP_TOT",
-                    "MeasureName": "Popolazione totale",
-                    "Unit": "Numero",
-                    "DataType": "Integer",
-                },
-                {
-                    "MeasureCode": "POP_DENS",
-                    "MeasureName": "Densità di popolazione",
-                    "Unit": "Abitanti per km²",
-                    "DataType": "Decimal",
-                },
-            ]
-
-            # Apply OData query options
-            filtered_measures = (
-                _apply_odata_filter(measures, filter) if filter else measures
-            )
-
-            if orderby:
-                filtered_measures = _apply_odata_orderby(filtered_measures, orderby)
-
-            total_count = len(filtered_measures)
-            if skip:
-                filtered_measures = filtered_measures[skip:]
-            if top:
-                filtered_measures = filtered_measures[:top]
-
-            if select:
-                selected_props = [prop.strip() for prop in select.split(",")]
-                filtered_measures = [
-                    {k: v for k, v in measure.items() if k in selected_props}
-                    for measure in filtered_measures
-                ]
-
-            response_data = {
-                "@odata.context": f"{base_url}/$metadata#Measures",
-                "value": filtered_measures,
-            }
-
-            if count:
-                response_data["@odata.count"] = total_count
-
-            return JSONResponse(
-                content=jsonable_encoder(response_data),
-                headers={
-                    "OData-Version": ODATA_VERSION,
-                    "Content-Type": "application/json;odata.metadata=minimal",
-                },
-            )
+        """
+        OData Measures entity set with measure definitions and metadata.
 
-        except Exception as e:
-            logger.error(f"Failed to process OData Measures query: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to process OData query",
-            )
+        Lists the measures of each dataset with their Unit and DataType
+        (Integer if all values are integral). Query options run in DuckDB on
+        an indexed dimension table that ingestion keeps current; pages are
+        bounded by the server page size (see Datasets).
+        """
+        return await _dimension_page(
+            request,
+            "Measures",
+            [("DatasetId", False), ("MeasureCode", False)],
+            repository.query_measures,
+            repository.count_measures,
+            repository.get_catalog_version(),
+            top,
+            skip,
+            filter,
+            select,
+            orderby,
+            count,
+            skiptoken,
+        )
 
     return router
 
 
-# Helper functions for OData query processing
-
-
-def _apply_odata_filter(data: list[dict], filter_expr: str) -> list[dict]:
-    """Apply basic OData $filter expressions"""
-    if not filter_expr:
-        return data
-
-    # Simple implementation for common filters
-    # In production, use a proper OData expression parser
+def _csdl_document() -> bytes:
+    """Build the CSDL metadata document of ENTITY_SETS.
+
+    Key properties are declared non-nullable.
+    """
+    edmx = Element(
+        "edmx:Edmx",
+        {"Version": "4.0", "xmlns:edmx": "http://docs.oasis-open.org/odata/ns/edmx"},
+    )
+    data_services = SubElement(edmx, "edmx:DataServices")
+    schema = SubElement(
+        data_services,
+        "Schema",
+        {
+            "Namespace": ODATA_NAMESPACE,
+            "xmlns": "http://docs.oasis-open.org/odata/ns/edm",
+        },
+    )
+
+    for entity_type, properties, key in ENTITY_SETS.values():
+        type_element = SubElement(schema, "EntityType", {"Name": entity_type})
+        key_element = SubElement(type_element, "Key")
+        for name in key:
+            SubElement(key_element, "PropertyRef", {"Name": name})
+        for name, edm_type in properties.items():
+            attributes = {"Name": name, "Type": edm_type}
+            if name in key:
+                attributes["Nullable"] = "false"
+            SubElement(type_element, "Property", attributes)
+
+    container = SubElement(schema, "EntityContainer", {"Name": ODATA_CONTAINER})
+    for entity_set, (entity_type, _, _) in ENTITY_SETS.items():
+        SubElement(
+            container,
+            "EntitySet",
+            {"Name": entity_set, "EntityType": f"{ODATA_NAMESPACE}.{entity_type}"},
+        )
+
+    return tostring(edmx, encoding="unicode").encode()
 
-    filtered_data = []
-    for record in data:
-        if _matches_odata_filter(record, filter_expr):
-            filtered_data.append(record)
-
-    return filtered_data
-
-
-def _matches_odata_filter(record: dict, filter_expr: str) -> bool:
-    """Check if a record matches an OData filter expression"""
-    if not filter_expr:
-        return True
 
+# Helper functions for OData query processing
+def _parse_query_options(
+    properties: dict[str, str],
+    filter_expr: Optional[str],
+    orderby_expr: Optional[str],
+    select_expr: Optional[str],
+    natural_order: list[tuple[str, bool]],
+) -> tuple[Optional[FilterNode], list[tuple[str, bool]], Optional[list[str]]]:
+    """Parse $filter, $orderby and $select, mapping errors to HTTP 400.
+
+    The natural order of the entity set is appended to the $orderby keys as
+    a tiebreaker, so the (field, descending) sort spec identifies rows and
+    can be used for $skiptoken.
+
+    Returns:
+        Tuple of (filter expression or None, sort spec, selected properties
+        or None)
+    """
     try:
-        # Basic parsing for common patterns
-        # This is a simplified implementation - production should use a proper parser
-
-        # Handle "eq" (equals) operator
-        if " eq " in filter_expr:
-            parts = filter_expr.split(" eq ")
-            if len(parts) == 2:
-                field = parts[0].strip()
-                value = parts[1].strip().strip("'\"")
-
-                # Handle nested field access (e.g., "DatasetId eq 'VALUE'")
-                if field in record:
-                    return str(record[field]) == value
-
-        # Handle "ne" (not equals) operator
-        if " ne " in filter_expr:
-            parts = filter_expr.split(" ne ")
-            if len(parts) == 2:
-                field = parts[0].strip()
-                value = parts[1].strip().strip("'\"")
-
-                if field in record:
-                    return str(record[field]) != value
-
-        # Handle "gt" (greater than) operator
-        if " gt " in filter_expr:
-            parts = filter_expr.split(" gt ")
-            if len(parts) == 2:
-                field = parts[0].strip()
-                value = parts[1].strip()
-
-                if field in record and record[field] is not None:
-                    try:
-                        return float(record[field]) > float(value)
-                    except (ValueError, TypeError):
-                        return False
-
-        # Handle "contains" function
-        if "contains(" in filter_expr.lower():
-            # Extract contains(field, 'value') pattern
-            import re
-
-            match = re.search(
-                r"contains\((\w+),\s*'([^']+)'\)", filter_expr, re.IGNORECASE
-            )
-            if match:
-                field = match.group(1)
-                value = match.group(2)
-
-                if field in record and record[field]:
-                    return value.lower() in str(record[field]).lower()
-
-        return True  # Default to include if we can't parse the filter
-
-    except Exception as e:
-        logger.warning(f"Failed to parse OData filter '{filter_expr}': {e}")
-        return True
-
-
-def _apply_odata_orderby(data: list[dict], orderby_expr: str) -> list[dict]:
-    """Apply OData $orderby expression"""
-    if not orderby_expr:
-        return data
-
+        filter_node = parse_filter(filter_expr, properties) if filter_expr else None
+        sort_spec = parse_orderby(orderby_expr, properties) if orderby_expr else []
+        selected = parse_select(select_expr, properties) if select_expr else None
+    except ODataQueryError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    sorted_fields = {field for field, _ in sort_spec}
+    sort_spec += [key for key in natural_order if key[0] not in sorted_fields]
+    return filter_node, sort_spec, selected
+
+
+def _page_size(request: Request) -> tuple[int, Optional[str]]:
+    """Resolve the server-driven page size of a request.
+
+    The page size is ODATA_CONFIG["max_page_size"], capped by an
+    odata.maxpagesize preference in the Prefer header.
+
+    Returns:
+        Tuple of (page size, Preference-Applied value or None)
+    """
+    page_size = ODATA_CONFIG["max_page_size"]
+    preference = None
+    for token in request.headers.get("prefer", "").split(","):
+        name, _, value = token.partition("=")
+        if name.strip().lower() not in ("odata.maxpagesize", "maxpagesize"):
+            continue
+        try:
+            preferred = int(value.strip().strip('"'))
+        except ValueError:
+            continue
+        if preferred > 0:
+            page_size = min(page_size, preferred)
+            preference = f"odata.maxpagesize={page_size}"
+        break
+
+    return page_size, preference
+
+
+def _page_rows(page_size: int, top: Optional[int]) -> int:
+    """Rows to fetch for a page.
+
+    A $top within the page size ends the result. Otherwise one row more
+    than the page size is fetched to know whether there is a next page.
+    """
+    if top and 0 < top <= page_size:
+        return top
+    return page_size + 1
+
+
+def _paged_headers(preference: Optional[str]) -> dict[str, str]:
+    """Response headers of an entity set page."""
+    headers = {
+        "OData-Version": ODATA_VERSION,
+        "Content-Type": "application/json;odata.metadata=minimal",
+    }
+    if preference:
+        headers["Preference-Applied"] = preference
+    return headers
+
+
+def _page_columns(
+    selected: Optional[list[str]], sort_spec: list[tuple[str, bool]]
+) -> Optional[list[str]]:
+    """Columns to fetch for $select; sort keys are needed for the next $skiptoken."""
+    if not selected:
+        return None
+    return list(dict.fromkeys([*selected, *(field for field, _ in sort_spec)]))
+
+
+async def _query_page(
+    request: Request,
+    query: Callable[..., pa.Table],
+    count_query: Callable[..., int],
+    query_args: dict[str, Any],
+    page_args: dict[str, Any],
+    sort_spec: list[tuple[str, bool]],
+    page_size: int,
+    top: Optional[int],
+    skip: Optional[int],
+    skiptoken: Optional[str],
+    count: Optional[bool],
+) -> tuple[pa.Table, Optional[int], Optional[str]]:
+    """Fetch a page of entities from a repository query.
+
+    Filtering, ordering and paging run in DuckDB (see _page_rows() for the
+    number of rows fetched).
+
+    Args:
+        request: Current request
+        query: Repository query returning an Arrow table
+        count_query: Repository count taking the same query_args
+        query_args: Arguments of both query and count_query
+        page_args: Further arguments of query only
+        sort_spec: (field, descending) keys from _parse_query_options()
+        page_size: Page size from _page_size()
+        top: $top, the limit of the whole result
+        skip: $skip (ignored with a $skiptoken)
+        skiptoken: $skiptoken from a previous @odata.nextLink
+        count: Whether $count was requested
+
+    Returns:
+        Tuple of (page, total count or None, next $skiptoken or None)
+    """
+    table = await run_query(
+        request,
+        query,
+        endpoint_class="odata",
+        **query_args,
+        **page_args,
+        order_by=sort_spec,
+        limit=_page_rows(page_size, top),
+        offset=None if skiptoken else skip,
+        after=_decode_skiptoken(skiptoken, sort_spec) if skiptoken else None,
+    )
+
+    next_token = None
+    if table.num_rows > page_size:
+        table = table.slice(0, page_size)
+        last_row = table.slice(page_size - 1).select([f for f, _ in sort_spec])
+        next_token = _odata_skiptoken_for(last_row.to_pylist()[0], sort_spec)
+
+    total_count = None
+    if count:
+        total_count = await run_query(
+            request, count_query, endpoint_class="odata", **query_args
+        )
+    return table, total_count, next_token
+
+
+def _stream_page(
+    request: Request,
+    context: str,
+    table: pa.Table,
+    selected: Optional[list[str]],
+    total_count: Optional[int],
+    next_token: Optional[str],
+    top: Optional[int],
+    preference: Optional[str],
+    etag: Optional[str],
+) -> StreamingJSONResponse:
+    """Stream a page of entities, caching the body under its ETag.
+
+    Control information precedes the value, which is serialized one record
+    batch at a time.
+    """
+    base_url = str(request.base_url).rstrip("/") + "/odata"
+    response_data = {"@odata.context": f"{base_url}/$metadata#{context}"}
+
+    if total_count is not None:
+        response_data["@odata.count"] = total_count
+
+    response_data["value"] = table.select(selected) if selected else table
+
+    if next_token:
+        response_data["@odata.nextLink"] = _odata_next_link(
+            request, next_token, top, table.num_rows
+        )
+
+    response = StreamingJSONResponse(
+        content=response_data,
+        batch_size=ODATA_CONFIG["stream_batch_size"],
+        headers=_paged_headers(preference),
+    )
+    return cache_streaming_response(etag, response)
+
+
+async def _dimension_page(
+    request: Request,
+    entity_set: str,
+    natural_order: list[tuple[str, bool]],
+    query: Callable[..., pa.Table],
+    count_query: Callable[..., int],
+    version: int,
+    top: Optional[int],
+    skip: Optional[int],
+    filter_expr: Optional[str],
+    select_expr: Optional[str],
+    orderby_expr: Optional[str],
+    count: Optional[bool],
+    skiptoken: Optional[str],
+) -> Response:
+    """Serve a page of a dimension entity set (Territories, Measures).
+
+    Args:
+        request: Current request
+        entity_set: Name of the entity set in ENTITY_SETS
+        natural_order: Key of the entity set, as (field, descending)
+        query: Repository query taking condition and page arguments
+        count_query: Repository count taking condition
+        version: Data version the dimension is built from
+        top, skip, filter_expr, select_expr, orderby_expr, count, skiptoken:
+            OData query options
+
+    Returns:
+        Streamed page, or the cached response for its ETag
+    """
     try:
-        # Parse orderby expression (e.g., "Name asc" or "Priority desc")
-        parts = orderby_expr.strip().split()
-        field = parts[0]
-        direction = parts[1].lower() if len(parts) > 1 else "asc"
-
-        reverse = direction == "desc"
-
-        # Sort the data
-        return sorted(data, key=lambda x: x.get(field, ""), reverse=reverse)
-
+        page_size, preference = _page_size(request)
+        etag = make_etag(request, version, preference)
+        cached = conditional_response(request, etag)
+        if cached is not None:
+            return cached
+
+        _, properties, _ = ENTITY_SETS[entity_set]
+        filter_node, sort_spec, selected = _parse_query_options(
+            properties, filter_expr, orderby_expr, select_expr, natural_order
+        )
+        table, total_count, next_token = await _query_page(
+            request,
+            query,
+            count_query,
+            {"condition": compile_filter(filter_node) if filter_node else None},
+            {"columns": _page_columns(selected, sort_spec)},
+            sort_spec,
+            page_size,
+            top,
+            skip,
+            skiptoken,
+            count,
+        )
+        return _stream_page(
+            request,
+            entity_set,
+            table,
+            selected,
+            total_count,
+            next_token,
+            top,
+            preference,
+            etag,
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.warning(f"Failed to parse OData orderby '{orderby_expr}': {e}")
-        return data
+        logger.error(f"Failed to process OData {entity_set} query: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to process OData query",
+        )
 
 
-def _extract_dataset_filter(filter_expr: str) -> Optional[str]:
-    """Extract DatasetId from OData filter expression"""
-    if not filter_expr:
-        return None
+def _parse_apply(apply_expr: Optional[str], properties: dict[str, str]) -> Apply:
+    """Parse $apply, mapping errors to HTTP 400.
 
+    Returns:
+        Parsed transformations (a no-op Apply over properties if absent)
+    """
+    if not apply_expr:
+        return Apply(properties=properties)
     try:
-        # Look for "DatasetId eq 'VALUE'" pattern
-        if "DatasetId eq " in filter_expr:
-            parts = filter_expr.split("DatasetId eq ")
-            if len(parts) > 1:
-                value_part = parts[1].split()[0]  # Get first part after "eq"
-                return value_part.strip("'\"")
-
-        return None
-
-    except Exception as e:
-        logger.warning(f"Failed to extract dataset filter from '{filter_expr}': {e}")
-        return None
+        return parse_apply(apply_expr, properties)
+    except ODataQueryError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _dataset_entity(dataset: dict) -> dict:
+    """Convert a registry dataset to an OData Dataset entity."""
+    analytics_stats = dataset.get("analytics_stats", {})
+    return {
+        "DatasetId": dataset["dataset_id"],
+        "Name": dataset["name"],
+        "Category": dataset["category"],
+        "Description": dataset.get("description"),
+        "IstatAgency": dataset.get("istat_agency"),
+        "Priority": dataset.get("priority", 5),
+        "RecordCount": analytics_stats.get("record_count", 0),
+        "MinYear": analytics_stats.get("min_year"),
+        "MaxYear": analytics_stats.get("max_year"),
+        "TerritoryCount": analytics_stats.get("territory_count", 0),
+        "MeasureCount": analytics_stats.get("measure_count", 0),
+        "CreatedAt": dataset.get("created_at"),
+        "UpdatedAt": dataset.get("updated_at"),
+    }
+
+
+def _select_properties(records: list[dict], selected: list[str]) -> list[dict]:
+    """Apply $select to in-memory entities."""
+    return [{name: record.get(name) for name in selected} for record in records]
+
+
+def _apply_odata_orderby(
+    data: list[dict], sort_spec: list[tuple[str, bool]]
+) -> list[dict]:
+    """Sort entities by (field, descending) keys, nulls last as in DuckDB."""
+    for field, descending in reversed(sort_spec):
+        present = [record for record in data if record.get(field) is not None]
+        missing = [record for record in data if record.get(field) is None]
+        # sorted() is stable, so earlier passes break ties of later keys
+        data = sorted(present, key=lambda r: r[field], reverse=descending) + missing
+    return data
+
+
+def _skiptoken_keys(sort_spec: list[tuple[str, bool]]) -> list[str]:
+    """Describe a sort spec for embedding in (and checking) a $skiptoken."""
+    return [f"{field} {'desc' if desc else 'asc'}" for field, desc in sort_spec]
+
+
+def _decode_skiptoken(skiptoken: str, sort_spec: list[tuple[str, bool]]) -> list:
+    """Decode a $skiptoken, mapping errors to HTTP 400."""
+    try:
+        return decode_cursor(skiptoken, _skiptoken_keys(sort_spec))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid $skiptoken"
+        )
+
+
+def _odata_skiptoken_for(record: dict, sort_spec: list[tuple[str, bool]]) -> str:
+    """Encode the $skiptoken pointing after a record."""
+    return encode_cursor(
+        [record.get(field) for field, _ in sort_spec], _skiptoken_keys(sort_spec)
+    )
+
+
+def _apply_odata_skiptoken(
+    data: list[dict], skiptoken: str, sort_spec: list[tuple[str, bool]]
+) -> list[dict]:
+    """Drop records up to and including the one encoded in $skiptoken."""
+    values = _decode_skiptoken(skiptoken, sort_spec)
+
+    def is_after(record: dict) -> bool:
+        for (field, descending), value in zip(sort_spec, values):
+            current = record.get(field)
+            if current == value:
+                continue
+            # Nulls sort last in both directions
+            if current is None or value is None:
+                return current is None
+            try:
+                return current < value if descending else current > value
+            except TypeError:
+                return False
+        return False
+
+    for index, record in enumerate(data):
+        if is_after(record):
+            return data[index:]
+    return []
+
+
+def _odata_next_link(
+    request: Request, skiptoken: str, top: Optional[int], returned: int
+) -> str:
+    """Build @odata.nextLink from the current URL and a new $skiptoken.
+
+    $top limits the whole result, so the link asks for the rows still to be
+    returned after this page.
+    """
+    url = request.url.remove_query_params("$skip")
+    params = {"$skiptoken": skiptoken}
+    if top and top > 0:
+        params["$top"] = top - returned
+    return str(url.include_query_params(**params))
@@ -0,0 +1,719 @@
+"""
+OData v4 query options for Osservatorio ISTAT REST API
+
+$filter, $orderby and $select are parsed against the properties of an entity
+set, so an unknown property or a malformed expression is reported as an
+error instead of being ignored. A parsed filter is either compiled into
+DuckDBQueryBuilder conditions, so that it runs inside DuckDB, or evaluated on
+in-memory records for the entity sets served from the SQLite registry.
+
+Supported $filter syntax: eq, ne, gt, ge, lt, le, in, and, or, not,
+parentheses and the contains/startswith/endswith functions, with string,
+number, boolean and null literals. Comparisons follow OData semantics:
+null eq null is true, and null ne 'x' is true.
+
+Supported $apply syntax (OData Data Aggregation): filter() transformations,
+followed by at most one groupby((P1,P2[,...])[,aggregate(...)]) or
+aggregate(...) transformation, followed by filter() transformations on its
+output. Aggregate expressions take the form ``Property with method as
+Alias``, with the sum, average, min, max and countdistinct methods.
+"""
+
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+from src.database.duckdb.query_builder import (
+    ConditionGroup,
+    FilterCondition,
+    FilterOperator,
+)
+
+COMPARISON_OPERATORS = {"eq", "ne", "gt", "ge", "lt", "le"}
+STRING_FUNCTIONS = {"contains", "startswith", "endswith"}
+
+# EDM types compared as numbers; every other non-boolean type takes strings
+NUMERIC_TYPES = {"Edm.Int32", "Edm.Int64", "Edm.Double", "Edm.Decimal"}
+
+# $apply aggregation methods and the aggregate function each compiles to
+# (see UnifiedDataRepository.aggregate_observations)
+AGGREGATE_METHODS = {
+    "sum": "sum",
+    "average": "avg",
+    "min": "min",
+    "max": "max",
+    "countdistinct": "count_distinct",
+}
+
+# Operator for "literal op Property", rewritten as "Property op' literal"
+_SWAPPED_OPERATORS = {
+    "eq": "eq",
+    "ne": "ne",
+    "gt": "lt",
+    "ge": "le",
+    "lt": "gt",
+    "le": "ge",
+}
+
+_SQL_OPERATORS = {
+    "eq": FilterOperator.EQ,
+    "ne": FilterOperator.DISTINCT_FROM,
+    "gt": FilterOperator.GT,
+    "ge": FilterOperator.GTE,
+    "lt": FilterOperator.LT,
+    "le": FilterOperator.LTE,
+    "contains": FilterOperator.CONTAINS,
+    "startswith": FilterOperator.STARTS_WITH,
+    "endswith": FilterOperator.ENDS_WITH,
+}
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    \s*(?:
+        (?P<string>'(?:[^']|'')*')
+      | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<punct>[(),])
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+class ODataQueryError(ValueError):
+    """Invalid OData query option (reported as HTTP 400)."""
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """Comparison or string function on a property, e.g. ``Year ge 2020``.
+
+    Attributes:
+        property: Property name
+        operator: One of COMPARISON_OPERATORS, STRING_FUNCTIONS or "in"
+        value: Literal value (a tuple of values for "in")
+    """
+
+    property: str
+    operator: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class BoolOp:
+    """``and``/``or`` over two or more operands."""
+
+    operator: str
+    operands: tuple["FilterNode", ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    """``not`` applied to an expression."""
+
+    operand: "FilterNode"
+
+
+FilterNode = Union[Comparison, BoolOp, Not]
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    """Aggregate expression, e.g. ``ObsValue with sum as Total``."""
+
+    property: str
+    method: str
+    alias: str
+
+
+@dataclass
+class Apply:
+    """Parsed $apply option.
+
+    Attributes:
+        filter: Conjunction of the filter() transformations before grouping
+        groupby: Grouping properties
+        aggregates: Aggregate expressions
+        having: Conjunction of the filter() transformations after grouping
+        properties: Properties of the result and their EDM types
+    """
+
+    filter: Optional[FilterNode] = None
+    groupby: tuple[str, ...] = ()
+    aggregates: tuple[Aggregate, ...] = ()
+    having: Optional[FilterNode] = None
+    properties: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def grouped(self) -> bool:
+        """Whether the result is aggregated rather than filtered entities."""
+        return bool(self.groupby or self.aggregates)
+
+
+@dataclass(frozen=True)
+class _Token:
+    kind: str  # string, number, name, punct
+    text: str
+    position: int
+
+
+@dataclass(frozen=True)
+class _Literal:
+    value: Any
+
+
+def _tokenize(expression: str) -> list[_Token]:
+    """Split a $filter expression into tokens."""
+    tokens = []
+    position = 0
+    end = len(expression.rstrip())
+    while position < end:
+        match = _TOKEN_PATTERN.match(expression, position)
+        if match is None:
+            while expression[position].isspace():
+                position += 1
+            raise ODataQueryError(
+                f"Unexpected character in $filter at position {position}"
+            )
+        kind = match.lastgroup
+        tokens.append(_Token(kind, match.group(kind), match.start(kind)))
+        position = match.end()
+    return tokens
+
+
+class _FilterParser:
+    """Recursive descent parser for $filter expressions.
+
+    Grammar (lowest precedence first)::
+
+        or_expr   := and_expr ("or" and_expr)*
+        and_expr  := unary ("and" unary)*
+        unary     := "not" unary | primary
+        primary   := "(" or_expr ")"
+                   | function "(" property "," literal ")"
+                   | property "in" "(" literal ("," literal)* ")"
+                   | operand comparison_operator operand
+    """
+
+    def __init__(self, expression: str, properties: Mapping[str, str]):
+        self.tokens = _tokenize(expression)
+        self.properties = properties
+        self.index = 0
+
+    def parse(self) -> FilterNode:
+        if not self.tokens:
+            raise ODataQueryError("Empty $filter expression")
+        node = self._or_expression()
+        token = self._peek()
+        if token is not None:
+            raise self._error(f"Unexpected '{token.text}'", token)
+        return node
+
+    # Token helpers
+
+    def _peek(self) -> Optional[_Token]:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def _next(self) -> _Token:
+        token = self._peek()
+        if token is None:
+            raise ODataQueryError("Unexpected end of $filter expression")
+        self.index += 1
+        return token
+
+    def _accept(self, text: str) -> bool:
+        """Consume the next token if it is the keyword or punctuation text."""
+        token = self._peek()
+        if token is not None and token.kind in ("name", "punct"):
+            if token.text.lower() == text:
+                self.index += 1
+                return True
+        return False
+
+    def _expect(self, text: str) -> None:
+        token = self._next()
+        if token.text != text:
+            raise self._error(f"Expected '{text}', found '{token.text}'", token)
+
+    @staticmethod
+    def _error(message: str, token: _Token) -> ODataQueryError:
+        return ODataQueryError(f"{message} in $filter at position {token.position}")
+
+    # Grammar rules
+
+    def _or_expression(self) -> FilterNode:
+        operands = [self._and_expression()]
+        while self._accept("or"):
+            operands.append(self._and_expression())
+        return operands[0] if len(operands) == 1 else BoolOp("or", tuple(operands))
+
+    def _and_expression(self) -> FilterNode:
+        operands = [self._unary()]
+        while self._accept("and"):
+            operands.append(self._unary())
+        return operands[0] if len(operands) == 1 else BoolOp("and", tuple(operands))
+
+    def _unary(self) -> FilterNode:
+        if self._accept("not"):
+            return Not(self._unary())
+        return self._primary()
+
+    def _primary(self) -> FilterNode:
+        if self._accept("("):
+            node = self._or_expression()
+            self._expect(")")
+            return node
+
+        token = self._next()
+        following = self._peek()
+        if (
+            token.kind == "name"
+            and token.text in STRING_FUNCTIONS
+            and following is not None
+            and following.text == "("
+        ):
+            self._expect("(")
+            property_name = self._property(self._next())
+            self._expect(",")
+            value = self._literal(self._next())
+            self._expect(")")
+            return self._comparison(property_name, token.text, value, token)
+
+        left = self._operand(token)
+        operator_token = self._next()
+        operator = operator_token.text.lower()
+
+        if operator == "in":
+            if not isinstance(left, str):
+                raise self._error("'in' needs a property on the left", token)
+            self._expect("(")
+            values = [self._literal(self._next())]
+            while self._accept(","):
+                values.append(self._literal(self._next()))
+            self._expect(")")
+            return self._comparison(left, "in", tuple(values), token)
+
+        if operator_token.kind != "name" or operator not in COMPARISON_OPERATORS:
+            raise self._error(
+                f"Expected a comparison operator, found '{operator_token.text}'",
+                operator_token,
+            )
+
+        right = self._operand(self._next())
+        if isinstance(left, str) and isinstance(right, _Literal):
+            return self._comparison(left, operator, right.value, token)
+        if isinstance(left, _Literal) and isinstance(right, str):
+            return self._comparison(
+                right, _SWAPPED_OPERATORS[operator], left.value, token
+            )
+        raise self._error("Comparisons need a property and a literal", token)
+
+    def _operand(self, token: _Token) -> Union[str, "_Literal"]:
+        """Parse a property name (returned as str) or a literal."""
+        if token.kind == "name" and token.text not in ("true", "false", "null"):
+            return self._property(token)
+        return _Literal(self._literal(token))
+
+    def _property(self, token: _Token) -> str:
+        if token.kind != "name":
+            raise self._error(f"Expected a property, found '{token.text}'", token)
+        if token.text not in self.properties:
+            raise self._error(f"Unknown property '{token.text}'", token)
+        return token.text
+
+    def _literal(self, token: _Token) -> Any:
+        if token.kind == "string":
+            return token.text[1:-1].replace("''", "'")
+        if token.kind == "number":
+            if re.fullmatch(r"-?\d+", token.text):
+                return int(token.text)
+            return float(token.text)
+        if token.kind == "name" and token.text in ("true", "false"):
+            return token.text == "true"
+        if token.kind == "name" and token.text == "null":
+            return None
+        raise self._error(f"Expected a literal, found '{token.text}'", token)
+
+    def _comparison(
+        self, property_name: str, operator: str, value: Any, token: _Token
+    ) -> Comparison:
+        """Build a Comparison, checking literals against the property type."""
+        edm_type = self.properties[property_name]
+        if operator in STRING_FUNCTIONS:
+            if edm_type != "Edm.String" or not isinstance(value, str):
+                raise self._error(
+                    f"{operator}() needs a string property and a string literal",
+                    token,
+                )
+            return Comparison(property_name, operator, value)
+
+        for literal in value if operator == "in" else (value,):
+            if literal is None:
+                continue
+            if edm_type == "Edm.Boolean":
+                valid = isinstance(literal, bool)
+            elif edm_type in NUMERIC_TYPES:
+                valid = isinstance(literal, (int, float)) and not isinstance(
+                    literal, bool
+                )
+            else:
+                valid = isinstance(literal, str)
+            if not valid:
+                raise self._error(
+                    f"Literal {literal!r} does not match {property_name} ({edm_type})",
+                    token,
+                )
+        return Comparison(property_name, operator, value)
+
+
+def parse_filter(expression: str, properties: Mapping[str, str]) -> FilterNode:
+    """Parse a $filter expression.
+
+    Args:
+        expression: Value of $filter
+        properties: Property names of the entity set and their EDM types
+
+    Returns:
+        Expression tree
+
+    Raises:
+        ODataQueryError: If the expression is malformed or references
+            unknown properties
+    """
+    return _FilterParser(expression, properties).parse()
+
+
+def parse_apply(expression: str, properties: Mapping[str, str]) -> Apply:
+    """Parse an $apply expression.
+
+    For example ``filter(Year ge 2020)/groupby((TerritoryCode),
+    aggregate(ObsValue with sum as Total))``.
+
+    Args:
+        expression: Value of $apply
+        properties: Property names of the entity set and their EDM types
+
+    Returns:
+        Parsed transformations
+
+    Raises:
+        ODataQueryError: If the expression is malformed, uses an unsupported
+            transformation or references unknown properties
+    """
+    apply = Apply(properties=dict(properties))
+    for step in _split_top_level(expression, "/"):
+        match = re.fullmatch(r"\s*([A-Za-z]+)\s*\((.*)\)\s*", step, re.DOTALL)
+        if match is None:
+            raise ODataQueryError(f"Invalid $apply transformation '{step.strip()}'")
+        name, body = match.groups()
+
+        if name == "filter":
+            node = parse_filter(body, apply.properties)
+            if apply.grouped:
+                apply.having = and_filters(apply.having, node)
+            else:
+                apply.filter = and_filters(apply.filter, node)
+            continue
+
+        if name not in ("groupby", "aggregate"):
+            raise ODataQueryError(f"Unsupported $apply transformation '{name}'")
+        if apply.grouped:
+            raise ODataQueryError("$apply supports one groupby or aggregate")
+
+        if name == "groupby":
+            items = _split_top_level(body, ",")
+            grouping = re.fullmatch(r"\s*\((.*)\)\s*", items[0], re.DOTALL)
+            if grouping is None or len(items) > 2:
+                raise ODataQueryError(
+                    "Expected groupby((Property,...)[,aggregate(...)])"
+                )
+            apply.groupby = tuple(
+                _apply_property(item, properties)
+                for item in _split_top_level(grouping.group(1), ",")
+            )
+            if len(items) == 2:
+                nested = re.fullmatch(
+                    r"\s*aggregate\s*\((.*)\)\s*", items[1], re.DOTALL
+                )
+                if nested is None:
+                    raise ODataQueryError("Expected aggregate(...) inside groupby")
+                apply.aggregates = _parse_aggregates(nested.group(1), properties)
+        else:
+            apply.aggregates = _parse_aggregates(body, properties)
+
+        if len(set(apply.groupby)) < len(apply.groupby):
+            raise ODataQueryError("Duplicate property in groupby")
+        apply.properties = {name: properties[name] for name in apply.groupby}
+        for aggregate in apply.aggregates:
+            if aggregate.alias in properties or aggregate.alias in apply.properties:
+                raise ODataQueryError(f"Alias '{aggregate.alias}' is already in use")
+            apply.properties[aggregate.alias] = _aggregate_type(
+                aggregate, properties[aggregate.property]
+            )
+
+    return apply
+
+
+def _split_top_level(expression: str, separator: str) -> list[str]:
+    """Split on a separator outside parentheses and string literals."""
+    parts = []
+    depth = 0
+    quoted = False
+    start = 0
+    for index, char in enumerate(expression):
+        if char == "'":
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                raise ODataQueryError("Unbalanced parentheses in $apply")
+        elif char == separator and depth == 0:
+            parts.append(expression[start:index])
+            start = index + 1
+    if depth or quoted:
+        raise ODataQueryError("Unbalanced parentheses or quotes in $apply")
+    parts.append(expression[start:])
+    return parts
+
+
+def _apply_property(text: str, properties: Mapping[str, str]) -> str:
+    name = text.strip()
+    if name not in properties:
+        raise ODataQueryError(f"Unknown property '{name}' in $apply")
+    return name
+
+
+def _parse_aggregates(
+    body: str, properties: Mapping[str, str]
+) -> tuple[Aggregate, ...]:
+    """Parse the ``Property with method as Alias`` list of aggregate()."""
+    aggregates = []
+    for item in _split_top_level(body, ","):
+        match = re.fullmatch(
+            r"\s*([A-Za-z_]\w*)\s+with\s+([A-Za-z]+)\s+as\s+([A-Za-z_]\w*)\s*", item
+        )
+        if match is None:
+            raise ODataQueryError(
+                f"Expected 'Property with method as Alias', found '{item.strip()}'"
+            )
+        property_name, method, alias = match.groups()
+        _apply_property(property_name, properties)
+        if method not in AGGREGATE_METHODS:
+            raise ODataQueryError(f"Unsupported aggregation method '{method}'")
+        if alias in (aggregate.alias for aggregate in aggregates):
+            raise ODataQueryError(f"Alias '{alias}' is already in use")
+        aggregates.append(Aggregate(property_name, method, alias))
+    return tuple(aggregates)
+
+
+def _aggregate_type(aggregate: Aggregate, edm_type: str) -> str:
+    """EDM type of an aggregate expression over a property of edm_type."""
+    if aggregate.method == "countdistinct":
+        return "Edm.Int64"
+    if aggregate.method in ("min", "max"):
+        return edm_type
+    if edm_type not in NUMERIC_TYPES:
+        raise ODataQueryError(
+            f"{aggregate.method} needs a numeric property, not {aggregate.property}"
+        )
+    if aggregate.method == "average":
+        return "Edm.Double"
+    return "Edm.Int64" if edm_type in ("Edm.Int32", "Edm.Int64") else edm_type
+
+
+def and_filters(*nodes: Optional[FilterNode]) -> Optional[FilterNode]:
+    """Combine parsed filters with ``and``, skipping missing ones.
+
+    Returns:
+        The conjunction, or None if every node is None
+    """
+    operands = tuple(node for node in nodes if node is not None)
+    if not operands:
+        return None
+    return operands[0] if len(operands) == 1 else BoolOp("and", operands)
+
+
+def compile_aggregates(apply: Apply) -> list[tuple[str, str, str]]:
+    """Compile the aggregate expressions of a parsed $apply.
+
+    Returns:
+        (property, aggregate function, alias) for
+        UnifiedDataRepository.aggregate_observations()
+    """
+    return [
+        (aggregate.property, AGGREGATE_METHODS[aggregate.method], aggregate.alias)
+        for aggregate in apply.aggregates
+    ]
+
+
+def parse_orderby(
+    expression: str, properties: Mapping[str, str]
+) -> list[tuple[str, bool]]:
+    """Parse an $orderby expression such as ``Year desc,TerritoryCode``.
+
+    Args:
+        expression: Value of $orderby
+        properties: Property names of the entity set
+
+    Returns:
+        (property, descending) sort keys
+
+    Raises:
+        ODataQueryError: If the expression is malformed
+    """
+    keys = []
+    for item in expression.split(","):
+        parts = item.split()
+        if not parts or len(parts) > 2:
+            raise ODataQueryError(f"Invalid $orderby item '{item.strip()}'")
+        if parts[0] not in properties:
+            raise ODataQueryError(f"Unknown property '{parts[0]}' in $orderby")
+        direction = parts[1].lower() if len(parts) == 2 else "asc"
+        if direction not in ("asc", "desc"):
+            raise ODataQueryError(f"Invalid $orderby direction '{parts[1]}'")
+        keys.append((parts[0], direction == "desc"))
+    return keys
+
+
+def parse_select(expression: str, properties: Mapping[str, str]) -> list[str]:
+    """Parse a $select expression.
+
+    Args:
+        expression: Value of $select
+        properties: Property names of the entity set
+
+    Returns:
+        Selected properties, in entity set order
+
+    Raises:
+        ODataQueryError: If a property is unknown
+    """
+    selected = {item.strip() for item in expression.split(",")}
+    if "*" in selected:
+        return list(properties)
+    unknown = selected - set(properties)
+    if unknown:
+        raise ODataQueryError(f"Unknown property '{sorted(unknown)[0]}' in $select")
+    return [name for name in properties if name in selected]
+
+
+def compile_filter(
+    node: FilterNode, columns: Optional[Mapping[str, str]] = None
+) -> Union[FilterCondition, ConditionGroup]:
+    """Compile a parsed filter into DuckDBQueryBuilder conditions.
+
+    Args:
+        node: Expression from parse_filter()
+        columns: SQL column of each property (default: the property name)
+
+    Returns:
+        Condition for DuckDBQueryBuilder.where_condition()
+    """
+    if isinstance(node, BoolOp):
+        return ConditionGroup(
+            [compile_filter(operand, columns) for operand in node.operands],
+            conjunction=node.operator.upper(),
+        )
+    if isinstance(node, Not):
+        return ConditionGroup([compile_filter(node.operand, columns)], negated=True)
+
+    column = columns.get(node.property, node.property) if columns else node.property
+
+    if node.operator == "in":
+        values = [value for value in node.value if value is not None]
+        conditions = []
+        if values:
+            conditions.append(FilterCondition(column, FilterOperator.IN, values))
+        if len(values) < len(node.value):
+            conditions.append(FilterCondition(column, FilterOperator.IS_NULL, None))
+        if len(conditions) == 1:
+            return conditions[0]
+        return ConditionGroup(conditions, conjunction="OR")
+
+    if node.value is None and node.operator in ("eq", "ne"):
+        operator = (
+            FilterOperator.IS_NULL
+            if node.operator == "eq"
+            else FilterOperator.IS_NOT_NULL
+        )
+        return FilterCondition(column, operator, None)
+
+    return FilterCondition(column, _SQL_OPERATORS[node.operator], node.value)
+
+
+def matches(node: FilterNode, record: Mapping[str, Any]) -> bool:
+    """Evaluate a parsed filter on an in-memory record.
+
+    Args:
+        node: Expression from parse_filter()
+        record: Entity keyed by property name
+
+    Returns:
+        True if the record satisfies the filter
+    """
+    if isinstance(node, BoolOp):
+        results = (matches(operand, record) for operand in node.operands)
+        return all(results) if node.operator == "and" else any(results)
+    if isinstance(node, Not):
+        return not matches(node.operand, record)
+
+    value = record.get(node.property)
+    operator = node.operator
+
+    if operator == "eq":
+        return value == node.value
+    if operator == "ne":
+        return value != node.value
+    if operator == "in":
+        return value in node.value
+    if operator in STRING_FUNCTIONS:
+        if not isinstance(value, str):
+            return False
+        if operator == "contains":
+            return node.value in value
+        if operator == "startswith":
+            return value.startswith(node.value)
+        return value.endswith(node.value)
+
+    if value is None or node.value is None:
+        return False
+    try:
+        if operator == "gt":
+            return value > node.value
+        if operator == "ge":
+            return value >= node.value
+        if operator == "lt":
+            return value < node.value
+        return value <= node.value
+    except TypeError:
+        return False
+
+
+def required_value(node: Optional[FilterNode], property_name: str) -> Any:
+    """Find a value the filter requires a property to equal.
+
+    Only equalities that must hold for every match count: top-level ones and
+    those in top-level ``and`` operands, not those under ``or`` or ``not``.
+
+    Args:
+        node: Expression from parse_filter() (or None)
+        property_name: Property to look for
+
+    Returns:
+        The required value, or None if the filter does not pin the property
+    """
+    if isinstance(node, Comparison):
+        if node.property == property_name and node.operator == "eq":
+            return node.value
+        return None
+    if isinstance(node, BoolOp) and node.operator == "and":
+        for operand in node.operands:
+            value = required_value(operand, property_name)
+            if value is not None:
+                return value
+    return None
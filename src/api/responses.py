@@ -0,0 +1,166 @@
+"""
+Fast JSON responses for Osservatorio ISTAT REST API
+
+Large payloads (time series, OData observations) are built from trusted
+repository data, so validating every row through Pydantic and walking it
+again with jsonable_encoder only costs time. FastJSONResponse serializes the
+content as-is with orjson when installed (``pip install .[speedups]``),
+including NumPy arrays and scalars, datetimes and Arrow tables, and falls
+back to the standard library json module otherwise.
+
+Endpoints opt in by returning FastJSONResponse explicitly; everything else
+keeps FastAPI's validated response_model path. StreamingJSONResponse writes
+Arrow table members one record batch at a time instead, so a large page is
+never held as one Python list and one bytes object.
+"""
+
+import json
+from collections.abc import Iterator
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+import numpy as np
+import pyarrow as pa
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised without the speedups extra
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def arrow_records(
+    table: pa.Table, columns: Optional[list[str]] = None
+) -> list[dict[str, Any]]:
+    """Convert an Arrow table to row dicts without per-row validation.
+
+    Args:
+        table: Arrow table with the rows
+        columns: Columns to keep, in output order (default: all)
+
+    Returns:
+        One dict per row
+    """
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pylist()
+
+
+def _default(value: Any) -> Any:
+    """Convert values neither serializer handles natively."""
+    if isinstance(value, pa.Table):
+        return value.to_pylist()
+    if isinstance(value, (pa.Array, pa.ChunkedArray)):
+        return value.to_pylist()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _default_stdlib(value: Any) -> Any:
+    """Fallback conversions for the standard library json module."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return _default(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON.
+
+    NaN and infinite floats become null, as in Pydantic's JSON output.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(
+        _replace_non_finite(content),
+        default=_default_stdlib,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _replace_non_finite(content: Any) -> Any:
+    """Replace NaN/infinite floats with None (orjson does this natively)."""
+    if isinstance(content, float):
+        return content if content == content and abs(content) != float("inf") else None
+    if isinstance(content, dict):
+        return {key: _replace_non_finite(value) for key, value in content.items()}
+    if isinstance(content, (list, tuple)):
+        return [_replace_non_finite(value) for value in content]
+    return content
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response serialized with orjson, skipping jsonable_encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def iter_json_object(
+    content: dict[str, Any], batch_size: int = 1000
+) -> Iterator[bytes]:
+    """Serialize a JSON object incrementally.
+
+    Members are written in dict order. Arrow table values are written as
+    arrays of row objects, one chunk per record batch of at most batch_size
+    rows; every other value is serialized with dumps().
+
+    Args:
+        content: Object to serialize
+        batch_size: Maximum rows per chunk of an Arrow table member
+
+    Yields:
+        UTF-8 JSON chunks which concatenate to the whole object
+    """
+    separator = b"{"
+    for key, value in content.items():
+        prefix = separator + dumps(key) + b":"
+        separator = b","
+        if not isinstance(value, pa.Table):
+            yield prefix + dumps(value)
+            continue
+
+        yield prefix + b"["
+        first = True
+        for batch in value.to_batches(max_chunksize=batch_size):
+            if batch.num_rows == 0:
+                continue
+            # Strip the brackets of each batch array and join with commas
+            rows = dumps(batch.to_pylist())[1:-1]
+            yield rows if first else b"," + rows
+            first = False
+        yield b"]"
+
+    yield b"{}" if separator == b"{" else b"}"
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """JSON object response streamed with iter_json_object()."""
+
+    def __init__(
+        self,
+        content: dict[str, Any],
+        batch_size: int = 1000,
+        status_code: int = 200,
+        headers: Optional[dict[str, str]] = None,
+        media_type: str = "application/json",
+    ) -> None:
+        super().__init__(
+            iter_json_object(content, batch_size),
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+        )
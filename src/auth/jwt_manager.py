@@ -5,11 +5,15 @@ JWT token generation and validation:
 - HS256 JWT token support
 - Access and refresh token generation
 - Token expiration and refresh
-- Token blacklisting for logout
+- Token revocation persisted in SQLite (logout and explicit revoke)
 - Claims validation
+- Cache of verified claims for repeated verification of the same token
 """
 
+import dataclasses
+import hashlib
 import secrets
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -25,7 +29,13 @@ try:
 except ImportError:
     from src.utils.logger import get_logger
 
+try:
+    from utils.cache import BoundedCache
+except ImportError:
+    from src.utils.cache import BoundedCache
+
 from .models import APIKey, AuthToken, TokenClaims
+from .token_revocation import get_token_revocation_store
 
 logger = get_logger(__name__)
 
@@ -40,6 +50,9 @@ class JWTManager:
     # JWT algorithm
     ALGORITHM_HS256 = "HS256"
 
+    # Verified tokens kept in the claims cache
+    TOKEN_CACHE_MAX_ENTRIES = 10000
+
     def __init__(
         self,
         db_path: Optional[str] = None,
@@ -48,7 +61,8 @@ class JWTManager:
         """Initialize JWT manager with refresh token support
 
         Args:
-            db_path: Optional database path (kept for compatibility)
+            db_path: SQLite database holding revoked tokens (default database
+                if None)
             secret_key: JWT signing secret (if None, will generate or load from config)
         """
         self.algorithm = self.ALGORITHM_HS256
@@ -66,8 +80,15 @@ class JWTManager:
             "jwt_refresh_token_expire_days", self.DEFAULT_REFRESH_TOKEN_EXPIRE_DAYS
         )
 
-        # In-memory token blacklist for logout
-        self._blacklisted_tokens = set()
+        # Revoked token IDs, shared with other workers through SQLite
+        self.revocations = get_token_revocation_store(db_path)
+
+        # Verified claims by token digest, each held until the token expires
+        self._token_cache = BoundedCache(
+            "jwt_tokens",
+            max_entries=self.TOKEN_CACHE_MAX_ENTRIES,
+            default_ttl=self.access_token_expire_minutes * 60,
+        )
 
         logger.info("JWT Manager initialized with refresh token support")
 
@@ -216,12 +237,27 @@ class JWTManager:
     def verify_token(self, token: str) -> Optional[TokenClaims]:
         """Verify and decode JWT token
 
+        Claims of valid tokens are cached by token digest until the token
+        expires, so repeated requests with the same bearer token skip the
+        signature check. The blacklist is still consulted on every call.
+
         Args:
             token: JWT token string
 
         Returns:
             TokenClaims if token is valid, None if invalid/expired
         """
+        digest = self._token_digest(token)
+        cached = self._token_cache.get(digest)
+        if cached is not None:
+            jti, claims = cached
+            if jti and self.is_token_blacklisted(jti):
+                self._token_cache.delete(digest)
+                logger.warning("Token is blacklisted (logged out)")
+                return None
+            # Callers annotate the claims per request, so hand out a copy
+            return dataclasses.replace(claims)
+
         try:
             # Decode and verify token (MVP: disable audience validation for simplicity)
             payload = jwt.decode(
@@ -254,6 +290,12 @@ class JWTManager:
                 user_type=payload.get("user_type", "api_key"),
             )
 
+            ttl = payload["exp"] - time.time() if payload.get("exp") else None
+            if ttl is None or ttl > 0:
+                self._token_cache.set(
+                    digest, (jti, dataclasses.replace(token_claims)), ttl
+                )
+
             logger.debug(
                 f"Token verified successfully for: {token_claims.api_key_name}"
             )
@@ -364,39 +406,63 @@ class JWTManager:
             return None
 
     def revoke_token(self, token: str, reason: Optional[str] = None) -> bool:
-        """MVP: Token revocation not implemented (no blacklist for simplicity)
+        """Revoke a token until it expires
 
-        Returns True for compatibility but doesn't actually revoke anything
-        """
-        logger.info("Token revocation called but not implemented in MVP - Issue #153")
-        return True
+        The revocation is persisted, so it applies to every worker sharing
+        the database and survives restarts.
 
-    def cleanup_expired_tokens(self) -> int:
-        """MVP: Token cleanup not implemented (no persistent storage)
+        Args:
+            token: JWT access or refresh token
+            reason: Optional reason stored with the revocation
 
-        Returns 0 for compatibility
+        Returns:
+            True if the token was revoked, False if it could not be decoded
+            or has no jti claim
         """
-        logger.info("Token cleanup called but not implemented in MVP - Issue #153")
-        return 0
-
-    def blacklist_token(self, token: str) -> bool:
-        """Add token to blacklist to invalidate it"""
         try:
-            # Extract jti from token for blacklisting
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            # Extract jti and expiry from token for revocation
+            payload = jwt.decode(
+                token,
+                self.secret_key,
+                algorithms=[self.algorithm],
+                options={"verify_aud": False},  # Same as verify_token
+            )
             jti = payload.get("jti")
-            if jti:
-                self._blacklisted_tokens.add(jti)
-                logger.debug(f"Token blacklisted: {jti}")
-                return True
-            return False
+            if not jti:
+                return False
+            if not self.revocations.revoke(jti, payload.get("exp"), reason):
+                return False
+            self._token_cache.delete(self._token_digest(token))
+            logger.debug(f"Token revoked: {jti}")
+            return True
         except Exception as e:
-            logger.error(f"Failed to blacklist token: {e}")
+            logger.error(f"Failed to revoke token: {e}")
             return False
 
+    def cleanup_expired_tokens(self) -> int:
+        """Remove revocations of tokens that have expired
+
+        Returns:
+            Number of revocations removed
+        """
+        return self.revocations.cleanup_expired()
+
+    def blacklist_token(self, token: str) -> bool:
+        """Add token to blacklist to invalidate it (logout)"""
+        return self.revoke_token(token, reason="logout")
+
     def is_token_blacklisted(self, jti: str) -> bool:
         """Check if token is blacklisted"""
-        return jti in self._blacklisted_tokens
+        return self.revocations.is_revoked(jti)
+
+    def get_cache_stats(self) -> dict:
+        """Return hit/miss statistics of the verified-token cache"""
+        return self._token_cache.get_stats()
+
+    @staticmethod
+    def _token_digest(token: str) -> str:
+        """Cache key for a token; the raw token is never kept in memory"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
 # Convenience functions for backward compatibility
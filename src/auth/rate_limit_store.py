@@ -0,0 +1,472 @@
+"""
+Rate limit counter stores for Osservatorio ISTAT Data Platform
+
+Stores hold the sliding window counters used by SQLiteRateLimiter:
+- MemoryRateLimitStore: per-process dictionary (single worker)
+- SharedMemoryRateLimitStore: fixed-size hash table in a named
+  multiprocessing.shared_memory segment, shared by all workers on one host
+- RedisRateLimitStore: Redis-compatible server, shared across hosts
+
+All stores implement the same algorithm. Each window (minute, hour, day)
+keeps a count per fixed bucket; the current request rate is estimated as the
+current bucket plus the previous bucket weighted by how much of it still
+overlaps the sliding window. A hit is checked against every window and only
+counted if all of them allow it, atomically per store.
+"""
+
+import abc
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+
+try:
+    from utils.logger import get_logger
+except ImportError:
+    from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Window name -> length in seconds
+WINDOW_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+
+# (window_type, size_seconds, limit)
+Window = tuple[str, int, int]
+
+STORE_BACKENDS = ("memory", "shared_memory", "redis")
+
+
+@dataclass
+class WindowHit:
+    """Outcome of a rate limit hit across all windows."""
+
+    allowed: bool
+    # Index of the window that denied the hit (None if allowed)
+    denied: Optional[int]
+    # Estimated request count per window before this hit
+    estimates: list[float]
+
+
+def bucket_start(now: float, size: int) -> int:
+    """Start (epoch seconds) of the fixed bucket of a window containing now."""
+    return int(now // size * size)
+
+
+def evaluate_windows(
+    counts: list[tuple[int, int]], windows: list[Window], now: float
+) -> WindowHit:
+    """Apply the sliding window estimate to per-window bucket counts.
+
+    Args:
+        counts: (current bucket count, previous bucket count) per window
+        windows: Window definitions
+        now: Current time (epoch seconds)
+
+    Returns:
+        WindowHit; allowed if every estimate is below its limit
+    """
+    estimates = []
+    denied = None
+    for index, ((current, previous), (_name, size, limit)) in enumerate(
+        zip(counts, windows)
+    ):
+        overlap = 1.0 - (now - bucket_start(now, size)) / size
+        estimate = current + overlap * previous
+        estimates.append(estimate)
+        if denied is None and estimate >= limit:
+            denied = index
+    return WindowHit(denied is None, denied, estimates)
+
+
+class RateLimitStore(abc.ABC):
+    """Interface of rate limit counter stores."""
+
+    backend = ""
+
+    @abc.abstractmethod
+    def hit(self, key: str, windows: list[Window], now: float) -> WindowHit:
+        """Check a request against all windows and count it if allowed.
+
+        Args:
+            key: Rate limit subject (identifier, type and endpoint)
+            windows: Window definitions
+            now: Current time (epoch seconds)
+
+        Returns:
+            WindowHit with the estimates before this request
+        """
+
+    @abc.abstractmethod
+    def seed(self, key: str, buckets: dict[tuple[str, int], int], now: float) -> None:
+        """Initialize counters of a key not yet present in the store.
+
+        Args:
+            key: Rate limit subject
+            buckets: (window_type, bucket_start) -> count, e.g. from rate_limits
+            now: Current time (epoch seconds)
+        """
+
+    def prune(self, now: float) -> int:
+        """Drop counters that no longer affect any window.
+
+        Returns:
+            Number of keys removed
+        """
+        return 0
+
+    def close(self) -> None:  # noqa: B027 - optional hook, no-op by default
+        """Release resources held by the store."""
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Counters in a dictionary of the current process."""
+
+    backend = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> {(window_type, bucket_start): count}
+        self._counters: dict[str, dict[tuple[str, int], int]] = {}
+
+    def hit(self, key: str, windows: list[Window], now: float) -> WindowHit:
+        with self._lock:
+            counters = self._counters.setdefault(key, {})
+            counts = []
+            for name, size, _limit in windows:
+                start = bucket_start(now, size)
+                counts.append(
+                    (
+                        counters.get((name, start), 0),
+                        counters.get((name, start - size), 0),
+                    )
+                )
+
+            result = evaluate_windows(counts, windows, now)
+            if result.allowed:
+                for name, size, _limit in windows:
+                    bucket = (name, bucket_start(now, size))
+                    counters[bucket] = counters.get(bucket, 0) + 1
+            return result
+
+    def seed(self, key: str, buckets: dict[tuple[str, int], int], now: float) -> None:
+        with self._lock:
+            if not self._counters.get(key):
+                self._counters[key] = dict(buckets)
+
+    def prune(self, now: float) -> int:
+        removed = 0
+        with self._lock:
+            for key in list(self._counters):
+                counters = self._counters[key]
+                for bucket in [
+                    b for b in counters if b[1] + 2 * WINDOW_SECONDS[b[0]] <= now
+                ]:
+                    del counters[bucket]
+                if not counters:
+                    del self._counters[key]
+                    removed += 1
+        return removed
+
+
+class SharedMemoryRateLimitStore(RateLimitStore):
+    """Counters in a named shared memory hash table (POSIX only).
+
+    Every worker process attaches to the same segment. A slot holds the
+    64-bit hash of a key and, per window, two (bucket_start, count) pairs
+    used alternately by even and odd buckets. Access is serialized across
+    processes with an flock on a lock file next to the segment. Slots whose
+    buckets are all outside their windows are reclaimed when probed, so no
+    sweep over the table is needed.
+    """
+
+    backend = "shared_memory"
+
+    WINDOWS = ("minute", "hour", "day")
+    # Slots probed for a key before the stalest probed slot is reused
+    MAX_PROBE = 32
+
+    _SLOT = struct.Struct("<Q12q")
+
+    def __init__(self, name: str = "osservatorio_rate_limits", slots: int = 65536):
+        """Create or attach to the shared segment.
+
+        Args:
+            name: Shared memory segment name
+            slots: Number of hash table slots (keys tracked concurrently)
+        """
+        import fcntl
+        from multiprocessing import resource_tracker, shared_memory
+
+        self._fcntl = fcntl
+        self.name = name
+        self.slots = slots
+        size = slots * self._SLOT.size
+
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=name)
+            if self._shm.size < size:
+                self._shm.close()
+                raise ValueError(
+                    f"Shared memory segment {name} is smaller than {slots} slots"
+                )
+        # The segment outlives the process that created it: workers come and
+        # go, and the resource tracker would otherwise unlink it on exit
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        self._lock_file = open(  # noqa: SIM115 - held for the store's lifetime
+            os.path.join(tempfile.gettempdir(), f"{name}.lock"), "a+b"
+        )
+        self._thread_lock = threading.Lock()
+
+    def hit(self, key: str, windows: list[Window], now: float) -> WindowHit:
+        with self._locked():
+            slot, values = self._find_slot(self._hash(key), now)
+            counts = [self._counts(values, w, size, now) for w, size, _ in windows]
+
+            result = evaluate_windows(counts, windows, now)
+            if result.allowed:
+                for name, size, _limit in windows:
+                    self._increment(values, name, size, now, 1)
+                self._write(slot, values)
+            return result
+
+    def seed(self, key: str, buckets: dict[tuple[str, int], int], now: float) -> None:
+        with self._locked():
+            slot, values = self._find_slot(self._hash(key), now)
+            if any(values[2::2]):
+                return
+            for (name, start), count in buckets.items():
+                if name not in self.WINDOWS:
+                    continue
+                size = WINDOW_SECONDS[name]
+                base = self._offset(name, start, size)
+                if start + 2 * size > now and values[base] <= start:
+                    values[base] = start
+                    values[base + 1] = count
+            self._write(slot, values)
+
+    def close(self) -> None:
+        try:
+            self._lock_file.close()
+        finally:
+            self._shm.close()
+
+    def unlink(self) -> None:
+        """Remove the shared segment (after all workers are done with it)."""
+        from multiprocessing import shared_memory
+
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+            shm.close()
+            shm.unlink()
+            os.remove(self._lock_file.name)
+        except FileNotFoundError:
+            pass
+
+    # Slot layout: hash, then per window (start_even, count_even,
+    # start_odd, count_odd); values are kept as a 13-item list
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _offset(self, name: str, start: int, size: int) -> int:
+        return 1 + self.WINDOWS.index(name) * 4 + (start // size % 2) * 2
+
+    def _counts(
+        self, values: list[int], name: str, size: int, now: float
+    ) -> tuple[int, int]:
+        start = bucket_start(now, size)
+        current = self._offset(name, start, size)
+        previous = self._offset(name, start - size, size)
+        return (
+            values[current + 1] if values[current] == start else 0,
+            values[previous + 1] if values[previous] == start - size else 0,
+        )
+
+    def _increment(
+        self, values: list[int], name: str, size: int, now: float, amount: int
+    ) -> None:
+        start = bucket_start(now, size)
+        base = self._offset(name, start, size)
+        if values[base] != start:
+            values[base] = start
+            values[base + 1] = 0
+        values[base + 1] += amount
+
+    def _is_stale(self, values: list[int], now: float) -> bool:
+        return all(
+            values[1 + i * 4 + j * 2] + 2 * WINDOW_SECONDS[name] <= now
+            for i, name in enumerate(self.WINDOWS)
+            for j in (0, 1)
+        )
+
+    def _find_slot(self, key_hash: int, now: float) -> tuple[int, list[int]]:
+        """Return the slot of a key, claiming a free or stale one if new."""
+        first = key_hash % self.slots
+        reuse = None
+        for probe in range(self.MAX_PROBE):
+            slot = (first + probe) % self.slots
+            values = self._read(slot)
+            if values[0] == key_hash:
+                return slot, values
+            if reuse is None and (not values[0] or self._is_stale(values, now)):
+                reuse = slot
+
+        if reuse is None:
+            # Table full around this key: take over the least recently used
+            # probed slot (its subject starts counting from zero)
+            reuse = min(
+                ((first + probe) % self.slots for probe in range(self.MAX_PROBE)),
+                key=lambda s: max(self._read(s)[1::2]),
+            )
+        return reuse, [key_hash] + [0] * 12
+
+    def _read(self, slot: int) -> list[int]:
+        return list(self._SLOT.unpack_from(self._shm.buf, slot * self._SLOT.size))
+
+    def _write(self, slot: int, values: list[int]) -> None:
+        self._SLOT.pack_into(self._shm.buf, slot * self._SLOT.size, *values)
+
+    def _locked(self):
+        return _FileLock(self._thread_lock, self._lock_file, self._fcntl)
+
+
+class _FileLock:
+    """Thread lock plus flock: flock alone does not exclude threads of one
+    process, which share the open file description."""
+
+    def __init__(self, thread_lock: threading.Lock, lock_file, fcntl_module):
+        self._thread_lock = thread_lock
+        self._lock_file = lock_file
+        self._fcntl = fcntl_module
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._fcntl.flock(self._lock_file, self._fcntl.LOCK_EX)
+        except Exception:
+            self._thread_lock.release()
+            raise
+
+    def __exit__(self, *exc_info):
+        try:
+            self._fcntl.flock(self._lock_file, self._fcntl.LOCK_UN)
+        finally:
+            self._thread_lock.release()
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Counters on a Redis-compatible server.
+
+    One Lua script reads the current and previous bucket of every window,
+    applies the sliding window estimate and increments the current buckets
+    only if all windows allow the hit, so the check is atomic across
+    processes and hosts. Buckets expire on their own after two windows.
+    """
+
+    backend = "redis"
+
+    _HIT_SCRIPT = """
+        local n = #ARGV / 3
+        local counts = {}
+        local denied = 0
+        for i = 1, n do
+            local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+            local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+            counts[2 * i - 1] = current
+            counts[2 * i] = previous
+            local estimate = current + tonumber(ARGV[3 * i - 1]) * previous
+            if denied == 0 and estimate >= tonumber(ARGV[3 * i - 2]) then
+                denied = i
+            end
+        end
+        if denied == 0 then
+            for i = 1, n do
+                redis.call('INCR', KEYS[2 * i - 1])
+                redis.call('EXPIRE', KEYS[2 * i - 1], tonumber(ARGV[3 * i]))
+            end
+        end
+        table.insert(counts, 1, denied)
+        return counts
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "osservatorio:rl",
+        client: Any = None,
+    ):
+        """Connect to the server.
+
+        Args:
+            url: Redis URL
+            prefix: Key prefix for counters
+            client: Existing redis client (overrides url)
+        """
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self._prefix = prefix
+        self._script = client.register_script(self._HIT_SCRIPT)
+
+    def _bucket_key(self, key: str, name: str, start: int) -> str:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return f"{self._prefix}:{digest}:{name}:{start}"
+
+    def hit(self, key: str, windows: list[Window], now: float) -> WindowHit:
+        keys = []
+        args = []
+        for name, size, limit in windows:
+            start = bucket_start(now, size)
+            keys += [
+                self._bucket_key(key, name, start),
+                self._bucket_key(key, name, start - size),
+            ]
+            args += [limit, repr(1.0 - (now - start) / size), 2 * size]
+
+        reply = [int(value) for value in self._script(keys=keys, args=args)]
+        counts = list(zip(reply[1::2], reply[2::2]))
+        result = evaluate_windows(counts, windows, now)
+        # The script decides; the estimates are recomputed for headers
+        result.denied = reply[0] - 1 if reply[0] else None
+        result.allowed = result.denied is None
+        return result
+
+    def seed(self, key: str, buckets: dict[tuple[str, int], int], now: float) -> None:
+        pipe = self._client.pipeline()
+        for (name, start), count in buckets.items():
+            ttl = int(start + 2 * WINDOW_SECONDS[name] - now)
+            if ttl > 0:
+                pipe.set(self._bucket_key(key, name, start), count, ex=ttl, nx=True)
+        pipe.execute()
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def create_rate_limit_store(backend: str = "memory", **options: Any) -> RateLimitStore:
+    """Create a rate limit store.
+
+    Args:
+        backend: "memory", "shared_memory" or "redis"
+        **options: Backend options (name/slots, url/prefix)
+
+    Returns:
+        RateLimitStore instance
+    """
+    if backend == "memory":
+        return MemoryRateLimitStore()
+    if backend == "shared_memory":
+        return SharedMemoryRateLimitStore(**options)
+    if backend == "redis":
+        return RedisRateLimitStore(**options)
+    raise ValueError(f"Unknown rate limit store: {backend}")
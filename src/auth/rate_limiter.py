@@ -1,30 +1,65 @@
 """
 Rate Limiting Middleware for Osservatorio ISTAT Data Platform
 
-SQLite-backed rate limiting with sliding window algorithm:
+Rate limiting with sliding window algorithm:
 - Per-API-key rate limiting
 - Per-IP rate limiting
 - Configurable time windows (minute, hour, day)
 - Graceful degradation with HTTP 429 responses
 - Rate limit headers (X-RateLimit-*)
 - Burst allowance for short-term spikes
+
+By default counters live in a rate limit store (sliding window counters over
+fixed minute/hour/day buckets, see rate_limit_store) and are snapshotted to
+the rate_limits table in the background, so a check costs no database
+round-trip. The store is per process, shared between the workers of a host
+(shared memory) or shared between hosts (Redis). Strict mode keeps the
+original behaviour of reading and writing SQLite on every check.
 """
 
+import atexit
 import hashlib
+import os
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
 from typing import Optional
 
 from database.sqlite.manager_factory import get_audit_manager
 
 try:
+    from utils.cache import BoundedCache
     from utils.logger import get_logger
 except ImportError:
+    from src.utils.cache import BoundedCache
     from src.utils.logger import get_logger
 
 from .models import APIKey
+from .rate_limit_store import (
+    WINDOW_SECONDS,
+    MemoryRateLimitStore,
+    RateLimitStore,
+    create_rate_limit_store,
+)
 
 logger = get_logger(__name__)
 
+RATE_LIMIT_CONFIG = {
+    # Read and write SQLite on every check instead of counting in memory
+    "strict": os.getenv("RATE_LIMIT_STRICT", "false").lower() == "true",
+    # Seconds between snapshots of counted requests to rate_limits
+    "snapshot_interval": float(os.getenv("RATE_LIMIT_SNAPSHOT_INTERVAL", "5")),
+    # Counter store: "memory" (per process), "shared_memory" (all workers on
+    # this host) or "redis" (all hosts)
+    "store": os.getenv("RATE_LIMIT_STORE", "memory"),
+    "redis_url": os.getenv(
+        "RATE_LIMIT_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    ),
+    "shm_name": os.getenv("RATE_LIMIT_SHM_NAME", "osservatorio_rate_limits"),
+    "shm_slots": int(os.getenv("RATE_LIMIT_SHM_SLOTS", "65536")),
+}
+
 
 class RateLimitConfig:
     """Rate limit configuration"""
@@ -90,16 +125,45 @@ class SQLiteRateLimiter:
     WINDOW_HOUR = "hour"
     WINDOW_DAY = "day"
 
-    def __init__(self, db_path: Optional[str] = None):
-        """Initialize rate limiter with SQLite backend"""
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        strict: Optional[bool] = None,
+        store: Optional[RateLimitStore] = None,
+    ):
+        """Initialize rate limiter with SQLite backend
+
+        Args:
+            db_path: SQLite database path
+            strict: Count in SQLite on every check instead of in a store
+                (RATE_LIMIT_CONFIG["strict"] if None)
+            store: Counter store (RATE_LIMIT_CONFIG["store"] if None)
+        """
         # Initialize specialized manager for rate limiting operations
         self.audit_manager = get_audit_manager(db_path)
         self.logger = logger
+        self.strict = RATE_LIMIT_CONFIG["strict"] if strict is None else strict
+        self.store = None if self.strict else (store or get_rate_limit_store())
+
+        # Requests counted since the last snapshot, and subjects whose
+        # persisted counts have been handed to the store
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str, str, str, str, int], int] = {}
+        self._pending_violations: list[tuple] = []
+        self._seeded = BoundedCache(
+            "rate_limit_subjects", default_ttl=WINDOW_SECONDS["day"]
+        )
 
         # Ensure rate limiting schema exists
         self._ensure_rate_limit_schema()
 
-        logger.info("SQLite Rate Limiter initialized")
+        if not self.strict:
+            _register(self)
+
+        logger.info(
+            "SQLite Rate Limiter initialized "
+            f"({'strict' if self.strict else self.store.backend})"
+        )
 
     def _ensure_rate_limit_schema(self):
         """Ensure rate limiting tables exist"""
@@ -287,6 +351,181 @@ class SQLiteRateLimiter:
         config: RateLimitConfig,
     ) -> RateLimitResult:
         """Check sliding window rate limit"""
+        if self.strict:
+            return self._check_sqlite_window_limit(
+                identifier, identifier_type, endpoint, config
+            )
+        return self._check_store_window_limit(
+            identifier, identifier_type, endpoint, config
+        )
+
+    def _check_store_window_limit(
+        self,
+        identifier: str,
+        identifier_type: str,
+        endpoint: str,
+        config: RateLimitConfig,
+    ) -> RateLimitResult:
+        """Check and count a request against the store's sliding windows."""
+        windows = [
+            (name, WINDOW_SECONDS[name], limit)
+            for name, limit in (
+                (self.WINDOW_MINUTE, config.requests_per_minute),
+                (self.WINDOW_HOUR, config.requests_per_hour),
+                (self.WINDOW_DAY, config.requests_per_day),
+            )
+        ]
+        subject = (identifier, identifier_type, endpoint)
+        store_key = f"{identifier_type}:{identifier}:{endpoint}"
+        now = time.time()
+
+        if subject not in self._seeded:
+            self.store.seed(store_key, self._load_counters(subject, now), now)
+            self._seeded.set(subject, True)
+
+        hit = self.store.hit(store_key, windows, now)
+
+        if not hit.allowed:
+            _name, size, limit = windows[hit.denied]
+            window_end = (now // size + 1) * size
+            return RateLimitResult(
+                allowed=False,
+                limit=limit,
+                remaining=0,
+                reset_time=datetime.utcfromtimestamp(window_end),
+                retry_after=max(1, int(window_end - now)),
+            )
+
+        with self._lock:
+            for name, size, _limit in windows:
+                pending_key = (*subject, name, int(now // size * size))
+                self._pending[pending_key] = self._pending.get(pending_key, 0) + 1
+
+        return RateLimitResult(
+            allowed=True,
+            limit=config.requests_per_minute,
+            remaining=max(0, int(config.requests_per_minute - hit.estimates[0] - 1)),
+            reset_time=datetime.utcfromtimestamp((now // 60 + 1) * 60),
+        )
+
+    def _load_counters(
+        self, key: tuple[str, str, str], now: float
+    ) -> dict[tuple[str, int], int]:
+        """Load persisted counts for a key seen for the first time.
+
+        Keeps limits across restarts and includes what other processes have
+        snapshotted so far.
+        """
+        counters: dict[tuple[str, int], int] = {}
+        try:
+            rows = self.audit_manager.execute_query(
+                """
+                SELECT window_type, window_start, SUM(request_count)
+                FROM rate_limits
+                WHERE identifier = ? AND identifier_type = ? AND endpoint = ?
+                AND window_end > ?
+                GROUP BY window_type, window_start
+                """,
+                (*key, datetime.utcfromtimestamp(now - WINDOW_SECONDS["day"])),
+            )
+            for window_type, window_start, count in rows:
+                if window_type not in WINDOW_SECONDS:
+                    continue
+                if isinstance(window_start, str):
+                    window_start = datetime.fromisoformat(window_start)
+                start = int((window_start - datetime(1970, 1, 1)).total_seconds())
+                counters[(window_type, start)] = int(count)
+        except Exception as e:
+            logger.error(f"Failed to load rate limit counters: {e}")
+        return counters
+
+    def flush(self) -> int:
+        """Write requests counted since the last snapshot and violations to SQLite.
+
+        Each process writes only its own increments, so the rows add up to
+        the totals of all workers sharing the database.
+
+        Returns:
+            Number of rate_limits rows written
+        """
+        if self.strict:
+            return 0
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            violations, self._pending_violations = self._pending_violations, []
+        self.store.prune(time.time())
+
+        if not pending and not violations:
+            return 0
+
+        rows = []
+        updated_at = datetime.utcnow()
+        for (
+            identifier,
+            identifier_type,
+            endpoint,
+            window_type,
+            start,
+        ), count in pending.items():
+            rows.append(
+                (
+                    identifier,
+                    identifier_type,
+                    endpoint,
+                    window_type,
+                    count,
+                    datetime.utcfromtimestamp(start),
+                    datetime.utcfromtimestamp(start + WINDOW_SECONDS[window_type]),
+                    updated_at,
+                )
+            )
+
+        try:
+            with self.audit_manager.transaction() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO rate_limits
+                    (identifier, identifier_type, endpoint, window_type,
+                     request_count, window_start, window_end, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(identifier, identifier_type, endpoint, window_type, window_start)
+                    DO UPDATE SET
+                        request_count = request_count + excluded.request_count,
+                        updated_at = excluded.updated_at
+                    """,
+                    rows,
+                )
+                if violations:
+                    conn.executemany(
+                        """
+                        INSERT INTO rate_limit_violations
+                        (identifier, identifier_type, endpoint, window_type,
+                         exceeded_by, limit_value, user_agent, ip_address)
+                        VALUES (?, ?, ?, 'minute', ?, ?, ?, ?)
+                        """,
+                        violations,
+                    )
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Failed to snapshot rate limit counters: {e}")
+            # Keep the counts for the next snapshot
+            with self._lock:
+                for pending_key, count in pending.items():
+                    self._pending[pending_key] = (
+                        self._pending.get(pending_key, 0) + count
+                    )
+                self._pending_violations[:0] = violations
+            return 0
+
+    def _check_sqlite_window_limit(
+        self,
+        identifier: str,
+        identifier_type: str,
+        endpoint: str,
+        config: RateLimitConfig,
+    ) -> RateLimitResult:
+        """Check sliding window rate limit with SQLite counters (strict mode)"""
         now = datetime.utcnow()
 
         # Check each time window (minute, hour, day)
@@ -464,6 +703,26 @@ class SQLiteRateLimiter:
         try:
             exceeded_by = result.limit - result.remaining
 
+            if not self.strict:
+                # Written with the next counter snapshot
+                with self._lock:
+                    self._pending_violations.append(
+                        (
+                            identifier,
+                            identifier_type,
+                            endpoint,
+                            exceeded_by,
+                            result.limit,
+                            user_agent,
+                            ip_address,
+                        )
+                    )
+                logger.warning(
+                    f"Rate limit violation: {identifier_type}={identifier}, "
+                    f"endpoint={endpoint}, exceeded_by={exceeded_by}"
+                )
+                return
+
             with self.audit_manager.transaction() as conn:
                 cursor = conn.cursor()
 
@@ -539,6 +798,9 @@ class SQLiteRateLimiter:
             Dictionary with current usage stats
         """
         try:
+            if not self.strict:
+                self.flush()
+
             stats = {}
             now = datetime.utcnow()
 
@@ -583,3 +845,78 @@ class SQLiteRateLimiter:
         except Exception as e:
             logger.error(f"Failed to get rate limit stats: {e}")
             return {}
+
+
+# Process-wide store for the shared backends
+_store: Optional[RateLimitStore] = None
+_store_lock = threading.Lock()
+
+
+def get_rate_limit_store() -> RateLimitStore:
+    """Get a counter store for a new rate limiter.
+
+    The "memory" backend gives every limiter its own counters; the shared
+    backends are created once per process (RATE_LIMIT_CONFIG["store"]).
+    """
+    global _store
+    backend = RATE_LIMIT_CONFIG["store"]
+    if backend == "memory":
+        return MemoryRateLimitStore()
+    with _store_lock:
+        if _store is None:
+            if backend == "shared_memory":
+                options = {
+                    "name": RATE_LIMIT_CONFIG["shm_name"],
+                    "slots": RATE_LIMIT_CONFIG["shm_slots"],
+                }
+            else:
+                options = {"url": RATE_LIMIT_CONFIG["redis_url"]}
+            _store = create_rate_limit_store(backend, **options)
+        return _store
+
+
+# Rate limiters counting outside SQLite, snapshotted by one background thread
+_limiters: "weakref.WeakSet[SQLiteRateLimiter]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
+_snapshotter: Optional[threading.Thread] = None
+
+
+def _register(limiter: SQLiteRateLimiter) -> None:
+    global _snapshotter
+    with _registry_lock:
+        _limiters.add(limiter)
+        interval = RATE_LIMIT_CONFIG["snapshot_interval"]
+        if interval > 0 and (_snapshotter is None or not _snapshotter.is_alive()):
+            _snapshotter = threading.Thread(
+                target=_snapshot_loop,
+                args=(interval,),
+                name="rate-limit-snapshot",
+                daemon=True,
+            )
+            _snapshotter.start()
+
+
+def _snapshot_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        flush_rate_limiters()
+
+
+def flush_rate_limiters() -> int:
+    """Snapshot the in-memory counters of every live rate limiter.
+
+    Returns:
+        Number of rate_limits rows written
+    """
+    with _registry_lock:
+        limiters = list(_limiters)
+    written = 0
+    for limiter in limiters:
+        try:
+            written += limiter.flush()
+        except Exception as e:
+            logger.warning(f"Rate limit snapshot failed: {e}")
+    return written
+
+
+atexit.register(flush_rate_limiters)
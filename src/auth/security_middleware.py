@@ -8,8 +8,9 @@ Basic security headers middleware for MVP:
 - Simplified CORS handling
 """
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 try:
     from utils.logger import get_logger
@@ -18,44 +19,75 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# Essential security headers for MVP
+SECURITY_HEADERS = {
+    # Basic security headers
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    # Basic cache control
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0",
+    # API identification
+    "X-API-Version": "mvp-0.5",
+    "Server": "Osservatorio-MVP",
+}
+
+# Cache-Control of responses with an ETag: clients may keep them but must
+# revalidate every time (no-store would keep them from sending If-None-Match)
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Simplified security headers middleware for MVP - Issue #153"""
+class SecurityHeadersMiddleware:
+    """Simplified security headers middleware for MVP - Issue #153
 
-    def __init__(self, app):
-        super().__init__(app)
+    Pure ASGI middleware: the headers are added to the http.response.start
+    message and the body is passed through untouched, so streamed responses
+    stay streamed. Responses carrying an ETag get REVALIDATE_CACHE_CONTROL
+    so that conditional requests keep working.
+    """
+
+    def __init__(self, app: ASGIApp, headers: Optional[dict[str, str]] = None):
+        self.app = app
+        headers = SECURITY_HEADERS if headers is None else headers
+        # Encoded once; replaces any header of the same name set by the endpoint
+        self._names = {name.lower().encode("latin-1") for name in headers}
+        self._raw_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        ]
+        self._revalidate_headers = [
+            (name, REVALIDATE_CACHE_CONTROL.encode("latin-1"))
+            if name == b"cache-control"
+            else (name, value)
+            for name, value in self._raw_headers
+        ]
         logger.info(
             "Simplified SecurityHeadersMiddleware initialized for MVP - Issue #153"
         )
 
-    async def dispatch(self, request: Request, call_next):
-        """Add basic security headers to responses"""
-        try:
-            response = await call_next(request)
-
-            # Add essential security headers for MVP
-            response.headers.update(
-                {
-                    # Basic security headers
-                    "X-Content-Type-Options": "nosniff",
-                    "X-Frame-Options": "DENY",
-                    "X-XSS-Protection": "1; mode=block",
-                    # Basic cache control
-                    "Cache-Control": "no-cache, no-store, must-revalidate",
-                    "Pragma": "no-cache",
-                    "Expires": "0",
-                    # API identification
-                    "X-API-Version": "mvp-0.5",
-                    "Server": "Osservatorio-MVP",
-                }
-            )
-
-            return response
-
-        except Exception as e:
-            logger.error(f"SecurityHeadersMiddleware error: {e}")
-            # Return the response without additional headers if there's an error
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                raw_headers = []
+                has_etag = False
+                for header in message.get("headers", ()):
+                    name = header[0].lower()
+                    has_etag = has_etag or name == b"etag"
+                    if name not in self._names:
+                        raw_headers.append(header)
+                raw_headers.extend(
+                    self._revalidate_headers if has_etag else self._raw_headers
+                )
+                message["headers"] = raw_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 
 # Backward compatibility - remove complex authentication features for MVP
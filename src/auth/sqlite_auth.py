@@ -3,13 +3,18 @@ SQLite-based Authentication Manager for Osservatorio ISTAT Data Platform
 
 Provides secure API key management with SQLite backend:
 - Cryptographically secure API key generation
-- Bcrypt-based key hashing and verification
+- Keys embed a public key ID (osv_<key_id>_<secret>): verification is one
+  indexed lookup and one hash comparison, with a short-lived cache of
+  verified keys
 - Scope-based access control
 - Usage tracking and rate limiting
 - Audit logging for security events
 """
 
+import hashlib
+import hmac
 import json
+import re
 import secrets
 import sqlite3
 from datetime import datetime, timedelta
@@ -24,8 +29,10 @@ from database.sqlite.manager_factory import (
 )
 
 try:
+    from utils.cache import BoundedCache
     from utils.logger import get_logger
 except ImportError:
+    from src.utils.cache import BoundedCache
     from src.utils.logger import get_logger
 from src.utils.mvp_security import security
 
@@ -48,9 +55,21 @@ class SQLiteAuthManager:
         "tableau",  # Tableau integration access
     ]
 
-    # API key format configuration
+    # API key format configuration: osv_<key_id>_<secret>
     KEY_PREFIX = "osv_"
     KEY_LENGTH = 32
+    KEY_ID_BYTES = 8
+    HASH_SCHEME = "sha256$"
+
+    # Seconds a verified key is served from memory; revocation through this
+    # manager invalidates it immediately, other processes within the TTL
+    CACHE_TTL = 30
+
+    _KEY_PATTERN = re.compile(r"^osv_([0-9a-f]{16})_(.+)$")
+    _KEY_COLUMNS = (
+        "id, api_key_hash, scopes_json, name, is_active, expires_at, "
+        "usage_count, rate_limit, created_at, updated_at"
+    )
 
     def __init__(self, db_path: Optional[str] = None):
         """Initialize auth manager with SQLite backend"""
@@ -59,6 +78,10 @@ class SQLiteAuthManager:
         self.config_manager = get_configuration_manager(db_path)
         self.user_manager = get_user_manager(db_path)
         self.logger = logger
+        # key_id -> (key digest, APIKey) of recently verified keys
+        self._key_cache = BoundedCache(
+            "api_keys", max_entries=10000, default_ttl=self.CACHE_TTL
+        )
 
         # Ensure auth schema exists
         self._ensure_auth_schema()
@@ -79,6 +102,7 @@ class SQLiteAuthManager:
                     ("key_prefix", "TEXT"),
                     ("revoked_at", "TIMESTAMP"),
                     ("last_refresh", "TIMESTAMP"),
+                    ("key_id", "TEXT"),
                 ]
 
                 for column_name, column_def in auth_columns:
@@ -91,6 +115,11 @@ class SQLiteAuthManager:
                         # Column already exists
                         pass
 
+                cursor.execute(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_api_credentials_key_id "
+                    "ON api_credentials(key_id)"
+                )
+
                 # Create refresh tokens table (if not already created by JWT manager)
                 cursor.execute(
                     """
@@ -167,12 +196,14 @@ class SQLiteAuthManager:
             if invalid_scopes:
                 raise ValueError(f"Invalid scopes: {invalid_scopes}")
 
-            # Generate cryptographically secure API key
+            # Generate cryptographically secure API key with a public key ID
+            key_id = secrets.token_hex(self.KEY_ID_BYTES)
             key_suffix = secrets.token_urlsafe(self.KEY_LENGTH)
-            api_key = f"{self.KEY_PREFIX}{key_suffix}"
+            api_key = f"{self.KEY_PREFIX}{key_id}_{key_suffix}"
 
-            # Hash the key for storage
-            key_hash = bcrypt.hashpw(api_key.encode(), bcrypt.gensalt()).decode()
+            # Hash the key for storage; the secret has 256 bits of entropy,
+            # so a fast hash is as safe as bcrypt and costs microseconds
+            key_hash = self._hash_key(api_key)
 
             # Calculate expiration
             expires_at = None
@@ -203,8 +234,9 @@ class SQLiteAuthManager:
                     """
                     INSERT INTO api_credentials
                     (service_name, api_key_hash, scopes_json, name, key_prefix,
-                     is_active, expires_at, rate_limit, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     is_active, expires_at, rate_limit, created_at, updated_at,
+                     key_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                     (
                         service_name,
@@ -217,6 +249,7 @@ class SQLiteAuthManager:
                         100,  # Default rate limit
                         datetime.now(),
                         datetime.now(),
+                        key_id,
                     ),
                 )
 
@@ -250,6 +283,10 @@ class SQLiteAuthManager:
     def verify_api_key(self, api_key: str) -> Optional[APIKey]:
         """Verify API key and return associated metadata
 
+        Keys with an embedded key ID are looked up by index and checked with
+        a single hash comparison; recently verified keys are served from a
+        short-lived cache.
+
         Args:
             api_key: The API key to verify
 
@@ -260,70 +297,120 @@ class SQLiteAuthManager:
             if not api_key.startswith(self.KEY_PREFIX):
                 return None
 
-            with self.audit_manager.transaction() as conn:
-                cursor = conn.cursor()
+            match = self._KEY_PATTERN.match(api_key)
+            if match:
+                key_id = match.group(1)
+                verified = self._verify_by_key_id(key_id, api_key)
+            else:
+                key_id = None
+                verified = self._verify_legacy_key(api_key)
 
-                # Get all active API keys for verification
-                cursor.execute(
-                    """
-                    SELECT id, service_name, api_key_hash, scopes_json, name,
-                           is_active, expires_at, last_used, usage_count,
-                           rate_limit, created_at, updated_at
-                    FROM api_credentials
-                    WHERE key_prefix = ? AND is_active = 1
-                    AND (expires_at IS NULL OR expires_at > ?)
-                """,
-                    (self.KEY_PREFIX, datetime.now()),
-                )
+            if verified is None:
+                return None
 
-                for row in cursor.fetchall():
-                    (
-                        key_id,
-                        service_name,
-                        key_hash,
-                        scopes_json,
-                        name,
-                        is_active,
-                        expires_at,
-                        last_used,
-                        usage_count,
-                        rate_limit,
-                        created_at,
-                        updated_at,
-                    ) = row
+            # Update usage tracking
+            self._update_key_usage(verified.id)
 
-                    # Verify key hash
-                    if bcrypt.checkpw(api_key.encode(), key_hash.encode()):
-                        # Decrypt scopes
-                        try:
-                            scopes_str = security.decrypt_data(scopes_json)
-                            scopes = json.loads(scopes_str)
-                        except Exception:
-                            scopes = ["read"]  # Fallback
+            return APIKey(
+                id=verified.id,
+                name=verified.name,
+                key_hash=verified.key_hash,
+                scopes=list(verified.scopes),
+                is_active=verified.is_active,
+                expires_at=verified.expires_at,
+                last_used=datetime.now(),
+                usage_count=verified.usage_count + 1,
+                rate_limit=verified.rate_limit,
+                created_at=verified.created_at,
+                updated_at=verified.updated_at,
+            )
 
-                        # Update usage tracking
-                        self._update_key_usage(key_id)
+        except Exception as e:
+            logger.error(f"API key verification failed: {e}")
+            return None
 
-                        return APIKey(
-                            id=key_id,
-                            name=name,
-                            key_hash=key_hash,
-                            scopes=scopes,
-                            is_active=is_active,
-                            expires_at=expires_at,
-                            last_used=datetime.now(),
-                            usage_count=usage_count + 1,
-                            rate_limit=rate_limit,
-                            created_at=created_at,
-                            updated_at=updated_at,
-                        )
+    def _verify_by_key_id(self, key_id: str, api_key: str) -> Optional[APIKey]:
+        """Verify a key with an embedded key ID (one lookup, one comparison)"""
+        digest = self._hash_key(api_key)
 
+        cached = self._key_cache.get(key_id)
+        if cached is not None:
+            cached_digest, cached_key = cached
+            if not hmac.compare_digest(cached_digest, digest):
+                return None
+            if cached_key.expires_at and cached_key.expires_at <= datetime.now():
+                self._key_cache.delete(key_id)
+                return None
+            return cached_key
+
+        rows = self.audit_manager.execute_query(
+            f"""
+            SELECT {self._KEY_COLUMNS}
+            FROM api_credentials
+            WHERE key_id = ? AND is_active = 1
+            AND (expires_at IS NULL OR expires_at > ?)
+            """,
+            (key_id, datetime.now()),
+        )
+        if not rows:
             return None
 
-        except Exception as e:
-            logger.error(f"API key verification failed: {e}")
+        verified = self._row_to_api_key(rows[0])
+        if not self._check_key_hash(api_key, verified.key_hash):
             return None
 
+        self._key_cache.set(key_id, (verified.key_hash, verified))
+        return verified
+
+    def _verify_legacy_key(self, api_key: str) -> Optional[APIKey]:
+        """Verify a key issued before key IDs (bcrypt check per candidate)"""
+        rows = self.audit_manager.execute_query(
+            f"""
+            SELECT {self._KEY_COLUMNS}
+            FROM api_credentials
+            WHERE key_prefix = ? AND key_id IS NULL AND is_active = 1
+            AND (expires_at IS NULL OR expires_at > ?)
+            """,
+            (self.KEY_PREFIX, datetime.now()),
+        )
+        for row in rows:
+            candidate = self._row_to_api_key(row)
+            if self._check_key_hash(api_key, candidate.key_hash):
+                return candidate
+        return None
+
+    def _row_to_api_key(self, row) -> APIKey:
+        """Build an APIKey from a row selected with _KEY_COLUMNS"""
+        # Decrypt scopes
+        try:
+            scopes = json.loads(security.decrypt_data(row["scopes_json"]))
+        except Exception:
+            scopes = ["read"]  # Fallback
+
+        return APIKey(
+            id=row["id"],
+            name=row["name"],
+            key_hash=row["api_key_hash"],
+            scopes=scopes,
+            is_active=row["is_active"],
+            expires_at=row["expires_at"],
+            usage_count=row["usage_count"],
+            rate_limit=row["rate_limit"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+    @classmethod
+    def _hash_key(cls, api_key: str) -> str:
+        return cls.HASH_SCHEME + hashlib.sha256(api_key.encode()).hexdigest()
+
+    @classmethod
+    def _check_key_hash(cls, api_key: str, key_hash: str) -> bool:
+        """Compare a key against its stored hash (sha256 or legacy bcrypt)"""
+        if key_hash.startswith(cls.HASH_SCHEME):
+            return hmac.compare_digest(cls._hash_key(api_key), key_hash)
+        return bcrypt.checkpw(api_key.encode(), key_hash.encode())
+
     def revoke_api_key(
         self, api_key_id: int, reason: str = "manual_revocation"
     ) -> bool:
@@ -352,6 +439,13 @@ class SQLiteAuthManager:
                 if cursor.rowcount > 0:
                     conn.commit()
 
+                    row = cursor.execute(
+                        "SELECT key_id FROM api_credentials WHERE id = ?",
+                        (api_key_id,),
+                    ).fetchone()
+                    if row and row[0]:
+                        self._key_cache.delete(row[0])
+
                     # Log revocation
                     self._log_auth_event(
                         "api_key_revoked", f"api_key:{api_key_id}", {"reason": reason}
@@ -0,0 +1,334 @@
+"""
+Token Revocation Store
+
+Revoked JWT IDs (jti) are persisted in SQLite together with the expiry of
+the token they belong to, so revocations survive restarts and are shared by
+every worker using the same database. Each process keeps the unexpired
+revocations in memory:
+
+- a bloom filter answers "definitely not revoked" for the vast majority of
+  checks without touching the exact set
+- an exact jti -> expiry map confirms the (rare) bloom filter positives
+
+New rows written by other workers are picked up incrementally by id at most
+every ``refresh_interval`` seconds. Entries disappear from SQLite and memory
+once the token would have expired anyway, so memory is bounded by the number
+of live revoked tokens.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from database.sqlite.manager_factory import get_audit_manager
+
+try:
+    from utils.logger import get_logger
+except ImportError:
+    from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+REVOCATION_CONFIG = {
+    # Seconds between polls for revocations written by other workers
+    "refresh_interval": float(os.getenv("TOKEN_REVOCATION_REFRESH_INTERVAL", "1")),
+    # Seconds between purges of entries whose tokens have expired
+    "cleanup_interval": float(os.getenv("TOKEN_REVOCATION_CLEANUP_INTERVAL", "300")),
+    # Initial bloom filter capacity; it is rebuilt larger when exceeded
+    "bloom_capacity": int(os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", "10000")),
+    "bloom_error_rate": float(os.getenv("TOKEN_REVOCATION_BLOOM_ERROR_RATE", "0.001")),
+    # Seconds a revocation is kept for tokens without an exp claim
+    "default_ttl": float(os.getenv("TOKEN_REVOCATION_DEFAULT_TTL", str(7 * 86400))),
+}
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings (no deletions)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """Size the filter for capacity items at the given false positive rate.
+
+        Args:
+            capacity: Expected number of items
+            error_rate: Target false positive probability
+        """
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8,
+            math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)),
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def add(self, item: str) -> None:
+        for index in self._indexes(item):
+            self._bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(item)
+        )
+
+    def _indexes(self, item: str):
+        """Bit positions by double hashing of one 128-bit digest."""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class TokenRevocationStore:
+    """SQLite-backed set of revoked JWT IDs with an in-memory fast path."""
+
+    def __init__(
+        self, db_path: Optional[str] = None, config: Optional[dict[str, Any]] = None
+    ):
+        """Initialize the store and load current revocations.
+
+        Args:
+            db_path: SQLite database path
+            config: Overrides for REVOCATION_CONFIG
+        """
+        self.audit_manager = get_audit_manager(db_path)
+        self.config = {**REVOCATION_CONFIG, **(config or {})}
+
+        self._lock = threading.Lock()
+        self._revoked: dict[str, float] = {}
+        self._bloom = self._new_bloom(0)
+        self._last_id = 0
+        self._next_refresh = 0.0
+        self._next_cleanup = 0.0
+        self._stats = dict.fromkeys(("checks", "bloom_negatives", "false_positives"), 0)
+
+        self._ensure_schema()
+        self.reload()
+
+    def _ensure_schema(self) -> None:
+        """Ensure the revoked_tokens table exists"""
+        with self.audit_manager.transaction() as conn:
+            # AUTOINCREMENT keeps ids monotonic across deletes, which the
+            # incremental refresh relies on
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS revoked_tokens (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    jti TEXT NOT NULL UNIQUE,
+                    expires_at REAL NOT NULL,  -- token expiry, unix seconds
+                    reason TEXT,
+                    revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires
+                ON revoked_tokens(expires_at)
+                """
+            )
+
+    def revoke(
+        self, jti: str, expires_at: Optional[float] = None, reason: Optional[str] = None
+    ) -> bool:
+        """Revoke a token ID until the token expires.
+
+        Args:
+            jti: JWT ID to revoke
+            expires_at: Token expiry as unix seconds (default_ttl from now if None)
+            reason: Optional reason stored with the revocation
+
+        Returns:
+            True if the token is revoked (or already expired)
+        """
+        now = time.time()
+        if expires_at is None:
+            expires_at = now + self.config["default_ttl"]
+        if expires_at <= now:
+            # Expired tokens are rejected anyway; nothing to remember
+            return True
+
+        try:
+            with self.audit_manager.transaction() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO revoked_tokens (jti, expires_at, reason)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(jti) DO UPDATE SET
+                        expires_at = MAX(expires_at, excluded.expires_at)
+                    """,
+                    (jti, expires_at, reason),
+                )
+        except Exception as e:
+            logger.error(f"Failed to persist token revocation: {e}")
+            return False
+
+        with self._lock:
+            self._add(jti, max(expires_at, self._revoked.get(jti, 0.0)))
+        return True
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check whether a token ID is revoked."""
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+
+        self._stats["checks"] += 1
+        if jti not in self._bloom:
+            self._stats["bloom_negatives"] += 1
+            return False
+        expires_at = self._revoked.get(jti)
+        if expires_at is None:
+            self._stats["false_positives"] += 1
+            return False
+        return expires_at > time.time()
+
+    def refresh(self) -> int:
+        """Load revocations written since the last refresh (by any worker).
+
+        Also purges expired entries every cleanup_interval seconds.
+
+        Returns:
+            Number of new revocations loaded
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_refresh:
+                return 0
+            self._next_refresh = now + self.config["refresh_interval"]
+            cleanup_due = now >= self._next_cleanup
+
+            try:
+                rows = self.audit_manager.execute_query(
+                    "SELECT id, jti, expires_at FROM revoked_tokens "
+                    "WHERE id > ? ORDER BY id",
+                    (self._last_id,),
+                )
+            except Exception as e:
+                logger.warning(f"Failed to refresh token revocations: {e}")
+                return 0
+
+            wall_now = time.time()
+            loaded = 0
+            for row in rows:
+                self._last_id = row["id"]
+                if row["expires_at"] > wall_now:
+                    self._add(row["jti"], row["expires_at"])
+                    loaded += 1
+
+        if cleanup_due:
+            self.cleanup_expired()
+        return loaded
+
+    def reload(self) -> None:
+        """Replace the in-memory state with the unexpired rows in SQLite."""
+        rows = self.audit_manager.execute_query(
+            "SELECT id, jti, expires_at FROM revoked_tokens ORDER BY id"
+        )
+        now = time.time()
+        revoked = {
+            row["jti"]: row["expires_at"] for row in rows if row["expires_at"] > now
+        }
+        with self._lock:
+            self._revoked = revoked
+            self._last_id = rows[-1]["id"] if rows else 0
+            self._rebuild_bloom()
+            self._next_refresh = time.monotonic() + self.config["refresh_interval"]
+
+    def cleanup_expired(self) -> int:
+        """Delete revocations of tokens that have expired.
+
+        Returns:
+            Number of rows removed from SQLite
+        """
+        now = time.time()
+        try:
+            deleted = self.audit_manager.execute_update(
+                "DELETE FROM revoked_tokens WHERE expires_at <= ?", (now,)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to clean up token revocations: {e}")
+            deleted = 0
+
+        with self._lock:
+            self._next_cleanup = time.monotonic() + self.config["cleanup_interval"]
+            live = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            if len(live) != len(self._revoked):
+                # Bloom filters cannot forget, so rebuild from what is left
+                self._revoked = live
+                self._rebuild_bloom()
+
+        if deleted:
+            logger.debug(f"Removed {deleted} expired token revocations")
+        return deleted
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return revocation counts, bloom filter size and check counters."""
+        with self._lock:
+            return {
+                **self._stats,
+                "revoked": len(self._revoked),
+                "bloom_capacity": self._bloom.capacity,
+                "bloom_bytes": self._bloom.size_bytes,
+                "bloom_hashes": self._bloom.num_hashes,
+            }
+
+    def _add(self, jti: str, expires_at: float) -> None:
+        """Record a revocation in memory (caller holds the lock)."""
+        if jti not in self._revoked:
+            if self._bloom.count >= self._bloom.capacity:
+                self._revoked[jti] = expires_at
+                self._rebuild_bloom()
+                return
+            self._bloom.add(jti)
+        self._revoked[jti] = expires_at
+
+    def _rebuild_bloom(self) -> None:
+        """Build a bloom filter over the exact set (caller holds the lock)."""
+        bloom = self._new_bloom(len(self._revoked))
+        for jti in self._revoked:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def _new_bloom(self, entries: int) -> BloomFilter:
+        capacity = self.config["bloom_capacity"]
+        while capacity < entries * 2 and entries:
+            capacity *= 2
+        return BloomFilter(capacity, self.config["bloom_error_rate"])
+
+
+# Stores by database path
+_stores: dict[str, TokenRevocationStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_token_revocation_store(db_path: Optional[str] = None) -> TokenRevocationStore:
+    """Get the revocation store for a database (one per database path).
+
+    Args:
+        db_path: SQLite database path (default database if None)
+
+    Returns:
+        TokenRevocationStore instance
+    """
+    manager = get_audit_manager(db_path)
+    with _stores_lock:
+        store = _stores.get(manager.db_path)
+        if store is None:
+            store = TokenRevocationStore(manager.db_path)
+            _stores[manager.db_path] = store
+        return store
+
+
+def reset_token_revocation_stores() -> None:
+    """Forget all stores (for testing)."""
+    with _stores_lock:
+        _stores.clear()
@@ -4,6 +4,12 @@ This module provides DuckDB-based storage and querying capabilities
 optimized for statistical data analysis and reporting.
 """
 
+from .adaptive_optimizer import (
+    AdaptiveOptimizer,
+    fingerprint_query,
+    get_adaptive_optimizer,
+    reset_adaptive_optimizer,
+)
 from .config import (
     DUCKDB_CONFIG,
     PERFORMANCE_CONFIG,
@@ -14,9 +20,21 @@ from .config import (
     get_table_config,
     validate_config,
 )
+from .executor import (
+    QueryCancelledError,
+    QueryContext,
+    QueryExecutor,
+    QueryQueueFullError,
+    QueryTimeoutError,
+    get_query_executor,
+    get_query_timeout,
+    query_scope,
+    reset_query_executor,
+)
 from .manager import DuckDBManager, get_manager
 from .query_builder import (
     AggregateFunction,
+    ConditionGroup,
     DuckDBQueryBuilder,
     FilterCondition,
     FilterOperator,
@@ -55,10 +73,26 @@ __all__ = [
     "get_manager",
     "ISTATSchemaManager",
     "initialize_schema",
+    # Async execution
+    "QueryExecutor",
+    "QueryQueueFullError",
+    "QueryCancelledError",
+    "QueryTimeoutError",
+    "QueryContext",
+    "query_scope",
+    "get_query_executor",
+    "get_query_timeout",
+    "reset_query_executor",
+    # Adaptive optimization
+    "AdaptiveOptimizer",
+    "fingerprint_query",
+    "get_adaptive_optimizer",
+    "reset_adaptive_optimizer",
     # Query Builder
     "DuckDBQueryBuilder",
     "QueryCache",
     "FilterCondition",
+    "ConditionGroup",
     "FilterOperator",
     "QueryType",
     "AggregateFunction",
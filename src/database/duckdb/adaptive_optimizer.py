@@ -0,0 +1,906 @@
+"""Adaptive query optimization for ISTAT DuckDB analytics.
+
+This module closes the loop between query execution and physical design:
+- Queries are reduced to normalized fingerprints (literals and parameters
+  stripped) and their latencies are persisted in DuckDB
+- Slow executions are profiled with EXPLAIN ANALYZE, rate-limited per shape
+- Profiling and optimization cycles run on a background worker, so recording
+  an execution never delays the request that ran it
+- Hot, slow shapes are matched against known materializations (pre-sorted
+  copies and pre-aggregated tables) which are proposed or applied
+- Data loads invalidate materializations, which serve no queries until
+  they are rebuilt
+- A report compares latency before and after each materialization
+"""
+
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional, Union
+
+import duckdb
+import pandas as pd
+
+try:
+    from utils.logger import get_logger
+except ImportError:
+    from src.utils.logger import get_logger
+
+from .config import ADAPTIVE_OPTIMIZER_CONFIG, get_schema_config
+from .manager import DuckDBManager, get_manager
+
+logger = get_logger(__name__)
+
+PROFILES_TABLE = "query_profiles"
+MATERIALIZATIONS_TABLE = "query_materializations"
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"\$\d+|\?")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?(?![\w.])", re.I)
+_IN_LIST_RE = re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_STOP = object()
+
+
+def normalize_query(query: str) -> str:
+    """Reduce a SQL query to its shape.
+
+    Comments are removed, string/number literals and bind parameters become
+    ``?``, literal IN lists collapse to ``IN (?)`` and whitespace and case
+    are normalized, so queries differing only in values share one shape.
+
+    Args:
+        query: SQL query
+
+    Returns:
+        Normalized query text
+    """
+    normalized = _COMMENT_RE.sub(" ", query)
+    normalized = _STRING_RE.sub("?", normalized)
+    normalized = _PARAM_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _WHITESPACE_RE.sub(" ", normalized).strip().rstrip(";").strip()
+    normalized = normalized.lower()
+    return _IN_LIST_RE.sub("in (?)", normalized)
+
+
+def fingerprint_query(query: str) -> tuple[str, str]:
+    """Compute a stable fingerprint for a query shape.
+
+    Args:
+        query: SQL query
+
+    Returns:
+        Tuple of (fingerprint, normalized query)
+    """
+    normalized = normalize_query(query)
+    digest = hashlib.blake2b(normalized.encode(), digest_size=12).hexdigest()
+    return digest, normalized
+
+
+def summarize_plan(plan: Union[str, dict[str, Any]]) -> dict[str, Any]:
+    """Extract the headline numbers from a DuckDB JSON ANALYZE profile.
+
+    Args:
+        plan: Profile as returned by ``EXPLAIN (ANALYZE, FORMAT JSON)``
+
+    Returns:
+        Dictionary with latency, CPU time, rows scanned and the most
+        expensive operators
+    """
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    operators = []
+    stack = list(plan.get("children", []))
+    while stack:
+        node = stack.pop()
+        stack.extend(node.get("children", []))
+        if node.get("operator_type") == "EXPLAIN_ANALYZE":
+            continue
+        operators.append(
+            {
+                "operator": node.get("operator_name") or node.get("operator_type"),
+                "timing_ms": round(float(node.get("operator_timing", 0)) * 1000, 3),
+                "cardinality": node.get("operator_cardinality", 0),
+                "rows_scanned": node.get("operator_rows_scanned", 0),
+            }
+        )
+    operators.sort(key=lambda op: op["timing_ms"], reverse=True)
+
+    return {
+        "latency_ms": round(float(plan.get("latency", 0)) * 1000, 3),
+        "cpu_time_ms": round(float(plan.get("cpu_time", 0)) * 1000, 3),
+        "rows_scanned": plan.get("cumulative_rows_scanned", 0),
+        "peak_memory_bytes": plan.get("system_peak_buffer_memory", 0),
+        "top_operators": operators[:5],
+    }
+
+
+@dataclass(frozen=True)
+class Materialization:
+    """A physical design change that can serve one analytics query type."""
+
+    name: str
+    kind: str  # "sort_order" or "materialized_aggregate"
+    query_type: str
+    description: str
+    build_sql: str
+
+    def table(self, schema_config: dict[str, Any]) -> str:
+        """Qualified name of the materialized table."""
+        return f"{schema_config['analytics_schema']}.{self.name}"
+
+
+# Materializations keyed by QueryType value. Each one is exact for its query
+# template: filters in the template only touch the sort or group-by keys.
+MATERIALIZATIONS: dict[str, Materialization] = {
+    "time_series": Materialization(
+        name="mv_time_series",
+        kind="sort_order",
+        query_type="time_series",
+        description=(
+            "Time series view stored as a table sorted by dataset, year and "
+            "territory so zone maps prune row groups on the template filters"
+        ),
+        build_sql="""
+        SELECT * FROM {analytics_schema}.time_series
+        ORDER BY dataset_id, year, territory_code
+        """,
+    ),
+    "territory_comparison": Materialization(
+        name="mv_territory_measure_stats",
+        kind="materialized_aggregate",
+        query_type="territory_comparison",
+        description=(
+            "Per year/measure/territory statistics pre-aggregated from the "
+            "datasets/observations join"
+        ),
+        build_sql="""
+        SELECT
+            d.year,
+            d.territory_code,
+            d.territory_name,
+            d.measure_code,
+            d.measure_name,
+            AVG(o.obs_value) as avg_value,
+            MIN(o.obs_value) as min_value,
+            MAX(o.obs_value) as max_value,
+            COUNT(o.obs_value) as obs_count,
+            STDDEV(o.obs_value) as std_dev
+        FROM {main_schema}.istat_datasets d
+        JOIN {main_schema}.istat_observations o ON d.id = o.dataset_row_id
+        WHERE o.obs_value IS NOT NULL
+        GROUP BY d.year, d.territory_code, d.territory_name,
+                 d.measure_code, d.measure_name
+        ORDER BY d.year, d.measure_code, d.territory_code
+        """,
+    ),
+    "trend_analysis": Materialization(
+        name="mv_category_yearly",
+        kind="materialized_aggregate",
+        query_type="trend_analysis",
+        description="Per category/year aggregates used by category trends",
+        build_sql="""
+        SELECT
+            m.category,
+            d.year,
+            COUNT(DISTINCT d.dataset_id) as dataset_count,
+            COUNT(o.obs_value) as total_observations,
+            AVG(o.obs_value) as avg_value,
+            MEDIAN(o.obs_value) as median_value,
+            STDDEV(o.obs_value) as std_dev
+        FROM {main_schema}.dataset_metadata m
+        JOIN {main_schema}.istat_datasets d ON m.dataset_id = d.dataset_id
+        JOIN {main_schema}.istat_observations o ON d.id = o.dataset_row_id
+        WHERE o.obs_value IS NOT NULL
+        GROUP BY m.category, d.year
+        ORDER BY m.category, d.year
+        """,
+    ),
+}
+
+
+class AdaptiveOptimizer:
+    """Records query profiles and manages materializations for hot shapes."""
+
+    def __init__(
+        self,
+        manager: Optional[DuckDBManager] = None,
+        config: Optional[dict[str, Any]] = None,
+    ):
+        """Initialize adaptive optimizer.
+
+        Args:
+            manager: Optional DuckDB manager instance
+            config: Optional overrides for ADAPTIVE_OPTIMIZER_CONFIG
+        """
+        self.manager = manager or get_manager()
+        self.schema_config = get_schema_config()
+        self.config = {**ADAPTIVE_OPTIMIZER_CONFIG, **(config or {})}
+
+        schema = self.schema_config["analytics_schema"]
+        self.profiles_table = f"{schema}.{PROFILES_TABLE}"
+        self.materializations_table = f"{schema}.{MATERIALIZATIONS_TABLE}"
+
+        self._lock = threading.RLock()
+        self._tables_ready = False
+        self._buffer: list[dict[str, Any]] = []
+        self._last_profiled: dict[str, float] = {}
+        self._recorded_since_cycle = 0
+
+        # Background worker for profiling and maintenance, started on demand
+        self._tasks: queue.Queue = queue.Queue(maxsize=self.config["max_queue"])
+        self._worker: Optional[threading.Thread] = None
+
+    def ensure_tables(self) -> None:
+        """Create the profile and materialization tables if needed."""
+        if self._tables_ready:
+            return
+
+        with self._lock:
+            if self._tables_ready:
+                return
+
+            self.manager.create_schema(self.schema_config["analytics_schema"])
+            self.manager.execute_statement(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.profiles_table} (
+                    fingerprint VARCHAR NOT NULL,
+                    query_type VARCHAR,
+                    normalized_query VARCHAR NOT NULL,
+                    executed_at TIMESTAMP NOT NULL,
+                    execution_time_ms DOUBLE NOT NULL,
+                    rows_returned BIGINT,
+                    materialized BOOLEAN NOT NULL DEFAULT FALSE,
+                    plan_summary VARCHAR,
+                    plan VARCHAR
+                );
+                """
+            )
+            self.manager.execute_statement(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.materializations_table} (
+                    name VARCHAR NOT NULL PRIMARY KEY,
+                    kind VARCHAR NOT NULL,
+                    query_type VARCHAR NOT NULL,
+                    fingerprint VARCHAR,
+                    status VARCHAR NOT NULL,
+                    proposed_at TIMESTAMP NOT NULL,
+                    applied_at TIMESTAMP,
+                    built_at TIMESTAMP,
+                    invalidated_at TIMESTAMP,
+                    build_time_ms DOUBLE,
+                    row_count BIGINT,
+                    error VARCHAR
+                );
+                """
+            )
+            self._tables_ready = True
+
+    def record(
+        self,
+        query_type: Optional[str],
+        query: str,
+        execution_time: float,
+        rows_returned: int,
+        parameters: Optional[Union[dict[str, Any], list[Any]]] = None,
+        materialized: bool = False,
+    ) -> None:
+        """Record one query execution.
+
+        Only buffers the execution: slow executions are profiled with EXPLAIN
+        ANALYZE (at most once per fingerprint per ``profile_interval``) on the
+        background worker, which also writes the buffer in batches and runs
+        an optimization cycle every ``cycle_interval`` records.
+
+        Args:
+            query_type: Analytics query type (QueryType value), if known
+            query: Executed SQL
+            execution_time: Execution time in seconds
+            rows_returned: Number of rows returned
+            parameters: Bound parameters, needed to profile the query
+            materialized: Whether the query ran against a materialization
+        """
+        fingerprint, normalized = fingerprint_query(query)
+        execution_ms = execution_time * 1000
+
+        entry = {
+            "fingerprint": fingerprint,
+            "query_type": query_type,
+            "normalized_query": normalized,
+            "executed_at": datetime.now(),
+            "execution_time_ms": execution_ms,
+            "rows_returned": int(rows_returned),
+            "materialized": materialized,
+            "plan_summary": None,
+            "plan": None,
+        }
+
+        due = False
+        if execution_ms >= self.config["slow_query_ms"]:
+            now = time.time()
+            with self._lock:
+                last = self._last_profiled.get(fingerprint, 0.0)
+                due = now - last >= self.config["profile_interval"]
+                if due:
+                    self._last_profiled[fingerprint] = now
+
+        # Profiling runs the query again: never on the caller's thread
+        if not (due and self._submit(self._profile, entry, query, parameters)):
+            self._buffer_entry(entry)
+
+    def wait(self, timeout: float = 5.0) -> bool:
+        """Wait until queued profiling and maintenance tasks are done.
+
+        Returns:
+            True if the queue was drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self._tasks.unfinished_tasks:
+            worker = self._worker
+            if time.monotonic() >= deadline or worker is None or not worker.is_alive():
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Finish queued tasks, stop the worker and flush buffered profiles."""
+        self.wait(timeout)
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None and worker.is_alive():
+            try:
+                self._tasks.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            worker.join(timeout)
+        self.flush()
+
+    def _profile(
+        self,
+        entry: dict[str, Any],
+        query: str,
+        parameters: Optional[Union[dict[str, Any], list[Any]]],
+    ) -> None:
+        """Attach an EXPLAIN ANALYZE profile to a recorded execution (worker)."""
+        plan = self.explain_analyze(query, parameters)
+        if plan:
+            entry["plan_summary"] = json.dumps(summarize_plan(plan))
+            entry["plan"] = json.dumps(plan)
+        self._buffer_entry(entry)
+
+    def _buffer_entry(self, entry: dict[str, Any]) -> None:
+        """Buffer a profile and schedule a flush or cycle when one is due."""
+        with self._lock:
+            self._buffer.append(entry)
+            self._recorded_since_cycle += 1
+            flush_due = len(self._buffer) >= self.config["flush_size"]
+            cycle_due = self._recorded_since_cycle >= self.config["cycle_interval"]
+            if cycle_due:
+                self._recorded_since_cycle = 0
+
+        if cycle_due:
+            self._submit(self.run_cycle)
+        elif flush_due:
+            self._submit(self.flush)
+
+    def _submit(self, task: Any, *args: Any) -> bool:
+        """Queue a task for the background worker, starting it if needed.
+
+        Returns:
+            False if the task was dropped because the queue is full
+        """
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="adaptive-optimizer", daemon=True
+                )
+                self._worker.start()
+        try:
+            self._tasks.put_nowait((task, args))
+            return True
+        except queue.Full:
+            logger.debug("Adaptive optimizer queue full, task dropped")
+            return False
+
+    def _run(self) -> None:
+        """Worker loop: run queued tasks one at a time."""
+        while True:
+            item = self._tasks.get()
+            try:
+                if item is _STOP:
+                    return
+                task, args = item
+                try:
+                    task(*args)
+                except Exception as e:
+                    logger.warning(f"Adaptive optimizer maintenance failed: {e}")
+            finally:
+                self._tasks.task_done()
+
+    def explain_analyze(
+        self,
+        query: str,
+        parameters: Optional[Union[dict[str, Any], list[Any]]] = None,
+    ) -> Optional[dict[str, Any]]:
+        """Run EXPLAIN ANALYZE for a query and return the JSON profile.
+
+        Args:
+            query: SQL query
+            parameters: Bound parameters
+
+        Returns:
+            Parsed profile, or None if profiling failed
+        """
+        try:
+            result = self.manager.execute_query(
+                f"EXPLAIN (ANALYZE, FORMAT JSON) {query.strip().rstrip(';')}",
+                parameters,
+            )
+            if result.empty:
+                return None
+            return json.loads(result.iloc[0, -1])
+        except Exception as e:
+            logger.warning(f"EXPLAIN ANALYZE failed: {e}")
+            return None
+
+    def flush(self) -> int:
+        """Write buffered profiles to DuckDB.
+
+        Returns:
+            Number of profiles written
+        """
+        with self._lock:
+            entries, self._buffer = self._buffer, []
+        if not entries:
+            return 0
+
+        try:
+            self.ensure_tables()
+            self.manager.bulk_insert(self.profiles_table, pd.DataFrame(entries))
+        except Exception as e:
+            logger.warning(f"Failed to persist {len(entries)} query profiles: {e}")
+            return 0
+        return len(entries)
+
+    def find_hot_shapes(
+        self,
+        min_calls: Optional[int] = None,
+        min_avg_ms: Optional[float] = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """Find query shapes that are both frequent and slow.
+
+        Args:
+            min_calls: Minimum executions (default: hot_min_calls)
+            min_avg_ms: Minimum average latency (default: slow_query_ms)
+            limit: Maximum number of shapes
+
+        Returns:
+            Shapes ordered by total time spent, most expensive first
+        """
+        self.flush()
+        self.ensure_tables()
+
+        result = self.manager.execute_query(
+            f"""
+            SELECT
+                fingerprint,
+                any_value(query_type) as query_type,
+                any_value(normalized_query) as normalized_query,
+                COUNT(*) as calls,
+                AVG(execution_time_ms) as avg_ms,
+                quantile_cont(execution_time_ms, 0.95) as p95_ms,
+                SUM(execution_time_ms) as total_ms,
+                MAX(executed_at) as last_seen,
+                arg_max(plan_summary, executed_at)
+                    FILTER (WHERE plan_summary IS NOT NULL) as plan_summary
+            FROM {self.profiles_table}
+            WHERE NOT materialized
+            GROUP BY fingerprint
+            HAVING COUNT(*) >= $1 AND AVG(execution_time_ms) >= $2
+            ORDER BY total_ms DESC
+            LIMIT $3
+            """,
+            [
+                self.config["hot_min_calls"] if min_calls is None else min_calls,
+                self.config["slow_query_ms"] if min_avg_ms is None else min_avg_ms,
+                int(limit),
+            ],
+        )
+
+        shapes = result.to_dict("records")
+        for shape in shapes:
+            if shape.get("plan_summary"):
+                shape["plan_summary"] = json.loads(shape["plan_summary"])
+            if isinstance(shape.get("last_seen"), pd.Timestamp):
+                shape["last_seen"] = shape["last_seen"].isoformat()
+        return shapes
+
+    def propose(self) -> list[dict[str, Any]]:
+        """Propose materializations for hot shapes that have one available.
+
+        Returns:
+            Newly proposed materializations
+        """
+        proposals = []
+        for shape in self.find_hot_shapes():
+            candidate = MATERIALIZATIONS.get(shape.get("query_type"))
+            if candidate is None:
+                continue
+
+            existing = self.manager.execute_query(
+                f"SELECT status FROM {self.materializations_table} WHERE name = $1",
+                [candidate.name],
+            )
+            if not existing.empty and existing.iloc[0]["status"] != "dropped":
+                continue
+
+            self.manager.execute_statement(
+                f"""
+                INSERT OR REPLACE INTO {self.materializations_table}
+                    (name, kind, query_type, fingerprint, status, proposed_at)
+                VALUES ($1, $2, $3, $4, 'proposed', $5)
+                """,
+                [
+                    candidate.name,
+                    candidate.kind,
+                    candidate.query_type,
+                    shape["fingerprint"],
+                    datetime.now(),
+                ],
+            )
+            logger.info(
+                f"Proposed {candidate.kind} {candidate.name} for hot "
+                f"{candidate.query_type} shape ({shape['calls']} calls, "
+                f"avg {shape['avg_ms']:.1f}ms)"
+            )
+            proposals.append(
+                {
+                    "name": candidate.name,
+                    "kind": candidate.kind,
+                    "query_type": candidate.query_type,
+                    "description": candidate.description,
+                    "fingerprint": shape["fingerprint"],
+                }
+            )
+        return proposals
+
+    def apply(self, name: str) -> dict[str, Any]:
+        """Build (or rebuild) a materialization and route its queries to it.
+
+        Args:
+            name: Materialization name
+
+        Returns:
+            Dictionary with build time and row count
+
+        Raises:
+            ValueError: If the materialization is unknown
+        """
+        candidate = next((m for m in MATERIALIZATIONS.values() if m.name == name), None)
+        if candidate is None:
+            raise ValueError(f"Unknown materialization: {name}")
+
+        self.ensure_tables()
+        table = candidate.table(self.schema_config)
+        build_sql = candidate.build_sql.format(
+            main_schema=self.schema_config["main_schema"],
+            analytics_schema=self.schema_config["analytics_schema"],
+        )
+
+        started = time.time()
+        built_at = datetime.now()
+        try:
+            self.manager.execute_statement(
+                f"CREATE OR REPLACE TABLE {table} AS {build_sql}"
+            )
+            row_count = int(
+                self.manager.execute_query(f"SELECT COUNT(*) AS n FROM {table}").iloc[
+                    0
+                ]["n"]
+            )
+        except Exception as e:
+            self._set_status(candidate, "failed", error=str(e))
+            logger.error(f"Failed to build materialization {name}: {e}")
+            raise
+
+        build_time_ms = (time.time() - started) * 1000
+        self._set_status(
+            candidate,
+            "applied",
+            built_at=built_at,
+            build_time_ms=build_time_ms,
+            row_count=row_count,
+        )
+        logger.info(
+            f"Materialization {name} built in {build_time_ms:.1f}ms ({row_count} rows)"
+        )
+        return {"name": name, "build_time_ms": build_time_ms, "row_count": row_count}
+
+    def drop(self, name: str) -> None:
+        """Drop a materialization and route its queries back to the base tables.
+
+        Args:
+            name: Materialization name
+        """
+        candidate = next((m for m in MATERIALIZATIONS.values() if m.name == name), None)
+        if candidate is None:
+            raise ValueError(f"Unknown materialization: {name}")
+
+        self.ensure_tables()
+        # Route other processes away before the table goes
+        self._set_status(candidate, "dropped")
+        self.manager.execute_statement(
+            f"DROP TABLE IF EXISTS {candidate.table(self.schema_config)}"
+        )
+
+    def active_table(self, query_type: str) -> Optional[str]:
+        """Get the materialized table serving a query type, if usable.
+
+        The status is read from the materializations table on every call, so
+        apply(), drop() and invalidate_materializations() in other processes
+        take effect immediately. Stale materializations (invalidated by a
+        data load since they were built, or older than ``max_staleness``)
+        are not used until the next refresh.
+
+        Args:
+            query_type: QueryType value
+
+        Returns:
+            Qualified table name, or None to use the base tables
+        """
+        try:
+            self.ensure_tables()
+            applied = self._applied_materializations(query_type).get(query_type)
+        except Exception as e:
+            logger.debug(f"Adaptive optimizer tables unavailable: {e}")
+            return None
+
+        if applied is None or self._is_stale(*applied):
+            return None
+        return MATERIALIZATIONS[query_type].table(self.schema_config)
+
+    def invalidate_materializations(self) -> None:
+        """Mark applied materializations as stale after a data load.
+
+        Their queries go back to the base tables until the next cycle (or
+        refresh_materializations()) rebuilds them. A build that was running
+        during the load stays stale as well, since it may have missed it.
+        """
+        try:
+            self.manager.execute_statement(
+                f"UPDATE {self.materializations_table} SET invalidated_at = $1 "
+                "WHERE status = 'applied'",
+                [datetime.now()],
+            )
+        except duckdb.CatalogException:
+            # Nothing was ever materialized
+            pass
+
+    def refresh_materializations(self, stale_only: bool = False) -> list[str]:
+        """Rebuild applied materializations, e.g. after a data load.
+
+        Args:
+            stale_only: Only rebuild stale materializations (see active_table())
+
+        Returns:
+            Names of rebuilt materializations
+        """
+        self.ensure_tables()
+
+        refreshed = []
+        for query_type, applied in self._applied_materializations().items():
+            if stale_only and not self._is_stale(*applied):
+                continue
+            name = MATERIALIZATIONS[query_type].name
+            try:
+                self.apply(name)
+                refreshed.append(name)
+            except Exception as e:
+                logger.warning(f"Failed to refresh materialization {name}: {e}")
+        return refreshed
+
+    def run_cycle(self, apply: Optional[bool] = None) -> dict[str, Any]:
+        """Run one optimization cycle.
+
+        Flushes profiles, prunes old ones, refreshes stale materializations
+        and proposes new ones, applying them when ``auto_apply`` is set.
+
+        Args:
+            apply: Override for the auto_apply setting
+
+        Returns:
+            Summary of the cycle
+        """
+        self.flush()
+        self.ensure_tables()
+
+        cutoff = datetime.now() - timedelta(days=self.config["retention_days"])
+        self.manager.execute_statement(
+            f"DELETE FROM {self.profiles_table} WHERE executed_at < $1", [cutoff]
+        )
+
+        refreshed = self.refresh_materializations(stale_only=True)
+        proposals = self.propose()
+
+        should_apply = self.config["auto_apply"] if apply is None else apply
+        applied = []
+        if should_apply:
+            pending = self.manager.execute_query(
+                f"SELECT name FROM {self.materializations_table} "
+                "WHERE status = 'proposed'"
+            )
+            for name in pending["name"]:
+                try:
+                    self.apply(name)
+                    applied.append(name)
+                except Exception:
+                    continue
+
+        return {"proposed": proposals, "applied": applied, "refreshed": refreshed}
+
+    def get_report(self) -> dict[str, Any]:
+        """Build a report of hot shapes and materialization impact.
+
+        Returns:
+            Dictionary with hot shapes and, per materialization, latency of
+            its query type before and after it was applied
+        """
+        hot_shapes = self.find_hot_shapes()
+
+        result = self.manager.execute_query(
+            f"""
+            SELECT
+                m.name, m.kind, m.query_type, m.status, m.proposed_at,
+                m.applied_at, m.built_at, m.invalidated_at, m.build_time_ms,
+                m.row_count, m.error,
+                AVG(p.execution_time_ms) FILTER (WHERE NOT p.materialized)
+                    as before_avg_ms,
+                COUNT(p.fingerprint) FILTER (WHERE NOT p.materialized)
+                    as before_calls,
+                AVG(p.execution_time_ms) FILTER (WHERE p.materialized)
+                    as after_avg_ms,
+                COUNT(p.fingerprint) FILTER (WHERE p.materialized) as after_calls
+            FROM {self.materializations_table} m
+            LEFT JOIN {self.profiles_table} p ON p.query_type = m.query_type
+            GROUP BY ALL
+            ORDER BY m.proposed_at
+            """
+        )
+
+        materializations = []
+        for row in result.to_dict("records"):
+            for key in ("proposed_at", "applied_at", "built_at", "invalidated_at"):
+                value = row.get(key)
+                row[key] = None if pd.isna(value) else pd.Timestamp(value).isoformat()
+            for key, value in row.items():
+                if not isinstance(value, str) and value is not None and pd.isna(value):
+                    row[key] = None
+
+            before, after = row["before_avg_ms"], row["after_avg_ms"]
+            row["improvement_pct"] = (
+                round((before - after) / before * 100, 1)
+                if before and after is not None
+                else None
+            )
+            materializations.append(row)
+
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "settings": {
+                "hot_min_calls": self.config["hot_min_calls"],
+                "slow_query_ms": self.config["slow_query_ms"],
+                "auto_apply": self.config["auto_apply"],
+            },
+            "hot_shapes": hot_shapes,
+            "materializations": materializations,
+        }
+
+    def _applied_materializations(
+        self, query_type: Optional[str] = None
+    ) -> dict[str, tuple[datetime, bool]]:
+        """Read applied materializations from the materializations table.
+
+        Args:
+            query_type: Only read the materialization of this query type
+
+        Returns:
+            Build time of each applied materialization and whether a data
+            load invalidated it since, by query type
+        """
+        query = (
+            "SELECT query_type, built_at, "
+            "COALESCE(invalidated_at >= built_at, FALSE) AS invalidated "
+            f"FROM {self.materializations_table} WHERE status = 'applied'"
+        )
+        params = None
+        if query_type is not None:
+            query += " AND query_type = $1"
+            params = [query_type]
+        applied = self.manager.execute_query(query, params)
+        return {
+            row.query_type: (
+                pd.Timestamp(row.built_at).to_pydatetime(),
+                bool(row.invalidated),
+            )
+            for row in applied.itertuples()
+        }
+
+    def _is_stale(self, built_at: datetime, invalidated: bool) -> bool:
+        """Whether an applied materialization must not serve queries."""
+        max_age = timedelta(seconds=self.config["max_staleness"])
+        return invalidated or datetime.now() - built_at > max_age
+
+    def _set_status(self, candidate: Materialization, status: str, **fields: Any):
+        """Upsert the status row of a materialization.
+
+        Args:
+            candidate: Materialization
+            status: New status (proposed, applied, failed, dropped)
+            **fields: built_at, build_time_ms, row_count or error
+        """
+        now = datetime.now()
+        self.manager.execute_statement(
+            f"""
+            INSERT INTO {self.materializations_table}
+                (name, kind, query_type, status, proposed_at, applied_at,
+                 built_at, build_time_ms, row_count, error)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+            ON CONFLICT (name) DO UPDATE SET
+                status = excluded.status,
+                applied_at = COALESCE(excluded.applied_at, applied_at),
+                built_at = COALESCE(excluded.built_at, built_at),
+                build_time_ms = COALESCE(excluded.build_time_ms, build_time_ms),
+                row_count = COALESCE(excluded.row_count, row_count),
+                error = excluded.error
+            """,
+            [
+                candidate.name,
+                candidate.kind,
+                candidate.query_type,
+                status,
+                now,
+                now if status == "applied" else None,
+                fields.get("built_at"),
+                fields.get("build_time_ms"),
+                fields.get("row_count"),
+                fields.get("error"),
+            ],
+        )
+
+
+# Global adaptive optimizer bound to the shared DuckDB manager
+_adaptive_optimizer: Optional[AdaptiveOptimizer] = None
+_adaptive_optimizer_lock = threading.Lock()
+
+
+def get_adaptive_optimizer() -> AdaptiveOptimizer:
+    """Get the adaptive optimizer for the shared DuckDB manager.
+
+    Returns:
+        Global AdaptiveOptimizer instance
+    """
+    global _adaptive_optimizer
+    if _adaptive_optimizer is None:
+        with _adaptive_optimizer_lock:
+            if _adaptive_optimizer is None:
+                _adaptive_optimizer = AdaptiveOptimizer(get_manager())
+    return _adaptive_optimizer
+
+
+def reset_adaptive_optimizer() -> None:
+    """Reset the global adaptive optimizer (finishing queued work)."""
+    global _adaptive_optimizer
+    with _adaptive_optimizer_lock:
+        if _adaptive_optimizer is not None:
+            _adaptive_optimizer.close()
+        _adaptive_optimizer = None
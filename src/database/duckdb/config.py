@@ -35,6 +35,41 @@ CONNECTION_CONFIG = {
     "max_overflow": int(os.getenv("DUCKDB_MAX_OVERFLOW", "10")),
     "pool_timeout": int(os.getenv("DUCKDB_POOL_TIMEOUT", "30")),
     "pool_recycle": int(os.getenv("DUCKDB_POOL_RECYCLE", "3600")),
+    # Async execution: calls waiting for a worker before new ones are rejected
+    "max_queued_queries": int(os.getenv("DUCKDB_MAX_QUEUED_QUERIES", "64")),
+}
+
+# Per-query time budgets (seconds) by endpoint class; 0 disables the limit
+QUERY_TIMEOUT_CONFIG = {
+    "default": float(os.getenv("DUCKDB_TIMEOUT", "30")),
+    "interactive": float(os.getenv("DUCKDB_TIMEOUT_INTERACTIVE", "10")),
+    "odata": float(os.getenv("DUCKDB_TIMEOUT_ODATA", "30")),
+    "analytics": float(os.getenv("DUCKDB_TIMEOUT_ANALYTICS", "60")),
+    "export": float(os.getenv("DUCKDB_TIMEOUT_EXPORT", "300")),
+}
+
+# Adaptive optimizer: query profiling and automatic materializations
+ADAPTIVE_OPTIMIZER_CONFIG = {
+    "enabled": os.getenv("DUCKDB_ADAPTIVE_OPTIMIZER", "true").lower() == "true",
+    # Apply proposed materializations automatically (otherwise only propose)
+    "auto_apply": os.getenv("DUCKDB_ADAPTIVE_AUTO_APPLY", "false").lower() == "true",
+    # A query shape is "hot" with this many executions ...
+    "hot_min_calls": int(os.getenv("DUCKDB_ADAPTIVE_HOT_MIN_CALLS", "20")),
+    # ... and "slow" above this average latency (milliseconds)
+    "slow_query_ms": float(os.getenv("DUCKDB_ADAPTIVE_SLOW_QUERY_MS", "250")),
+    # Minimum gap between EXPLAIN ANALYZE runs for one fingerprint (seconds)
+    "profile_interval": int(os.getenv("DUCKDB_ADAPTIVE_PROFILE_INTERVAL", "300")),
+    # Profiles buffered in memory before they are written to DuckDB
+    "flush_size": int(os.getenv("DUCKDB_ADAPTIVE_FLUSH_SIZE", "50")),
+    # Recorded executions between automatic optimization cycles
+    "cycle_interval": int(os.getenv("DUCKDB_ADAPTIVE_CYCLE_INTERVAL", "500")),
+    # Materializations older than this are rebuilt before being used again
+    "max_staleness": int(os.getenv("DUCKDB_ADAPTIVE_MAX_STALENESS", "3600")),
+    # Profiles older than this are pruned (days)
+    "retention_days": int(os.getenv("DUCKDB_ADAPTIVE_RETENTION_DAYS", "30")),
+    # Profiling and maintenance tasks queued for the background worker
+    # before new ones are dropped
+    "max_queue": int(os.getenv("DUCKDB_ADAPTIVE_MAX_QUEUE", "1000")),
 }
 
 # Performance tuning
@@ -0,0 +1,458 @@
+"""Bounded thread pool and cancellation for running DuckDB work.
+
+FastAPI handlers are ``async def`` while DuckDB calls are blocking. This
+module runs them on a dedicated pool sized to the DuckDB thread setting, so a
+slow aggregate no longer stalls the event loop, and bounds the number of
+queued calls so overload surfaces as a rejection instead of unbounded latency.
+
+Each call runs inside a QueryContext carrying its deadline and a cancel flag.
+DuckDBManager registers every connection opened under a context with the
+QueryWatchdog, which calls ``connection.interrupt()`` once the deadline
+passes or the client disconnects.
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+try:
+    from utils.logger import get_logger
+except ImportError:
+    from src.utils.logger import get_logger
+
+from .config import CONNECTION_CONFIG, DUCKDB_CONFIG, QUERY_TIMEOUT_CONFIG
+
+logger = get_logger(__name__)
+
+DisconnectCheck = Callable[[], Awaitable[bool]]
+
+
+class QueryQueueFullError(RuntimeError):
+    """Raised when the executor queue is at capacity."""
+
+
+class QueryCancelledError(RuntimeError):
+    """Raised when a query is abandoned because the client went away."""
+
+
+class QueryTimeoutError(RuntimeError):
+    """Raised when a query exceeds its time budget."""
+
+
+def get_query_timeout(endpoint_class: str = "default") -> Optional[float]:
+    """Get the query time budget for an endpoint class.
+
+    Args:
+        endpoint_class: Key of QUERY_TIMEOUT_CONFIG (interactive, odata, ...)
+
+    Returns:
+        Timeout in seconds, or None if disabled
+    """
+    timeout = QUERY_TIMEOUT_CONFIG.get(endpoint_class, QUERY_TIMEOUT_CONFIG["default"])
+    return timeout if timeout and timeout > 0 else None
+
+
+@dataclass
+class QueryContext:
+    """Deadline and cancel flag shared by all queries of one call."""
+
+    timeout: Optional[float] = None
+    deadline: Optional[float] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    reason: Optional[str] = None  # "timeout" or "cancelled" once stopped
+    recorded: bool = False
+
+    def start(self) -> None:
+        """Start the clock (called when the call leaves the queue)."""
+        if self.timeout and self.deadline is None:
+            self.deadline = time.time() + self.timeout
+
+    def cancel(self) -> None:
+        """Request cooperative cancellation."""
+        self.cancel_event.set()
+
+    def should_stop(self) -> bool:
+        """Check for cancellation or an expired deadline, recording why."""
+        if self.reason is None:
+            if self.cancel_event.is_set():
+                self.reason = "cancelled"
+            elif self.deadline is not None and time.time() >= self.deadline:
+                self.reason = "timeout"
+        return self.reason is not None
+
+    def error(self) -> RuntimeError:
+        """Build the exception matching the stop reason."""
+        if self.reason == "timeout":
+            return QueryTimeoutError(f"Query exceeded {self.timeout:g}s time budget")
+        return QueryCancelledError("Query cancelled")
+
+    def check(self) -> None:
+        """Raise if the call should stop (cooperative cancellation point)."""
+        if self.should_stop():
+            raise self.error()
+
+
+_context_local = threading.local()
+
+
+def current_query_context() -> Optional[QueryContext]:
+    """Get the QueryContext active on this thread, if any."""
+    return getattr(_context_local, "context", None)
+
+
+@contextmanager
+def query_scope(
+    timeout: Optional[float] = None, context: Optional[QueryContext] = None
+) -> Iterator[Optional[QueryContext]]:
+    """Run the enclosed DuckDB calls under a deadline/cancel context.
+
+    An already active context is kept as is, so nested scopes share the
+    budget of the outermost one.
+
+    Args:
+        timeout: Time budget in seconds (ignored if None and no context)
+        context: Explicit context to activate
+
+    Yields:
+        The active QueryContext, or None if neither argument was given
+    """
+    outer = current_query_context()
+    if outer is not None:
+        yield outer
+        return
+
+    if context is None and timeout is None:
+        yield None
+        return
+
+    context = context or QueryContext(timeout=timeout)
+    context.start()
+    _context_local.context = context
+    try:
+        yield context
+    finally:
+        _context_local.context = None
+
+
+class QueryWatchdog:
+    """Background thread interrupting connections past their deadline."""
+
+    def __init__(self, poll_interval: float = 0.05):
+        """Initialize watchdog.
+
+        Args:
+            poll_interval: Seconds between deadline checks while watching
+        """
+        self.poll_interval = poll_interval
+        self._watched: dict[int, tuple[Any, QueryContext]] = {}
+        self._next_token = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._interrupts_sent = 0
+
+    def watch(self, connection: Any, context: QueryContext) -> int:
+        """Start watching a connection.
+
+        Args:
+            connection: DuckDB connection (anything with interrupt())
+            context: Context whose deadline/cancel flag applies
+
+        Returns:
+            Token for unwatch()
+        """
+        with self._condition:
+            self._next_token += 1
+            token = self._next_token
+            self._watched[token] = (connection, context)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="duckdb-watchdog", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+            return token
+
+    def unwatch(self, token: int) -> None:
+        """Stop watching a connection."""
+        with self._condition:
+            self._watched.pop(token, None)
+
+    def _run(self) -> None:
+        """Watchdog loop: interrupt connections that should stop."""
+        while True:
+            with self._condition:
+                while not self._watched:
+                    self._condition.wait()
+                entries = list(self._watched.items())
+
+            for token, (connection, context) in entries:
+                if context.should_stop():
+                    with self._condition:
+                        # Skip connections released since the snapshot
+                        if self._watched.pop(token, None) is None:
+                            continue
+                        try:
+                            connection.interrupt()
+                            self._interrupts_sent += 1
+                        except Exception as e:
+                            logger.debug(f"Failed to interrupt query: {e}")
+
+            time.sleep(self.poll_interval)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get watchdog statistics."""
+        with self._condition:
+            return {
+                "watched_connections": len(self._watched),
+                "interrupts_sent": self._interrupts_sent,
+            }
+
+
+_query_watchdog = QueryWatchdog()
+
+
+def get_query_watchdog() -> QueryWatchdog:
+    """Get the process-wide query watchdog."""
+    return _query_watchdog
+
+
+class QueryExecutor:
+    """Bounded thread pool with queue-depth metrics for DuckDB calls."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue_depth: Optional[int] = None,
+        disconnect_poll_interval: float = 0.25,
+    ):
+        """Initialize executor.
+
+        Args:
+            max_workers: Worker threads (default: DuckDB ``threads`` setting)
+            max_queue_depth: Maximum calls waiting for a worker
+            disconnect_poll_interval: Seconds between client disconnect checks
+        """
+        self.max_workers = max_workers or DUCKDB_CONFIG["threads"]
+        self.max_queue_depth = (
+            max_queue_depth
+            if max_queue_depth is not None
+            else CONNECTION_CONFIG["max_queued_queries"]
+        )
+        self.disconnect_poll_interval = disconnect_poll_interval
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="duckdb-query"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "disconnects": 0,
+            "timeouts": 0,
+            "interrupted": 0,
+            "max_queue_depth_seen": 0,
+            "total_queue_wait": 0.0,
+        }
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        query_context: Optional[QueryContext] = None,
+        **kwargs: Any,
+    ) -> Future:
+        """Submit a blocking call to the pool.
+
+        Args:
+            fn: Callable to run on a worker thread
+            *args: Positional arguments for fn
+            query_context: Deadline/cancel context to activate around fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            concurrent.futures.Future for the call
+
+        Raises:
+            QueryQueueFullError: If max_queue_depth calls are already waiting
+        """
+        with self._lock:
+            if self._queued >= self.max_queue_depth:
+                self._stats["rejected"] += 1
+                raise QueryQueueFullError(
+                    f"Query queue is full ({self.max_queue_depth} waiting)"
+                )
+            self._queued += 1
+            self._stats["submitted"] += 1
+            self._stats["max_queue_depth_seen"] = max(
+                self._stats["max_queue_depth_seen"], self._queued
+            )
+
+        enqueued_at = time.time()
+
+        def task():
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._stats["total_queue_wait"] += time.time() - enqueued_at
+            try:
+                if query_context is None:
+                    result = fn(*args, **kwargs)
+                else:
+                    with query_scope(context=query_context):
+                        result = fn(*args, **kwargs)
+                    # Callers that swallow errors must not turn a stopped
+                    # query into a partial result
+                    if query_context.reason is not None:
+                        raise query_context.error()
+            except BaseException:
+                # Each call ends in exactly one of completed, failed,
+                # timeouts and interrupted
+                reason = query_context.reason if query_context is not None else None
+                if reason == "timeout":
+                    key = "timeouts"
+                elif reason:
+                    key = "interrupted"
+                else:
+                    key = "failed"
+                with self._lock:
+                    self._running -= 1
+                    self._stats[key] += 1
+                raise
+            with self._lock:
+                self._running -= 1
+                self._stats["completed"] += 1
+            return result
+
+        future = self._pool.submit(task)
+
+        def on_done(done: Future) -> None:
+            # A call cancelled while still queued never ran task()
+            if done.cancelled():
+                with self._lock:
+                    self._queued -= 1
+                    self._stats["cancelled"] += 1
+
+        future.add_done_callback(on_done)
+        return future
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        disconnect_check: Optional[DisconnectCheck] = None,
+        query_timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run a blocking call on the pool and await its result.
+
+        Args:
+            fn: Callable to run on a worker thread
+            *args: Positional arguments for fn
+            disconnect_check: Optional coroutine function returning True once
+                the client has gone (e.g. ``request.is_disconnected``)
+            query_timeout: Time budget in seconds once the call starts running
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of fn
+
+        Raises:
+            QueryQueueFullError: If the queue is at capacity
+            QueryCancelledError: If the client disconnected first
+            QueryTimeoutError: If the call exceeded query_timeout
+        """
+        context = QueryContext(timeout=query_timeout)
+        future = self.submit(fn, *args, query_context=context, **kwargs)
+        awaitable = asyncio.wrap_future(future)
+        if disconnect_check is None:
+            return await awaitable
+
+        watcher = asyncio.ensure_future(self._wait_for_disconnect(disconnect_check))
+        try:
+            done, _ = await asyncio.wait(
+                {awaitable, watcher}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if awaitable in done:
+                return awaitable.result()
+
+            # Client is gone: drop the call if it is still queued, otherwise
+            # let the watchdog interrupt whatever it is running
+            context.cancel()
+            future.cancel()
+            awaitable.cancel()
+            with self._lock:
+                self._stats["disconnects"] += 1
+            raise QueryCancelledError("Client disconnected before query completed")
+        finally:
+            watcher.cancel()
+
+    async def _wait_for_disconnect(self, disconnect_check: DisconnectCheck) -> None:
+        """Poll disconnect_check until it reports a disconnect."""
+        while True:
+            try:
+                if await disconnect_check():
+                    return
+            except Exception as e:
+                # Cannot tell: stop polling and let the query finish
+                logger.debug(f"Disconnect check failed: {e}")
+                await asyncio.Event().wait()
+            await asyncio.sleep(self.disconnect_poll_interval)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get executor statistics.
+
+        Returns:
+            Dictionary with pool size, queue depth and call counters
+        """
+        with self._lock:
+            stats = self._stats.copy()
+            started = stats["submitted"] - stats["cancelled"] - self._queued
+            stats.update(
+                {
+                    "max_workers": self.max_workers,
+                    "max_queue_depth": self.max_queue_depth,
+                    "queue_depth": self._queued,
+                    "running": self._running,
+                    "avg_queue_wait": (
+                        stats["total_queue_wait"] / started if started > 0 else 0.0
+                    ),
+                }
+            )
+            return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker pool."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Global executor shared by all DuckDBManager instances
+_query_executor: Optional[QueryExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_query_executor() -> QueryExecutor:
+    """Get the shared query executor (created on first use)."""
+    global _query_executor
+    with _executor_lock:
+        if _query_executor is None:
+            _query_executor = QueryExecutor()
+        return _query_executor
+
+
+def reset_query_executor() -> None:
+    """Shut down and discard the shared query executor (for testing)."""
+    global _query_executor
+    with _executor_lock:
+        if _query_executor is not None:
+            _query_executor.shutdown(wait=False)
+        _query_executor = None
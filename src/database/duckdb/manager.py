@@ -17,6 +17,7 @@ from typing import Any, Optional, Union
 
 import duckdb
 import pandas as pd
+import pyarrow as pa
 
 try:
     from utils.logger import get_logger
@@ -24,6 +25,13 @@ except ImportError:
     from src.utils.logger import get_logger
 
 from .config import get_connection_string, get_duckdb_config
+from .executor import (
+    DisconnectCheck,
+    current_query_context,
+    get_query_executor,
+    get_query_watchdog,
+    query_scope,
+)
 
 logger = get_logger(__name__)
 
@@ -63,6 +71,8 @@ class DuckDBManager:
             "total_time": 0.0,
             "slow_queries": 0,
             "errors": 0,
+            "timeouts": 0,
+            "interrupts": 0,
         }
 
         # DON'T initialize connection in constructor - do it lazily
@@ -128,17 +138,33 @@ class DuckDBManager:
 
         STABLE PATTERN: Always create fresh connection per context.
         This prevents lock issues and ensures clean state.
+
+        Inside a query_scope() the connection is registered with the query
+        watchdog, which interrupts it once the scope's deadline passes or it
+        is cancelled; later connections in the same scope fail fast.
         """
         conn = None
+        watch_token = None
+        context = current_query_context()
         try:
+            if context is not None:
+                context.check()
+
             # Always create fresh connection - no shared state
             db_path_str = self.connection_string
             conn = duckdb.connect(database=str(db_path_str))
+            if context is not None:
+                watch_token = get_query_watchdog().watch(conn, context)
             yield conn
         except Exception as e:
+            if context is not None and context.reason is not None:
+                self._record_interruption(context)
+                raise context.error() from e
             print(f"Connection error: {e}")
             raise
         finally:
+            if watch_token is not None:
+                get_query_watchdog().unwatch(watch_token)
             # Always clean up connection
             if conn:
                 try:
@@ -147,18 +173,24 @@ class DuckDBManager:
                     pass  # Ignore close errors
 
     def execute_query(
-        self, query: str, parameters: Optional[dict[str, Any]] = None
+        self,
+        query: str,
+        parameters: Optional[Union[dict[str, Any], list[Any]]] = None,
+        timeout: Optional[float] = None,
     ) -> pd.DataFrame:
         """Execute SQL query and return results as DataFrame.
 
         Args:
             query: SQL query to execute
             parameters: Optional query parameters for prepared statements
+            timeout: Optional time budget in seconds; the query is interrupted
+                when exceeded (an enclosing query_scope takes precedence)
 
         Returns:
             Query results as pandas DataFrame
 
         Raises:
+            QueryTimeoutError: If the time budget was exceeded
             Exception: If query execution fails
         """
         start_time = time.time()
@@ -168,7 +200,7 @@ class DuckDBManager:
             # if not security_manager.sanitize_input(query):
             #     raise ValueError("Query failed security validation")
 
-            with self.get_connection() as conn:
+            with query_scope(timeout), self.get_connection() as conn:
                 if parameters:
                     result = conn.execute(query, parameters).df()
                 else:
@@ -189,6 +221,84 @@ class DuckDBManager:
             print(f"Failed query: {query[:200]}...")
             raise
 
+    def execute_arrow(
+        self,
+        query: str,
+        parameters: Optional[Union[dict[str, Any], list[Any]]] = None,
+        timeout: Optional[float] = None,
+    ) -> pa.Table:
+        """Execute SQL query and return results as a columnar Arrow table.
+
+        Avoids the pandas conversion of execute_query() for callers that
+        consume whole columns.
+
+        Args:
+            query: SQL query to execute
+            parameters: Optional query parameters for prepared statements
+            timeout: Optional time budget in seconds
+
+        Returns:
+            Query results as pyarrow Table
+
+        Raises:
+            QueryTimeoutError: If the time budget was exceeded
+            Exception: If query execution fails
+        """
+        start_time = time.time()
+
+        try:
+            with query_scope(timeout), self.get_connection() as conn:
+                result = conn.execute(query, parameters or [])
+                # to_arrow_table() replaces fetch_arrow_table() in newer DuckDB
+                fetch = getattr(result, "to_arrow_table", None)
+                table = fetch() if fetch else result.fetch_arrow_table()
+
+                execution_time = time.time() - start_time
+                self._update_query_stats(execution_time, success=True)
+
+                print(f"Query executed successfully in {execution_time:.3f}s")
+                return table
+
+        except Exception as e:
+            execution_time = time.time() - start_time
+            self._update_query_stats(execution_time, success=False)
+
+            print(f"Query execution failed after {execution_time:.3f}s: {e}")
+            print(f"Failed query: {query[:200]}...")
+            raise
+
+    async def execute_query_async(
+        self,
+        query: str,
+        parameters: Optional[Union[dict[str, Any], list[Any]]] = None,
+        disconnect_check: Optional[DisconnectCheck] = None,
+        timeout: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """Execute SQL query on the shared query executor without blocking.
+
+        Args:
+            query: SQL query to execute
+            parameters: Optional query parameters for prepared statements
+            disconnect_check: Optional coroutine function reporting client
+                disconnects (e.g. ``request.is_disconnected``)
+            timeout: Optional time budget in seconds
+
+        Returns:
+            Query results as pandas DataFrame
+
+        Raises:
+            QueryQueueFullError: If too many queries are waiting
+            QueryCancelledError: If the client disconnected
+            QueryTimeoutError: If the time budget was exceeded
+        """
+        return await get_query_executor().run(
+            self.execute_query,
+            query,
+            parameters,
+            disconnect_check=disconnect_check,
+            query_timeout=timeout,
+        )
+
     def execute_statement(
         self,
         statement: str,
@@ -406,7 +516,24 @@ class DuckDBManager:
                 stats["slow_query_percentage"] = 0.0
                 stats["error_percentage"] = 0.0
 
-            return stats
+        stats["executor"] = get_query_executor().get_stats()
+        stats["watchdog"] = get_query_watchdog().get_stats()
+        return stats
+
+    def _record_interruption(self, context) -> None:
+        """Count a query stopped by timeout or cancellation (once per scope).
+
+        Args:
+            context: QueryContext that stopped
+        """
+        with self._lock:
+            if context.recorded:
+                return
+            context.recorded = True
+            if context.reason == "timeout":
+                self._query_stats["timeouts"] += 1
+            else:
+                self._query_stats["interrupts"] += 1
 
     def _update_query_stats(self, execution_time: float, success: bool = True) -> None:
         """Update query execution statistics.
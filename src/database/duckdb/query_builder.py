@@ -11,17 +11,22 @@ This module provides a fluent query builder for DuckDB that:
 import hashlib
 import threading
 import time
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Any, Optional, Union
 
 import pandas as pd
+import pyarrow as pa
 
 try:
     from utils.logger import get_logger
+    from utils.pagination import decode_cursor, encode_cursor
 except ImportError:
     from src.utils.logger import get_logger
+    from src.utils.pagination import decode_cursor, encode_cursor
 
+from .executor import DisconnectCheck, get_query_executor
 from .manager import DuckDBManager, get_manager
 from .schema import ISTATSchemaManager
 
@@ -55,6 +60,20 @@ class FilterOperator(Enum):
     BETWEEN = "BETWEEN"
     IS_NULL = "IS NULL"
     IS_NOT_NULL = "IS NOT NULL"
+    # Null-safe inequality: NULL counts as different from any value
+    DISTINCT_FROM = "IS DISTINCT FROM"
+    # String functions, rendered as function(column, ?)
+    CONTAINS = "contains"
+    STARTS_WITH = "starts_with"
+    ENDS_WITH = "ends_with"
+
+
+# Operators rendered as a function call instead of an infix operator
+FUNCTION_OPERATORS = {
+    FilterOperator.CONTAINS,
+    FilterOperator.STARTS_WITH,
+    FilterOperator.ENDS_WITH,
+}
 
 
 class AggregateFunction(Enum):
@@ -102,10 +121,50 @@ class FilterCondition:
             return f"{self.column} {self.operator.value} ({placeholders})", list(
                 self.value
             )
+        elif self.operator in FUNCTION_OPERATORS:
+            return f"{self.operator.value}({self.column}, ?)", [self.value]
         else:
             return f"{self.column} {self.operator.value} ?", [self.value]
 
 
+@dataclass
+class ConditionGroup:
+    """Represents a parenthesized group of WHERE conditions.
+
+    Used for OR and nested expressions, which a flat list of FilterConditions
+    cannot express. A negated group treats an unknown (NULL) result as false
+    before negating, so NOT keeps two-valued logic.
+    """
+
+    conditions: list[Union[FilterCondition, "ConditionGroup"]]
+    conjunction: str = "AND"  # AND, OR
+    negated: bool = False
+    logical_operator: str = "AND"  # AND, OR
+
+    def to_sql(self) -> tuple[str, list[Any]]:
+        """Convert group to SQL with parameters.
+
+        Returns:
+            Tuple of (sql_fragment, parameters)
+        """
+        if not self.conditions:
+            raise ValueError("Condition group must not be empty")
+        if self.conjunction not in ("AND", "OR"):
+            raise ValueError("Conjunction must be AND or OR")
+
+        fragments = []
+        params: list[Any] = []
+        for condition in self.conditions:
+            sql_fragment, condition_params = condition.to_sql()
+            fragments.append(sql_fragment)
+            params.extend(condition_params)
+
+        sql = "(" + f" {self.conjunction} ".join(fragments) + ")"
+        if self.negated:
+            sql = f"NOT COALESCE({sql}, FALSE)"
+        return sql, params
+
+
 @dataclass
 class JoinCondition:
     """Represents a table join."""
@@ -121,9 +180,13 @@ class OrderByClause:
 
     column: str
     direction: str = "ASC"  # ASC, DESC
+    nullable: bool = False
 
     def to_sql(self) -> str:
         """Convert to SQL fragment."""
+        if self.nullable:
+            # Keyset predicates assume NULLs sort last in both directions
+            return f"{self.column} {self.direction} NULLS LAST"
         return f"{self.column} {self.direction}"
 
 
@@ -265,12 +328,13 @@ class DuckDBQueryBuilder:
         self._select_columns: list[str] = []
         self._from_table: Optional[str] = None
         self._joins: list[JoinCondition] = []
-        self._where_conditions: list[FilterCondition] = []
+        self._where_conditions: list[Union[FilterCondition, ConditionGroup]] = []
         self._group_by_columns: list[str] = []
         self._having_conditions: list[FilterCondition] = []
         self._order_by_clauses: list[OrderByClause] = []
         self._limit_count: Optional[int] = None
         self._offset_count: Optional[int] = None
+        self._seek_values: Optional[list[Any]] = None
 
         # Query metadata
         self._query_type: QueryType = QueryType.SELECT
@@ -398,6 +462,24 @@ class DuckDBQueryBuilder:
         self._where_conditions.append(condition)
         return self
 
+    def where_condition(
+        self, condition: Union[FilterCondition, ConditionGroup]
+    ) -> "DuckDBQueryBuilder":
+        """Add a prebuilt WHERE condition or condition group.
+
+        Args:
+            condition: Condition, e.g. a ConditionGroup compiled from a filter
+                expression
+
+        Returns:
+            Self for method chaining
+        """
+        if not isinstance(condition, (FilterCondition, ConditionGroup)):
+            raise ValueError("Condition must be a FilterCondition or ConditionGroup")
+
+        self._where_conditions.append(condition)
+        return self
+
     def where_in(self, column: str, values: list[Any]) -> "DuckDBQueryBuilder":
         """Add WHERE IN condition.
 
@@ -481,12 +563,33 @@ class DuckDBQueryBuilder:
         self._having_conditions.append(condition)
         return self
 
-    def order_by(self, column: str, direction: str = "ASC") -> "DuckDBQueryBuilder":
+    def having_condition(
+        self, condition: Union[FilterCondition, ConditionGroup]
+    ) -> "DuckDBQueryBuilder":
+        """Add a prebuilt HAVING condition or condition group.
+
+        Args:
+            condition: Condition on grouped columns or aggregate aliases
+
+        Returns:
+            Self for method chaining
+        """
+        if not isinstance(condition, (FilterCondition, ConditionGroup)):
+            raise ValueError("Condition must be a FilterCondition or ConditionGroup")
+
+        self._having_conditions.append(condition)
+        return self
+
+    def order_by(
+        self, column: str, direction: str = "ASC", nullable: bool = False
+    ) -> "DuckDBQueryBuilder":
         """Add ORDER BY clause.
 
         Args:
             column: Column name
             direction: Sort direction (ASC or DESC)
+            nullable: Whether the column may contain NULLs; nullable keys sort
+                NULLs last and get NULL-aware keyset predicates in after()
 
         Returns:
             Self for method chaining
@@ -495,7 +598,7 @@ class DuckDBQueryBuilder:
         if direction not in ["ASC", "DESC"]:
             raise ValueError("Direction must be ASC or DESC")
 
-        self._order_by_clauses.append(OrderByClause(column, direction))
+        self._order_by_clauses.append(OrderByClause(column, direction, nullable))
         return self
 
     def limit(self, count: int) -> "DuckDBQueryBuilder":
@@ -528,6 +631,48 @@ class DuckDBQueryBuilder:
         self._offset_count = count
         return self
 
+    def after(
+        self, column_values: Union[Sequence[Any], Mapping[str, Any]]
+    ) -> "DuckDBQueryBuilder":
+        """Resume after a row using keyset (seek) pagination.
+
+        Generates a predicate on the ORDER BY keys instead of an OFFSET, so the
+        cost of a page does not depend on how deep it is. Grouped queries
+        seek in HAVING, so the keys may be aggregate aliases. The ORDER BY keys
+        should identify rows uniquely (add a tiebreaker column if needed);
+        keys that may contain NULLs must be declared with
+        ``order_by(..., nullable=True)``.
+
+        Args:
+            column_values: Values of the ORDER BY keys for the last row of the
+                previous page, either positional or keyed by column name
+
+        Returns:
+            Self for method chaining
+        """
+        if isinstance(column_values, Mapping):
+            self._seek_values = dict(column_values)
+        elif isinstance(column_values, (list, tuple)) and column_values:
+            self._seek_values = list(column_values)
+        else:
+            raise ValueError("after() requires a non-empty list/tuple or mapping")
+
+        return self
+
+    def after_cursor(self, cursor: str) -> "DuckDBQueryBuilder":
+        """Resume after the row encoded in a continuation token.
+
+        Must be called after order_by(), since the token is checked against the
+        current ORDER BY keys.
+
+        Args:
+            cursor: Token returned by execute_page()
+
+        Returns:
+            Self for method chaining
+        """
+        return self.after(decode_cursor(cursor, self._order_by_keys()))
+
     def cache_for(self, seconds: int) -> "DuckDBQueryBuilder":
         """Set cache TTL for this query.
 
@@ -662,6 +807,130 @@ class DuckDBQueryBuilder:
         """
         return self.where_in("d.territory_code", territory_codes)
 
+    def _order_by_keys(self) -> list[str]:
+        """Get the ORDER BY columns in order."""
+        return [clause.column for clause in self._order_by_clauses]
+
+    def _build_seek_predicate(self) -> tuple[str, list[Any]]:
+        """Build the keyset predicate for after().
+
+        Uniform sort directions use a row-value comparison; mixed directions
+        expand to ``(k1 > ?) OR (k1 = ? AND k2 < ?) ...``. Multi-key predicates
+        also get a plain bound on the leading key so DuckDB can skip row groups
+        using min/max statistics.
+
+        Returns:
+            Tuple of (sql_fragment, parameters)
+        """
+        if not self._order_by_clauses:
+            raise ValueError("after() requires ORDER BY columns")
+
+        if isinstance(self._seek_values, dict):
+            missing = [
+                key for key in self._order_by_keys() if key not in self._seek_values
+            ]
+            if missing:
+                raise ValueError(f"after() is missing values for: {missing}")
+            values = [self._seek_values[key] for key in self._order_by_keys()]
+        else:
+            values = self._seek_values
+
+        if len(values) != len(self._order_by_clauses):
+            raise ValueError(
+                f"after() expects {len(self._order_by_clauses)} values, got {len(values)}"
+            )
+
+        clauses = self._order_by_clauses
+        operators = [">" if clause.direction == "ASC" else "<" for clause in clauses]
+
+        if any(clause.nullable for clause in clauses):
+            return self._build_nullable_seek_predicate(values, operators)
+
+        if len(clauses) == 1:
+            return f"{clauses[0].column} {operators[0]} ?", [values[0]]
+
+        leading = f"{clauses[0].column} {operators[0]}= ?"
+        if len(set(operators)) == 1:
+            columns = ", ".join(clause.column for clause in clauses)
+            placeholders = ", ".join("?" for _ in clauses)
+            seek = f"({columns}) {operators[0]} ({placeholders})"
+            return f"{leading} AND {seek}", [values[0], *values]
+
+        branches = []
+        params = [values[0]]
+        for i, clause in enumerate(clauses):
+            terms = [f"{clauses[j].column} = ?" for j in range(i)]
+            terms.append(f"{clause.column} {operators[i]} ?")
+            branches.append("(" + " AND ".join(terms) + ")")
+            params.extend(values[: i + 1])
+
+        return f"{leading} AND ({' OR '.join(branches)})", params
+
+    def _build_nullable_seek_predicate(
+        self, values: Sequence[Any], operators: list[str]
+    ) -> tuple[str, list[Any]]:
+        """Build the expanded keyset predicate when some keys may be NULL.
+
+        NULLs sort last, so a NULL value on a key can only be followed by
+        other NULLs (its branch is dropped), and a non-NULL value is followed
+        by larger values and by NULLs.
+
+        Args:
+            values: Values of the ORDER BY keys for the last row
+            operators: Comparison operator per key
+
+        Returns:
+            Tuple of (sql_fragment, parameters)
+        """
+        clauses = self._order_by_clauses
+        branches = []
+        params: list[Any] = []
+        for i, clause in enumerate(clauses):
+            if values[i] is None:
+                continue
+
+            terms = []
+            for j in range(i):
+                if values[j] is None:
+                    terms.append(f"{clauses[j].column} IS NULL")
+                else:
+                    terms.append(f"{clauses[j].column} = ?")
+                    params.append(values[j])
+
+            term = f"{clause.column} {operators[i]} ?"
+            if clause.nullable:
+                term = f"({term} OR {clause.column} IS NULL)"
+            terms.append(term)
+            params.append(values[i])
+            branches.append("(" + " AND ".join(terms) + ")")
+
+        if not branches:
+            return "FALSE", []
+
+        predicate = "(" + " OR ".join(branches) + ")"
+        leading = clauses[0]
+        if values[0] is None:
+            return f"{leading.column} IS NULL AND {predicate}", params
+        if not leading.nullable:
+            return f"{leading.column} {operators[0]}= ? AND {predicate}", [
+                values[0],
+                *params,
+            ]
+        return predicate, params
+
+    def _append_seek_predicate(
+        self, clause_parts: list[str], parameters: list[Any]
+    ) -> list[str]:
+        """AND the keyset predicate onto WHERE or HAVING parts."""
+        seek_sql, seek_params = self._build_seek_predicate()
+        if "OR" in clause_parts:
+            clause_parts = ["(" + " ".join(clause_parts) + ")"]
+        if clause_parts:
+            clause_parts.append("AND")
+        clause_parts.append(seek_sql)
+        parameters.extend(seek_params)
+        return clause_parts
+
     def build_sql(self) -> tuple[str, list[Any]]:
         """Build SQL query with parameters.
 
@@ -693,8 +962,8 @@ class DuckDBQueryBuilder:
             parts.append(f"{join.join_type} JOIN {join.table} ON {join.on_condition}")
 
         # WHERE
+        where_parts = []
         if self._where_conditions:
-            where_parts = []
             for i, condition in enumerate(self._where_conditions):
                 if i > 0:
                     where_parts.append(condition.logical_operator)
@@ -703,6 +972,11 @@ class DuckDBQueryBuilder:
                 where_parts.append(sql_fragment)
                 parameters.extend(condition_params)
 
+        # Keyset seek predicate (after); grouped queries seek over the groups
+        if self._seek_values is not None and not self._group_by_columns:
+            where_parts = self._append_seek_predicate(where_parts, parameters)
+
+        if where_parts:
             parts.append("WHERE " + " ".join(where_parts))
 
         # GROUP BY
@@ -710,16 +984,19 @@ class DuckDBQueryBuilder:
             parts.append("GROUP BY " + ", ".join(self._group_by_columns))
 
         # HAVING
-        if self._having_conditions:
-            having_parts = []
-            for i, condition in enumerate(self._having_conditions):
-                if i > 0:
-                    having_parts.append(condition.logical_operator)
+        having_parts = []
+        for i, condition in enumerate(self._having_conditions):
+            if i > 0:
+                having_parts.append(condition.logical_operator)
 
-                sql_fragment, condition_params = condition.to_sql()
-                having_parts.append(sql_fragment)
-                parameters.extend(condition_params)
+            sql_fragment, condition_params = condition.to_sql()
+            having_parts.append(sql_fragment)
+            parameters.extend(condition_params)
+
+        if self._seek_values is not None and self._group_by_columns:
+            having_parts = self._append_seek_predicate(having_parts, parameters)
 
+        if having_parts:
             parts.append("HAVING " + " ".join(having_parts))
 
         # ORDER BY
@@ -820,12 +1097,111 @@ class DuckDBQueryBuilder:
             # Reset state for next query
             self._reset_query_state()
 
+    def execute_arrow(self) -> pa.Table:
+        """Execute the query and return results as a columnar Arrow table.
+
+        Skips the pandas conversion (and the DataFrame query cache) for
+        callers that serialize whole columns.
+
+        Returns:
+            Query results as pyarrow Table
+        """
+        start_time = time.time()
+
+        try:
+            sql, params = self.build_sql()
+            logger.debug(f"Executing query: {sql[:200]}...")
+            result = self.manager.execute_arrow(sql, params or None)
+
+            execution_time = time.time() - start_time
+            logger.info(
+                f"Query executed successfully in {execution_time:.3f}s, returned {result.num_rows} rows"
+            )
+            return result
+
+        except Exception as e:
+            execution_time = time.time() - start_time
+            logger.error(f"Query execution failed after {execution_time:.3f}s: {e}")
+            raise
+        finally:
+            # Reset state for next query
+            self._reset_query_state()
+
+    async def execute_async(
+        self,
+        use_cache: bool = True,
+        disconnect_check: Optional[DisconnectCheck] = None,
+        timeout: Optional[float] = None,
+    ) -> pd.DataFrame:
+        """Execute the query on the shared query executor without blocking.
+
+        Args:
+            use_cache: Whether to use query caching
+            disconnect_check: Optional coroutine function reporting client
+                disconnects (e.g. ``request.is_disconnected``)
+            timeout: Optional time budget in seconds
+
+        Returns:
+            Query results as DataFrame
+        """
+        return await get_query_executor().run(
+            self.execute,
+            use_cache,
+            disconnect_check=disconnect_check,
+            query_timeout=timeout,
+        )
+
+    def execute_page(
+        self, page_size: int, use_cache: bool = True
+    ) -> tuple[pd.DataFrame, Optional[str]]:
+        """Execute a keyset-paginated query.
+
+        Fetches one row more than requested to detect whether another page
+        exists. The ORDER BY columns must be part of the result set (matched
+        without their table alias).
+
+        Args:
+            page_size: Number of rows per page
+            use_cache: Whether to use query caching
+
+        Returns:
+            Tuple of (page rows, continuation token or None on the last page)
+        """
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError("Page size must be a positive integer")
+        if not self._order_by_clauses:
+            raise ValueError("execute_page() requires ORDER BY columns")
+
+        # execute() resets the builder, so capture the sort keys first
+        order_keys = self._order_by_keys()
+        result = self.limit(page_size + 1).execute(use_cache=use_cache)
+
+        if len(result) <= page_size:
+            return result, None
+
+        page = result.iloc[:page_size]
+        last_row = page.iloc[-1]
+        values = []
+        for key in order_keys:
+            column = key.split(".")[-1]
+            if column not in page.columns:
+                raise ValueError(f"ORDER BY column {key} must be selected for paging")
+            value = last_row[column]
+            # pandas reports NULLs of nullable keys as NA/NaN
+            values.append(None if pd.isna(value) else value)
+
+        return page, encode_cursor(values, order_keys)
+
     def count(self) -> int:
         """Execute query and return row count.
 
         Returns:
-            Number of rows that would be returned by the query
+            Number of rows that would be returned by the query (the number of
+            groups for grouped queries)
         """
+        if self._group_by_columns or self._having_conditions:
+            return self._count_groups()
+
         # Modify query to return count
         original_select = self._select_columns[:]
         original_order = self._order_by_clauses[:]
@@ -849,6 +1225,20 @@ class DuckDBQueryBuilder:
             self._limit_count = original_limit
             self._offset_count = original_offset
 
+    def _count_groups(self) -> int:
+        """Count the rows of a grouped query by wrapping it in a subquery."""
+        try:
+            self._order_by_clauses = []
+            self._limit_count = None
+            self._offset_count = None
+            sql, params = self.build_sql()
+            result = self.manager.execute_query(
+                f"SELECT COUNT(*) AS row_count FROM ({sql}) AS grouped", params or None
+            )
+            return int(result.iloc[0]["row_count"])
+        finally:
+            self._reset_query_state()
+
     def first(self) -> Optional[pd.Series]:
         """Execute query and return first row.
 
@@ -5,14 +5,26 @@ This module provides:
 - Index management and recommendations
 - Query performance monitoring
 - Caching strategies for frequent queries
+
+Analytics queries are fixed, parameterized templates: user-supplied values
+(dataset IDs, territory lists, years) are bound as parameters, never
+interpolated, so every call of a query type shares one SQL text and plan.
+Cache keys are content hashes that are stable across processes.
+
+Executions are reported to the AdaptiveOptimizer, which may route a query
+type to a materialized table once its shape is hot and slow.
 """
 
+import hashlib
+import json
 import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Optional
 
+import duckdb
 import pandas as pd
 
 try:
@@ -20,11 +32,187 @@ try:
 except ImportError:
     from src.utils.logger import get_logger
 
-from .config import get_schema_config
+from .adaptive_optimizer import (
+    AdaptiveOptimizer,
+    fingerprint_query,
+    get_adaptive_optimizer,
+    summarize_plan,
+)
+from .config import ADAPTIVE_OPTIMIZER_CONFIG, get_schema_config
+from .executor import get_query_timeout
 from .manager import DuckDBManager
 
 logger = get_logger(__name__)
 
+TIME_SERIES_TEMPLATE = """
+SELECT
+    ts.dataset_id,
+    ts.year,
+    ts.time_period,
+    ts.territory_code,
+    ts.territory_name,
+    ts.measure_code,
+    ts.measure_name,
+    ts.obs_value,
+    ts.obs_status,
+    ts.category,
+    ts.unit_of_measure
+FROM {source} ts
+WHERE ts.dataset_id IN (SELECT unnest($1::VARCHAR[]))
+  AND ts.year BETWEEN $2 AND $3
+  AND ($4::VARCHAR[] IS NULL OR ts.territory_code IN (SELECT unnest($4::VARCHAR[])))
+ORDER BY ts.dataset_id, ts.year, ts.territory_code;
+"""
+
+TERRITORY_STATS_BASE = """
+    SELECT
+        d.territory_code,
+        d.territory_name,
+        d.measure_code,
+        d.measure_name,
+        AVG(o.obs_value) as avg_value,
+        MIN(o.obs_value) as min_value,
+        MAX(o.obs_value) as max_value,
+        COUNT(o.obs_value) as obs_count,
+        STDDEV(o.obs_value) as std_dev
+    FROM {schema}.istat_datasets d
+    JOIN {schema}.istat_observations o ON d.id = o.dataset_row_id
+    WHERE d.year = $1
+      AND d.measure_code IN (SELECT unnest($2::VARCHAR[]))
+      AND ($3::VARCHAR[] IS NULL OR d.territory_code IN (SELECT unnest($3::VARCHAR[])))
+      AND o.obs_value IS NOT NULL
+    GROUP BY d.territory_code, d.territory_name, d.measure_code, d.measure_name
+"""
+
+TERRITORY_STATS_MATERIALIZED = """
+    SELECT
+        territory_code, territory_name, measure_code, measure_name,
+        avg_value, min_value, max_value, obs_count, std_dev
+    FROM {table}
+    WHERE year = $1
+      AND measure_code IN (SELECT unnest($2::VARCHAR[]))
+      AND ($3::VARCHAR[] IS NULL OR territory_code IN (SELECT unnest($3::VARCHAR[])))
+"""
+
+TERRITORY_COMPARISON_TEMPLATE = """
+WITH territory_stats AS ({territory_stats})
+SELECT
+    *,
+    RANK() OVER (PARTITION BY measure_code ORDER BY avg_value DESC) as value_rank,
+    NTILE(4) OVER (PARTITION BY measure_code ORDER BY avg_value) as quartile
+FROM territory_stats
+ORDER BY measure_code, value_rank;
+"""
+
+YEARLY_AGGREGATES_BASE = """
+    SELECT
+        m.category,
+        d.year,
+        COUNT(DISTINCT d.dataset_id) as dataset_count,
+        COUNT(o.obs_value) as total_observations,
+        AVG(o.obs_value) as avg_value,
+        MEDIAN(o.obs_value) as median_value,
+        STDDEV(o.obs_value) as std_dev
+    FROM {schema}.dataset_metadata m
+    JOIN {schema}.istat_datasets d ON m.dataset_id = d.dataset_id
+    JOIN {schema}.istat_observations o ON d.id = o.dataset_row_id
+    WHERE m.category IN (SELECT unnest($1::VARCHAR[]))
+      AND d.year BETWEEN $2 AND $3
+      AND o.obs_value IS NOT NULL
+    GROUP BY m.category, d.year
+"""
+
+YEARLY_AGGREGATES_MATERIALIZED = """
+    SELECT
+        category, year, dataset_count, total_observations,
+        avg_value, median_value, std_dev
+    FROM {table}
+    WHERE category IN (SELECT unnest($1::VARCHAR[]))
+      AND year BETWEEN $2 AND $3
+"""
+
+CATEGORY_TRENDS_TEMPLATE = """
+WITH yearly_aggregates AS ({yearly_aggregates}),
+trend_calculations AS (
+    SELECT
+        *,
+        LAG(avg_value) OVER (PARTITION BY category ORDER BY year) as prev_avg_value,
+        LEAD(avg_value) OVER (PARTITION BY category ORDER BY year) as next_avg_value
+    FROM yearly_aggregates
+)
+SELECT
+    *,
+    CASE
+        WHEN prev_avg_value IS NULL THEN NULL
+        ELSE ((avg_value - prev_avg_value) / prev_avg_value) * 100
+    END as year_over_year_change,
+    CASE
+        WHEN ROW_NUMBER() OVER (PARTITION BY category ORDER BY year) >= 3 THEN
+            AVG(avg_value) OVER (
+                PARTITION BY category
+                ORDER BY year
+                ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+            )
+    END as moving_avg_3yr
+FROM trend_calculations
+ORDER BY category, year;
+"""
+
+TOP_PERFORMERS_TEMPLATE = """
+SELECT
+    d.territory_code,
+    d.territory_name,
+    d.measure_code,
+    d.measure_name,
+    AVG(o.obs_value) as avg_value,
+    COUNT(o.obs_value) as obs_count,
+    m.unit_of_measure,
+    RANK() OVER (ORDER BY AVG(o.obs_value) DESC) as rank
+FROM {schema}.dataset_metadata m
+JOIN {schema}.istat_datasets d ON m.dataset_id = d.dataset_id
+JOIN {schema}.istat_observations o ON d.id = o.dataset_row_id
+WHERE m.category = $1
+  AND d.measure_code = $2
+  AND d.year = $3
+  AND o.obs_value IS NOT NULL
+GROUP BY d.territory_code, d.territory_name, d.measure_code,
+         d.measure_name, m.unit_of_measure
+ORDER BY avg_value DESC
+LIMIT $4;
+"""
+
+
+def _normalize_values(values: Optional[list[str]]) -> Optional[list[str]]:
+    """Deduplicate and sort a list filter so equivalent requests match.
+
+    Args:
+        values: Filter values, or None/empty for no filter
+
+    Returns:
+        Sorted list of unique string values, or None
+    """
+    if not values:
+        return None
+    return sorted({str(value) for value in values})
+
+
+def make_cache_key(query_type: "QueryType", **params: Any) -> str:
+    """Build a stable content-hash cache key for a parameterized query.
+
+    Unlike the built-in hash(), the key is identical across processes and
+    restarts, so it can address a shared or persistent result cache.
+
+    Args:
+        query_type: Query template type
+        **params: Bound parameters of the query
+
+    Returns:
+        Cache key of the form ``<query_type>:<blake2b hex digest>``
+    """
+    payload = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    return f"{query_type.value}:{digest}"
+
 
 class QueryType(Enum):
     """Types of analytical queries for optimization."""
@@ -57,17 +245,31 @@ class QueryPerformance:
 class QueryOptimizer:
     """Advanced query optimizer for ISTAT analytics."""
 
-    def __init__(self, manager: Optional[DuckDBManager] = None):
+    def __init__(
+        self,
+        manager: Optional[DuckDBManager] = None,
+        adaptive: Optional[AdaptiveOptimizer] = None,
+    ):
         """Initialize query optimizer.
 
         Args:
             manager: Optional DuckDB manager instance
+            adaptive: Optional adaptive optimizer; by default one bound to the
+                same manager when ADAPTIVE_OPTIMIZER_CONFIG is enabled
         """
         self.manager = manager or DuckDBManager()
         self.schema_config = get_schema_config()
         self.query_cache: dict[str, Any] = {}  # Simple in-memory cache
-        self.performance_log: list[QueryPerformance] = []
+        self.performance_log: deque[QueryPerformance] = deque(maxlen=1000)
+        if adaptive is None and ADAPTIVE_OPTIMIZER_CONFIG["enabled"]:
+            adaptive = (
+                get_adaptive_optimizer()
+                if manager is None
+                else AdaptiveOptimizer(self.manager)
+            )
+        self.adaptive = adaptive
         self.cache_ttl = timedelta(minutes=30)
+        self.query_timeout = get_query_timeout("analytics")
 
     def create_advanced_indexes(self) -> None:
         """Create advanced indexes for optimal query performance."""
@@ -120,48 +322,32 @@ class QueryOptimizer:
         Returns:
             DataFrame with time series data
         """
-        # Generate cache key
-        cache_key = f"timeseries_{hash(tuple(dataset_ids))}_{start_year}_{end_year}_{hash(tuple(territories or []))}"
+        dataset_ids = _normalize_values(dataset_ids) or []
+        territories = _normalize_values(territories)
+        params = [dataset_ids, int(start_year), int(end_year), territories]
+
+        cache_key = make_cache_key(
+            QueryType.TIME_SERIES,
+            dataset_ids=dataset_ids,
+            start_year=params[1],
+            end_year=params[2],
+            territories=territories,
+        )
 
         # Check cache
         cached_result = self._get_cached_result(cache_key, QueryType.TIME_SERIES)
         if cached_result is not None:
             return cached_result
 
-        # Build optimized query
-        self.schema_config["main_schema"]
-        analytics_schema = self.schema_config["analytics_schema"]
-
-        territory_filter = ""
-        if territories:
-            territory_list = "', '".join(territories)
-            territory_filter = f"AND d.territory_code IN ('{territory_list}')"
-
-        dataset_list = "', '".join(dataset_ids)
-
-        query = f"""
-        SELECT
-            ts.dataset_id,
-            ts.year,
-            ts.time_period,
-            ts.territory_code,
-            ts.territory_name,
-            ts.measure_code,
-            ts.measure_name,
-            ts.obs_value,
-            ts.obs_status,
-            ts.category,
-            ts.unit_of_measure
-        FROM {analytics_schema}.time_series ts
-        WHERE ts.dataset_id IN ('{dataset_list}')
-          AND ts.year BETWEEN {start_year} AND {end_year}
-          {territory_filter}
-        ORDER BY ts.dataset_id, ts.year, ts.territory_code;
-        """
+        base_query = TIME_SERIES_TEMPLATE.format(
+            source=f"{self.schema_config['analytics_schema']}.time_series"
+        )
+        table = self._materialized_table(QueryType.TIME_SERIES)
+        query = TIME_SERIES_TEMPLATE.format(source=table) if table else base_query
 
-        start_time = time.time()
-        result = self.manager.execute_query(query)
-        execution_time = time.time() - start_time
+        result, execution_time = self._execute_template(
+            QueryType.TIME_SERIES, query, params, fallback=base_query if table else None
+        )
 
         # Cache result
         self._cache_result(cache_key, result, QueryType.TIME_SERIES, execution_time)
@@ -187,7 +373,16 @@ class QueryOptimizer:
         Returns:
             DataFrame with territory comparison data
         """
-        cache_key = f"territory_comp_{hash(tuple(measure_codes))}_{year}_{hash(tuple(territories or []))}"
+        measure_codes = _normalize_values(measure_codes) or []
+        territories = _normalize_values(territories)
+        params = [int(year), measure_codes, territories]
+
+        cache_key = make_cache_key(
+            QueryType.TERRITORY_COMPARISON,
+            measure_codes=measure_codes,
+            year=params[0],
+            territories=territories,
+        )
 
         cached_result = self._get_cached_result(
             cache_key, QueryType.TERRITORY_COMPARISON
@@ -195,46 +390,24 @@ class QueryOptimizer:
         if cached_result is not None:
             return cached_result
 
-        schema = self.schema_config["main_schema"]
-
-        territory_filter = ""
-        if territories:
-            territory_list = "', '".join(territories)
-            territory_filter = f"AND d.territory_code IN ('{territory_list}')"
-
-        measure_list = "', '".join(measure_codes)
-
-        query = f"""
-        WITH territory_stats AS (
-            SELECT
-                d.territory_code,
-                d.territory_name,
-                d.measure_code,
-                d.measure_name,
-                AVG(o.obs_value) as avg_value,
-                MIN(o.obs_value) as min_value,
-                MAX(o.obs_value) as max_value,
-                COUNT(o.obs_value) as obs_count,
-                STDDEV(o.obs_value) as std_dev
-            FROM {schema}.istat_datasets d
-            JOIN {schema}.istat_observations o ON d.id = o.dataset_row_id
-            WHERE d.year = {year}
-              AND d.measure_code IN ('{measure_list}')
-              {territory_filter}
-              AND o.obs_value IS NOT NULL
-            GROUP BY d.territory_code, d.territory_name, d.measure_code, d.measure_name
+        base_query = TERRITORY_COMPARISON_TEMPLATE.format(
+            territory_stats=TERRITORY_STATS_BASE.format(
+                schema=self.schema_config["main_schema"]
+            )
         )
-        SELECT
-            *,
-            RANK() OVER (PARTITION BY measure_code ORDER BY avg_value DESC) as value_rank,
-            NTILE(4) OVER (PARTITION BY measure_code ORDER BY avg_value) as quartile
-        FROM territory_stats
-        ORDER BY measure_code, value_rank;
-        """
+        table = self._materialized_table(QueryType.TERRITORY_COMPARISON)
+        query = base_query
+        if table:
+            query = TERRITORY_COMPARISON_TEMPLATE.format(
+                territory_stats=TERRITORY_STATS_MATERIALIZED.format(table=table)
+            )
 
-        start_time = time.time()
-        result = self.manager.execute_query(query)
-        execution_time = time.time() - start_time
+        result, execution_time = self._execute_template(
+            QueryType.TERRITORY_COMPARISON,
+            query,
+            params,
+            fallback=base_query if table else None,
+        )
 
         self._cache_result(
             cache_key, result, QueryType.TERRITORY_COMPARISON, execution_time
@@ -256,61 +429,38 @@ class QueryOptimizer:
         Returns:
             DataFrame with trend analysis data
         """
-        cache_key = f"category_trends_{hash(tuple(categories))}_{start_year}_{end_year}"
+        categories = _normalize_values(categories) or []
+        params = [categories, int(start_year), int(end_year)]
+
+        cache_key = make_cache_key(
+            QueryType.TREND_ANALYSIS,
+            categories=categories,
+            start_year=params[1],
+            end_year=params[2],
+        )
 
         cached_result = self._get_cached_result(cache_key, QueryType.TREND_ANALYSIS)
         if cached_result is not None:
             return cached_result
 
-        schema = self.schema_config["main_schema"]
-        category_list = "', '".join(categories)
-
-        query = f"""
-        WITH yearly_aggregates AS (
-            SELECT
-                m.category,
-                d.year,
-                COUNT(DISTINCT d.dataset_id) as dataset_count,
-                COUNT(o.obs_value) as total_observations,
-                AVG(o.obs_value) as avg_value,
-                MEDIAN(o.obs_value) as median_value,
-                STDDEV(o.obs_value) as std_dev
-            FROM {schema}.dataset_metadata m
-            JOIN {schema}.istat_datasets d ON m.dataset_id = d.dataset_id
-            JOIN {schema}.istat_observations o ON d.id = o.dataset_row_id
-            WHERE m.category IN ('{category_list}')
-              AND d.year BETWEEN {start_year} AND {end_year}
-              AND o.obs_value IS NOT NULL
-            GROUP BY m.category, d.year
-        ),
-        trend_calculations AS (
-            SELECT
-                *,
-                LAG(avg_value) OVER (PARTITION BY category ORDER BY year) as prev_avg_value,
-                LEAD(avg_value) OVER (PARTITION BY category ORDER BY year) as next_avg_value
-            FROM yearly_aggregates
+        base_query = CATEGORY_TRENDS_TEMPLATE.format(
+            yearly_aggregates=YEARLY_AGGREGATES_BASE.format(
+                schema=self.schema_config["main_schema"]
+            )
         )
-        SELECT
-            *,
-            CASE
-                WHEN prev_avg_value IS NULL THEN NULL
-                ELSE ((avg_value - prev_avg_value) / prev_avg_value) * 100
-            END as year_over_year_change,
-            CASE
-                WHEN ROW_NUMBER() OVER (PARTITION BY category ORDER BY year) >= 3 THEN
-                    AVG(avg_value) OVER (
-                        PARTITION BY category
-                        ORDER BY year
-                        ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-                    )
-            END as moving_avg_3yr
-        FROM trend_calculations
-        ORDER BY category, year;
-        """
+        table = self._materialized_table(QueryType.TREND_ANALYSIS)
+        query = base_query
+        if table:
+            query = CATEGORY_TRENDS_TEMPLATE.format(
+                yearly_aggregates=YEARLY_AGGREGATES_MATERIALIZED.format(table=table)
+            )
 
-        start_time = time.time()
-        result = self.manager.execute_query(query)
-        execution_time = time.time() - start_time
+        result, execution_time = self._execute_template(
+            QueryType.TREND_ANALYSIS,
+            query,
+            params,
+            fallback=base_query if table else None,
+        )
 
         self._cache_result(cache_key, result, QueryType.TREND_ANALYSIS, execution_time)
 
@@ -331,73 +481,64 @@ class QueryOptimizer:
         Returns:
             DataFrame with top performers
         """
-        cache_key = f"top_performers_{category}_{measure_code}_{year}_{limit}"
+        params = [str(category), str(measure_code), int(year), int(limit)]
+
+        cache_key = make_cache_key(
+            QueryType.RANKING,
+            category=params[0],
+            measure_code=params[1],
+            year=params[2],
+            limit=params[3],
+        )
 
         cached_result = self._get_cached_result(cache_key, QueryType.RANKING)
         if cached_result is not None:
             return cached_result
 
-        schema = self.schema_config["main_schema"]
+        query = TOP_PERFORMERS_TEMPLATE.format(schema=self.schema_config["main_schema"])
 
-        query = f"""
-        SELECT
-            d.territory_code,
-            d.territory_name,
-            d.measure_code,
-            d.measure_name,
-            AVG(o.obs_value) as avg_value,
-            COUNT(o.obs_value) as obs_count,
-            m.unit_of_measure,
-            RANK() OVER (ORDER BY AVG(o.obs_value) DESC) as rank
-        FROM {schema}.dataset_metadata m
-        JOIN {schema}.istat_datasets d ON m.dataset_id = d.dataset_id
-        JOIN {schema}.istat_observations o ON d.id = o.dataset_row_id
-        WHERE m.category = '{category}'
-          AND d.measure_code = '{measure_code}'
-          AND d.year = {year}
-          AND o.obs_value IS NOT NULL
-        GROUP BY d.territory_code, d.territory_name, d.measure_code,
-                 d.measure_name, m.unit_of_measure
-        ORDER BY avg_value DESC
-        LIMIT {limit};
-        """
-
-        start_time = time.time()
-        result = self.manager.execute_query(query)
-        execution_time = time.time() - start_time
+        result, execution_time = self._execute_template(
+            QueryType.RANKING, query, params
+        )
 
         self._cache_result(cache_key, result, QueryType.RANKING, execution_time)
 
         logger.info(f"Top performers query executed in {execution_time:.3f}s")
         return result
 
-    def analyze_query_performance(self, query: str) -> dict[str, Any]:
+    def analyze_query_performance(
+        self, query: str, parameters: Optional[list[Any]] = None
+    ) -> dict[str, Any]:
         """Analyze query performance and provide optimization suggestions.
 
         Args:
             query: SQL query to analyze
+            parameters: Optional bound parameters for the query
 
         Returns:
             Dictionary with performance analysis
         """
         try:
-            # Get query execution plan
-            explain_query = f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}"
-            plan_result = self.manager.execute_query(explain_query)
+            explain_query = (
+                f"EXPLAIN (ANALYZE, FORMAT JSON) {query.strip().rstrip(';')}"
+            )
+            plan_result = self.manager.execute_query(
+                explain_query, parameters, timeout=self.query_timeout
+            )
 
-            # Extract performance metrics
             if not plan_result.empty:
-                plan_data = plan_result.iloc[0, 0]  # First column of first row
+                plan_data = json.loads(plan_result.iloc[0, -1])
+                fingerprint, _ = fingerprint_query(query)
 
-                analysis = {
+                return {
+                    "fingerprint": fingerprint,
                     "execution_plan": plan_data,
+                    "profile": summarize_plan(plan_data),
                     "suggestions": self._get_optimization_suggestions(query, plan_data),
                     "estimated_cost": self._extract_cost_from_plan(plan_data),
                     "analysis_timestamp": datetime.now().isoformat(),
                 }
 
-                return analysis
-
         except Exception as e:
             logger.warning(f"Query performance analysis failed: {e}")
 
@@ -467,6 +608,69 @@ class QueryOptimizer:
             "cache_ttl_minutes": self.cache_ttl.total_seconds() / 60,
         }
 
+    def _materialized_table(self, query_type: QueryType) -> Optional[str]:
+        """Get the materialization currently serving a query type, if any.
+
+        Args:
+            query_type: Type of query
+
+        Returns:
+            Qualified table name or None
+        """
+        if self.adaptive is None:
+            return None
+        return self.adaptive.active_table(query_type.value)
+
+    def _execute_template(
+        self,
+        query_type: QueryType,
+        query: str,
+        params: list[Any],
+        fallback: Optional[str] = None,
+    ) -> tuple[pd.DataFrame, float]:
+        """Execute an analytics template and report it to the adaptive optimizer.
+
+        Args:
+            query_type: Type of query
+            query: Formatted SQL template
+            params: Bound parameters
+            fallback: The template on the base tables, if query reads a
+                materialization; used when the materialized table is gone
+                (e.g. dropped by another process)
+
+        Returns:
+            Tuple of (result DataFrame, execution time in seconds)
+        """
+        start_time = time.time()
+        try:
+            result = self.manager.execute_query(
+                query, params, timeout=self.query_timeout
+            )
+        except duckdb.CatalogException as e:
+            if fallback is None:
+                raise
+            logger.warning(f"Materialization unavailable, using base tables: {e}")
+            query, fallback = fallback, None
+            result = self.manager.execute_query(
+                query, params, timeout=self.query_timeout
+            )
+        execution_time = time.time() - start_time
+
+        if self.adaptive is not None:
+            try:
+                self.adaptive.record(
+                    query_type.value,
+                    query,
+                    execution_time,
+                    len(result),
+                    parameters=params,
+                    materialized=fallback is not None,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to record query profile: {e}")
+
+        return result, execution_time
+
     def _get_cached_result(
         self, cache_key: str, query_type: QueryType
     ) -> Optional[pd.DataFrame]:
@@ -531,16 +735,12 @@ class QueryOptimizer:
             )
         )
 
-        # Keep performance log size manageable
-        if len(self.performance_log) > 1000:
-            self.performance_log = self.performance_log[-500:]
-
     def _get_optimization_suggestions(self, query: str, plan_data: Any) -> list[str]:
         """Generate optimization suggestions based on query and execution plan.
 
         Args:
             query: Original SQL query
-            plan_data: Execution plan data
+            plan_data: Execution plan data (DuckDB JSON profile)
 
         Returns:
             List of optimization suggestions
@@ -562,21 +762,43 @@ class QueryOptimizer:
         if "order by" in query_lower and "limit" not in query_lower:
             suggestions.append("ORDER BY without LIMIT may be inefficient")
 
+        # Plan-based suggestions from the most expensive operator
+        if isinstance(plan_data, dict):
+            profile = summarize_plan(plan_data)
+            top = profile["top_operators"][0] if profile["top_operators"] else None
+            if top and profile["latency_ms"] > 0:
+                share = top["timing_ms"] / profile["latency_ms"]
+                operator = str(top["operator"]).upper()
+                if share >= 0.5 and "SCAN" in operator:
+                    suggestions.append(
+                        "Table scan dominates - a sort order on the filter "
+                        "columns would let zone maps skip row groups"
+                    )
+                elif share >= 0.5 and "JOIN" in operator:
+                    suggestions.append(
+                        "Join dominates - consider a pre-joined materialized aggregate"
+                    )
+                elif share >= 0.5 and "ORDER" in operator:
+                    suggestions.append(
+                        "Sort dominates - consider storing the data pre-sorted"
+                    )
+
         return suggestions
 
     def _extract_cost_from_plan(self, plan_data: Any) -> Optional[float]:
-        """Extract estimated cost from execution plan.
+        """Extract the measured cost from an execution plan.
+
+        DuckDB reports no cost estimate, so the CPU time of the profiled run
+        is used instead.
 
         Args:
             plan_data: Execution plan data
 
         Returns:
-            Estimated query cost or None
+            CPU time in milliseconds or None
         """
         try:
-            # This would need to be implemented based on DuckDB's plan format
-            # For now, return None
-            return None
+            return summarize_plan(plan_data)["cpu_time_ms"]
         except Exception:
             return None
 
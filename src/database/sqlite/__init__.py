@@ -12,6 +12,7 @@ Architecture:
 
 Key Components:
 - Specialized Managers: DatasetManager, ConfigurationManager, UserManager, AuditManager
+- AuditSink: Non-blocking, batched audit logging for request paths
 - MetadataManager: Legacy monolithic manager (deprecated)
 - Schema: Database schema definitions for metadata tables
 - Repository: Unified facade for both SQLite and DuckDB operations
@@ -20,6 +21,7 @@ Key Components:
 
 # Specialized managers
 from .audit_manager import AuditManager
+from .audit_sink import AuditSink, close_audit_sinks, get_audit_sink
 from .base_manager import BaseSQLiteManager
 from .config_manager import ConfigurationManager
 from .dataset_manager import DatasetManager
@@ -48,6 +50,9 @@ __all__ = [
     "ConfigurationManager",
     "UserManager",
     "AuditManager",
+    "AuditSink",
+    "get_audit_sink",
+    "close_audit_sinks",
     "SQLiteManagerFactory",
     "get_dataset_manager",
     "get_configuration_manager",
@@ -108,6 +108,66 @@ class AuditManager(BaseSQLiteManager):
             logger.error(f"Failed to create audit log entry: {e}")
             return False
 
+    def log_actions(self, events: list[tuple]) -> int:
+        """Log a batch of audit events in a single transaction.
+
+        Args:
+            events: Tuples of (user_id, action, resource_type, resource_id,
+                details, ip_address, user_agent, success, error_message,
+                execution_time_ms), as queued by AuditSink
+
+        Returns:
+            Number of events written; events without action or resource_type
+            are skipped
+        """
+        rows = [
+            (
+                user_id,
+                action,
+                resource_type,
+                resource_id,
+                json.dumps(details) if details else None,
+                ip_address,
+                user_agent,
+                success,
+                error_message,
+                execution_time_ms,
+            )
+            for (
+                user_id,
+                action,
+                resource_type,
+                resource_id,
+                details,
+                ip_address,
+                user_agent,
+                success,
+                error_message,
+                execution_time_ms,
+            ) in events
+            if action and resource_type
+        ]
+        if len(rows) < len(events):
+            logger.error(
+                f"Skipped {len(events) - len(rows)} audit events without "
+                "action or resource_type"
+            )
+        if not rows:
+            return 0
+
+        query = """
+            INSERT INTO audit_log (
+                user_id, action, resource_type, resource_id, details_json,
+                ip_address, user_agent, success, error_message,
+                execution_time_ms, timestamp
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """
+        with self.transaction() as conn:
+            conn.executemany(query, rows)
+
+        logger.debug(f"Audit batch written: {len(rows)} entries")
+        return len(rows)
+
     def get_audit_logs(
         self,
         user_id: Optional[str] = None,
@@ -0,0 +1,242 @@
+"""
+Audit Sink - Non-blocking, batched audit logging
+
+Request paths hand audit events to an AuditSink, which only appends them to
+a bounded in-memory queue. A background writer thread drains the queue and
+writes hundreds of rows per SQLite transaction through
+AuditManager.log_actions(). When the queue is full, events are dropped and
+counted instead of slowing down requests.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Optional
+
+try:
+    from utils.logger import get_logger
+except ImportError:
+    from src.utils.logger import get_logger
+
+from .audit_manager import AuditManager
+from .manager_factory import get_audit_manager
+
+logger = get_logger(__name__)
+
+AUDIT_SINK_CONFIG = {
+    # Events buffered in memory before new ones are dropped
+    "max_queue": int(os.getenv("AUDIT_SINK_MAX_QUEUE", "10000")),
+    # Maximum rows written per transaction
+    "batch_size": int(os.getenv("AUDIT_SINK_BATCH_SIZE", "500")),
+    # Seconds the writer waits for more events before writing a partial batch
+    "flush_interval": float(os.getenv("AUDIT_SINK_FLUSH_INTERVAL", "0.5")),
+    # Seconds submit() may wait for queue space; 0 drops immediately
+    "enqueue_timeout": float(os.getenv("AUDIT_SINK_ENQUEUE_TIMEOUT", "0")),
+}
+
+_STOP = object()
+
+
+class AuditSink:
+    """Bounded queue of audit events drained by a batching writer thread."""
+
+    def __init__(
+        self,
+        audit_manager: AuditManager,
+        config: Optional[dict[str, Any]] = None,
+    ):
+        """Initialize the sink and start its writer thread.
+
+        Args:
+            audit_manager: Manager used to write batches
+            config: Overrides for AUDIT_SINK_CONFIG
+        """
+        self.audit_manager = audit_manager
+        self.config = {**AUDIT_SINK_CONFIG, **(config or {})}
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.config["max_queue"])
+        self._stats_lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ("submitted", "written", "dropped", "failed", "batches"), 0
+        )
+        self._closed = False
+
+        self._writer = threading.Thread(
+            target=self._run, name="audit-sink-writer", daemon=True
+        )
+        self._writer.start()
+
+    def submit(
+        self,
+        action: str,
+        resource_type: str,
+        user_id: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        details: Optional[dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        success: bool = True,
+        error_message: Optional[str] = None,
+        execution_time_ms: Optional[int] = None,
+    ) -> bool:
+        """Queue an audit event (see AuditManager.log_action for the fields).
+
+        Returns:
+            False if the event was dropped because the queue is full or the
+            sink is closed
+        """
+        event = (
+            user_id,
+            action,
+            resource_type,
+            resource_id,
+            details,
+            ip_address,
+            user_agent,
+            success,
+            error_message,
+            execution_time_ms,
+        )
+        if not self._closed:
+            try:
+                timeout = self.config["enqueue_timeout"]
+                if timeout > 0:
+                    self._queue.put(event, timeout=timeout)
+                else:
+                    self._queue.put_nowait(event)
+                self._count("submitted")
+                return True
+            except queue.Full:
+                pass
+
+        dropped = self._count("dropped")
+        # Warn on the first drop and then periodically, not per event
+        if dropped == 1 or dropped % 1000 == 0:
+            logger.warning(f"Audit sink full or closed, {dropped} events dropped")
+        return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event has been written (or failed).
+
+        Returns:
+            True if the queue was drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline or not self._writer.is_alive():
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting events, write what is queued and stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        self.flush(timeout)
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._writer.join(timeout)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return event counters and the current queue depth."""
+        with self._stats_lock:
+            return {
+                **self._stats,
+                "queued": self._queue.qsize(),
+                "max_queue": self.config["max_queue"],
+            }
+
+    def _count(self, name: str, amount: int = 1) -> int:
+        with self._stats_lock:
+            self._stats[name] += amount
+            return self._stats[name]
+
+    def _run(self) -> None:
+        """Writer loop: wait for an event, then take what is queued as a batch."""
+        batch_size = self.config["batch_size"]
+        interval = self.config["flush_interval"]
+
+        while True:
+            try:
+                event = self._queue.get(timeout=interval)
+            except queue.Empty:
+                continue
+
+            batch: list[tuple] = []
+            taken = 0
+            stop = False
+            while True:
+                taken += 1
+                if event is _STOP:
+                    stop = True
+                    break
+                batch.append(event)
+                if len(batch) >= batch_size:
+                    break
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            try:
+                if batch:
+                    self._write(batch)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, batch: list[tuple]) -> None:
+        try:
+            written = self.audit_manager.log_actions(batch)
+            self._count("batches")
+            self._count("written", written)
+            if written < len(batch):
+                self._count("failed", len(batch) - written)
+        except Exception as e:
+            self._count("failed", len(batch))
+            logger.error(f"Failed to write audit batch of {len(batch)} events: {e}")
+
+
+# Sinks by database path
+_sinks: dict[str, AuditSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_audit_sink(audit_manager: Optional[AuditManager] = None) -> AuditSink:
+    """Get the audit sink for a manager's database (one per database path).
+
+    Args:
+        audit_manager: Manager to write through; defaults to get_audit_manager()
+
+    Returns:
+        AuditSink instance
+    """
+    manager = audit_manager or get_audit_manager()
+    with _sinks_lock:
+        sink = _sinks.get(manager.db_path)
+        if sink is None or sink._closed:
+            sink = AuditSink(manager)
+            _sinks[manager.db_path] = sink
+        return sink
+
+
+def close_audit_sinks(timeout: float = 5.0) -> None:
+    """Flush and close all audit sinks (used at shutdown and in tests)."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        try:
+            sink.close(timeout)
+        except Exception as e:
+            logger.warning(f"Error closing audit sink: {e}")
+
+
+atexit.register(close_audit_sinks)
@@ -63,7 +63,10 @@ class BaseSQLiteManager:
         """Context manager for database transactions with proper error handling."""
         conn = self._get_connection()
         try:
-            conn.execute("BEGIN")
+            # Take the write lock up front: a deferred transaction that has
+            # already read (e.g. FTS5 loading its structure inside a trigger)
+            # cannot wait for the lock and fails with "database is locked"
+            conn.execute("BEGIN IMMEDIATE")
             yield conn
             conn.commit()
             logger.debug("Transaction committed successfully")
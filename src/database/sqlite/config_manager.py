@@ -3,8 +3,14 @@ Configuration Manager - Specialized SQLite manager for system configuration
 
 Handles system configuration storage, retrieval, and management
 as part of the refactored SQLite metadata architecture.
+
+Reads are served from an in-process snapshot of system_config. Writes made
+through the manager update the snapshot directly; writes from other
+connections or processes are detected through ``PRAGMA data_version`` and
+trigger a reload on the next read.
 """
 
+import copy
 import json
 from typing import Any, Optional
 
@@ -28,6 +34,8 @@ class ConfigurationManager(BaseSQLiteManager):
             db_path: Path to SQLite database file. If None, uses default.
         """
         super().__init__(db_path)
+        # Parsed configuration values by key; None until first loaded
+        self._snapshot: Optional[dict[str, Any]] = None
         logger.info(f"Configuration manager initialized: {self.db_path}")
 
     def set_config(self, key: str, value: Any, config_type: str = "string") -> bool:
@@ -65,6 +73,7 @@ class ConfigurationManager(BaseSQLiteManager):
             """
 
             affected_rows = self.execute_update(query, (key, stored_value, config_type))
+            self._write_through(key, stored_value, config_type)
 
             if affected_rows > 0:
                 logger.debug(f"Configuration set: {key} = {value}")
@@ -78,7 +87,10 @@ class ConfigurationManager(BaseSQLiteManager):
             return False
 
     def get_config(self, key: str, default: Any = None) -> Any:
-        """Get a configuration value from the database.
+        """Get a configuration value.
+
+        Served from the in-process snapshot, which is reloaded when another
+        connection has changed the database since the last read.
 
         Args:
             key: Configuration key
@@ -88,64 +100,97 @@ class ConfigurationManager(BaseSQLiteManager):
             Configuration value or default
         """
         try:
-            query = """
-                SELECT config_value, config_type
-                FROM system_config
-                WHERE config_key = ?
-            """
+            snapshot = self._get_snapshot()
+        except Exception as e:
+            logger.error(f"Failed to get configuration {key}: {e}")
+            return default
 
-            results = self.execute_query(query, (key,))
+        if key not in snapshot:
+            logger.debug(f"Configuration not found, using default: {key} = {default}")
+            return default
 
-            if results:
-                row = results[0]
-                value = row["config_value"]
-                config_type = row["config_type"]
-
-                # Convert value based on type
-                if config_type == "json":
-                    try:
-                        parsed_value = json.loads(value)
-                        logger.debug(f"Configuration retrieved (json): {key}")
-                        return parsed_value
-                    except json.JSONDecodeError:
-                        logger.warning(
-                            f"Invalid JSON in config {key}, returning raw value"
-                        )
-                        return value
-                elif config_type == "boolean":
-                    parsed_value = value.lower() in ("true", "1", "yes", "on")
-                    logger.debug(
-                        f"Configuration retrieved (boolean): {key} = {parsed_value}"
-                    )
-                    return parsed_value
-                elif config_type == "number":
-                    try:
-                        # Try integer first, then float
-                        if "." in value:
-                            parsed_value = float(value)
-                        else:
-                            parsed_value = int(value)
-                        logger.debug(
-                            f"Configuration retrieved (number): {key} = {parsed_value}"
-                        )
-                        return parsed_value
-                    except ValueError:
-                        logger.warning(
-                            f"Invalid number in config {key}, returning raw value"
-                        )
-                        return value
-                else:
-                    logger.debug(f"Configuration retrieved (string): {key}")
-                    return value
-            else:
-                logger.debug(
-                    f"Configuration not found, using default: {key} = {default}"
+        value = snapshot[key]
+        # JSON values are shared by the snapshot; never hand out the original
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
+
+    def reload(self) -> int:
+        """Reload the configuration snapshot from the database.
+
+        Returns:
+            Number of configuration entries loaded
+        """
+        with self._lock:
+            conn = self._get_connection()
+            self._thread_local.data_version = self._data_version(conn)
+            rows = conn.execute(
+                "SELECT config_key, config_value, config_type FROM system_config"
+            ).fetchall()
+            self._snapshot = {
+                row["config_key"]: self._parse_value(
+                    row["config_key"], row["config_value"], row["config_type"]
                 )
-                return default
+                for row in rows
+            }
+            logger.debug(f"Configuration snapshot loaded: {len(rows)} entries")
+            return len(rows)
+
+    def _get_snapshot(self) -> dict[str, Any]:
+        """Return the snapshot, reloading it if the database changed."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            # data_version is per connection and only moves when *another*
+            # connection commits, so each thread tracks its own last value
+            version = self._data_version(self._get_connection())
+            if version == getattr(self._thread_local, "data_version", None):
+                return snapshot
+        self.reload()
+        return self._snapshot
+
+    @staticmethod
+    def _data_version(conn) -> int:
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _write_through(
+        self, key: str, stored_value: Optional[str] = None, config_type: str = ""
+    ) -> None:
+        """Apply a write made by this manager to the snapshot.
 
-        except Exception as e:
-            logger.error(f"Failed to get configuration {key}: {e}")
-            return default
+        Args:
+            key: Configuration key
+            stored_value: Value as stored in the database, None if deleted
+            config_type: Value type of stored_value
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return
+            snapshot = dict(self._snapshot)
+            if stored_value is None:
+                snapshot.pop(key, None)
+            else:
+                snapshot[key] = self._parse_value(key, stored_value, config_type)
+            self._snapshot = snapshot
+
+    @staticmethod
+    def _parse_value(key: str, value: str, config_type: str) -> Any:
+        """Convert a stored configuration value to its declared type."""
+        if config_type == "json":
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                logger.warning(f"Invalid JSON in config {key}, returning raw value")
+                return value
+        elif config_type == "boolean":
+            return value.lower() in ("true", "1", "yes", "on")
+        elif config_type == "number":
+            try:
+                # Try integer first, then float
+                return float(value) if "." in value else int(value)
+            except ValueError:
+                logger.warning(f"Invalid number in config {key}, returning raw value")
+                return value
+        return value
 
     def delete_config(self, key: str) -> bool:
         """Delete a configuration value from the database.
@@ -159,6 +204,7 @@ class ConfigurationManager(BaseSQLiteManager):
         try:
             query = "DELETE FROM system_config WHERE config_key = ?"
             affected_rows = self.execute_update(query, (key,))
+            self._write_through(key)
 
             if affected_rows > 0:
                 logger.info(f"Configuration deleted: {key}")
@@ -197,27 +243,12 @@ class ConfigurationManager(BaseSQLiteManager):
                 """
                 results = self.execute_query(query)
 
-            configs = {}
-            for row in results:
-                key = row["config_key"]
-                value = row["config_value"]
-                config_type = row["config_type"]
-
-                # Convert value based on type (same logic as get_config)
-                if config_type == "json":
-                    try:
-                        configs[key] = json.loads(value)
-                    except json.JSONDecodeError:
-                        configs[key] = value
-                elif config_type == "boolean":
-                    configs[key] = value.lower() in ("true", "1", "yes", "on")
-                elif config_type == "number":
-                    try:
-                        configs[key] = float(value) if "." in value else int(value)
-                    except ValueError:
-                        configs[key] = value
-                else:
-                    configs[key] = value
+            configs = {
+                row["config_key"]: self._parse_value(
+                    row["config_key"], row["config_value"], row["config_type"]
+                )
+                for row in results
+            }
 
             logger.debug(f"Listed {len(configs)} configurations")
             return configs
@@ -298,6 +329,7 @@ class ConfigurationManager(BaseSQLiteManager):
             affected_rows = self.execute_update(
                 query, (key, stored_value, config_type, description, is_sensitive)
             )
+            self._write_through(key, stored_value, config_type)
 
             if affected_rows > 0:
                 logger.info(f"Configuration with metadata set: {key}")
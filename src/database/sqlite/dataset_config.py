@@ -18,8 +18,10 @@ from typing import Any, Optional
 from database.sqlite.schema import MetadataSchema
 
 try:
+    from utils.cache import BoundedCache
     from utils.logger import get_logger
 except ImportError:
+    from src.utils.cache import BoundedCache
     from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -36,9 +38,10 @@ class DatasetConfigManager:
             repository: UnifiedDataRepository instance for database operations.
         """
         self.schema = MetadataSchema(db_path)
-        self._config_cache = {}
-        self._cache_timestamp = None
         self._cache_ttl = 300  # 5 minutes cache TTL
+        self._config_cache = BoundedCache(
+            "dataset_config", max_entries=1, default_ttl=self._cache_ttl
+        )
 
         # Issue #84: Use UnifiedDataRepository instead of direct connections
         if repository:
@@ -53,18 +56,6 @@ class DatasetConfigManager:
             logger.warning("SQLite schema not found, creating...")
             self.schema.create_schema()
 
-    def _is_cache_valid(self) -> bool:
-        """Check if configuration cache is still valid.
-
-        Returns:
-            True if cache is valid, False otherwise.
-        """
-        if not self._cache_timestamp:
-            return False
-
-        cache_age = (datetime.now() - self._cache_timestamp).total_seconds()
-        return cache_age < self._cache_ttl
-
     def _load_datasets_from_sqlite(self) -> list[dict[str, Any]]:
         """Load all active datasets from SQLite database.
 
@@ -125,9 +116,11 @@ class DatasetConfigManager:
             Dictionary with datasets configuration in converter-compatible format.
         """
         # Use cache if valid and not forcing refresh
-        if not force_refresh and self._is_cache_valid() and self._config_cache:
-            logger.debug("Using cached dataset configuration")
-            return self._config_cache
+        if not force_refresh:
+            cached = self._config_cache.get("datasets")
+            if cached:
+                logger.debug("Using cached dataset configuration")
+                return cached
 
         # Load fresh data from SQLite
         datasets = self._load_datasets_from_sqlite()
@@ -150,8 +143,7 @@ class DatasetConfigManager:
         }
 
         # Update cache
-        self._config_cache = config
-        self._cache_timestamp = datetime.now()
+        self._config_cache.set("datasets", config)
 
         logger.info(
             f"Generated dataset configuration: {len(datasets)} datasets, {len(categories)} categories"
@@ -248,8 +240,7 @@ class DatasetConfigManager:
 
             if success:
                 # Invalidate cache
-                self._config_cache = {}
-                self._cache_timestamp = None
+                self._config_cache.clear()
                 logger.info(f"Added dataset: {dataset_config.get('dataflow_id')}")
                 return True
             else:
@@ -317,8 +308,7 @@ class DatasetConfigManager:
 
                 if cursor.rowcount > 0:
                     # Invalidate cache
-                    self._config_cache = {}
-                    self._cache_timestamp = None
+                    self._config_cache.clear()
 
                     logger.info(f"Updated dataset: {dataset_id}")
                     return True
@@ -351,8 +341,7 @@ class DatasetConfigManager:
 
                 if cursor.rowcount > 0:
                     # Invalidate cache
-                    self._config_cache = {}
-                    self._cache_timestamp = None
+                    self._config_cache.clear()
 
                     logger.info(f"Deactivated dataset: {dataset_id}")
                     return True
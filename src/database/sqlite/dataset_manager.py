@@ -6,6 +6,9 @@ as part of the refactored SQLite metadata architecture.
 """
 
 import json
+import os
+import re
+import time
 from datetime import datetime
 from typing import Any, Optional
 
@@ -15,6 +18,7 @@ except ImportError:
     from src.utils.logger import get_logger
 
 from .base_manager import BaseSQLiteManager
+from .schema import MetadataSchema
 
 logger = get_logger(__name__)
 
@@ -22,6 +26,37 @@ logger = get_logger(__name__)
 class DatasetManager(BaseSQLiteManager):
     """Specialized manager for dataset-related database operations."""
 
+    # Sort keys of list_datasets(), in ORDER BY order; dataset_id breaks ties
+    # so that keyset pagination never skips or repeats a row.
+    KEYSET_COLUMNS = ("priority", "name", "dataset_id")
+
+    # Orderings accepted by query_datasets(): (column, descending) pairs, each
+    # ending on dataset_id so that they are total and usable as keysets
+    SORT_ORDERS = {
+        "priority": (("priority", True), ("name", False), ("dataset_id", False)),
+        "name": (("name", False), ("dataset_id", False)),
+        "updated": (("updated_at", True), ("dataset_id", False)),
+        # BM25 score of the text query (lower is better); needs q
+        "relevance": (("fts.search_rank", False), ("dataset_id", False)),
+    }
+
+    # BM25 column weights of dataset_search: dataset_id, name, description,
+    # category, keywords
+    SEARCH_WEIGHTS = (10.0, 5.0, 1.0, 2.0, 0.5)
+
+    # Analytics statistics precomputed into dataset_stats by ingestion
+    STATS_COLUMNS = (
+        "record_count",
+        "min_year",
+        "max_year",
+        "territory_count",
+        "measure_count",
+    )
+
+    # Seconds data versions are served from memory before checking the
+    # database for versions bumped by other processes
+    VERSION_REFRESH_INTERVAL = float(os.getenv("DATA_VERSION_REFRESH_INTERVAL", "1"))
+
     def __init__(self, db_path: Optional[str] = None):
         """Initialize dataset manager.
 
@@ -29,8 +64,86 @@ class DatasetManager(BaseSQLiteManager):
             db_path: Path to SQLite database file. If None, uses default.
         """
         super().__init__(db_path)
+        self._stats_table_ready = False
+        self._versions_table_ready = False
+        # Snapshot of dataset_versions; see get_data_version()
+        self._versions: dict[str, int] = {}
+        self._catalog_version = 0
+        self._versions_loaded_at: Optional[float] = None
+        self._search_available: Optional[bool] = None
         logger.info(f"Dataset manager initialized: {self.db_path}")
 
+    def _ensure_stats_table(self) -> None:
+        """Create the dataset_stats table on databases predating it."""
+        if self._stats_table_ready:
+            return
+        with self._lock:
+            if not self._stats_table_ready:
+                with self.transaction() as conn:
+                    conn.execute(MetadataSchema.SCHEMA_SQL["dataset_stats"])
+                self._stats_table_ready = True
+
+    def _ensure_versions_table(self) -> None:
+        """Create the dataset_versions table on databases predating it."""
+        if self._versions_table_ready:
+            return
+        with self._lock:
+            if not self._versions_table_ready:
+                with self.transaction() as conn:
+                    conn.execute(MetadataSchema.SCHEMA_SQL["dataset_versions"])
+                    conn.execute(
+                        "CREATE INDEX IF NOT EXISTS idx_dataset_versions_version "
+                        "ON dataset_versions(version)"
+                    )
+                self._versions_table_ready = True
+
+    def _ensure_search_index(self) -> bool:
+        """Create the full-text search index on databases predating it.
+
+        Returns:
+            True if FTS5 search is available
+        """
+        if self._search_available is None:
+            with self._lock:
+                if self._search_available is None:
+                    with self.transaction() as conn:
+                        self._search_available = MetadataSchema.create_search_index(
+                            conn
+                        )
+        return self._search_available
+
+    @classmethod
+    def resolve_sort(cls, sort: str, q: Optional[str] = None) -> str:
+        """Return the ordering query_datasets() applies for a request.
+
+        Relevance needs a text query; without one it falls back to priority.
+        """
+        if sort == "relevance" and not (q and q.strip()):
+            return "priority"
+        return sort
+
+    @classmethod
+    def sort_keys(cls, sort: str) -> list[str]:
+        """Return the row keys holding the sort values of an ordering."""
+        return [column.split(".")[-1] for column, _ in cls.SORT_ORDERS[sort]]
+
+    @staticmethod
+    def build_search_query(q: str) -> Optional[str]:
+        """Turn free text into an FTS5 query matching every word as a prefix.
+
+        Words are quoted, so FTS5 operators in user input are taken literally.
+
+        Args:
+            q: User search text
+
+        Returns:
+            FTS5 MATCH expression, or None if q contains no words
+        """
+        words = re.findall(r"[^\W_]+", q)
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+
     def register_dataset(
         self,
         dataset_id: str,
@@ -86,6 +199,7 @@ class DatasetManager(BaseSQLiteManager):
             )
 
             if affected_rows > 0:
+                self.bump_data_versions([dataset_id])
                 logger.info(f"Dataset registered successfully: {dataset_id}")
                 return True
             else:
@@ -147,6 +261,9 @@ class DatasetManager(BaseSQLiteManager):
         active_only: bool = True,
         limit: Optional[int] = None,
         offset: int = 0,
+        after: Optional[list[Any]] = None,
+        with_stats: bool = False,
+        has_data: Optional[bool] = None,
     ) -> list[dict[str, Any]]:
         """List datasets with optional filtering.
 
@@ -155,34 +272,129 @@ class DatasetManager(BaseSQLiteManager):
             active_only: Only return active datasets
             limit: Maximum number of results
             offset: Results offset for pagination
+            after: Keyset position (values of KEYSET_COLUMNS for the last row
+                already returned); preferred over offset for deep pages
+            with_stats: Join precomputed analytics statistics, returned under
+                "analytics_stats"
+            has_data: Filter by presence of analytics data (implies with_stats)
 
         Returns:
             List of dataset dictionaries
         """
-        try:
-            # Build query
-            query_parts = ["SELECT * FROM dataset_registry WHERE 1=1"]
-            params = []
+        datasets, _ = self.query_datasets(
+            category=category,
+            active_only=active_only,
+            limit=limit,
+            offset=offset,
+            after=after,
+            with_stats=with_stats,
+            has_data=has_data,
+        )
+        return datasets
+
+    def query_datasets(
+        self,
+        category: Optional[str] = None,
+        q: Optional[str] = None,
+        active_only: bool = True,
+        has_data: Optional[bool] = None,
+        sort: str = "priority",
+        limit: Optional[int] = None,
+        offset: int = 0,
+        after: Optional[list[Any]] = None,
+        with_stats: bool = False,
+        with_total: bool = False,
+    ) -> tuple[list[dict[str, Any]], Optional[int]]:
+        """Filter, sort and paginate datasets in a single query.
 
-            if category:
-                query_parts.append("AND category = ?")
-                params.append(category)
+        Args:
+            category: Filter by category (optional)
+            q: Case-insensitive substring matched against name, description
+                and dataset_id (optional)
+            active_only: Only return active datasets
+            has_data: Filter by presence of analytics data (implies with_stats)
+            sort: Ordering, one of SORT_ORDERS
+            limit: Maximum number of results
+            offset: Results offset for pagination
+            after: Keyset position (values of the sort columns for the last
+                row already returned); preferred over offset for deep pages
+            with_stats: Join precomputed analytics statistics, returned under
+                "analytics_stats"
+            with_total: Also count all matching rows (COUNT(*) window)
 
-            if active_only:
-                query_parts.append("AND is_active = 1")
+        Returns:
+            Tuple of (list of dataset dictionaries, total matching rows or
+            None when with_total is False)
+        """
+        try:
+            sort = self.resolve_sort(sort, q)
+            if sort not in self.SORT_ORDERS:
+                raise ValueError(
+                    f"Unknown sort {sort!r}, expected one of {list(self.SORT_ORDERS)}"
+                )
+            order = self.SORT_ORDERS[sort]
+            with_stats = with_stats or has_data is not None
+            text_search = bool(q and q.strip())
 
-            query_parts.append("ORDER BY priority DESC, name ASC")
+            # Build query
+            select = ["r.*"]
+            if text_search:
+                select.append("fts.search_rank")
+            if with_stats:
+                self._ensure_stats_table()
+                select.extend(
+                    f"s.{column} AS stats_{column}" for column in self.STATS_COLUMNS
+                )
+            if with_total:
+                select.append("COUNT(*) OVER () AS total_count")
+
+            joins, params = [], []
+            if text_search:
+                search_join, search_params = self._search_join(q)
+                joins.append(search_join)
+                params.extend(search_params)
+            if with_stats:
+                joins.append("LEFT JOIN dataset_stats s ON s.dataset_id = r.dataset_id")
+
+            query_parts = [
+                f"SELECT {', '.join(select)} FROM dataset_registry r",
+                *joins,
+            ]
+            conditions, filter_params = self._dataset_filters(
+                category, active_only, has_data
+            )
+            params.extend(filter_params)
+
+            # The keyset predicate stays out of the count: totals describe the
+            # whole result set, not what is left after the cursor
+            count_conditions = list(conditions)
+            count_params = list(params)
+
+            if after is not None:
+                predicate, keyset_params = self._keyset_predicate(order, after)
+                conditions.append(predicate)
+                params.extend(keyset_params)
+
+            query_parts.append("WHERE " + " AND ".join(conditions))
+            query_parts.append(
+                "ORDER BY "
+                + ", ".join(
+                    f"{self._sort_expression(column)} {'DESC' if descending else 'ASC'}"
+                    for column, descending in order
+                )
+            )
 
             if limit:
-                query_parts.append(f"LIMIT {limit}")
+                query_parts.append(f"LIMIT {int(limit)}")
                 if offset > 0:
-                    query_parts.append(f"OFFSET {offset}")
+                    query_parts.append(f"OFFSET {int(offset)}")
 
             query = " ".join(query_parts)
             results = self.execute_query(query, tuple(params))
 
             # Process results
             datasets = []
+            total = None
             for row in results:
                 dataset = dict(row)
 
@@ -200,16 +412,353 @@ class DatasetManager(BaseSQLiteManager):
                 else:
                     dataset["metadata"] = {}
 
+                if with_stats:
+                    dataset["analytics_stats"] = self._stats_from_row(
+                        {
+                            column: dataset.pop(f"stats_{column}")
+                            for column in self.STATS_COLUMNS
+                        }
+                    )
+
+                if with_total:
+                    total = dataset.pop("total_count")
+
+                if text_search and sort != "relevance":
+                    dataset.pop("search_rank")
+
                 datasets.append(dataset)
 
+            if with_total and (total is None or after is not None):
+                # No rows to carry the window (page past the end) or the
+                # window only saw rows after the cursor: count separately
+                count_result = self.execute_query(
+                    f"SELECT COUNT(*) FROM dataset_registry r {' '.join(joins)} "
+                    f"WHERE {' AND '.join(count_conditions)}",
+                    tuple(count_params),
+                )
+                total = count_result[0][0] if count_result else 0
+
             logger.debug(
-                f"Listed {len(datasets)} datasets (category={category}, active_only={active_only})"
+                f"Listed {len(datasets)} datasets (category={category}, q={q}, "
+                f"sort={sort}, active_only={active_only})"
             )
-            return datasets
+            return datasets, total
 
         except Exception as e:
             logger.error(f"Failed to list datasets: {e}")
-            return []
+            return [], 0 if with_total else None
+
+    def _dataset_filters(
+        self,
+        category: Optional[str],
+        active_only: bool,
+        has_data: Optional[bool],
+    ) -> tuple[list[str], list[Any]]:
+        """Build WHERE conditions shared by dataset queries and their counts."""
+        conditions = ["1=1"]
+        params: list[Any] = []
+
+        if category:
+            conditions.append("r.category = ?")
+            params.append(category)
+
+        if active_only:
+            conditions.append("r.is_active = 1")
+
+        if has_data is not None:
+            conditions.append(
+                "COALESCE(s.record_count, 0) > 0"
+                if has_data
+                else "COALESCE(s.record_count, 0) = 0"
+            )
+
+        return conditions, params
+
+    def _search_join(self, q: str) -> tuple[str, list[Any]]:
+        """Build the join restricting datasets to text matches.
+
+        Matches come from the dataset_search FTS5 index ranked by BM25. When
+        SQLite lacks FTS5, an escaped LIKE over name, description and
+        dataset_id is used instead, with a constant rank.
+
+        Returns:
+            Tuple of (JOIN clause exposing fts.search_rank, parameters)
+        """
+        if self._ensure_search_index():
+            match = self.build_search_query(q)
+            weights = ", ".join(str(weight) for weight in self.SEARCH_WEIGHTS)
+            return (
+                "JOIN (SELECT rowid AS id, "
+                f"bm25(dataset_search, {weights}) AS search_rank "
+                "FROM dataset_search WHERE dataset_search MATCH ?) fts "
+                "ON fts.id = r.id",
+                # Queries without any word match nothing
+                [match or '""'],
+            )
+
+        escaped = (
+            q.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        pattern = f"%{escaped}%"
+        return (
+            "JOIN (SELECT id, 0.0 AS search_rank FROM dataset_registry "
+            "WHERE name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\' "
+            "OR dataset_id LIKE ? ESCAPE '\\') fts ON fts.id = r.id",
+            [pattern, pattern, pattern],
+        )
+
+    @staticmethod
+    def _sort_expression(column: str) -> str:
+        """Qualify a SORT_ORDERS column with its table alias."""
+        return column if "." in column else f"r.{column}"
+
+    @staticmethod
+    def _keyset_predicate(
+        order: tuple[tuple[str, bool], ...], after: list[Any]
+    ) -> tuple[str, list[Any]]:
+        """Build the seek predicate for rows strictly after a keyset position.
+
+        Args:
+            order: (column, descending) pairs of the ORDER BY
+            after: Values of the order columns for the last row returned
+
+        Returns:
+            Tuple of (SQL predicate, parameters)
+        """
+        if len(after) != len(order):
+            raise ValueError(
+                f"after expects values for {[column for column, _ in order]}"
+            )
+
+        # (c1 > v1) OR (c1 = v1 AND ((c2 > v2) OR (c2 = v2 AND ...)))
+        predicate, params = None, []
+        for (column, descending), value in reversed(list(zip(order, after))):
+            expression = DatasetManager._sort_expression(column)
+            comparison = f"{expression} {'<' if descending else '>'} ?"
+            if predicate is None:
+                predicate, params = comparison, [value]
+            else:
+                predicate = f"{comparison} OR ({expression} = ? AND ({predicate}))"
+                params = [value, value, *params]
+        return f"({predicate})", params
+
+    def get_dataset_stats(self, dataset_id: str) -> dict[str, Any]:
+        """Get precomputed analytics statistics for a dataset.
+
+        Args:
+            dataset_id: Dataset identifier
+
+        Returns:
+            Statistics dictionary ({"record_count": 0} if never computed)
+        """
+        try:
+            self._ensure_stats_table()
+            results = self.execute_query(
+                f"SELECT {', '.join(self.STATS_COLUMNS)} FROM dataset_stats "
+                "WHERE dataset_id = ?",
+                (dataset_id,),
+            )
+            return self._stats_from_row(dict(results[0]) if results else {})
+
+        except Exception as e:
+            logger.error(f"Failed to get dataset stats {dataset_id}: {e}")
+            return {"record_count": 0}
+
+    def has_dataset_stats(self) -> bool:
+        """Check whether any analytics statistics have been computed.
+
+        Returns:
+            True if dataset_stats has at least one row
+        """
+        try:
+            self._ensure_stats_table()
+            return bool(self.execute_query("SELECT 1 FROM dataset_stats LIMIT 1"))
+        except Exception as e:
+            logger.error(f"Failed to check dataset stats: {e}")
+            return False
+
+    def upsert_dataset_stats(
+        self, stats: list[dict[str, Any]], replace_all: bool = False
+    ) -> int:
+        """Store precomputed analytics statistics.
+
+        Also keeps dataset_registry.record_count in step with the stats and
+        bumps the data version of every dataset written.
+
+        Args:
+            stats: One dictionary per dataset with dataset_id and STATS_COLUMNS
+            replace_all: Remove statistics of datasets not in ``stats``
+                (used by full refreshes)
+
+        Returns:
+            Number of datasets written
+        """
+        try:
+            self._ensure_stats_table()
+            self._ensure_versions_table()
+            rows = [
+                (
+                    entry["dataset_id"],
+                    int(entry.get("record_count") or 0),
+                    entry.get("min_year"),
+                    entry.get("max_year"),
+                    int(entry.get("territory_count") or 0),
+                    int(entry.get("measure_count") or 0),
+                )
+                for entry in stats
+            ]
+
+            with self.transaction() as conn:
+                if replace_all:
+                    conn.execute("DELETE FROM dataset_stats")
+                conn.executemany(
+                    """
+                    INSERT INTO dataset_stats (
+                        dataset_id, record_count, min_year, max_year,
+                        territory_count, measure_count, refreshed_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(dataset_id) DO UPDATE SET
+                        record_count = excluded.record_count,
+                        min_year = excluded.min_year,
+                        max_year = excluded.max_year,
+                        territory_count = excluded.territory_count,
+                        measure_count = excluded.measure_count,
+                        refreshed_at = excluded.refreshed_at
+                    """,
+                    rows,
+                )
+                conn.executemany(
+                    "UPDATE dataset_registry SET record_count = ? "
+                    "WHERE dataset_id = ? AND record_count IS NOT ?",
+                    [(row[1], row[0], row[1]) for row in rows],
+                )
+                self._bump_versions(
+                    conn, None if replace_all else [row[0] for row in rows]
+                )
+            self._load_data_versions()
+
+            logger.debug(f"Dataset stats stored for {len(rows)} datasets")
+            return len(rows)
+
+        except Exception as e:
+            logger.error(f"Failed to store dataset stats: {e}")
+            return 0
+
+    def get_data_version(self, dataset_id: str) -> int:
+        """Get the data version of a dataset.
+
+        The version changes whenever the dataset's registry entry or
+        statistics are written, which ingestion does after loading data.
+        Versions are served from an in-process snapshot that picks up
+        versions bumped by other processes within VERSION_REFRESH_INTERVAL.
+
+        Args:
+            dataset_id: Dataset identifier
+
+        Returns:
+            Data version (0 if the dataset never changed)
+        """
+        self._refresh_data_versions()
+        return self._versions.get(dataset_id, 0)
+
+    def get_catalog_version(self) -> int:
+        """Get the data version of the whole catalog.
+
+        Versions come from one sequence shared by all datasets, so this is the
+        highest dataset version and changes with any dataset.
+
+        Returns:
+            Catalog data version (0 if no dataset ever changed)
+        """
+        self._refresh_data_versions()
+        return self._catalog_version
+
+    def bump_data_versions(self, dataset_ids: Optional[list[str]] = None) -> int:
+        """Give datasets a new data version after their data changed.
+
+        Args:
+            dataset_ids: Changed datasets (all registered datasets if None)
+
+        Returns:
+            The new catalog version
+        """
+        try:
+            self._ensure_versions_table()
+            with self.transaction() as conn:
+                self._bump_versions(conn, dataset_ids)
+            self._load_data_versions()
+        except Exception as e:
+            logger.error(f"Failed to bump data versions: {e}")
+        return self._catalog_version
+
+    @staticmethod
+    def _bump_versions(conn, dataset_ids: Optional[list[str]]) -> None:
+        """Store the next version for datasets inside a write transaction."""
+        if dataset_ids is None:
+            dataset_ids = [
+                row[0]
+                for row in conn.execute("SELECT dataset_id FROM dataset_registry")
+            ]
+        if not dataset_ids:
+            return
+        # Microsecond timestamps, kept increasing: versions also differ from
+        # those of an earlier database at the same path
+        latest = conn.execute(
+            "SELECT COALESCE(MAX(version), 0) FROM dataset_versions"
+        ).fetchone()[0]
+        version = max(latest + 1, time.time_ns() // 1000)
+        conn.executemany(
+            """
+            INSERT INTO dataset_versions (dataset_id, version, changed_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(dataset_id) DO UPDATE SET
+                version = excluded.version,
+                changed_at = excluded.changed_at
+            """,
+            [(dataset_id, version) for dataset_id in dataset_ids],
+        )
+
+    def _refresh_data_versions(self) -> None:
+        """Reload the version snapshot once VERSION_REFRESH_INTERVAL passed."""
+        loaded_at = self._versions_loaded_at
+        if (
+            loaded_at is not None
+            and time.monotonic() - loaded_at < self.VERSION_REFRESH_INTERVAL
+        ):
+            return
+        try:
+            self._ensure_versions_table()
+            self._load_data_versions()
+        except Exception as e:
+            logger.warning(f"Failed to load data versions: {e}")
+            # Keep serving the previous snapshot until the next interval
+            self._versions_loaded_at = time.monotonic()
+
+    def _load_data_versions(self) -> None:
+        """Load the versions bumped since the snapshot was last loaded."""
+        with self._lock:
+            latest = self.execute_query(
+                "SELECT COALESCE(MAX(version), 0) AS latest FROM dataset_versions"
+            )[0]["latest"]
+            if latest < self._catalog_version:
+                # Database replaced or reset: start over
+                self._versions, self._catalog_version = {}, 0
+            if latest > self._catalog_version:
+                rows = self.execute_query(
+                    "SELECT dataset_id, version FROM dataset_versions "
+                    "WHERE version > ?",
+                    (self._catalog_version,),
+                )
+                for row in rows:
+                    self._versions[row["dataset_id"]] = row["version"]
+                self._catalog_version = latest
+            self._versions_loaded_at = time.monotonic()
+
+    def _stats_from_row(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Shape a dataset_stats row into the analytics_stats dictionary."""
+        if row.get("record_count") is None:
+            return {"record_count": 0}
+        return {column: row.get(column) for column in self.STATS_COLUMNS}
 
     def update_dataset_stats(
         self,
@@ -274,6 +823,7 @@ class DatasetManager(BaseSQLiteManager):
             affected_rows = self.execute_update(query, tuple(params))
 
             if affected_rows > 0:
+                self.bump_data_versions([dataset_id])
                 logger.info(f"Dataset stats updated: {dataset_id}")
                 return True
             else:
@@ -303,6 +853,7 @@ class DatasetManager(BaseSQLiteManager):
             affected_rows = self.execute_update(query, (dataset_id,))
 
             if affected_rows > 0:
+                self.bump_data_versions([dataset_id])
                 logger.info(f"Dataset deactivated: {dataset_id}")
                 return True
             else:
@@ -20,15 +20,29 @@ Features:
 
 import json
 import threading
+from collections.abc import Sequence
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+from src.database.duckdb.adaptive_optimizer import AdaptiveOptimizer
 from src.database.duckdb.manager import get_manager
+from src.database.duckdb.query_builder import (
+    ConditionGroup,
+    DuckDBQueryBuilder,
+    FilterCondition,
+    FilterOperator,
+)
 
 try:
+    from utils.cache import BoundedCache
     from utils.logger import get_logger
 except ImportError:
+    from src.utils.cache import BoundedCache
     from src.utils.logger import get_logger
 
 from .manager_factory import (
@@ -40,6 +54,211 @@ from .manager_factory import (
 
 logger = get_logger(__name__)
 
+# Columns of get_dataset_time_series_columns(), as projected in DuckDB
+TIME_SERIES_SCHEMA = pa.schema(
+    [
+        ("dataset_id", pa.string()),
+        ("time_period", pa.string()),
+        ("year", pa.int32()),
+        ("obs_value", pa.float64()),
+        ("record_id", pa.int32()),
+        ("ingestion_timestamp", pa.string()),
+        ("territory_code", pa.string()),
+        ("territory_name", pa.string()),
+        ("measure_code", pa.string()),
+        ("measure_name", pa.string()),
+        ("obs_status", pa.string()),
+    ]
+)
+
+# OData Observation entities, one row per observation (see ODATA_OBSERVATIONS_VIEW)
+ODATA_OBSERVATIONS_SCHEMA = pa.schema(
+    [
+        pa.field("Id", pa.int64(), nullable=False),
+        pa.field("DatasetId", pa.string(), nullable=False),
+        ("Year", pa.int32()),
+        ("TimePeriod", pa.string()),
+        ("TerritoryCode", pa.string()),
+        ("TerritoryName", pa.string()),
+        ("MeasureCode", pa.string()),
+        ("MeasureName", pa.string()),
+        ("ObsValue", pa.float64()),
+        ("ObsStatus", pa.string()),
+    ]
+)
+
+# Aggregate functions of aggregate_observations(), as SQL templates
+OBSERVATION_AGGREGATES = {
+    "sum": "SUM({})",
+    "avg": "AVG({})",
+    "min": "MIN({})",
+    "max": "MAX({})",
+    "count_distinct": "COUNT(DISTINCT {})",
+}
+
+# Projection of the observations table as OData Observation properties
+_ODATA_OBSERVATION_COLUMNS = """
+        dataset_id AS DatasetId,
+        CASE WHEN regexp_full_match(time_period, '[0-9]+')
+             THEN TRY_CAST(time_period AS INTEGER) END AS Year,
+        time_period AS TimePeriod,
+        json_extract_string(additional_attributes, '$.territory_code')
+            AS TerritoryCode,
+        json_extract_string(additional_attributes, '$.territory_name')
+            AS TerritoryName,
+        json_extract_string(additional_attributes, '$.measure_code')
+            AS MeasureCode,
+        json_extract_string(additional_attributes, '$.measure_name')
+            AS MeasureName,
+        TRY_CAST(obs_value AS DOUBLE) AS ObsValue,
+        COALESCE(
+            json_extract_string(additional_attributes, '$.obs_status'),
+            CASE WHEN TRY_CAST(obs_value AS DOUBLE) IS NULL AND obs_value <> ''
+                 THEN obs_value END
+        ) AS ObsStatus
+"""
+
+# OData entities. Id is the record_id stored at ingestion (the position of
+# the observation in its dataset); being a plain column, filters and keyset
+# conditions on it are pushed down into the scan.
+ODATA_OBSERVATIONS_VIEW = f"""
+    CREATE OR REPLACE VIEW main.odata_observations AS
+    SELECT
+        CAST(record_id AS BIGINT) AS Id,
+        {_ODATA_OBSERVATION_COLUMNS}
+    FROM main.istat_observations
+"""
+
+# OData Territory entities, one row per distinct territory code
+ODATA_TERRITORIES_SCHEMA = pa.schema(
+    [
+        pa.field("TerritoryCode", pa.string(), nullable=False),
+        ("TerritoryName", pa.string()),
+        ("Level", pa.string()),
+        ("ParentCode", pa.string()),
+    ]
+)
+
+# OData Measure entities, one row per measure of each dataset
+ODATA_MEASURES_SCHEMA = pa.schema(
+    [
+        pa.field("DatasetId", pa.string(), nullable=False),
+        pa.field("MeasureCode", pa.string(), nullable=False),
+        ("MeasureName", pa.string()),
+        ("Unit", pa.string()),
+        ("DataType", pa.string()),
+    ]
+)
+
+# Dimension tables behind the Territory and Measure entities, kept current by
+# refresh_dataset_stats(). odata_dataset_territories records the datasets
+# using each territory, so a territory goes away with its last dataset.
+ODATA_DIMENSION_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS main.odata_dataset_territories (
+        DatasetId VARCHAR NOT NULL,
+        TerritoryCode VARCHAR NOT NULL,
+        TerritoryName VARCHAR,
+        PRIMARY KEY (DatasetId, TerritoryCode)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS main.odata_territories (
+        TerritoryCode VARCHAR PRIMARY KEY,
+        TerritoryName VARCHAR,
+        Level VARCHAR,
+        ParentCode VARCHAR
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS main.odata_measures (
+        DatasetId VARCHAR NOT NULL,
+        MeasureCode VARCHAR NOT NULL,
+        MeasureName VARCHAR,
+        Unit VARCHAR,
+        DataType VARCHAR,
+        PRIMARY KEY (DatasetId, MeasureCode)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_odata_territories_parent"
+    " ON main.odata_territories (ParentCode)",
+    "CREATE INDEX IF NOT EXISTS idx_odata_measures_code"
+    " ON main.odata_measures (MeasureCode)",
+]
+
+# NUTS level and parent of a territory code (ITC11 is a province of region
+# ITC1, of macroregion ITC, of country IT); other codes, such as ISTAT
+# municipality codes, have neither
+_NUTS_LEVEL = """
+    CASE WHEN regexp_full_match(TerritoryCode, '[A-Z]{2}[A-Z0-9]{0,3}')
+         THEN CASE length(TerritoryCode)
+                   WHEN 2 THEN 'Country'
+                   WHEN 3 THEN 'Macroregion'
+                   WHEN 4 THEN 'Region'
+                   ELSE 'Province' END
+    END
+"""
+_NUTS_PARENT = """
+    CASE WHEN regexp_full_match(TerritoryCode, '[A-Z]{2}[A-Z0-9]{1,3}')
+         THEN left(TerritoryCode, length(TerritoryCode) - 1)
+    END
+"""
+
+# Statements of _refresh_dimensions(); {scope} restricts them to the
+# refreshed datasets (or is empty for a full rebuild)
+_DIMENSION_REFRESH = [
+    "DELETE FROM main.odata_dataset_territories {scope}",
+    """
+    INSERT INTO main.odata_dataset_territories
+    SELECT DatasetId, TerritoryCode, max(TerritoryName)
+    FROM main.odata_observations
+    {scope}
+    GROUP BY DatasetId, TerritoryCode
+    HAVING TerritoryCode IS NOT NULL
+    """,
+    """
+    DELETE FROM main.odata_territories
+    WHERE TerritoryCode NOT IN (
+        SELECT TerritoryCode FROM main.odata_dataset_territories
+    )
+    """,
+    f"""
+    INSERT INTO main.odata_territories
+    SELECT TerritoryCode, max(TerritoryName), {_NUTS_LEVEL}, {_NUTS_PARENT}
+    FROM main.odata_dataset_territories
+    WHERE TerritoryCode IN (
+        SELECT TerritoryCode FROM main.odata_dataset_territories {{scope}}
+    )
+    GROUP BY TerritoryCode
+    ON CONFLICT (TerritoryCode) DO UPDATE SET TerritoryName = excluded.TerritoryName
+    """,
+    "DELETE FROM main.odata_measures {scope}",
+    """
+    INSERT INTO main.odata_measures
+    SELECT
+        DatasetId,
+        MeasureCode,
+        max(MeasureName),
+        max(Unit),
+        CASE WHEN bool_and(ObsValue = trunc(ObsValue)) THEN 'Integer'
+             WHEN count(ObsValue) > 0 THEN 'Decimal' END
+    FROM (
+        SELECT
+            dataset_id AS DatasetId,
+            json_extract_string(additional_attributes, '$.measure_code')
+                AS MeasureCode,
+            json_extract_string(additional_attributes, '$.measure_name')
+                AS MeasureName,
+            json_extract_string(additional_attributes, '$.unit_measure') AS Unit,
+            TRY_CAST(obs_value AS DOUBLE) AS ObsValue
+        FROM main.istat_observations
+    )
+    {scope}
+    GROUP BY DatasetId, MeasureCode
+    HAVING MeasureCode IS NOT NULL
+    """,
+]
+
 
 class UnifiedDataRepository:
     """
@@ -66,8 +285,17 @@ class UnifiedDataRepository:
         self.analytics_manager = get_manager()  # Use singleton
 
         # Cache for frequently accessed data
-        self._cache = {}
-        self._cache_ttl = {}
+        self._cache = BoundedCache("repository")
+
+        # Analytics stats are precomputed by ingestion; bootstrap once if empty
+        self._stats_bootstrapped = False
+
+        # main.odata_observations is created on first use
+        self._observations_view_ready = False
+
+        # Territory/Measure dimensions are built on first use if ingestion
+        # predates them
+        self._dimensions_ready = False
 
         logger.info("Unified data repository initialized")
 
@@ -161,7 +389,7 @@ class UnifiedDataRepository:
             if not metadata:
                 return None
 
-            # Get analytics stats from DuckDB
+            # Get precomputed analytics stats
             analytics_stats = self._get_dataset_analytics_stats(dataset_id)
 
             # Combine information
@@ -180,7 +408,10 @@ class UnifiedDataRepository:
             return None
 
     def _get_dataset_analytics_stats(self, dataset_id: str) -> dict[str, Any]:
-        """Get analytics statistics for a dataset from DuckDB.
+        """Get analytics statistics for a dataset.
+
+        Statistics are read from the dataset_stats table, which ingestion keeps
+        current through refresh_dataset_stats().
 
         Args:
             dataset_id: ISTAT dataset identifier
@@ -188,88 +419,219 @@ class UnifiedDataRepository:
         Returns:
             Dictionary with analytics statistics
         """
+        self._bootstrap_dataset_stats()
+        return self.dataset_manager.get_dataset_stats(dataset_id)
+
+    def refresh_dataset_stats(self, dataset_ids: Optional[list[str]] = None) -> int:
+        """Recompute analytics statistics from DuckDB into SQLite.
+
+        Runs a single grouped aggregate over the observations table for all
+        requested datasets. Called by ingestion after data is written; like
+        the data versions it bumps, the adaptive optimizer's materializations
+        are invalidated, so routed queries stop serving the previous data.
+
+        Args:
+            dataset_ids: Datasets to refresh (all datasets if None)
+
+        Returns:
+            Number of datasets whose statistics were stored
+        """
         try:
-            # Query DuckDB for dataset statistics
             stats_query = """
                 SELECT
-                    COUNT(*) as record_count,
-                    MIN(o.year) as min_year,
-                    MAX(o.year) as max_year,
-                    COUNT(DISTINCT o.territory_code) as territory_count,
-                    COUNT(DISTINCT o.value_type) as measure_count
-                FROM istat.istat_observations o
-                JOIN istat.istat_datasets d ON o.dataset_row_id = d.id
-                WHERE d.dataset_id = ?
+                    dataset_id,
+                    COUNT(*) AS record_count,
+                    MIN(TRY_CAST(substr(time_period, 1, 4) AS INTEGER)) AS min_year,
+                    MAX(TRY_CAST(substr(time_period, 1, 4) AS INTEGER)) AS max_year,
+                    COUNT(DISTINCT json_extract_string(
+                        additional_attributes, '$.territory_code'
+                    )) AS territory_count,
+                    COUNT(DISTINCT json_extract_string(
+                        additional_attributes, '$.measure_code'
+                    )) AS measure_count
+                FROM main.istat_observations
             """
+            params = None
+            if dataset_ids is not None:
+                if not dataset_ids:
+                    return 0
+                stats_query += " WHERE dataset_id IN (SELECT unnest($1::VARCHAR[]))"
+                params = [list(dataset_ids)]
+            stats_query += " GROUP BY dataset_id"
+
+            result = self.analytics_manager.execute_query(stats_query, params)
+
+            stats = {}
+            for row in result.itertuples(index=False):
+                stats[row.dataset_id] = {
+                    "dataset_id": row.dataset_id,
+                    "record_count": int(row.record_count),
+                    "min_year": None if pd.isna(row.min_year) else int(row.min_year),
+                    "max_year": None if pd.isna(row.max_year) else int(row.max_year),
+                    "territory_count": int(row.territory_count),
+                    "measure_count": int(row.measure_count),
+                }
 
-            result = self.analytics_manager.execute_query(stats_query, [dataset_id])
+            # Requested datasets without observations are stored as empty
+            for dataset_id in dataset_ids or []:
+                stats.setdefault(dataset_id, {"dataset_id": dataset_id})
 
-            if (
-                result is not None
-                and not (hasattr(result, "empty") and result.empty)
-                and len(result) > 0
-            ):
-                row = result[0]
-                return {
-                    "record_count": row[0] or 0,
-                    "min_year": row[1] if row[1] is not None else 2020,
-                    "max_year": row[2] if row[2] is not None else 2024,
-                    "territory_count": row[3] or 0,
-                    "measure_count": row[4] or 0,
-                }
+            # Dimensions first: storing the stats bumps the data versions
+            self._refresh_dimensions(dataset_ids)
 
-            return {"record_count": 0}
+            stored = self.dataset_manager.upsert_dataset_stats(
+                list(stats.values()), replace_all=dataset_ids is None
+            )
+            self._stats_bootstrapped = True
+            AdaptiveOptimizer(self.analytics_manager).invalidate_materializations()
+            return stored
 
         except Exception as e:
-            logger.error(f"Failed to get analytics stats for {dataset_id}: {e}")
-            return {"record_count": 0}
+            logger.warning(f"Failed to refresh dataset stats: {e}")
+            return 0
+
+    def get_data_version(self, dataset_id: str) -> int:
+        """Get the data version of a dataset, without querying its data.
+
+        Args:
+            dataset_id: ISTAT dataset identifier
+
+        Returns:
+            Version that changes whenever the dataset is re-ingested or its
+            registry entry changes (see DatasetManager.get_data_version)
+        """
+        # Bootstrapping stats bumps versions; do it before they are read
+        self._bootstrap_dataset_stats()
+        return self.dataset_manager.get_data_version(dataset_id)
+
+    def get_catalog_version(self) -> int:
+        """Get the data version of the dataset catalog as a whole.
+
+        Returns:
+            Version that changes whenever any dataset changes
+        """
+        self._bootstrap_dataset_stats()
+        return self.dataset_manager.get_catalog_version()
+
+    def _bootstrap_dataset_stats(self) -> None:
+        """Populate dataset_stats once for databases ingested before it existed."""
+        if self._stats_bootstrapped:
+            return
+        with self._lock:
+            if self._stats_bootstrapped:
+                return
+            self._stats_bootstrapped = True
+            if not self.dataset_manager.has_dataset_stats():
+                self.refresh_dataset_stats()
 
     def list_datasets_complete(
-        self, category: str = None, with_analytics: bool = None
+        self,
+        category: str = None,
+        with_analytics: bool = None,
+        limit: Optional[int] = None,
+        after: Optional[list[Any]] = None,
+        offset: int = 0,
     ) -> list[dict[str, Any]]:
         """List datasets with complete information from both databases.
 
+        Filtering, pagination and analytics enrichment run as one SQLite query
+        joining the precomputed dataset_stats table.
+
         Args:
             category: Optional category filter
             with_analytics: Filter by presence of analytics data
+            limit: Maximum number of datasets to return
+            after: Keyset position, see DatasetManager.KEYSET_COLUMNS
+            offset: Results offset for pagination (ignored when after is set)
 
         Returns:
             List of complete dataset dictionaries
         """
         try:
-            # Get datasets from metadata
-            datasets = self.dataset_manager.list_datasets(category)
+            self._bootstrap_dataset_stats()
+
+            datasets = self.dataset_manager.list_datasets(
+                category,
+                limit=limit,
+                offset=0 if after is not None else offset,
+                after=after,
+                with_stats=True,
+                has_data=with_analytics,
+            )
 
-            # Enhance with analytics information
-            complete_datasets = []
             for dataset in datasets:
-                dataset_id = dataset["dataset_id"]
-                analytics_stats = self._get_dataset_analytics_stats(dataset_id)
-
-                complete_dataset = dataset.copy()
-                complete_dataset.update(
-                    {
-                        "analytics_stats": analytics_stats,
-                        "has_analytics_data": analytics_stats.get("record_count", 0)
-                        > 0,
-                    }
+                dataset["has_analytics_data"] = (
+                    dataset["analytics_stats"].get("record_count", 0) > 0
                 )
 
-                # Apply analytics filter if specified
-                if with_analytics is not None:
-                    if with_analytics and not complete_dataset["has_analytics_data"]:
-                        continue
-                    if not with_analytics and complete_dataset["has_analytics_data"]:
-                        continue
-
-                complete_datasets.append(complete_dataset)
-
-            return complete_datasets
+            return datasets
 
         except Exception as e:
             logger.error(f"Failed to list complete datasets: {e}")
             return []
 
+    def query_datasets(
+        self,
+        category: Optional[str] = None,
+        q: Optional[str] = None,
+        with_analytics: Optional[bool] = None,
+        page: int = 1,
+        page_size: int = 50,
+        sort: str = "priority",
+        after: Optional[list[Any]] = None,
+    ) -> dict[str, Any]:
+        """Query one page of datasets with filtering and sorting done in SQL.
+
+        Page mode returns the total number of matches, counted by the same
+        query through a COUNT(*) window. Keyset mode (``after``) skips the
+        count and fetches one extra row to detect further pages.
+
+        Args:
+            category: Optional category filter
+            q: Optional text matched against name, description and dataset_id
+            with_analytics: Filter by presence of analytics data
+            page: Page number (1-based, ignored when after is set)
+            page_size: Number of datasets per page
+            sort: Ordering, see DatasetManager.SORT_ORDERS
+            after: Keyset position (values of the sort columns)
+
+        Returns:
+            Dictionary with datasets, total_count (None in keyset mode) and
+            has_next
+        """
+        self._bootstrap_dataset_stats()
+
+        keyset = after is not None
+        datasets, total_count = self.dataset_manager.query_datasets(
+            category=category,
+            q=q,
+            has_data=with_analytics,
+            sort=sort,
+            limit=page_size + 1 if keyset else page_size,
+            offset=0 if keyset else (page - 1) * page_size,
+            after=after,
+            with_stats=True,
+            with_total=not keyset,
+        )
+
+        if keyset:
+            has_next = len(datasets) > page_size
+            datasets = datasets[:page_size]
+            total_count = None
+        else:
+            has_next = (page - 1) * page_size + len(datasets) < (total_count or 0)
+
+        for dataset in datasets:
+            dataset["has_analytics_data"] = (
+                dataset["analytics_stats"].get("record_count", 0) > 0
+            )
+
+        return {
+            "datasets": datasets,
+            "total_count": total_count,
+            "has_next": has_next,
+        }
+
     # User Operations (SQLite + Caching)
 
     def set_user_preference(
@@ -416,148 +778,647 @@ class UnifiedDataRepository:
         measure_code: str = None,
         start_year: int = None,
         end_year: int = None,
+        limit: Optional[int] = None,
+        include_attributes: bool = False,
     ) -> list[dict[str, Any]]:
         """Get time series data for a dataset with metadata integration.
 
+        Row-oriented view of get_dataset_time_series_columns().
+
         Args:
             dataset_id: ISTAT dataset identifier
             territory_code: Optional territory filter
             measure_code: Optional measure filter
             start_year: Optional start year filter
             end_year: Optional end year filter
+            limit: Optional maximum number of points
+            include_attributes: Also return the parsed additional_attributes
+                of every point (slower, parses JSON per row)
 
         Returns:
             List of time series data points
         """
+        table = self.get_dataset_time_series_columns(
+            dataset_id,
+            territory_code=territory_code,
+            measure_code=measure_code,
+            start_year=start_year,
+            end_year=end_year,
+            limit=limit,
+            include_attributes=include_attributes,
+        )
+        time_series = table.to_pylist()
+
+        if include_attributes:
+            for point in time_series:
+                try:
+                    attributes = json.loads(point["additional_attributes"] or "{}")
+                except (json.JSONDecodeError, TypeError):
+                    attributes = {}
+                if point["obs_status"] and "obs_status" not in attributes:
+                    attributes["obs_status"] = point["obs_status"]
+                point["additional_attributes"] = attributes
+
+        return time_series
+
+    def get_dataset_time_series_columns(
+        self,
+        dataset_id: str,
+        territory_code: str = None,
+        measure_code: str = None,
+        start_year: int = None,
+        end_year: int = None,
+        limit: Optional[int] = None,
+        include_attributes: bool = False,
+    ) -> pa.Table:
+        """Get time series data for a dataset as Arrow columns.
+
+        JSON attributes are projected with json_extract_string and values are
+        cast in DuckDB, so no per-row work happens in Python. Non-numeric
+        observation values become a null obs_value with the raw value as
+        obs_status (unless the observation has an explicit status).
+
+        Args:
+            dataset_id: ISTAT dataset identifier
+            territory_code: Optional territory filter
+            measure_code: Optional measure filter
+            start_year: Optional start year filter
+            end_year: Optional end year filter
+            limit: Optional maximum number of points
+            include_attributes: Add the raw additional_attributes JSON column
+
+        Returns:
+            Table with TIME_SERIES_SCHEMA columns (empty if the dataset is
+            unknown or no observations have been ingested)
+
+        Raises:
+            QueryTimeoutError: If the query exceeded its time budget
+            QueryCancelledError: If the query was cancelled
+        """
+        schema = TIME_SERIES_SCHEMA
+        if include_attributes:
+            schema = schema.append(pa.field("additional_attributes", pa.string()))
+
         try:
             # Verify dataset exists in metadata
             dataset_metadata = self.dataset_manager.get_dataset(dataset_id)
             if not dataset_metadata:
                 logger.warning(f"Dataset {dataset_id} not found in metadata registry")
-                return []
+                return schema.empty_table()
 
-            # Build query conditions
-            query_params = [dataset_id]
-            conditions = []
+            # Filters on projected columns, applied around the dataset scan
+            conditions = ["TRUE"]
+            query_params: dict[str, Any] = {"dataset_id": dataset_id}
 
             if territory_code:
-                conditions.append("o.territory_code = ?")
-                query_params.append(territory_code)
+                conditions.append("territory_code = $territory_code")
+                query_params["territory_code"] = territory_code
 
             if measure_code:
-                conditions.append("o.measure_code = ?")
-                query_params.append(measure_code)
+                conditions.append("measure_code = $measure_code")
+                query_params["measure_code"] = measure_code
 
             if start_year:
-                conditions.append("d.year >= ?")
-                query_params.append(start_year)
+                conditions.append("period_year >= $start_year")
+                query_params["start_year"] = start_year
 
             if end_year:
-                conditions.append("d.year <= ?")
-                query_params.append(end_year)
+                conditions.append("period_year <= $end_year")
+                query_params["end_year"] = end_year
 
-            where_clause = " AND " + " AND ".join(conditions) if conditions else ""
-
-            # Execute time series query - updated for correct schema
-            base_query = """
+            query = f"""
                 SELECT
-                    o.dataset_id,
-                    o.time_period,
-                    o.obs_value,
-                    o.record_id,
-                    o.ingestion_timestamp,
-                    o.additional_attributes
-                FROM istat_observations o
-                WHERE o.dataset_id = ?"""
-
-            # Update conditions for correct field names (since we don't have the JOIN anymore)
-            conditions = []
-            query_params = [dataset_id]
+                    dataset_id,
+                    time_period,
+                    year,
+                    obs_value,
+                    record_id,
+                    ingestion_timestamp,
+                    territory_code,
+                    territory_name,
+                    measure_code,
+                    measure_name,
+                    COALESCE(
+                        obs_status,
+                        CASE WHEN obs_value IS NULL AND raw_value <> ''
+                             THEN raw_value END
+                    ) AS obs_status
+                    {", additional_attributes" if include_attributes else ""}
+                FROM (
+                    SELECT
+                        o.dataset_id,
+                        o.time_period,
+                        CASE WHEN regexp_full_match(o.time_period, '[0-9]+')
+                             THEN TRY_CAST(o.time_period AS INTEGER) END AS year,
+                        TRY_CAST(substr(o.time_period, 1, 4) AS INTEGER)
+                            AS period_year,
+                        TRY_CAST(o.obs_value AS DOUBLE) AS obs_value,
+                        o.obs_value AS raw_value,
+                        CAST(o.record_id AS INTEGER) AS record_id,
+                        CAST(o.ingestion_timestamp AS VARCHAR)
+                            AS ingestion_timestamp,
+                        json_extract_string(o.additional_attributes, '$.territory_code')
+                            AS territory_code,
+                        json_extract_string(o.additional_attributes, '$.territory_name')
+                            AS territory_name,
+                        json_extract_string(o.additional_attributes, '$.measure_code')
+                            AS measure_code,
+                        json_extract_string(o.additional_attributes, '$.measure_name')
+                            AS measure_name,
+                        json_extract_string(o.additional_attributes, '$.obs_status')
+                            AS obs_status,
+                        CAST(o.additional_attributes AS VARCHAR)
+                            AS additional_attributes
+                    FROM main.istat_observations o
+                    WHERE o.dataset_id = $dataset_id
+                ) o
+                WHERE {" AND ".join(conditions)}
+                ORDER BY time_period ASC, record_id ASC
+            """
+            if limit:
+                query += f" LIMIT {int(limit)}"
 
-            if territory_code:
-                conditions.append(
-                    "JSON_EXTRACT(o.additional_attributes, '$.territory_code') = ?"
-                )
-                query_params.append(territory_code)
+            table = self.analytics_manager.execute_arrow(query, query_params)
+            return table.cast(schema)
 
-            if measure_code:
-                conditions.append(
-                    "JSON_EXTRACT(o.additional_attributes, '$.measure_code') = ?"
-                )
-                query_params.append(measure_code)
+        except duckdb.CatalogException as e:
+            # Nothing ingested yet: main.istat_observations does not exist
+            logger.warning(f"No observations for {dataset_id}: {e}")
+            return schema.empty_table()
+        except Exception as e:
+            logger.error(f"Failed to get time series for {dataset_id}: {e}")
+            raise
 
-            if start_year:
-                conditions.append("CAST(o.time_period AS INTEGER) >= ?")
-                query_params.append(start_year)
+    def query_observations(
+        self,
+        dataset_id: str,
+        condition: Optional[Union[FilterCondition, ConditionGroup]] = None,
+        order_by: Sequence[tuple[str, bool]] = (),
+        columns: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        after: Optional[list[Any]] = None,
+    ) -> pa.Table:
+        """Query the OData Observation entities of a dataset in DuckDB.
+
+        Filtering, ordering and paging all run in DuckDB, so only the rows
+        of the requested page are materialized.
 
-            if end_year:
-                conditions.append("CAST(o.time_period AS INTEGER) <= ?")
-                query_params.append(end_year)
+        Args:
+            dataset_id: ISTAT dataset identifier
+            condition: Optional condition on ODATA_OBSERVATIONS_SCHEMA columns
+            order_by: (column, descending) sort keys
+            columns: Columns to return (default: all)
+            limit: Optional maximum number of rows
+            offset: Optional number of rows to skip
+            after: Keyset values of the last row of the previous page, one
+                per sort key (instead of offset)
 
-            where_clause = " AND " + " AND ".join(conditions) if conditions else ""
+        Returns:
+            Table with the requested ODATA_OBSERVATIONS_SCHEMA columns (empty
+            if the dataset is unknown or has no observations)
+        """
+        columns = list(columns or ODATA_OBSERVATIONS_SCHEMA.names)
+        self._check_observation_columns([*columns, *(key for key, _ in order_by)])
+        schema = pa.schema([ODATA_OBSERVATIONS_SCHEMA.field(name) for name in columns])
+
+        if not self._observations_available(dataset_id):
+            return schema.empty_table()
+
+        builder = self._observations_query(dataset_id, condition).select(*columns)
+        for column, descending in order_by:
+            builder.order_by(
+                column,
+                "DESC" if descending else "ASC",
+                nullable=ODATA_OBSERVATIONS_SCHEMA.field(column).nullable,
+            )
+        if after is not None:
+            builder.after(after)
+        if limit is not None:
+            builder.limit(limit)
+        if offset:
+            builder.offset(offset)
+
+        return builder.execute_arrow().cast(schema)
 
-            query = (
-                base_query
-                + where_clause
-                + " ORDER BY o.time_period ASC, o.record_id ASC"
+    def count_observations(
+        self,
+        dataset_id: str,
+        condition: Optional[Union[FilterCondition, ConditionGroup]] = None,
+    ) -> int:
+        """Count the OData Observation entities of a dataset in DuckDB.
+
+        Args:
+            dataset_id: ISTAT dataset identifier
+            condition: Optional condition on ODATA_OBSERVATIONS_SCHEMA columns
+
+        Returns:
+            Number of matching observations
+        """
+        if not self._observations_available(dataset_id):
+            return 0
+        return self._observations_query(dataset_id, condition).count()
+
+    def aggregate_observations(
+        self,
+        dataset_id: str,
+        group_by: Sequence[str] = (),
+        aggregates: Sequence[tuple[str, str, str]] = (),
+        condition: Optional[Union[FilterCondition, ConditionGroup]] = None,
+        having: Optional[Union[FilterCondition, ConditionGroup]] = None,
+        order_by: Sequence[tuple[str, bool]] = (),
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        after: Optional[list[Any]] = None,
+    ) -> pa.Table:
+        """Aggregate the OData Observation entities of a dataset in DuckDB.
+
+        Compiles to one GROUP BY query, so only the aggregated rows leave
+        DuckDB.
+
+        Args:
+            dataset_id: ISTAT dataset identifier
+            group_by: ODATA_OBSERVATIONS_SCHEMA columns to group by
+            aggregates: (column, function, alias) with a function from
+                OBSERVATION_AGGREGATES
+            condition: Optional condition on the observations (WHERE)
+            having: Optional condition on the grouped columns and aliases
+            order_by: (column, descending) sort keys on the output columns
+            limit: Optional maximum number of rows
+            offset: Optional number of rows to skip
+            after: Keyset values of the last row of the previous page, one
+                per sort key (instead of offset)
+
+        Returns:
+            Table with the group_by columns followed by the aliases (empty if
+            the dataset is unknown or has no observations)
+
+        Raises:
+            ValueError: If a column, function or alias is invalid
+        """
+        schema = self._aggregate_schema(group_by, aggregates)
+        unknown = {key for key, _ in order_by} - set(schema.names)
+        if unknown:
+            raise ValueError(f"Unknown aggregate columns: {sorted(unknown)}")
+
+        # Without grouping there is exactly one row, so nothing follows it
+        if not self._observations_available(dataset_id) or (
+            after is not None and not group_by
+        ):
+            return schema.empty_table()
+
+        builder = self._aggregate_query(
+            dataset_id, group_by, aggregates, condition, having
+        )
+        for column, descending in order_by:
+            builder.order_by(
+                column,
+                "DESC" if descending else "ASC",
+                nullable=schema.field(column).nullable,
             )
+        if after is not None:
+            builder.after(after)
+        if limit is not None:
+            builder.limit(limit)
+        if offset:
+            builder.offset(offset)
 
-            results = self.analytics_manager.execute_query(query, query_params)
+        return builder.execute_arrow().cast(schema)
 
-            # Convert to dictionary format
-            time_series = []
-            for row in results:
-                # Parse additional attributes if available
-                additional_attrs = {}
-                try:
-                    import json
+    def count_observation_groups(
+        self,
+        dataset_id: str,
+        group_by: Sequence[str] = (),
+        aggregates: Sequence[tuple[str, str, str]] = (),
+        condition: Optional[Union[FilterCondition, ConditionGroup]] = None,
+        having: Optional[Union[FilterCondition, ConditionGroup]] = None,
+    ) -> int:
+        """Count the rows aggregate_observations() returns without paging.
 
-                    additional_attrs = json.loads(row[5]) if row[5] else {}
-                except (json.JSONDecodeError, TypeError, AttributeError):
-                    additional_attrs = {}
+        Args:
+            dataset_id: ISTAT dataset identifier
+            group_by: ODATA_OBSERVATIONS_SCHEMA columns to group by
+            aggregates: (column, function, alias) with a function from
+                OBSERVATION_AGGREGATES
+            condition: Optional condition on the observations (WHERE)
+            having: Optional condition on the grouped columns and aliases
 
-                # Parse obs_value to float, handle non-numeric values
-                obs_value = row[2]
-                try:
-                    obs_value_float = (
-                        float(obs_value) if obs_value is not None else None
-                    )
-                except (ValueError, TypeError):
-                    # If value is not numeric, keep as status flag
-                    obs_value_float = None
-                    if obs_value and not additional_attrs.get("obs_status"):
-                        additional_attrs["obs_status"] = obs_value
-
-                time_series.append(
-                    {
-                        "dataset_id": row[0],
-                        "time_period": row[1],
-                        "year": int(row[1])
-                        if row[1] and str(row[1]).isdigit()
-                        else None,
-                        "obs_value": obs_value_float,
-                        "record_id": row[3],
-                        "ingestion_timestamp": row[4],
-                        "territory_code": additional_attrs.get("territory_code"),
-                        "territory_name": additional_attrs.get("territory_name"),
-                        "measure_code": additional_attrs.get("measure_code"),
-                        "measure_name": additional_attrs.get("measure_name"),
-                        "obs_status": additional_attrs.get("obs_status"),
-                        "additional_attributes": additional_attrs,
-                    }
-                )
+        Returns:
+            Number of groups
+        """
+        self._aggregate_schema(group_by, aggregates)
+        if not self._observations_available(dataset_id):
+            return 0
+        if not group_by and having is None:
+            return 1
+        builder = self._aggregate_query(
+            dataset_id, group_by, aggregates, condition, having
+        )
+        return builder.count()
 
-            # Update dataset statistics
-            if time_series:
-                self.dataset_manager.update_dataset_stats(
-                    dataset_id, record_count=len(time_series)
-                )
+    def _aggregate_query(
+        self,
+        dataset_id: str,
+        group_by: Sequence[str],
+        aggregates: Sequence[tuple[str, str, str]],
+        condition: Optional[Union[FilterCondition, ConditionGroup]],
+        having: Optional[Union[FilterCondition, ConditionGroup]],
+    ) -> DuckDBQueryBuilder:
+        """Build the GROUP BY query of aggregate_observations()."""
+        columns = list(group_by) + [
+            f"{OBSERVATION_AGGREGATES[function].format(column)} AS {alias}"
+            for column, function, alias in aggregates
+        ]
+        builder = self._observations_query(dataset_id, condition)
+        builder.select(*columns)
+        if group_by:
+            builder.group_by(*group_by)
+        if having is not None:
+            builder.having_condition(having)
+        return builder
+
+    @staticmethod
+    def _aggregate_schema(
+        group_by: Sequence[str], aggregates: Sequence[tuple[str, str, str]]
+    ) -> pa.Schema:
+        """Validate an aggregation and return the schema of its output."""
+        if not group_by and not aggregates:
+            raise ValueError("Aggregation needs group_by columns or aggregates")
+        UnifiedDataRepository._check_observation_columns(
+            [*group_by, *(column for column, _, _ in aggregates)]
+        )
+
+        fields = [ODATA_OBSERVATIONS_SCHEMA.field(column) for column in group_by]
+        for column, function, alias in aggregates:
+            source = ODATA_OBSERVATIONS_SCHEMA.field(column)
+            if function not in OBSERVATION_AGGREGATES:
+                raise ValueError(f"Unknown aggregate function: {function}")
+            if not alias.isidentifier() or alias in ODATA_OBSERVATIONS_SCHEMA.names:
+                raise ValueError(f"Invalid aggregate alias: {alias}")
+            if function == "count_distinct":
+                fields.append(pa.field(alias, pa.int64(), nullable=False))
+            elif function in ("min", "max"):
+                fields.append(pa.field(alias, source.type))
+            elif not (
+                pa.types.is_integer(source.type) or pa.types.is_floating(source.type)
+            ):
+                raise ValueError(f"{function} needs a numeric column, not {column}")
+            elif function == "sum" and pa.types.is_integer(source.type):
+                fields.append(pa.field(alias, pa.int64()))
+            else:
+                fields.append(pa.field(alias, pa.float64()))
+
+        names = [field.name for field in fields]
+        if len(set(names)) < len(names):
+            raise ValueError(f"Duplicate aggregate output columns: {names}")
+        return pa.schema(fields)
+
+    def _observations_query(
+        self,
+        dataset_id: str,
+        condition: Optional[Union[FilterCondition, ConditionGroup]],
+    ) -> DuckDBQueryBuilder:
+        """Start a query on the observations of one dataset."""
+        builder = DuckDBQueryBuilder(self.analytics_manager)
+        builder.from_table("main.odata_observations").where(
+            "DatasetId", FilterOperator.EQ, dataset_id
+        )
+        if condition is not None:
+            builder.where_condition(condition)
+        return builder
+
+    @staticmethod
+    def _check_observation_columns(columns: list[str]) -> None:
+        """Reject columns that are not Observation properties."""
+        unknown = set(columns) - set(ODATA_OBSERVATIONS_SCHEMA.names)
+        if unknown:
+            raise ValueError(f"Unknown observation columns: {sorted(unknown)}")
+
+    def _observations_available(self, dataset_id: str) -> bool:
+        """Check that a dataset is registered and the observation views exist."""
+        if not self.dataset_manager.get_dataset(dataset_id):
+            logger.warning(f"Dataset {dataset_id} not found in metadata registry")
+            return False
+        return self._observation_views_available()
 
-            return time_series
+    def _observation_views_available(self) -> bool:
+        """Create the observation views once observations have been ingested."""
+        if self._observations_view_ready:
+            return True
+        with self._lock:
+            if not self._observations_view_ready:
+                # Nothing ingested yet: check again on the next call
+                if not self.analytics_manager.table_exists("istat_observations"):
+                    return False
+                self.analytics_manager.execute_statement(ODATA_OBSERVATIONS_VIEW)
+                self._observations_view_ready = True
+        return True
 
+    def query_territories(
+        self,
+        condition: Optional[Union[FilterCondition, ConditionGroup]] = None,
+        order_by: Sequence[tuple[str, bool]] = (),
+        columns: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        after: Optional[list[Any]] = None,
+    ) -> pa.Table:
+        """Query the OData Territory entities in DuckDB.
+
+        Territories are the distinct territory codes of all datasets, with
+        their NUTS level and parent, read from the indexed dimension table
+        that refresh_dataset_stats() maintains.
+
+        Args:
+            condition: Optional condition on ODATA_TERRITORIES_SCHEMA columns
+            order_by: (column, descending) sort keys
+            columns: Columns to return (default: all)
+            limit: Optional maximum number of rows
+            offset: Optional number of rows to skip
+            after: Keyset values of the last row of the previous page, one
+                per sort key (instead of offset)
+
+        Returns:
+            Table with the requested ODATA_TERRITORIES_SCHEMA columns (empty
+            if nothing has been ingested)
+        """
+        return self._query_dimension(
+            "main.odata_territories",
+            ODATA_TERRITORIES_SCHEMA,
+            condition,
+            order_by,
+            columns,
+            limit,
+            offset,
+            after,
+        )
+
+    def count_territories(
+        self, condition: Optional[Union[FilterCondition, ConditionGroup]] = None
+    ) -> int:
+        """Count the OData Territory entities in DuckDB.
+
+        Args:
+            condition: Optional condition on ODATA_TERRITORIES_SCHEMA columns
+
+        Returns:
+            Number of matching territories
+        """
+        return self._count_dimension("main.odata_territories", condition)
+
+    def query_measures(
+        self,
+        condition: Optional[Union[FilterCondition, ConditionGroup]] = None,
+        order_by: Sequence[tuple[str, bool]] = (),
+        columns: Optional[list[str]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        after: Optional[list[Any]] = None,
+    ) -> pa.Table:
+        """Query the OData Measure entities in DuckDB.
+
+        Measures are the distinct measure codes of each dataset, with their
+        unit and whether all their values are integral, read from the
+        indexed dimension table that refresh_dataset_stats() maintains.
+
+        Args:
+            condition: Optional condition on ODATA_MEASURES_SCHEMA columns
+            order_by: (column, descending) sort keys
+            columns: Columns to return (default: all)
+            limit: Optional maximum number of rows
+            offset: Optional number of rows to skip
+            after: Keyset values of the last row of the previous page, one
+                per sort key (instead of offset)
+
+        Returns:
+            Table with the requested ODATA_MEASURES_SCHEMA columns (empty if
+            nothing has been ingested)
+        """
+        return self._query_dimension(
+            "main.odata_measures",
+            ODATA_MEASURES_SCHEMA,
+            condition,
+            order_by,
+            columns,
+            limit,
+            offset,
+            after,
+        )
+
+    def count_measures(
+        self, condition: Optional[Union[FilterCondition, ConditionGroup]] = None
+    ) -> int:
+        """Count the OData Measure entities in DuckDB.
+
+        Args:
+            condition: Optional condition on ODATA_MEASURES_SCHEMA columns
+
+        Returns:
+            Number of matching measures
+        """
+        return self._count_dimension("main.odata_measures", condition)
+
+    def _query_dimension(
+        self,
+        table: str,
+        schema: pa.Schema,
+        condition: Optional[Union[FilterCondition, ConditionGroup]],
+        order_by: Sequence[tuple[str, bool]],
+        columns: Optional[list[str]],
+        limit: Optional[int],
+        offset: Optional[int],
+        after: Optional[list[Any]],
+    ) -> pa.Table:
+        """Filter, order and page a dimension table in DuckDB."""
+        entity_schema = schema
+        columns = list(columns or entity_schema.names)
+        unknown = {*columns, *(key for key, _ in order_by)} - set(entity_schema.names)
+        if unknown:
+            raise ValueError(f"Unknown columns of {table}: {sorted(unknown)}")
+        schema = pa.schema([entity_schema.field(name) for name in columns])
+
+        if not self._dimensions_available():
+            return schema.empty_table()
+
+        builder = DuckDBQueryBuilder(self.analytics_manager)
+        builder.from_table(table).select(*columns)
+        if condition is not None:
+            builder.where_condition(condition)
+        for column, descending in order_by:
+            builder.order_by(
+                column,
+                "DESC" if descending else "ASC",
+                nullable=entity_schema.field(column).nullable,
+            )
+        if after is not None:
+            builder.after(after)
+        if limit is not None:
+            builder.limit(limit)
+        if offset:
+            builder.offset(offset)
+
+        return builder.execute_arrow().cast(schema)
+
+    def _count_dimension(
+        self,
+        table: str,
+        condition: Optional[Union[FilterCondition, ConditionGroup]],
+    ) -> int:
+        """Count the matching rows of a dimension table in DuckDB."""
+        if not self._dimensions_available():
+            return 0
+        builder = DuckDBQueryBuilder(self.analytics_manager).from_table(table)
+        if condition is not None:
+            builder.where_condition(condition)
+        return builder.count()
+
+    def _dimensions_available(self) -> bool:
+        """Check that the dimension tables exist, building them if needed."""
+        if self._dimensions_ready:
+            return True
+        with self._lock:
+            if not self._dimensions_ready:
+                # Databases ingested before the dimension tables existed
+                if (
+                    not self.analytics_manager.table_exists("odata_territories")
+                    and not self._refresh_dimensions()
+                ):
+                    return False
+                self._dimensions_ready = True
+        return True
+
+    def _refresh_dimensions(self, dataset_ids: Optional[list[str]] = None) -> bool:
+        """Rebuild the Territory and Measure dimensions of some datasets.
+
+        Replaces the rows of the given datasets in one transaction, then
+        upserts the territories they use and drops territories no dataset
+        uses any more.
+
+        Args:
+            dataset_ids: Datasets to refresh (all datasets if None)
+
+        Returns:
+            True if the dimensions were refreshed
+        """
+        if not self._observation_views_available():
+            return False
+        scope, params = "", None
+        if dataset_ids is not None:
+            scope = "WHERE DatasetId IN (SELECT unnest($1::VARCHAR[]))"
+            params = [list(dataset_ids)]
+
+        try:
+            with self._lock, self.analytics_manager.transaction() as conn:
+                for statement in ODATA_DIMENSION_TABLES:
+                    conn.execute(statement)
+                for template in _DIMENSION_REFRESH:
+                    # str.replace: the NUTS patterns contain braces
+                    statement = template.replace("{scope}", scope)
+                    conn.execute(statement, params if "$1" in statement else None)
+            return True
         except Exception as e:
-            logger.error(f"Failed to get time series for {dataset_id}: {e}")
-            return []
+            logger.warning(f"Failed to refresh OData dimensions: {e}")
+            return False
 
     # Categorization Rules Operations
 
@@ -851,7 +1712,7 @@ class UnifiedDataRepository:
                 },
                 "cache": {
                     "size": len(self._cache),
-                    "hit_rate": "pending_issue_63",  # Cache metrics to be implemented in Issue #63
+                    **self._cache.get_stats(),
                 },
                 "timestamp": datetime.now().isoformat(),
             }
@@ -864,32 +1725,16 @@ class UnifiedDataRepository:
 
     def _set_cache(self, key: str, value: Any, ttl_seconds: int):
         """Set cache value with TTL."""
-        with self._lock:
-            self._cache[key] = value
-            self._cache_ttl[key] = datetime.now().timestamp() + ttl_seconds
+        self._cache.set(key, value, ttl_seconds)
 
     def _get_cache(self, key: str) -> Any:
         """Get cache value if not expired."""
-        with self._lock:
-            if key not in self._cache:
-                return None
-
-            # Check TTL
-            if datetime.now().timestamp() > self._cache_ttl.get(key, 0):
-                # Expired, remove from cache
-                del self._cache[key]
-                if key in self._cache_ttl:
-                    del self._cache_ttl[key]
-                return None
-
-            return self._cache[key]
+        return self._cache.get(key)
 
     def clear_cache(self):
         """Clear all cached data."""
-        with self._lock:
-            self._cache.clear()
-            self._cache_ttl.clear()
-            logger.info("Cache cleared")
+        self._cache.clear()
+        logger.info("Cache cleared")
 
     # Context Managers
 
@@ -10,6 +10,9 @@ Tables:
 - api_credentials: API keys and authentication tokens
 - audit_log: System audit trail and logging
 - system_config: Application configuration and settings
+- dataset_stats: Precomputed analytics statistics per dataset (from DuckDB)
+- dataset_versions: Data version per dataset, for HTTP ETags
+- dataset_search: FTS5 full-text index over datasets and category keywords
 """
 
 import json
@@ -84,7 +87,8 @@ class MetadataSchema(BaseSQLiteManager):
                 name TEXT,
                 key_prefix TEXT,
                 revoked_at TIMESTAMP,
-                last_refresh TIMESTAMP
+                last_refresh TIMESTAMP,
+                key_id TEXT
             )
         """,
         "audit_log": """
@@ -116,6 +120,24 @@ class MetadataSchema(BaseSQLiteManager):
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """,
+        "dataset_stats": """
+            CREATE TABLE IF NOT EXISTS dataset_stats (
+                dataset_id TEXT PRIMARY KEY,
+                record_count INTEGER NOT NULL DEFAULT 0,
+                min_year INTEGER,
+                max_year INTEGER,
+                territory_count INTEGER NOT NULL DEFAULT 0,
+                measure_count INTEGER NOT NULL DEFAULT 0,
+                refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """,
+        "dataset_versions": """
+            CREATE TABLE IF NOT EXISTS dataset_versions (
+                dataset_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """,
         "schema_migrations": """
             CREATE TABLE IF NOT EXISTS schema_migrations (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -155,8 +177,113 @@ class MetadataSchema(BaseSQLiteManager):
         "CREATE INDEX IF NOT EXISTS idx_categorization_rules_category ON categorization_rules(category)",
         "CREATE INDEX IF NOT EXISTS idx_categorization_rules_active ON categorization_rules(is_active)",
         "CREATE INDEX IF NOT EXISTS idx_categorization_rules_priority ON categorization_rules(priority DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_dataset_versions_version ON dataset_versions(version)",
+    ]
+
+    # Active categorization rule keywords of a category, space separated
+    CATEGORY_KEYWORDS_SQL = """
+        (SELECT group_concat(k.value, ' ')
+         FROM categorization_rules c,
+              json_each(CASE WHEN json_valid(c.keywords_json)
+                             THEN c.keywords_json ELSE '[]' END) k
+         WHERE c.category = {category} AND c.is_active = 1)
+    """
+
+    # Full-text search index over dataset_registry, kept in sync by triggers.
+    # Rows are keyed by dataset_registry.id; the BEFORE INSERT trigger covers
+    # INSERT OR REPLACE, whose implicit delete does not fire delete triggers.
+    SEARCH_SQL = [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS dataset_search USING fts5(
+            dataset_id, name, description, category, keywords,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS dataset_search_bi
+        BEFORE INSERT ON dataset_registry BEGIN
+            DELETE FROM dataset_search WHERE rowid = (
+                SELECT id FROM dataset_registry WHERE dataset_id = NEW.dataset_id
+            );
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS dataset_search_ai
+        AFTER INSERT ON dataset_registry BEGIN
+            INSERT INTO dataset_search (
+                rowid, dataset_id, name, description, category, keywords
+            ) VALUES (
+                NEW.id, NEW.dataset_id, NEW.name, NEW.description, NEW.category,
+                {CATEGORY_KEYWORDS_SQL.format(category="NEW.category")}
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS dataset_search_ad
+        AFTER DELETE ON dataset_registry BEGIN
+            DELETE FROM dataset_search WHERE rowid = OLD.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS dataset_search_au
+        AFTER UPDATE OF dataset_id, name, description, category
+        ON dataset_registry BEGIN
+            DELETE FROM dataset_search WHERE rowid = OLD.id;
+            INSERT INTO dataset_search (
+                rowid, dataset_id, name, description, category, keywords
+            ) VALUES (
+                NEW.id, NEW.dataset_id, NEW.name, NEW.description, NEW.category,
+                {CATEGORY_KEYWORDS_SQL.format(category="NEW.category")}
+            );
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS categorization_rules_search_ai
+        AFTER INSERT ON categorization_rules BEGIN
+            UPDATE dataset_search
+            SET keywords = {CATEGORY_KEYWORDS_SQL.format(category="NEW.category")}
+            WHERE rowid IN (
+                SELECT id FROM dataset_registry WHERE category = NEW.category
+            );
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS categorization_rules_search_au
+        AFTER UPDATE ON categorization_rules BEGIN
+            UPDATE dataset_search
+            SET keywords = {CATEGORY_KEYWORDS_SQL.format(category="OLD.category")}
+            WHERE rowid IN (
+                SELECT id FROM dataset_registry WHERE category = OLD.category
+            );
+            UPDATE dataset_search
+            SET keywords = {CATEGORY_KEYWORDS_SQL.format(category="NEW.category")}
+            WHERE rowid IN (
+                SELECT id FROM dataset_registry WHERE category = NEW.category
+            );
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS categorization_rules_search_ad
+        AFTER DELETE ON categorization_rules BEGIN
+            UPDATE dataset_search
+            SET keywords = {CATEGORY_KEYWORDS_SQL.format(category="OLD.category")}
+            WHERE rowid IN (
+                SELECT id FROM dataset_registry WHERE category = OLD.category
+            );
+        END
+        """,
     ]
 
+    SEARCH_REBUILD_SQL = f"""
+        INSERT INTO dataset_search (
+            rowid, dataset_id, name, description, category, keywords
+        )
+        SELECT r.id, r.dataset_id, r.name, r.description, r.category,
+               {CATEGORY_KEYWORDS_SQL.format(category="r.category")}
+        FROM dataset_registry r
+    """
+
     def __init__(self, db_path: Optional[str] = None):
         """Initialize the metadata schema manager.
 
@@ -193,6 +320,9 @@ class MetadataSchema(BaseSQLiteManager):
                 for index_sql in self.INDEXES_SQL:
                     conn.execute(index_sql)
 
+                # Create the full-text search index (optional, needs FTS5)
+                self.create_search_index(conn)
+
                 # Record schema version
                 conn.execute(
                     "INSERT OR REPLACE INTO schema_migrations (version, description) VALUES (?, ?)",
@@ -216,6 +346,37 @@ class MetadataSchema(BaseSQLiteManager):
             logger.error(f"Failed to create metadata schema: {e}")
             return False
 
+    @classmethod
+    def create_search_index(cls, conn: sqlite3.Connection) -> bool:
+        """Create the dataset_search FTS5 index and its sync triggers.
+
+        The index is populated from dataset_registry when it is first created,
+        so it can be added to existing databases.
+
+        Args:
+            conn: Open connection (inside a transaction)
+
+        Returns:
+            bool: True if the index is available, False if SQLite lacks FTS5.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dataset_search'"
+        ).fetchone()
+        if exists:
+            return True
+
+        try:
+            conn.execute(cls.SCHEMA_SQL["dataset_registry"])
+            conn.execute(cls.SCHEMA_SQL["categorization_rules"])
+            for sql in cls.SEARCH_SQL:
+                conn.execute(sql)
+            conn.execute(cls.SEARCH_REBUILD_SQL)
+            logger.debug("Dataset full-text search index created")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text search index unavailable: {e}")
+            return False
+
     def _insert_default_config(self, conn: sqlite3.Connection) -> None:
         """Insert default system configuration."""
         default_configs = [
@@ -13,6 +13,8 @@ except ImportError:
     from src.utils.logger import get_logger
 
 from database.sqlite.repository import get_unified_repository
+from src.database.duckdb.executor import QueryCancelledError, QueryTimeoutError
+from src.database.duckdb.manager import get_manager
 
 logger = get_logger(__name__)
 
@@ -44,12 +46,15 @@ class ExportDataAccess:
 
         Returns:
             DataFrame with requested data
+
+        Raises:
+            QueryTimeoutError: If the query exceeded its time budget
+            QueryCancelledError: If the query was cancelled (client gone)
         """
         try:
-            # Direct DuckDB query to get actual data from main schema
-            from database.duckdb.manager import DuckDBManager
-
-            duckdb = DuckDBManager()
+            # Direct DuckDB query to get actual data from main schema, on the
+            # shared manager so the executor's budget and cancellation apply
+            duckdb = get_manager()
 
             # Build query for the actual schema
             query = "SELECT * FROM main.istat_observations WHERE dataset_id = ?"
@@ -110,6 +115,8 @@ class ExportDataAccess:
                 logger.warning(f"No data found for dataset {dataset_id}")
                 return pd.DataFrame()
 
+        except (QueryTimeoutError, QueryCancelledError):
+            raise
         except Exception as e:
             logger.error(f"Error fetching dataset data for {dataset_id}: {e}")
             return pd.DataFrame()
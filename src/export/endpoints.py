@@ -6,7 +6,7 @@ Provides REST API endpoints for exporting datasets in CSV, JSON, and Parquet for
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
 from fastapi.responses import StreamingResponse
 
 try:
@@ -14,11 +14,12 @@ try:
 except ImportError:
     from src.utils.logger import get_logger
 
+from src.api.conditional import make_etag, not_modified_response, set_etag
 from src.api.dependencies import (
-    check_rate_limit,
-    get_current_user,
+    authorize_request,
+    get_repository,
     handle_api_errors,
-    log_api_request,
+    run_query,
 )
 
 from .data_access import ExportDataAccess
@@ -34,6 +35,7 @@ export_router = APIRouter(prefix="/export", tags=["Export"])
 @export_router.get("/datasets/{dataset_id}")
 @handle_api_errors
 async def export_dataset(
+    request: Request,
     dataset_id: str = Path(..., description="Dataset ID to export"),
     format: str = Query(..., description="Export format", regex="^(csv|json|parquet)$"),
     columns: Optional[str] = Query(
@@ -59,9 +61,8 @@ async def export_dataset(
     stream: Optional[bool] = Query(
         None, description="Force streaming response (auto-detected for large datasets)"
     ),
-    current_user=Depends(get_current_user),
-    _rate_limit=Depends(check_rate_limit),
-    _log_request=Depends(log_api_request),
+    repository=Depends(get_repository),
+    current_user=Depends(authorize_request),
 ):
     """
     Export dataset in specified format with optional filtering.
@@ -87,6 +88,12 @@ async def export_dataset(
     )
 
     try:
+        # Unchanged data: 304 before any data access
+        etag = make_etag(request, repository.get_data_version(dataset_id))
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
         # Initialize data access and exporters
         data_access = ExportDataAccess()
         universal_exporter = UniversalExporter()
@@ -115,8 +122,11 @@ async def export_dataset(
             f"Export size estimation: {size_info['row_count']} rows, streaming: {use_streaming}"
         )
 
-        # Fetch data
-        df = data_access.get_dataset_data(
+        # Fetch data (off the event loop, bounded by the export time budget)
+        df = await run_query(
+            request,
+            data_access.get_dataset_data,
+            endpoint_class="export",
             dataset_id=dataset_id,
             columns=column_list,
             start_date=start_date,
@@ -130,8 +140,11 @@ async def export_dataset(
             )
             # Return empty response with appropriate content type
             if use_streaming:
-                return streaming_exporter.create_streaming_response(
-                    df, format, dataset_id
+                return set_etag(
+                    etag,
+                    streaming_exporter.create_streaming_response(
+                        df, format, dataset_id
+                    ),
                 )
             else:
                 empty_export = universal_exporter.export_dataframe(
@@ -141,20 +154,28 @@ async def export_dataset(
                 file_ext = universal_exporter.get_file_extension(format)
                 filename = f"{dataset_id}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}{file_ext}"
 
-                return StreamingResponse(
-                    iter(
-                        [empty_export]
-                        if isinstance(empty_export, str)
-                        else [empty_export]
+                return set_etag(
+                    etag,
+                    StreamingResponse(
+                        iter(
+                            [empty_export]
+                            if isinstance(empty_export, str)
+                            else [empty_export]
+                        ),
+                        media_type=content_type,
+                        headers={
+                            "Content-Disposition": f"attachment; filename={filename}"
+                        },
                     ),
-                    media_type=content_type,
-                    headers={"Content-Disposition": f"attachment; filename={filename}"},
                 )
 
         # Choose export method based on dataset size
         if use_streaming:
             logger.info(f"Using streaming export for {len(df)} rows")
-            return streaming_exporter.create_streaming_response(df, format, dataset_id)
+            return set_etag(
+                etag,
+                streaming_exporter.create_streaming_response(df, format, dataset_id),
+            )
         else:
             logger.info(f"Using standard export for {len(df)} rows")
 
@@ -173,14 +194,17 @@ async def export_dataset(
             file_ext = universal_exporter.get_file_extension(format)
             filename = f"{dataset_id}_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}{file_ext}"
 
-            return StreamingResponse(
-                iter(
-                    [exported_data]
-                    if isinstance(exported_data, str)
-                    else [exported_data]
+            return set_etag(
+                etag,
+                StreamingResponse(
+                    iter(
+                        [exported_data]
+                        if isinstance(exported_data, str)
+                        else [exported_data]
+                    ),
+                    media_type=content_type,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"},
                 ),
-                media_type=content_type,
-                headers={"Content-Disposition": f"attachment; filename={filename}"},
             )
 
     except HTTPException:
@@ -197,9 +221,7 @@ async def export_dataset(
 @handle_api_errors
 async def get_export_info(
     dataset_id: str = Path(..., description="Dataset ID"),
-    current_user=Depends(get_current_user),
-    _rate_limit=Depends(check_rate_limit),
-    _log_request=Depends(log_api_request),
+    current_user=Depends(authorize_request),
 ):
     """
     Get export information for a dataset including size estimates and available columns.
@@ -263,8 +285,7 @@ async def get_export_info(
 
 @export_router.get("/formats")
 async def get_supported_formats(
-    current_user=Depends(get_current_user),
-    _rate_limit=Depends(check_rate_limit),
+    current_user=Depends(authorize_request),
 ):
     """Get list of supported export formats with descriptions."""
 
@@ -319,6 +340,7 @@ async def get_supported_formats(
 # TEMPORARY: Test endpoint without authentication for Issue #150 testing
 @export_router.get("/test/datasets/{dataset_id}")
 async def test_export_dataset(
+    request: Request,
     dataset_id: str = Path(..., description="Dataset ID to export"),
     format: str = Query(..., description="Export format", regex="^(csv|json|parquet)$"),
     columns: Optional[str] = Query(
@@ -357,8 +379,11 @@ async def test_export_dataset(
             column_list = [col.strip() for col in columns.split(",") if col.strip()]
             logger.debug(f"Column filter applied: {column_list}")
 
-        # Fetch data
-        df = data_access.get_dataset_data(
+        # Fetch data (off the event loop, bounded by the export time budget)
+        df = await run_query(
+            request,
+            data_access.get_dataset_data,
+            endpoint_class="export",
             dataset_id=dataset_id,
             columns=column_list,
             limit=limit,
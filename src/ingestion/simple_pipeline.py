@@ -202,6 +202,7 @@ class SimpleIngestionPipeline:
                             "records_count": existing_count,
                         },
                     )
+                    self.repository.refresh_dataset_stats([dataset_id])
                     logger.info(
                         f"✅ Metadata registered for skipped dataset {dataset_id}"
                     )
@@ -722,6 +723,9 @@ class SimpleIngestionPipeline:
                 logger.debug(f"Metadata registration failed for {dataset_id}: {e}")
                 # Non-critical - skip logic now uses DuckDB directly
 
+            # Keep precomputed analytics stats current for dataset listings
+            self.repository.refresh_dataset_stats([dataset_id])
+
             logger.info(f"Dataset metadata for {dataset_id}: {metadata}")
 
         except Exception as e:
@@ -0,0 +1,328 @@
+"""Bounded in-process caches.
+
+A BoundedCache holds at most ``max_entries`` values and ``max_bytes`` of
+(estimated) payload, expires entries after their TTL and evicts by LRU or
+LFU order when full. Every cache belongs to a namespace; statistics for all
+live caches are available from get_cache_stats(), and a single daemon thread
+sweeps expired entries so that keys which are never read again do not
+accumulate in long-running processes.
+"""
+
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+try:
+    from utils.logger import get_logger
+except ImportError:
+    from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_CONFIG = {
+    "max_entries": int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+    "max_bytes": int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    "default_ttl": float(os.getenv("CACHE_DEFAULT_TTL", "1800")),
+    # Seconds between background expiry sweeps; 0 disables the sweeper
+    "sweep_interval": float(os.getenv("CACHE_SWEEP_INTERVAL", "60")),
+}
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+_MISSING = object()
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Estimate the memory held by a cached value in bytes.
+
+    Follows the common containers a few levels deep; other objects count
+    with their shallow size.
+    """
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    return size
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+    hits: int = 0
+
+
+class BoundedCache:
+    """Thread-safe TTL cache bounded by entry count and estimated size."""
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        default_ttl: Optional[float] = None,
+        policy: str = "lru",
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            namespace: Name reported in get_cache_stats()
+            max_entries: Maximum number of entries (CACHE_CONFIG default)
+            max_bytes: Maximum estimated payload size, 0 for no limit
+                (CACHE_CONFIG default)
+            default_ttl: TTL in seconds for set() without ttl
+            policy: Eviction order when full, "lru" or "lfu"
+            sizeof: Size estimator for values (estimate_size by default)
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+
+        self.namespace = namespace
+        self.max_entries = (
+            CACHE_CONFIG["max_entries"] if max_entries is None else max_entries
+        )
+        self.max_bytes = CACHE_CONFIG["max_bytes"] if max_bytes is None else max_bytes
+        self.default_ttl = (
+            CACHE_CONFIG["default_ttl"] if default_ttl is None else default_ttl
+        )
+        self.policy = policy
+        self._sizeof = sizeof or estimate_size
+
+        self._lock = threading.RLock()
+        # Recency order (LRU): least recently used first
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        # Frequency buckets (LFU): hits -> keys in recency order
+        self._buckets: dict[int, OrderedDict[Hashable, None]] = {}
+        self._bytes = 0
+        self._stats = dict.fromkeys(
+            ("hits", "misses", "sets", "evictions", "expirations"), 0
+        )
+
+        _register(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+
+            self._stats["hits"] += 1
+            self._touch(key, entry)
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time to live in seconds (default_ttl if None)
+
+        Returns:
+            False if the value alone exceeds max_bytes and was not stored
+        """
+        size = self._sizeof(value)
+        ttl = self.default_ttl if ttl is None else ttl
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                return False
+
+            # Make room before inserting so that a new entry, which has no
+            # hits yet, is never the LFU victim of its own insertion
+            self._evict(size)
+            self._entries[key] = _Entry(value, time.monotonic() + ttl, size)
+            self._buckets.setdefault(0, OrderedDict())[key] = None
+            self._bytes += size
+            self._stats["sets"] += 1
+            return True
+
+    def get_or_set(
+        self, key: Hashable, factory: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        """Return the cached value, computing and storing it when missing."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key; returns True if it was present."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self) -> None:
+        """Remove all entries (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._bytes = 0
+
+    def expire(self) -> int:
+        """Remove all expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+            for key in expired:
+                self._remove(key)
+            self._stats["expirations"] += len(expired)
+            return len(expired)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return counters and current occupancy."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "policy": self.policy,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _touch(self, key: Hashable, entry: _Entry) -> None:
+        """Record a hit for the eviction order."""
+        self._entries.move_to_end(key)
+        bucket = self._buckets[entry.hits]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[entry.hits]
+        entry.hits += 1
+        self._buckets.setdefault(entry.hits, OrderedDict())[key] = None
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        bucket = self._buckets[entry.hits]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[entry.hits]
+        self._bytes -= entry.size
+
+    def _evict(self, incoming: int) -> None:
+        """Evict entries until one of size incoming fits, expired entries first."""
+        if not self._over_limit(incoming):
+            return
+        self.expire()
+        while self._over_limit(incoming):
+            if self.policy == "lfu":
+                key = next(iter(self._buckets[min(self._buckets)]))
+            else:
+                key = next(iter(self._entries))
+            self._remove(key)
+            self._stats["evictions"] += 1
+
+    def _over_limit(self, incoming: int) -> bool:
+        return bool(self._entries) and (
+            len(self._entries) >= self.max_entries
+            or bool(self.max_bytes and self._bytes + incoming > self.max_bytes)
+        )
+
+
+# Registry of live caches for stats and the background sweeper
+_caches: "weakref.WeakSet[BoundedCache]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
+_sweeper: Optional[threading.Thread] = None
+
+
+def _register(cache: BoundedCache) -> None:
+    global _sweeper
+    with _registry_lock:
+        _caches.add(cache)
+        interval = CACHE_CONFIG["sweep_interval"]
+        if interval > 0 and (_sweeper is None or not _sweeper.is_alive()):
+            _sweeper = threading.Thread(
+                target=_sweep_loop, args=(interval,), name="cache-sweeper", daemon=True
+            )
+            _sweeper.start()
+
+
+def _sweep_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        sweep_expired()
+
+
+def sweep_expired() -> int:
+    """Expire entries in every live cache.
+
+    Returns:
+        Number of entries removed
+    """
+    with _registry_lock:
+        caches = list(_caches)
+    removed = 0
+    for cache in caches:
+        try:
+            removed += cache.expire()
+        except Exception as e:
+            logger.warning(f"Cache sweep failed for {cache.namespace}: {e}")
+    return removed
+
+
+def get_cache_stats() -> dict[str, dict[str, Any]]:
+    """Return statistics of all live caches, aggregated per namespace."""
+    with _registry_lock:
+        caches = list(_caches)
+
+    stats: dict[str, dict[str, Any]] = {}
+    for cache in caches:
+        cache_stats = cache.get_stats()
+        current = stats.get(cache.namespace)
+        if current is None:
+            stats[cache.namespace] = {**cache_stats, "instances": 1}
+            continue
+        for key in (
+            "hits",
+            "misses",
+            "sets",
+            "evictions",
+            "expirations",
+            "entries",
+            "bytes",
+        ):
+            current[key] += cache_stats[key]
+        current["instances"] += 1
+        lookups = current["hits"] + current["misses"]
+        current["hit_rate"] = current["hits"] / lookups if lookups else 0.0
+    return stats
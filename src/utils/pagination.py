@@ -0,0 +1,74 @@
+"""Keyset pagination helpers.
+
+Continuation tokens are opaque to API clients: they carry the sort-key values
+of the last row of a page, so the next page can be fetched with a seek
+predicate instead of an OFFSET that grows with the page number.
+"""
+
+import base64
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any, Optional
+
+CURSOR_VERSION = 1
+
+
+def _cursor_default(value: Any) -> Any:
+    """JSON fallback for values found in sort keys (dates, numpy scalars)."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def encode_cursor(values: Sequence[Any], keys: Optional[Sequence[str]] = None) -> str:
+    """Encode sort-key values into an opaque continuation token.
+
+    Args:
+        values: Values of the sort keys for the last row of the page
+        keys: Names of the sort keys, stored to reject tokens reused with a
+            different ordering
+
+    Returns:
+        URL-safe continuation token
+    """
+    payload = {"v": CURSOR_VERSION, "k": list(keys or []), "p": list(values)}
+    raw = json.dumps(payload, default=_cursor_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, keys: Optional[Sequence[str]] = None) -> list[Any]:
+    """Decode a continuation token produced by encode_cursor.
+
+    Args:
+        token: Continuation token
+        keys: Expected sort keys; when given they must match the token
+
+    Returns:
+        List of sort-key values
+
+    Raises:
+        ValueError: If the token is malformed or was issued for another ordering
+    """
+    if not token or not isinstance(token, str):
+        raise ValueError("Invalid cursor")
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        raise ValueError("Invalid cursor")
+
+    values = payload.get("p")
+    if not isinstance(values, list) or not values:
+        raise ValueError("Invalid cursor")
+
+    if keys is not None and payload.get("k") != list(keys):
+        raise ValueError("Cursor does not match the requested ordering")
+
+    return values
@@ -69,6 +69,7 @@ class TestIstatStatusEndpoint:
     def test_status_endpoint_success(self, client, auth_headers):
         """Test status endpoint returns client status."""
         from src.api.dependencies import (
+            authorize_request,
             check_rate_limit,
             get_current_user,
             get_istat_client,
@@ -102,6 +103,7 @@ class TestIstatStatusEndpoint:
         app.dependency_overrides[get_istat_client] = lambda: mock_client
         app.dependency_overrides[check_rate_limit] = lambda: None
         app.dependency_overrides[log_api_request] = lambda: None
+        app.dependency_overrides[authorize_request] = lambda: mock_user
 
         try:
             response = client.get("/api/istat/status", headers=auth_headers)
@@ -120,6 +122,7 @@ class TestIstatStatusEndpoint:
     def test_status_endpoint_error(self, client, auth_headers):
         """Test status endpoint handles errors."""
         from src.api.dependencies import (
+            authorize_request,
             check_rate_limit,
             get_current_user,
             get_istat_client,
@@ -146,6 +149,7 @@ class TestIstatStatusEndpoint:
         app.dependency_overrides[get_istat_client] = lambda: mock_client
         app.dependency_overrides[check_rate_limit] = lambda: None
         app.dependency_overrides[log_api_request] = lambda: None
+        app.dependency_overrides[authorize_request] = lambda: mock_user
 
         try:
             response = client.get("/api/istat/status", headers=auth_headers)
@@ -169,6 +173,7 @@ class TestIstatDataflowsEndpoint:
     def test_dataflows_endpoint_success(self, client, auth_headers):
         """Test dataflows endpoint returns dataset list."""
         from src.api.dependencies import (
+            authorize_request,
             check_rate_limit,
             get_current_user,
             get_istat_client,
@@ -201,6 +206,7 @@ class TestIstatDataflowsEndpoint:
         app.dependency_overrides[get_istat_client] = lambda: mock_client
         app.dependency_overrides[check_rate_limit] = lambda: None
         app.dependency_overrides[log_api_request] = lambda: None
+        app.dependency_overrides[authorize_request] = lambda: mock_user
 
         try:
             response = client.get("/api/istat/dataflows?limit=5", headers=auth_headers)
@@ -228,6 +234,7 @@ class TestIstatDataflowsEndpoint:
     def test_dataflows_endpoint_with_cache_fallback(self, client, auth_headers):
         """Test dataflows endpoint with cache fallback."""
         from src.api.dependencies import (
+            authorize_request,
             check_rate_limit,
             get_current_user,
             get_istat_client,
@@ -260,6 +267,7 @@ class TestIstatDataflowsEndpoint:
         app.dependency_overrides[get_istat_client] = lambda: mock_client
         app.dependency_overrides[check_rate_limit] = lambda: None
         app.dependency_overrides[log_api_request] = lambda: None
+        app.dependency_overrides[authorize_request] = lambda: mock_user
 
         try:
             response = client.get("/api/istat/dataflows", headers=auth_headers)
@@ -280,6 +288,7 @@ class TestIstatDatasetEndpoint:
     def test_dataset_endpoint_success(self, client, auth_headers):
         """Test dataset endpoint returns dataset data."""
         from src.api.dependencies import (
+            authorize_request,
             check_rate_limit,
             get_current_user,
             get_istat_client,
@@ -316,6 +325,7 @@ class TestIstatDatasetEndpoint:
         app.dependency_overrides[get_istat_client] = lambda: mock_client
         app.dependency_overrides[check_rate_limit] = lambda: None
         app.dependency_overrides[log_api_request] = lambda: None
+        app.dependency_overrides[authorize_request] = lambda: mock_user
 
         try:
             response = client.get(
@@ -338,6 +348,7 @@ class TestIstatDatasetEndpoint:
     def test_dataset_endpoint_not_found(self, client, auth_headers):
         """Test dataset endpoint handles non-existent datasets."""
         from src.api.dependencies import (
+            authorize_request,
             check_rate_limit,
             get_current_user,
             get_istat_client,
@@ -375,6 +386,7 @@ class TestIstatDatasetEndpoint:
         app.dependency_overrides[get_istat_client] = lambda: mock_client
         app.dependency_overrides[check_rate_limit] = lambda: None
         app.dependency_overrides[log_api_request] = lambda: None
+        app.dependency_overrides[authorize_request] = lambda: mock_user
 
         try:
             response = client.get(
@@ -406,6 +418,7 @@ class TestIstatSyncEndpoint:
     def test_sync_endpoint_success(self, client, auth_headers):
         """Test sync endpoint successfully syncs dataset."""
         from src.api.dependencies import (
+            authorize_request,
             check_rate_limit,
             get_istat_client,
             log_api_request,
@@ -450,6 +463,7 @@ class TestIstatSyncEndpoint:
         app.dependency_overrides[get_istat_client] = lambda: mock_client
         app.dependency_overrides[check_rate_limit] = lambda: None
         app.dependency_overrides[log_api_request] = lambda: None
+        app.dependency_overrides[authorize_request] = lambda: mock_user
 
         try:
             sync_request = {"include_data": True, "force_refresh": False}
@@ -480,6 +494,7 @@ class TestIstatSyncEndpoint:
     def test_sync_endpoint_error(self, client, auth_headers):
         """Test sync endpoint handles sync errors."""
         from src.api.dependencies import (
+            authorize_request,
             check_rate_limit,
             get_istat_client,
             log_api_request,
@@ -505,6 +520,7 @@ class TestIstatSyncEndpoint:
         app.dependency_overrides[get_istat_client] = lambda: mock_client
         app.dependency_overrides[check_rate_limit] = lambda: None
         app.dependency_overrides[log_api_request] = lambda: None
+        app.dependency_overrides[authorize_request] = lambda: mock_user
 
         try:
             sync_request = {"include_data": True}
@@ -529,6 +545,7 @@ class TestIstatEndpointsIntegration:
     def test_complete_istat_workflow(self, client, auth_headers):
         """Test complete workflow: status -> dataflows -> dataset -> sync."""
         from src.api.dependencies import (
+            authorize_request,
             check_rate_limit,
             get_current_user,
             get_istat_client,
@@ -579,6 +596,7 @@ class TestIstatEndpointsIntegration:
         app.dependency_overrides[require_write] = lambda: mock_user
         app.dependency_overrides[check_rate_limit] = lambda: None
         app.dependency_overrides[log_api_request] = lambda: None
+        app.dependency_overrides[authorize_request] = lambda: mock_user
 
         try:
             # 1. Check status
@@ -8,9 +8,19 @@ and DuckDB analytics operations in the hybrid architecture.
 import tempfile
 import threading
 from datetime import datetime
+from unittest.mock import patch
 
+import duckdb
 import pytest
 
+from src.database.duckdb.config import get_duckdb_config
+from src.database.duckdb.executor import QueryTimeoutError
+from src.database.duckdb.manager import DuckDBManager
+from src.database.duckdb.query_builder import (
+    ConditionGroup,
+    FilterCondition,
+    FilterOperator,
+)
 from src.database.sqlite.repository import UnifiedDataRepository
 from src.database.sqlite.schema import MetadataSchema
 from tests.utils.database_cleanup import safe_database_cleanup
@@ -131,6 +141,325 @@ class TestUnifiedDataRepository:
         assert isinstance(datasets_with_analytics, list)
         assert isinstance(datasets_without_analytics, list)
 
+    @pytest.fixture
+    def analytics_repository(self, repository, temp_paths):
+        """Repository backed by a private DuckDB with ingested observations."""
+        _, duckdb_path = temp_paths
+        safe_database_cleanup(duckdb_path=duckdb_path)
+        config = get_duckdb_config().copy()
+        config["database"] = duckdb_path
+        manager = DuckDBManager(config)
+        manager.execute_statement(
+            "CREATE TABLE main.istat_observations (dataset_id VARCHAR, "
+            "record_id INTEGER, ingestion_timestamp VARCHAR, obs_value VARCHAR, "
+            "time_period VARCHAR, additional_attributes JSON)"
+        )
+        rows = [
+            ("STATS_A", "2020", "ITC1", "M1"),
+            ("STATS_A", "2021-Q1", "ITF3", "M1"),
+            ("STATS_A", "2022", "ITF3", "M2"),
+            ("STATS_B", "2019", "ITC1", "M1"),
+        ]
+        for record_id, (dataset_id, period, territory, measure) in enumerate(rows):
+            manager.execute_statement(
+                "INSERT INTO main.istat_observations VALUES (?, ?, '', '1', ?, ?)",
+                [
+                    dataset_id,
+                    record_id,
+                    period,
+                    f'{{"territory_code": "{territory}", "measure_code": "{measure}"}}',
+                ],
+            )
+
+        for dataset_id, priority in (("STATS_A", 9), ("STATS_B", 8), ("STATS_C", 7)):
+            repository.register_dataset_complete(
+                dataset_id, dataset_id, "stats", priority=priority
+            )
+        repository.analytics_manager = manager
+        yield repository
+        manager.close()
+
+    def test_refresh_dataset_stats(self, analytics_repository):
+        """Test that one grouped aggregate fills the precomputed stats."""
+        assert analytics_repository.refresh_dataset_stats() == 2
+
+        dataset = analytics_repository.get_dataset_complete("STATS_A")
+        assert dataset["analytics_stats"] == {
+            "record_count": 3,
+            "min_year": 2020,
+            "max_year": 2022,
+            "territory_count": 2,
+            "measure_count": 2,
+        }
+        assert dataset["record_count"] == 3
+        assert analytics_repository.get_dataset_complete("STATS_C")[
+            "analytics_stats"
+        ] == {"record_count": 0}
+
+    def test_list_datasets_complete_single_query(self, analytics_repository):
+        """Test that listing never queries DuckDB per dataset."""
+        analytics_repository.refresh_dataset_stats(["STATS_A", "STATS_B", "STATS_C"])
+        manager = analytics_repository.analytics_manager
+        calls = []
+        original = manager.execute_query
+        manager.execute_query = lambda *a, **kw: calls.append(a) or original(*a, **kw)
+
+        with_data = analytics_repository.list_datasets_complete(
+            category="stats", with_analytics=True
+        )
+        without_data = analytics_repository.list_datasets_complete(
+            category="stats", with_analytics=False
+        )
+
+        assert calls == []
+        assert [d["dataset_id"] for d in with_data] == ["STATS_A", "STATS_B"]
+        assert all(d["has_analytics_data"] for d in with_data)
+        assert [d["dataset_id"] for d in without_data] == ["STATS_C"]
+
+    def test_list_datasets_complete_pushdown_pagination(self, analytics_repository):
+        """Test that limit and keyset apply after the analytics filter."""
+        analytics_repository.refresh_dataset_stats()
+        keyset = analytics_repository.dataset_manager.KEYSET_COLUMNS
+
+        first = analytics_repository.list_datasets_complete(
+            category="stats", with_analytics=True, limit=1
+        )
+        after = [first[-1][key] for key in keyset]
+        second = analytics_repository.list_datasets_complete(
+            category="stats", with_analytics=True, limit=1, after=after
+        )
+
+        assert [d["dataset_id"] for d in first] == ["STATS_A"]
+        assert [d["dataset_id"] for d in second] == ["STATS_B"]
+
+    def test_time_series_columns(self, analytics_repository):
+        """Test the columnar time series path and its SQL-side filters."""
+        analytics_repository.analytics_manager.execute_statement(
+            "INSERT INTO main.istat_observations VALUES "
+            "('STATS_A', 9, '', ':', '2023', "
+            '\'{"territory_code": "ITC1", "measure_code": "M1"}\')'
+        )
+
+        table = analytics_repository.get_dataset_time_series_columns("STATS_A")
+        assert table.num_rows == 4
+        assert table.column("year").to_pylist() == [2020, None, 2022, 2023]
+        assert table.column("obs_value").to_pylist() == [1.0, 1.0, 1.0, None]
+        assert table.column("obs_status").to_pylist() == [None, None, None, ":"]
+
+        filtered = analytics_repository.get_dataset_time_series(
+            "STATS_A", territory_code="ITF3", start_year=2021, end_year=2022
+        )
+        assert [p["time_period"] for p in filtered] == ["2021-Q1", "2022"]
+        assert filtered[0]["measure_code"] == "M1"
+
+        limited = analytics_repository.get_dataset_time_series(
+            "STATS_A", limit=1, include_attributes=True
+        )
+        assert limited[0]["additional_attributes"]["territory_code"] == "ITC1"
+
+    def test_time_series_columns_errors(self, analytics_repository):
+        """Test that only a missing observations table reads as no data."""
+        manager = analytics_repository.analytics_manager
+        with patch.object(
+            manager, "execute_arrow", side_effect=QueryTimeoutError("budget")
+        ):
+            with pytest.raises(QueryTimeoutError):
+                analytics_repository.get_dataset_time_series_columns("STATS_A")
+
+        with patch.object(
+            manager, "execute_arrow", side_effect=duckdb.CatalogException("missing")
+        ):
+            table = analytics_repository.get_dataset_time_series_columns("STATS_A")
+        assert table.num_rows == 0
+
+    def test_query_observations_pushdown(self, analytics_repository):
+        """Test filtering, ordering, keyset paging and counting in DuckDB."""
+        condition = ConditionGroup(
+            [
+                FilterCondition("TerritoryCode", FilterOperator.EQ, "ITF3"),
+                FilterCondition("Year", FilterOperator.LT, 2021),
+            ],
+            conjunction="OR",
+        )
+
+        table = analytics_repository.query_observations(
+            "STATS_A", condition, order_by=[("Id", True)]
+        )
+        assert table.column("Id").to_pylist() == [2, 1, 0]
+        assert table.column("TimePeriod").to_pylist() == ["2022", "2021-Q1", "2020"]
+        assert table.column("Year").to_pylist() == [2022, None, 2020]
+        assert analytics_repository.count_observations("STATS_A", condition) == 3
+
+        page = analytics_repository.query_observations(
+            "STATS_A",
+            order_by=[("MeasureCode", True), ("Id", False)],
+            columns=["Id"],
+            limit=2,
+            after=["M1", 0],
+        )
+        assert page.column_names == ["Id"]
+        assert page.column("Id").to_pylist() == [1]
+
+        # Year is nullable: NULLs sort last and keyset paging reaches them
+        by_year = [("Year", True), ("Id", False)]
+        table = analytics_repository.query_observations("STATS_A", order_by=by_year)
+        assert table.column("Id").to_pylist() == [2, 0, 1]
+        page = analytics_repository.query_observations(
+            "STATS_A", order_by=by_year, after=[2020, 0]
+        )
+        assert page.column("Id").to_pylist() == [1]
+        page = analytics_repository.query_observations(
+            "STATS_A", order_by=by_year, after=[None, 1]
+        )
+        assert page.num_rows == 0
+
+        # Default OData order: time series, seeking on the stored columns
+        page = analytics_repository.query_observations(
+            "STATS_A",
+            order_by=[("TimePeriod", False), ("Id", False)],
+            limit=1,
+            after=["2020", 0],
+        )
+        assert page.column("TimePeriod").to_pylist() == ["2021-Q1"]
+
+        assert analytics_repository.query_observations("STATS_C").num_rows == 0
+        with pytest.raises(ValueError):
+            analytics_repository.query_observations("STATS_A", columns=["obs_value"])
+
+    def test_aggregate_observations(self, analytics_repository):
+        """Test grouping, aggregates, HAVING and keyset paging in one GROUP BY."""
+        aggregates = [
+            ("ObsValue", "sum", "Total"),
+            ("Year", "max", "LastYear"),
+            ("MeasureCode", "count_distinct", "Measures"),
+        ]
+        table = analytics_repository.aggregate_observations(
+            "STATS_A",
+            ["TerritoryCode"],
+            aggregates,
+            order_by=[("Total", True), ("TerritoryCode", False)],
+        )
+        assert table.to_pylist() == [
+            {"TerritoryCode": "ITF3", "Total": 2.0, "LastYear": 2022, "Measures": 2},
+            {"TerritoryCode": "ITC1", "Total": 1.0, "LastYear": 2020, "Measures": 1},
+        ]
+        assert str(table.schema.field("LastYear").type) == "int32"
+
+        having = FilterCondition("Total", FilterOperator.GT, 1)
+        assert (
+            analytics_repository.count_observation_groups(
+                "STATS_A", ["TerritoryCode"], aggregates, having=having
+            )
+            == 1
+        )
+        page = analytics_repository.aggregate_observations(
+            "STATS_A",
+            ["TerritoryCode"],
+            aggregates,
+            order_by=[("TerritoryCode", False)],
+            limit=1,
+            after=["ITC1"],
+        )
+        assert page.column("TerritoryCode").to_pylist() == ["ITF3"]
+
+        # Id is the record_id stored at ingestion
+        table = analytics_repository.aggregate_observations(
+            "STATS_A", ["MeasureCode"], [("Id", "max", "LastId")]
+        )
+        assert sorted(table.to_pylist(), key=lambda row: row["MeasureCode"]) == [
+            {"MeasureCode": "M1", "LastId": 1},
+            {"MeasureCode": "M2", "LastId": 2},
+        ]
+
+        # Aggregating without grouping yields a single row
+        mean = [("ObsValue", "avg", "Mean")]
+        condition = FilterCondition("TerritoryCode", FilterOperator.EQ, "ITF3")
+        table = analytics_repository.aggregate_observations(
+            "STATS_A", aggregates=mean, condition=condition
+        )
+        assert table.to_pylist() == [{"Mean": 1.0}]
+        assert analytics_repository.count_observation_groups("STATS_A", (), mean) == 1
+
+        for invalid in (
+            [("TerritoryCode", "sum", "Total")],
+            [("ObsValue", "median", "Total")],
+            [("ObsValue", "sum", "Year")],
+        ):
+            with pytest.raises(ValueError):
+                analytics_repository.aggregate_observations("STATS_A", (), invalid)
+
+    def test_odata_dimensions(self, analytics_repository):
+        """Test the Territory/Measure dimensions and their incremental refresh."""
+        by_code = [("TerritoryCode", False)]
+        # Built on first use for observations ingested before the tables
+        assert analytics_repository.query_territories(order_by=by_code).to_pylist() == [
+            {
+                "TerritoryCode": "ITC1",
+                "TerritoryName": None,
+                "Level": "Region",
+                "ParentCode": "ITC",
+            },
+            {
+                "TerritoryCode": "ITF3",
+                "TerritoryName": None,
+                "Level": "Region",
+                "ParentCode": "ITF",
+            },
+        ]
+        measure_key = [("DatasetId", False), ("MeasureCode", False)]
+        page = analytics_repository.query_measures(
+            order_by=measure_key,
+            columns=["MeasureCode", "DataType"],
+            after=["STATS_A", "M1"],
+        )
+        assert page.to_pylist() == [
+            {"MeasureCode": "M2", "DataType": "Integer"},
+            {"MeasureCode": "M1", "DataType": "Integer"},
+        ]
+
+        manager = analytics_repository.analytics_manager
+        manager.execute_statement(
+            "INSERT INTO main.istat_observations VALUES "
+            "('STATS_C', 9, '', '2.5', '2020', "
+            '\'{"territory_code": "ITC11", "measure_code": "M3", '
+            '"unit_measure": "EUR"}\')'
+        )
+        manager.execute_statement(
+            "DELETE FROM main.istat_observations WHERE dataset_id = 'STATS_A'"
+        )
+        analytics_repository.refresh_dataset_stats(["STATS_A", "STATS_C"])
+
+        # ITF3 was only used by STATS_A; ITC1 is still used by STATS_B
+        condition = FilterCondition("ParentCode", FilterOperator.EQ, "ITC1")
+        table = analytics_repository.query_territories(condition, columns=["Level"])
+        assert table.to_pylist() == [{"Level": "Province"}]
+        assert analytics_repository.query_territories(
+            order_by=by_code, columns=["TerritoryCode"]
+        ).column("TerritoryCode").to_pylist() == ["ITC1", "ITC11"]
+
+        condition = FilterCondition("DatasetId", FilterOperator.EQ, "STATS_C")
+        assert analytics_repository.query_measures(condition).to_pylist() == [
+            {
+                "DatasetId": "STATS_C",
+                "MeasureCode": "M3",
+                "MeasureName": None,
+                "Unit": "EUR",
+                "DataType": "Decimal",
+            }
+        ]
+        assert analytics_repository.count_measures() == 2
+        with pytest.raises(ValueError):
+            analytics_repository.query_measures(columns=["Level"])
+
+    def test_time_series_read_does_not_write_stats(self, analytics_repository):
+        """Test that reading a series leaves the registry untouched."""
+        before = analytics_repository.dataset_manager.get_dataset("STATS_A")
+
+        assert len(analytics_repository.get_dataset_time_series("STATS_A")) == 3
+
+        after = analytics_repository.dataset_manager.get_dataset("STATS_A")
+        assert after["record_count"] == before["record_count"]
+
     # User Preferences with Caching Tests
 
     def test_user_preferences_with_cache(self, repository):
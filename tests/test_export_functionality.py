@@ -10,6 +10,7 @@ from unittest.mock import Mock, patch
 import pandas as pd
 import pytest
 
+from src.database.duckdb.executor import QueryCancelledError, QueryTimeoutError
 from src.export.data_access import ExportDataAccess
 from src.export.streaming_exporter import StreamingExporter
 from src.export.universal_exporter import UniversalExporter
@@ -271,7 +272,7 @@ class TestExportDataAccess:
 
     @pytest.mark.skip(
         reason="KNOWN ISSUE: Test broken by design. ExportDataAccess.get_dataset_data() "
-        "creates DuckDBManager() instance directly, bypassing repository mocks. "
+        "queries the DuckDB manager directly, bypassing repository mocks. "
         "Requires refactoring to use dependency injection. "
         "See: src/export/data_access.py:52"
     )
@@ -311,6 +312,21 @@ class TestExportDataAccess:
 
         assert df.empty
 
+    @patch("src.export.data_access.get_manager")
+    def test_query_timeout_propagates(self, mock_get_manager):
+        """Test that timeouts and cancellations are not exported as empty data."""
+        mock_get_manager.return_value.execute_query.side_effect = QueryTimeoutError(
+            "budget exceeded"
+        )
+        with pytest.raises(QueryTimeoutError):
+            self.data_access.get_dataset_data("slow_dataset")
+
+        mock_get_manager.return_value.execute_query.side_effect = QueryCancelledError(
+            "client gone"
+        )
+        with pytest.raises(QueryCancelledError):
+            self.data_access.get_dataset_data("slow_dataset")
+
     def test_build_export_query(self):
         """Test SQL query building."""
         query = self.data_access._build_export_query(
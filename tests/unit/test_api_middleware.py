@@ -0,0 +1,209 @@
+"""
+Unit tests for the ASGI response header and compression middleware
+
+Tests that security, timing and rate limit headers are added in
+http.response.start, that streamed bodies are passed through chunk by
+chunk, and that only textual responses are compressed.
+"""
+
+import asyncio
+import gzip
+import zlib
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from src.api.middleware import CompressionMiddleware, ResponseHeadersMiddleware
+from src.auth.security_middleware import SecurityHeadersMiddleware
+
+CSV_BODY = "year,value\n" + "".join(f"{year},{year * 3}\n" for year in range(2000))
+
+
+def call_app(app, on_message=None, path="/", headers=None):
+    """Run one GET request through an ASGI app and return the sent messages."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [
+            (name.lower().encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ],
+        "query_string": b"",
+        "client": ("127.0.0.1", 1234),
+    }
+    messages = []
+
+    async def receive():
+        # No request body; the client stays connected
+        await asyncio.sleep(10)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if on_message:
+            on_message(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages
+
+
+def response_headers(messages):
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    return {name.decode(): value.decode() for name, value in start["headers"]}
+
+
+def response_body(messages):
+    return b"".join(m.get("body", b"") for m in messages if "body" in m)
+
+
+async def limited(request: Request):
+    request.state.rate_limit_headers = {"X-RateLimit-Limit": "100"}
+    return PlainTextResponse("ok", headers={"Cache-Control": "max-age=60"})
+
+
+def test_security_and_rate_limit_headers():
+    """Test that headers are added and security headers replace the endpoint's"""
+    app = Starlette(routes=[Route("/", limited)])
+    app = ResponseHeadersMiddleware(SecurityHeadersMiddleware(app))
+
+    headers = response_headers(call_app(app))
+
+    assert headers["x-content-type-options"] == "nosniff"
+    assert headers["cache-control"] == "no-cache, no-store, must-revalidate"
+    assert headers["x-ratelimit-limit"] == "100"
+    assert float(headers["x-process-time"]) >= 0
+
+
+def test_streamed_body_not_buffered():
+    """Test that each chunk is sent before the next one is produced"""
+    events = []
+
+    async def chunks():
+        for i in range(3):
+            events.append(f"produce {i}")
+            yield f"chunk {i}\n"
+
+    async def stream(request):
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app = Starlette(routes=[Route("/", stream)])
+    app = ResponseHeadersMiddleware(SecurityHeadersMiddleware(app))
+
+    def record_send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            events.append(f"send {message['body'].decode().split()[1]}")
+
+    call_app(app, record_send)
+
+    assert events == [
+        "produce 0",
+        "send 0",
+        "produce 1",
+        "send 1",
+        "produce 2",
+        "send 2",
+    ]
+
+
+def test_non_http_scopes_passed_through():
+    """Test that lifespan and websocket scopes are not touched"""
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(scope["type"])
+
+    wrapped = ResponseHeadersMiddleware(SecurityHeadersMiddleware(app))
+    asyncio.run(wrapped({"type": "lifespan"}, None, None))
+
+    assert seen == ["lifespan"]
+
+
+async def csv_export(request):
+    return Response(CSV_BODY, media_type="text/csv", headers={"ETag": '"7-abc"'})
+
+
+async def parquet_export(request):
+    return Response(b"PAR1" * 1000, media_type="application/octet-stream")
+
+
+def compressed_app():
+    routes = [Route("/csv", csv_export), Route("/parquet", parquet_export)]
+    return CompressionMiddleware(Starlette(routes=routes))
+
+
+def test_compression_negotiation():
+    """Test that q-values pick the coding and identity disables compression"""
+    middleware = compressed_app()
+
+    assert middleware.negotiate("gzip, deflate") == "gzip"
+    assert middleware.negotiate("br;q=0, gzip;q=0.5") == "gzip"
+    assert middleware.negotiate("*") == middleware.codings[0]
+    assert middleware.negotiate("identity") is None
+    assert middleware.negotiate("gzip;q=0") is None
+
+
+def test_text_compressed_and_binary_skipped():
+    """Test gzip of a CSV body with its own ETag, and a Parquet passthrough"""
+    app = compressed_app()
+
+    messages = call_app(app, path="/csv", headers={"Accept-Encoding": "gzip"})
+    headers = response_headers(messages)
+    body = response_body(messages)
+
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == '"7-abc-gzip"'
+    assert int(headers["content-length"]) == len(body)
+    assert gzip.decompress(body).decode() == CSV_BODY
+
+    messages = call_app(app, path="/parquet", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response_headers(messages)
+    assert response_body(messages) == b"PAR1" * 1000
+
+
+def test_compressed_body_reused_for_same_etag():
+    """Test that a hot response is compressed only once"""
+    app = compressed_app()
+
+    first = call_app(app, path="/csv", headers={"Accept-Encoding": "gzip"})
+    second = call_app(app, path="/csv", headers={"Accept-Encoding": "gzip"})
+
+    assert response_body(first) == response_body(second)
+    assert app._cache.get_stats()["hits"] == 1
+
+
+def test_streamed_body_compressed_per_chunk():
+    """Test that each compressed chunk is decodable as soon as it is sent"""
+    events = []
+
+    async def chunks():
+        for i in range(3):
+            events.append(f"produce {i}")
+            yield f"chunk {i}\n"
+
+    async def stream(request):
+        return StreamingResponse(chunks(), media_type="text/csv")
+
+    app = CompressionMiddleware(Starlette(routes=[Route("/", stream)]))
+    decoder = zlib.decompressobj(31)
+
+    def record_send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            text = decoder.decompress(message["body"]).decode()
+            if text:
+                events.append(f"send {text.split()[1]}")
+
+    messages = call_app(app, record_send, headers={"Accept-Encoding": "gzip"})
+
+    assert response_headers(messages)["content-encoding"] == "gzip"
+    assert events == [
+        "produce 0",
+        "send 0",
+        "produce 1",
+        "send 1",
+        "produce 2",
+        "send 2",
+    ]
@@ -0,0 +1,119 @@
+"""
+Unit tests for the fast JSON response class
+
+Tests that FastJSONResponse produces the same JSON as the validated Pydantic
+path for time series payloads and handles Arrow, NumPy and non-finite values,
+with and without orjson, and that the streamed writer produces the same JSON.
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+import src.api.responses as responses
+from src.api.models import TimeSeriesPoint, TimeSeriesResponse
+from src.api.responses import FastJSONResponse, arrow_records, iter_json_object
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def serializer(request, monkeypatch):
+    """Run each test with orjson (if installed) and with the json fallback."""
+    if request.param == "orjson":
+        if responses.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(responses, "orjson", None)
+    return request.param
+
+
+def time_series_table() -> pa.Table:
+    return pa.table(
+        {
+            "dataset_id": ["DS", "DS", "DS"],
+            "year": pa.array([2020, 2021, None], type=pa.int32()),
+            "time_period": ["2020", "2021", "2022"],
+            "territory_code": ["IT", "ITC1", "IT"],
+            "territory_name": ["Italia", "Piemonte", "Città"],
+            "measure_code": ["POP", "POP", "POP"],
+            "measure_name": ["Popolazione", "Popolazione", "Popolazione"],
+            "obs_value": [59.1, float("nan"), None],
+            "obs_status": [None, "p", "ABC"],
+        }
+    )
+
+
+def test_time_series_matches_pydantic_output(serializer):
+    """Test that the fast path serializes points like TimeSeriesResponse"""
+    table = time_series_table()
+    timestamp = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    fields = list(TimeSeriesPoint.model_fields)
+
+    validated = TimeSeriesResponse(
+        dataset_id="DS",
+        data=table.to_pylist(),
+        filters_applied={"dataset_id": "DS"},
+        total_points=table.num_rows,
+        timestamp=timestamp,
+    )
+    fast = FastJSONResponse(
+        {
+            "success": True,
+            "message": None,
+            "timestamp": timestamp,
+            "dataset_id": "DS",
+            "data": arrow_records(table, fields),
+            "filters_applied": {"dataset_id": "DS"},
+            "total_points": table.num_rows,
+        }
+    )
+
+    assert json.loads(fast.body) == json.loads(validated.model_dump_json())
+    assert "Città" in fast.body.decode("utf-8")
+
+
+def test_numpy_and_arrow_values(serializer):
+    """Test that NumPy and Arrow values are serialized directly"""
+    content = {
+        "array": np.array([1.5, 2.5]),
+        "scalar": np.int64(7),
+        "table": pa.table({"a": [1, 2]}),
+        "column": pa.chunked_array([["x"], ["y"]]),
+        "infinite": float("inf"),
+    }
+
+    assert json.loads(FastJSONResponse(content).body) == {
+        "array": [1.5, 2.5],
+        "scalar": 7,
+        "table": [{"a": 1}, {"a": 2}],
+        "column": ["x", "y"],
+        "infinite": None,
+    }
+
+
+def test_unsupported_type_raises(serializer):
+    """Test that unknown objects fail loudly instead of being stringified"""
+    with pytest.raises(TypeError):
+        FastJSONResponse({"value": object()})
+
+
+def test_streamed_object_matches_rendered(serializer):
+    """Test that iter_json_object() writes Arrow members batch by batch"""
+    table = time_series_table()
+    content = {
+        "@odata.context": "ctx",
+        "@odata.count": 3,
+        "value": table,
+        "empty": table.slice(0, 0),
+        "@odata.nextLink": "next",
+    }
+
+    chunks = list(iter_json_object(content, batch_size=2))
+
+    rendered = FastJSONResponse({**content, "value": table.to_pylist(), "empty": []})
+    assert json.loads(b"".join(chunks)) == json.loads(rendered.body)
+    # Members before the table, two batches plus brackets, the rest, closing brace
+    assert len(chunks) == 2 + 4 + 2 + 1 + 1
+    assert json.loads(b"".join(iter_json_object({}))) == {}
@@ -0,0 +1,85 @@
+"""
+Unit tests for AuditSink
+
+Tests batched, non-blocking audit logging.
+"""
+
+import pytest
+
+from src.database.sqlite.audit_manager import AuditManager
+from src.database.sqlite.audit_sink import AuditSink
+
+
+class TestAuditSink:
+    """Test AuditSink functionality"""
+
+    @pytest.fixture
+    def audit_manager(self, temp_db):
+        """Create an AuditManager instance for testing"""
+        manager = AuditManager(temp_db)
+        try:
+            yield manager
+        finally:
+            manager.close_connections()
+
+    def test_events_written_in_batches(self, audit_manager):
+        """Test that queued events are written in few transactions"""
+        sink = AuditSink(audit_manager, {"batch_size": 100})
+        try:
+            for i in range(250):
+                assert sink.submit(
+                    action="api_request",
+                    resource_type="api_endpoint",
+                    resource_id=f"/datasets/{i}",
+                    details={"method": "GET"},
+                )
+            assert sink.flush()
+
+            stats = sink.get_stats()
+            assert stats["written"] == 250
+            assert stats["batches"] >= 3
+            assert stats["dropped"] == 0
+            logs = audit_manager.get_audit_logs(limit=None)
+            assert len(logs) == 250
+            assert logs[0]["details"] == {"method": "GET"}
+        finally:
+            sink.close()
+
+    def test_full_queue_drops_events(self, audit_manager):
+        """Test that a full queue drops and counts events instead of blocking"""
+        sink = AuditSink(audit_manager, {"max_queue": 1})
+        try:
+            # Hold the write lock so that the writer cannot drain the queue
+            with audit_manager.transaction():
+                results = [
+                    sink.submit(action="api_request", resource_type="api")
+                    for _ in range(20)
+                ]
+            assert not all(results)
+            assert sink.get_stats()["dropped"] == results.count(False)
+        finally:
+            sink.close()
+
+    def test_invalid_events_counted_as_failed(self, audit_manager):
+        """Test that events missing required fields are skipped"""
+        sink = AuditSink(audit_manager)
+        try:
+            sink.submit(action="", resource_type="api")
+            sink.submit(action="api_request", resource_type="api")
+            assert sink.flush()
+
+            stats = sink.get_stats()
+            assert stats["written"] == 1
+            assert stats["failed"] == 1
+        finally:
+            sink.close()
+
+    def test_close_writes_pending_events(self, audit_manager):
+        """Test that closing flushes the queue and rejects new events"""
+        sink = AuditSink(audit_manager)
+        for _ in range(10):
+            sink.submit(action="api_request", resource_type="api")
+        sink.close()
+
+        assert len(audit_manager.get_audit_logs(limit=None)) == 10
+        assert sink.submit(action="api_request", resource_type="api") is False
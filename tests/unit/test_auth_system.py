@@ -20,16 +20,20 @@ import time
 import unittest
 from datetime import datetime, timedelta
 from pathlib import Path
+from unittest.mock import patch
+
+import bcrypt
 
 from src.auth.jwt_manager import JWTManager
 from src.auth.models import APIKey
-from src.auth.rate_limiter import SQLiteRateLimiter
+from src.auth.rate_limiter import RateLimitConfig, SQLiteRateLimiter
 from src.auth.security_middleware import (
     AuthenticationMiddleware,
     SecurityHeadersMiddleware,
 )
 from src.auth.sqlite_auth import SQLiteAuthManager
 from src.database.sqlite import DatasetManager, create_metadata_schema
+from src.utils.mvp_security import security
 
 
 class TestAPIKeyManagement(unittest.TestCase):
@@ -156,6 +160,41 @@ class TestAPIKeyManagement(unittest.TestCase):
         verified_key = self.auth_manager.verify_api_key(api_key.key)
         self.assertIsNone(verified_key)
 
+    def test_verify_api_key_by_key_id(self):
+        """Test that keys embed a key ID and verify with one hash comparison"""
+        api_key = self.auth_manager.generate_api_key("Test", ["read"])
+        self.assertRegex(api_key.key, r"^osv_[0-9a-f]{16}_")
+        self.assertTrue(api_key.key_hash.startswith("sha256$"))
+
+        with patch("src.auth.sqlite_auth.bcrypt.checkpw") as checkpw:
+            self.assertIsNotNone(self.auth_manager.verify_api_key(api_key.key))
+            # Second verification is served from the cache
+            self.assertIsNotNone(self.auth_manager.verify_api_key(api_key.key))
+            checkpw.assert_not_called()
+
+        # Right key ID with a wrong secret, both cached and uncached
+        forged = api_key.key[:21] + "forged-secret"
+        self.assertIsNone(self.auth_manager.verify_api_key(forged))
+        self.auth_manager._key_cache.clear()
+        self.assertIsNone(self.auth_manager.verify_api_key(forged))
+
+    def test_verify_legacy_bcrypt_key(self):
+        """Test that keys issued before key IDs still verify"""
+        legacy_key = "osv_legacysecretvalue"
+        key_hash = bcrypt.hashpw(legacy_key.encode(), bcrypt.gensalt(4)).decode()
+        with self.auth_manager.audit_manager.transaction() as conn:
+            conn.execute(
+                "INSERT INTO api_credentials (service_name, api_key_hash, "
+                "scopes_json, name, key_prefix, is_active) "
+                "VALUES ('legacy', ?, ?, 'Legacy', 'osv_', 1)",
+                (key_hash, security.encrypt_data('["read"]')),
+            )
+
+        verified = self.auth_manager.verify_api_key(legacy_key)
+
+        self.assertIsNotNone(verified)
+        self.assertEqual(verified.name, "Legacy")
+
     def test_list_api_keys(self):
         """Test listing API keys"""
         # Create multiple keys
@@ -287,6 +326,37 @@ class TestJWTManager(unittest.TestCase):
 
         self.assertIsNone(claims)
 
+    def test_verify_token_cached(self):
+        """Test that repeated verification is served from the claims cache"""
+        api_key = APIKey(id=1, name="Test App", scopes=["read"])
+        token = self.jwt_manager.create_access_token(api_key).access_token
+
+        first = self.jwt_manager.verify_token(token)
+        first.client_ip = "10.0.0.1"
+        with patch("src.auth.jwt_manager.jwt.decode") as decode:
+            second = self.jwt_manager.verify_token(token)
+            decode.assert_not_called()
+
+        self.assertEqual(second.sub, "1")
+        self.assertFalse(hasattr(second, "client_ip"))
+        self.assertEqual(self.jwt_manager.get_cache_stats()["hits"], 1)
+
+        self.assertTrue(self.jwt_manager.blacklist_token(token))
+        self.assertIsNone(self.jwt_manager.verify_token(token))
+
+    def test_cached_token_expires(self):
+        """Test that cached claims are not served after the token expires"""
+        short_jwt = JWTManager(self.temp_db.name, secret_key="test_secret")
+        short_jwt.access_token_expire_minutes = 0.02  # ~1.2 seconds
+
+        api_key = APIKey(id=1, name="Test", scopes=["read"])
+        token = short_jwt.create_access_token(api_key).access_token
+        self.assertIsNotNone(short_jwt.verify_token(token))
+
+        time.sleep(2)
+
+        self.assertIsNone(short_jwt.verify_token(token))
+
     def test_revoke_token(self):
         """Test JWT token revocation (blacklisting)"""
         api_key = APIKey(id=1, name="Test", scopes=["read"])
@@ -302,9 +372,13 @@ class TestJWTManager(unittest.TestCase):
         )
         self.assertTrue(success)
 
-        # MVP Issue #153: Token still works after "revocation" (no blacklist implementation)
         claims = self.jwt_manager.verify_token(auth_token.access_token)
-        self.assertIsNotNone(claims)  # Changed: token still valid in MVP
+        self.assertIsNone(claims)
+
+        # Revocations are persisted and apply to other manager instances
+        other = JWTManager(self.temp_db.name, secret_key="test_secret_key")
+        other.revocations.reload()
+        self.assertIsNone(other.verify_token(auth_token.access_token))
 
     def test_cleanup_expired_tokens(self):
         """Test cleanup of expired tokens"""
@@ -435,6 +509,46 @@ class TestRateLimiter(unittest.TestCase):
         self.assertIsInstance(stats, dict)
         self.assertIn("minute", stats)
 
+    def test_rate_limit_memory_window_enforced(self):
+        """Test that in-memory counters deny requests over the limit"""
+        config = RateLimitConfig(3, 100, 1000)
+        results = [
+            self.rate_limiter._check_sliding_window_limit("k", "api_key", "ep", config)
+            for _ in range(4)
+        ]
+
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual(results[0].remaining, 2)
+        self.assertGreaterEqual(results[3].retry_after, 1)
+
+    def test_rate_limit_snapshot_survives_restart(self):
+        """Test that snapshotted counts are loaded by a new limiter"""
+        config = RateLimitConfig(3, 100, 1000)
+        for _ in range(3):
+            self.rate_limiter._check_sliding_window_limit("k", "api_key", "ep", config)
+        self.assertEqual(self.rate_limiter.flush(), 3)
+
+        stats = self.rate_limiter.get_rate_limit_stats("k", "api_key")
+        self.assertEqual(stats["minute"]["current_count"], 3)
+
+        restarted = SQLiteRateLimiter(self.temp_db.name)
+        result = restarted._check_sliding_window_limit(
+            "k", "api_key", "ep", RateLimitConfig(2, 100, 1000)
+        )
+        self.assertFalse(result.allowed)
+
+    def test_rate_limit_strict_mode(self):
+        """Test that strict mode counts in SQLite on every check"""
+        strict = SQLiteRateLimiter(self.temp_db.name, strict=True)
+        config = RateLimitConfig(2, 100, 1000)
+        results = [
+            strict._check_sliding_window_limit("s", "api_key", "ep", config)
+            for _ in range(3)
+        ]
+
+        self.assertEqual([r.allowed for r in results], [True, True, False])
+        self.assertEqual(strict.flush(), 0)
+
 
 class TestSecurityMiddleware(unittest.TestCase):
     """Test security headers middleware"""
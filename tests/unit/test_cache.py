@@ -0,0 +1,148 @@
+"""Unit tests for the bounded TTL cache.
+
+Tests cover:
+- TTL expiry and the background sweep entry point
+- LRU and LFU eviction by entry count
+- Size accounting and the byte bound
+- Per-namespace statistics
+"""
+
+import time
+
+import pytest
+
+from src.utils.cache import BoundedCache, get_cache_stats, sweep_expired
+
+
+class TestExpiry:
+    """Test TTL handling."""
+
+    def test_get_after_ttl_returns_default(self):
+        """Test that expired entries are not returned."""
+        cache = BoundedCache("test_expiry", default_ttl=60)
+        cache.set("short", 1, ttl=0.05)
+        cache.set("long", 2)
+
+        time.sleep(0.1)
+
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+        assert "short" not in cache
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_sweep_removes_unread_entries(self):
+        """Test that the sweep drops expired keys that are never read."""
+        cache = BoundedCache("test_sweep")
+        for i in range(5):
+            cache.set(i, i, ttl=0.01)
+        cache.set("kept", True, ttl=60)
+
+        time.sleep(0.05)
+
+        assert sweep_expired() >= 5
+        assert len(cache) == 1
+        assert cache.get_stats()["bytes"] == cache._sizeof(True)
+
+    def test_get_or_set(self):
+        """Test that the factory only runs on a miss."""
+        cache = BoundedCache("test_get_or_set")
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return "value"
+
+        assert cache.get_or_set("key", factory) == "value"
+        assert cache.get_or_set("key", factory) == "value"
+        assert len(calls) == 1
+
+
+class TestEviction:
+    """Test bounded eviction."""
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test LRU order with reads refreshing recency."""
+        cache = BoundedCache("test_lru", max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_lfu_evicts_least_frequently_used(self):
+        """Test LFU order regardless of recency."""
+        cache = BoundedCache("test_lfu", max_entries=2, policy="lfu")
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_expired_entries_evicted_first(self):
+        """Test that a full cache drops expired entries before live ones."""
+        cache = BoundedCache("test_expired_first", max_entries=2)
+        cache.set("old", 1, ttl=0.01)
+        cache.set("live", 2)
+        time.sleep(0.05)
+        cache.set("new", 3)
+
+        assert "live" in cache
+        assert "new" in cache
+        assert cache.get_stats()["evictions"] == 0
+
+    def test_byte_bound(self):
+        """Test eviction by estimated size and oversized values."""
+        cache = BoundedCache("test_bytes", max_bytes=1000, sizeof=len)
+        cache.set("a", "x" * 400)
+        cache.set("b", "x" * 400)
+        cache.set("c", "x" * 400)
+
+        assert "a" not in cache
+        assert cache.get_stats()["bytes"] == 800
+        assert cache.set("huge", "x" * 2000) is False
+        assert "huge" not in cache
+
+    def test_replace_updates_size(self):
+        """Test that overwriting a key does not leak size accounting."""
+        cache = BoundedCache("test_replace", sizeof=len)
+        cache.set("a", "xx")
+        cache.set("a", "xxxx")
+        cache.delete("a")
+
+        assert cache.get_stats()["bytes"] == 0
+        assert len(cache) == 0
+
+    def test_unknown_policy(self):
+        """Test that unknown eviction policies are rejected."""
+        with pytest.raises(ValueError):
+            BoundedCache("test_policy", policy="fifo")
+
+
+class TestStats:
+    """Test statistics."""
+
+    def test_namespace_stats_aggregated(self):
+        """Test that caches sharing a namespace are reported together."""
+        first = BoundedCache("test_shared")
+        second = BoundedCache("test_shared")
+        first.set("a", 1)
+        second.set("b", 2)
+        first.get("a")
+        second.get("missing")
+
+        stats = get_cache_stats()["test_shared"]
+
+        assert stats["instances"] == 2
+        assert stats["entries"] == 2
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
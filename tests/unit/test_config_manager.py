@@ -290,3 +290,38 @@ class TestConfigurationManager:
         all_configs = config_manager.list_configs()
         bulk_configs = {k: v for k, v in all_configs.items() if k.startswith("bulk.")}
         assert len(bulk_configs) >= 5
+
+    def test_snapshot_write_through(self, config_manager):
+        """Test that reads come from the snapshot and follow local writes"""
+        config_manager.set_config("snap.value", {"a": [1, 2]}, "json")
+        assert config_manager.get_config("snap.value") == {"a": [1, 2]}
+
+        with patch.object(config_manager, "execute_query") as mock_query:
+            # Returned JSON values are copies of the snapshot entry
+            config_manager.get_config("snap.value")["a"].append(3)
+            assert config_manager.get_config("snap.value") == {"a": [1, 2]}
+            mock_query.assert_not_called()
+
+        config_manager.set_config("snap.value", "updated")
+        assert config_manager.get_config("snap.value") == "updated"
+        config_manager.delete_config("snap.value")
+        assert config_manager.get_config("snap.value", "gone") == "gone"
+
+    def test_snapshot_detects_external_changes(self, config_manager):
+        """Test that writes from another connection reload the snapshot"""
+        import sqlite3
+
+        config_manager.set_config("external.key", "before")
+        assert config_manager.get_config("external.key") == "before"
+
+        conn = sqlite3.connect(config_manager.db_path)
+        try:
+            conn.execute(
+                "UPDATE system_config SET config_value = 'after' "
+                "WHERE config_key = 'external.key'"
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        assert config_manager.get_config("external.key") == "after"
@@ -249,6 +249,114 @@ class TestDatasetManager:
         datasets = manager.list_datasets(limit=2, offset=2)
         assert len(datasets) == 2
 
+    def test_list_datasets_keyset_pagination(self, manager, sample_dataset_data):
+        """Test listing datasets page by page with a keyset position."""
+        for i in range(5):
+            data = sample_dataset_data.copy()
+            data["dataset_id"] = f"TEST_DATASET_{i:03d}"
+            data["name"] = f"Test Dataset {i % 2}"
+            data["priority"] = 5 + i % 3
+            manager.register_dataset(**data)
+
+        expected = [d["dataset_id"] for d in manager.list_datasets()]
+
+        seen = []
+        after = None
+        while True:
+            page = manager.list_datasets(limit=2, after=after)
+            seen.extend(d["dataset_id"] for d in page)
+            if len(page) < 2:
+                break
+            after = [page[-1][key] for key in manager.KEYSET_COLUMNS]
+
+        assert seen == expected
+        assert len(seen) == 5
+
+    def test_query_datasets_text_sort_and_total(self, manager, sample_dataset_data):
+        """Test text search, sort orders and the COUNT(*) window total."""
+        for i in range(5):
+            data = sample_dataset_data.copy()
+            data["dataset_id"] = f"TEST_DATASET_{i:03d}"
+            data["name"] = f"{'Popolazione' if i % 2 else 'Prezzi'} {i}"
+            manager.register_dataset(**data)
+
+        page, total = manager.query_datasets(
+            q="popol", sort="name", limit=1, offset=1, with_total=True
+        )
+        assert total == 2
+        assert [d["name"] for d in page] == ["Popolazione 3"]
+
+        # Keyset pages keep the total of the whole result set
+        seen, after = [], None
+        while True:
+            page, total = manager.query_datasets(
+                sort="name", limit=2, after=after, with_total=True
+            )
+            assert total == 5
+            seen.extend(d["name"] for d in page)
+            if len(page) < 2:
+                break
+            after = [page[-1]["name"], page[-1]["dataset_id"]]
+        assert seen == sorted(seen)
+        assert len(seen) == 5
+
+        assert manager.query_datasets(sort="size") == ([], None)
+
+    def test_search_index_ranking_and_accents(self, manager):
+        """Test BM25 ranking, prefix matching and accent folding."""
+        manager.register_dataset(
+            "DCIS_POPRES1", "Popolazione residente", "popolazione", "Città e comuni"
+        )
+        manager.register_dataset(
+            "DCCV_TAXOCCU", "Occupati", "lavoro", "Popolazione attiva per età"
+        )
+
+        ranked, total = manager.query_datasets(
+            q="popolazione", sort="relevance", with_total=True
+        )
+        assert total == 2
+        assert [d["dataset_id"] for d in ranked] == ["DCIS_POPRES1", "DCCV_TAXOCCU"]
+        assert ranked[0]["search_rank"] < ranked[1]["search_rank"]
+
+        assert [d["dataset_id"] for d in manager.list_datasets()] == [
+            "DCCV_TAXOCCU",
+            "DCIS_POPRES1",
+        ]
+        for q in ("citta", "ETA", "popres1", "dcis_popres"):
+            assert len(manager.query_datasets(q=q)[0]) == 1, q
+        assert manager.query_datasets(q='" OR *')[0] == []
+
+    def test_search_index_follows_changes(self, manager, sample_dataset_data):
+        """Test that triggers keep the index in sync with registry and rules."""
+        manager.register_dataset(**sample_dataset_data)
+        dataset_id = sample_dataset_data["dataset_id"]
+
+        def search(q):
+            return [d["dataset_id"] for d in manager.query_datasets(q=q)[0]]
+
+        assert search("test") == [dataset_id]
+
+        # INSERT OR REPLACE must not leave the old row behind
+        manager.register_dataset(**{**sample_dataset_data, "name": "Inflazione"})
+        assert search("inflazione") == [dataset_id]
+        assert manager.execute_query("SELECT COUNT(*) FROM dataset_search")[0][0] == 1
+
+        # Category keywords come from active categorization rules
+        with manager.transaction() as conn:
+            conn.execute(
+                "INSERT INTO categorization_rules (rule_id, category, keywords_json) "
+                "VALUES ('r1', ?, '[\"prezzi\", \"consumo\"]')",
+                (sample_dataset_data["category"],),
+            )
+        assert search("consumo") == [dataset_id]
+        with manager.transaction() as conn:
+            conn.execute("UPDATE categorization_rules SET is_active = 0")
+        assert search("consumo") == []
+
+        with manager.transaction() as conn:
+            conn.execute("DELETE FROM dataset_registry")
+        assert search("inflazione") == []
+
     def test_list_datasets_include_inactive(self, manager, sample_dataset_data):
         """Test listing datasets including inactive ones."""
         # Register dataset and then deactivate it
@@ -444,6 +552,29 @@ class TestDatasetManager:
             stats = manager.get_dataset_stats_summary()
             assert stats == {}
 
+    def test_data_versions_follow_changes(self, manager, temp_db, sample_dataset_data):
+        """Test that registry and stats writes bump data versions."""
+        dataset_id = sample_dataset_data["dataset_id"]
+        assert manager.get_data_version(dataset_id) == 0
+
+        manager.register_dataset(**sample_dataset_data)
+        registered = manager.get_data_version(dataset_id)
+        assert registered > 0
+        assert manager.get_catalog_version() == registered
+
+        manager.upsert_dataset_stats([{"dataset_id": dataset_id, "record_count": 10}])
+        assert manager.get_data_version(dataset_id) > registered
+
+        # Another process picks up bumps when its snapshot is refreshed
+        other = DatasetManager(temp_db)
+        other.VERSION_REFRESH_INTERVAL = 0
+        assert other.get_data_version(dataset_id) == manager.get_data_version(
+            dataset_id
+        )
+        manager.register_dataset("OTHER_DATASET", "Other", "economia")
+        assert other.get_data_version("OTHER_DATASET") == manager.get_catalog_version()
+        assert other.get_data_version(dataset_id) < other.get_catalog_version()
+
 
 class TestDatasetManagerFactory:
     """Test factory function for DatasetManager."""
@@ -0,0 +1,306 @@
+"""Unit tests for the adaptive DuckDB query optimizer.
+
+Tests cover:
+- Query fingerprinting and normalization
+- EXPLAIN ANALYZE profile summaries
+- Profile persistence and hot shape detection
+- Background profiling, off the recording thread
+- Proposing, applying, refreshing, invalidating and dropping materializations
+- Before/after latency report
+"""
+
+import os
+import tempfile
+import threading
+
+import pandas as pd
+import pytest
+
+from src.database.duckdb.adaptive_optimizer import (
+    AdaptiveOptimizer,
+    fingerprint_query,
+    normalize_query,
+    summarize_plan,
+)
+from src.database.duckdb.config import get_duckdb_config
+from src.database.duckdb.manager import DuckDBManager
+from src.database.duckdb.query_optimizer import QueryOptimizer
+from src.database.duckdb.schema import ISTATSchemaManager
+
+TEST_CONFIG = {
+    "hot_min_calls": 2,
+    "slow_query_ms": 0.0,
+    "profile_interval": 0,
+    "flush_size": 1000,
+    "cycle_interval": 1000,
+    "auto_apply": False,
+}
+
+
+@pytest.fixture
+def manager():
+    """Create a DuckDB manager on a temporary database with sample data."""
+    temp_db_path = tempfile.mktemp(suffix=".duckdb")
+    config = get_duckdb_config().copy()
+    config["database"] = temp_db_path
+
+    manager = DuckDBManager(config)
+    schema_mgr = ISTATSchemaManager(manager)
+    schema_mgr.create_all_tables()
+    schema_mgr.insert_dataset_metadata(
+        {"dataset_id": "DS1", "dataset_name": "Sample", "category": "economia"}
+    )
+
+    row_id = 0
+    for year in (2020, 2021):
+        for territory in ("ITC1", "ITF3"):
+            for measure in ("M1", "M2"):
+                row_id += 1
+                manager.execute_statement(
+                    "INSERT INTO istat.istat_datasets (id, dataset_id, year, "
+                    "territory_code, territory_name, time_period, measure_code, "
+                    "measure_name) VALUES (?, 'DS1', ?, ?, ?, ?, ?, ?)",
+                    [row_id, year, territory, territory, str(year), measure, measure],
+                )
+                for value in (1.0, 2.0, 3.0 * row_id):
+                    manager.execute_statement(
+                        "INSERT INTO istat.istat_observations (dataset_row_id, "
+                        "dataset_id, year, territory_code, obs_value) "
+                        "VALUES (?, 'DS1', ?, ?, ?)",
+                        [row_id, year, territory, value],
+                    )
+
+    yield manager
+
+    manager.close()
+    if os.path.exists(temp_db_path):
+        os.unlink(temp_db_path)
+
+
+@pytest.fixture
+def adaptive(manager):
+    """Create an adaptive optimizer with low thresholds."""
+    adaptive = AdaptiveOptimizer(manager, config=TEST_CONFIG)
+    yield adaptive
+    adaptive.close()
+
+
+class TestFingerprinting:
+    """Test query normalization."""
+
+    def test_literals_and_parameters_normalized(self):
+        """Test that values do not change the fingerprint."""
+        first, normalized = fingerprint_query(
+            "SELECT * FROM t WHERE a = 'x' AND b IN (1, 2, 3) -- note\n LIMIT 10;"
+        )
+        second, _ = fingerprint_query(
+            "select *  from t where a = $1 and b in (?)   limit 20"
+        )
+
+        assert first == second
+        assert normalized == "select * from t where a = ? and b in (?) limit ?"
+
+    def test_identifiers_with_digits_kept(self):
+        """Test that digits inside identifiers are not treated as literals."""
+        assert "table_2020" in normalize_query("SELECT x1 FROM table_2020")
+
+    def test_different_shapes_differ(self):
+        """Test that structurally different queries get different fingerprints."""
+        assert (
+            fingerprint_query("SELECT a FROM t")[0]
+            != fingerprint_query("SELECT b FROM t")[0]
+        )
+
+
+class TestProfiling:
+    """Test profiling and persistence."""
+
+    def test_explain_analyze_summary(self, adaptive):
+        """Test that a real ANALYZE profile is summarized."""
+        plan = adaptive.explain_analyze(
+            "SELECT year, COUNT(*) FROM istat.istat_observations "
+            "WHERE year > $1 GROUP BY year",
+            [2000],
+        )
+        summary = summarize_plan(plan)
+
+        assert summary["latency_ms"] >= 0
+        assert summary["rows_scanned"] > 0
+        assert summary["top_operators"]
+
+    def test_record_flush_and_hot_shapes(self, adaptive):
+        """Test that recorded executions become hot shapes."""
+        for value in range(3):
+            adaptive.record(
+                "ranking", f"SELECT * FROM istat.istat_datasets LIMIT {value}", 0.5, 1
+            )
+
+        assert adaptive.wait()
+        shapes = adaptive.find_hot_shapes()
+
+        assert len(shapes) == 1
+        assert shapes[0]["calls"] == 3
+        assert shapes[0]["query_type"] == "ranking"
+        assert shapes[0]["plan_summary"]["top_operators"]
+
+    def test_unknown_shapes_not_proposed(self, adaptive):
+        """Test that shapes without a known materialization are left alone."""
+        for _ in range(3):
+            adaptive.record("ranking", "SELECT 1", 0.5, 1)
+
+        assert adaptive.wait()
+        assert adaptive.propose() == []
+
+    def test_record_profiles_in_background(self, adaptive, monkeypatch):
+        """Test that record() leaves profiling and cycles to the worker."""
+        threads = []
+        original = adaptive.explain_analyze
+        monkeypatch.setattr(
+            adaptive,
+            "explain_analyze",
+            lambda *a: threads.append(threading.current_thread()) or original(*a),
+        )
+        monkeypatch.setitem(adaptive.config, "cycle_interval", 2)
+        cycles = []
+        monkeypatch.setattr(
+            adaptive, "run_cycle", lambda: cycles.append(threading.current_thread())
+        )
+
+        for _ in range(2):
+            adaptive.record("ranking", "SELECT 1", 0.5, 1)
+
+        assert adaptive.wait()
+        assert len(threads) == 2 and len(cycles) == 1
+        assert threading.current_thread() not in threads + cycles
+
+
+class TestMaterializations:
+    """Test the adaptive loop end to end through QueryOptimizer."""
+
+    def test_materialization_applied_and_used(self, manager, adaptive):
+        """Test propose/apply, identical results and before/after report."""
+        optimizer = QueryOptimizer(manager, adaptive=adaptive)
+
+        baseline = None
+        for _ in range(3):
+            optimizer.clear_cache()
+            baseline = optimizer.get_territory_comparison(["M1", "M2"], 2021)
+
+        assert adaptive.wait()
+        cycle = adaptive.run_cycle(apply=True)
+        assert [p["name"] for p in cycle["proposed"]] == ["mv_territory_measure_stats"]
+        assert cycle["applied"] == ["mv_territory_measure_stats"]
+        assert adaptive.active_table("territory_comparison") == (
+            "analytics.mv_territory_measure_stats"
+        )
+
+        optimizer.clear_cache()
+        materialized = optimizer.get_territory_comparison(["M1", "M2"], 2021)
+        pd.testing.assert_frame_equal(
+            baseline.reset_index(drop=True),
+            materialized.reset_index(drop=True),
+            check_dtype=False,
+        )
+
+        assert adaptive.wait()
+        report = adaptive.get_report()
+        (entry,) = report["materializations"]
+        assert entry["status"] == "applied"
+        assert entry["before_calls"] == 3
+        assert entry["after_calls"] == 1
+        assert entry["before_avg_ms"] is not None
+        assert entry["after_avg_ms"] is not None
+
+    def test_category_trends_materialization_matches(self, manager, adaptive):
+        """Test that the category aggregate gives identical results."""
+        optimizer = QueryOptimizer(manager, adaptive=adaptive)
+        baseline = optimizer.get_category_trends(["economia"], 2020, 2021)
+
+        adaptive.apply("mv_category_yearly")
+        optimizer.clear_cache()
+        materialized = optimizer.get_category_trends(["economia"], 2020, 2021)
+
+        assert len(baseline) == 2
+        pd.testing.assert_frame_equal(
+            baseline.reset_index(drop=True),
+            materialized.reset_index(drop=True),
+            check_dtype=False,
+        )
+
+    def test_stale_materialization_not_used(self, manager):
+        """Test that materializations past max_staleness fall back to base tables."""
+        adaptive = AdaptiveOptimizer(
+            manager, config={**TEST_CONFIG, "max_staleness": -1}
+        )
+        adaptive.apply("mv_time_series")
+
+        assert adaptive.active_table("time_series") is None
+        assert adaptive.refresh_materializations(stale_only=True) == ["mv_time_series"]
+
+    def test_data_load_invalidates_materialization(self, manager, adaptive):
+        """Test that a data load routes back to base tables until a rebuild."""
+        # Without materializations there is nothing to invalidate
+        AdaptiveOptimizer(manager, config=TEST_CONFIG).invalidate_materializations()
+
+        adaptive.apply("mv_time_series")
+        assert adaptive.active_table("time_series") is not None
+
+        # Invalidated by another process, e.g. an ingestion job
+        AdaptiveOptimizer(manager, config=TEST_CONFIG).invalidate_materializations()
+
+        assert adaptive.active_table("time_series") is None
+        assert adaptive.refresh_materializations(stale_only=True) == ["mv_time_series"]
+        assert adaptive.active_table("time_series") == "analytics.mv_time_series"
+        assert adaptive.refresh_materializations(stale_only=True) == []
+
+    def test_drop_reverts_routing(self, adaptive):
+        """Test that dropping a materialization routes back to base tables."""
+        adaptive.apply("mv_time_series")
+        assert adaptive.active_table("time_series") is not None
+
+        adaptive.drop("mv_time_series")
+
+        assert adaptive.active_table("time_series") is None
+        statuses = adaptive.get_report()["materializations"]
+        assert statuses[0]["status"] == "dropped"
+
+    def test_apply_unknown_materialization(self, adaptive):
+        """Test that unknown names are rejected."""
+        with pytest.raises(ValueError):
+            adaptive.apply("mv_missing")
+
+    def test_applied_state_survives_restart(self, manager, adaptive):
+        """Test that applied materializations are reloaded from DuckDB."""
+        adaptive.apply("mv_time_series")
+
+        reloaded = AdaptiveOptimizer(manager, config=TEST_CONFIG)
+
+        assert reloaded.active_table("time_series") == "analytics.mv_time_series"
+
+    def test_routing_follows_other_processes(self, manager, adaptive):
+        """Test that apply/drop by another optimizer instance changes routing."""
+        other = AdaptiveOptimizer(manager, config=TEST_CONFIG)
+        assert adaptive.active_table("time_series") is None
+
+        other.apply("mv_time_series")
+        assert adaptive.active_table("time_series") == "analytics.mv_time_series"
+
+        other.drop("mv_time_series")
+        assert adaptive.active_table("time_series") is None
+
+    def test_missing_materialization_falls_back(self, manager, adaptive):
+        """Test that a vanished materialized table falls back to base tables."""
+        optimizer = QueryOptimizer(manager, adaptive=adaptive)
+        baseline = optimizer.get_time_series_data(["DS1"], 2020, 2021)
+
+        adaptive.apply("mv_time_series")
+        manager.execute_statement("DROP TABLE analytics.mv_time_series")
+        optimizer.clear_cache()
+        fallback = optimizer.get_time_series_data(["DS1"], 2020, 2021)
+
+        assert len(baseline) > 0
+        pd.testing.assert_frame_equal(
+            baseline.reset_index(drop=True),
+            fallback.reset_index(drop=True),
+            check_dtype=False,
+        )
@@ -0,0 +1,201 @@
+"""Unit tests for the bounded DuckDB query executor.
+
+Tests cover:
+- Running blocking calls without blocking the event loop
+- Queue bounds and rejection
+- Cancellation when the client disconnects
+- Query timeouts enforced by the watchdog
+- Async variants on DuckDBManager and DuckDBQueryBuilder
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+
+from src.database.duckdb.executor import (
+    QueryCancelledError,
+    QueryContext,
+    QueryExecutor,
+    QueryQueueFullError,
+    QueryTimeoutError,
+    get_query_executor,
+    get_query_timeout,
+    query_scope,
+    reset_query_executor,
+)
+from src.database.duckdb.manager import DuckDBManager
+from src.database.duckdb.query_builder import DuckDBQueryBuilder, QueryCache
+
+
+@pytest.fixture
+def executor():
+    """Create a small executor for testing."""
+    executor = QueryExecutor(max_workers=1, max_queue_depth=2)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+class TestQueryExecutor:
+    """Test QueryExecutor functionality."""
+
+    async def test_run_returns_result(self, executor):
+        """Test that run() returns the callable result from a worker thread."""
+        result = await executor.run(lambda x: (x * 2, threading.current_thread()), 21)
+
+        assert result[0] == 42
+        assert result[1] is not threading.main_thread()
+
+        stats = executor.get_stats()
+        assert stats["submitted"] == 1
+        assert stats["completed"] == 1
+        assert stats["queue_depth"] == 0
+
+    async def test_event_loop_not_blocked(self, executor):
+        """Test that the loop keeps running while a query blocks."""
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.time())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(executor.run(time.sleep, 0.2), ticker())
+        assert len(ticks) == 5
+
+    async def test_errors_propagate(self, executor):
+        """Test that exceptions from the callable reach the caller."""
+
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            await executor.run(fail)
+        stats = executor.get_stats()
+        assert stats["failed"] == 1
+        assert stats["completed"] == 0
+
+    async def test_queue_full_rejection(self, executor):
+        """Test that calls beyond max_queue_depth are rejected."""
+        release = threading.Event()
+        futures = [executor.submit(release.wait) for _ in range(3)]  # 1 running
+
+        with pytest.raises(QueryQueueFullError):
+            executor.submit(release.wait)
+
+        stats = executor.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["max_queue_depth_seen"] == 2
+
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+
+    async def test_disconnect_cancels_queued_call(self, executor):
+        """Test that a queued call is dropped when the client disconnects."""
+        release = threading.Event()
+        blocker = executor.submit(release.wait)
+        called = Mock()
+
+        async def disconnected():
+            return True
+
+        with pytest.raises(QueryCancelledError):
+            await executor.run(called, disconnect_check=disconnected)
+
+        release.set()
+        blocker.result(timeout=5)
+        await asyncio.sleep(0.05)
+
+        called.assert_not_called()
+        stats = executor.get_stats()
+        assert stats["disconnects"] == 1
+        assert stats["cancelled"] == 1
+        assert stats["queue_depth"] == 0
+
+    def test_global_executor_singleton(self):
+        """Test get/reset of the shared executor."""
+        reset_query_executor()
+        first = get_query_executor()
+        assert get_query_executor() is first
+        reset_query_executor()
+        assert get_query_executor() is not first
+
+
+class TestQueryTimeouts:
+    """Test timeouts and interrupt-based cancellation."""
+
+    LONG_QUERY = "SELECT count(*) FROM range(100000000000)"
+
+    def test_timeout_interrupts_query(self):
+        """Test that a running DuckDB query is interrupted at its deadline."""
+        manager = DuckDBManager(":memory:")
+        started = time.time()
+
+        with pytest.raises(QueryTimeoutError):
+            manager.execute_query(self.LONG_QUERY, timeout=0.2)
+
+        assert time.time() - started < 5
+        stats = manager.get_performance_stats()
+        assert stats["timeouts"] == 1
+        assert stats["watchdog"]["interrupts_sent"] >= 1
+
+    async def test_executor_run_timeout(self, executor):
+        """Test that query_timeout applies to connections opened by fn."""
+        manager = DuckDBManager(":memory:")
+
+        with pytest.raises(QueryTimeoutError):
+            await executor.run(
+                manager.execute_query, self.LONG_QUERY, query_timeout=0.2
+            )
+        stats = executor.get_stats()
+        assert stats["timeouts"] == 1
+        assert stats["failed"] == 0
+        assert stats["completed"] == 0
+
+    def test_cancelled_context_fails_fast(self):
+        """Test that a cancelled scope refuses to open new connections."""
+        manager = DuckDBManager(":memory:")
+        context = QueryContext()
+        context.cancel()
+
+        with query_scope(context=context):
+            with pytest.raises(QueryCancelledError):
+                manager.execute_query("SELECT 1")
+
+    def test_outer_scope_wins(self):
+        """Test that nested scopes keep the outer deadline."""
+        with query_scope(timeout=5) as outer:
+            with query_scope(timeout=60) as inner:
+                assert inner is outer
+
+    def test_endpoint_class_timeouts(self):
+        """Test lookup of per-endpoint-class time budgets."""
+        assert get_query_timeout("interactive") <= get_query_timeout("export")
+        assert get_query_timeout("unknown") == get_query_timeout("default")
+
+
+class TestAsyncVariants:
+    """Test async execution on manager and query builder."""
+
+    async def test_execute_query_async(self):
+        """Test DuckDBManager.execute_query_async runs the real query path."""
+        manager = DuckDBManager(":memory:")
+        result = await manager.execute_query_async("SELECT 42 AS answer")
+
+        assert result.iloc[0]["answer"] == 42
+        assert "executor" in manager.get_performance_stats()
+
+    async def test_builder_execute_async(self):
+        """Test DuckDBQueryBuilder.execute_async delegates to execute()."""
+        manager = Mock(spec=DuckDBManager)
+        manager.execute_query.return_value = pd.DataFrame({"id": [1, 2]})
+        builder = DuckDBQueryBuilder(manager=manager, cache=QueryCache())
+
+        result = await builder.select("id").from_table("items").execute_async()
+
+        assert list(result["id"]) == [1, 2]
+        manager.execute_query.assert_called_once()
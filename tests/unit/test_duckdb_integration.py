@@ -8,6 +8,7 @@ This module tests all aspects of the DuckDB implementation:
 - Error handling and edge cases
 """
 
+import hashlib
 import os
 import tempfile
 from datetime import datetime
@@ -32,7 +33,12 @@ from src.database.duckdb.partitioning import (
     YearPartitionStrategy,
     create_partition_manager,
 )
-from src.database.duckdb.query_optimizer import QueryOptimizer, create_optimizer
+from src.database.duckdb.query_optimizer import (
+    QueryOptimizer,
+    QueryType,
+    create_optimizer,
+    make_cache_key,
+)
 from src.database.duckdb.schema import ISTATSchemaManager, initialize_schema
 
 
@@ -546,6 +552,76 @@ class TestQueryOptimizer:
 
         assert result1.equals(result2)
 
+    def test_time_series_values_are_bound_not_interpolated(self, optimizer):
+        """Test that quoted input is treated as data, not SQL."""
+        hostile = "X') OR 1=1 --"
+
+        result = optimizer.get_time_series_data(
+            [hostile], 2020, 2022, territories=[hostile]
+        )
+
+        assert isinstance(result, pd.DataFrame)
+        assert result.empty
+
+    def test_territory_comparison_with_territory_filter(self, optimizer):
+        """Test the territory comparison template with and without a filter."""
+        rows = [
+            (1, "IT", "M1", 2020, [10.0, 20.0]),
+            (2, "ITC1", "M1", 2020, [4.0]),
+            (3, "ITF3", "M1", 2020, [7.0]),
+            (4, "ITC1", "M2", 2020, [100.0]),  # other measure
+            (5, "ITC1", "M1", 2021, [50.0]),  # other year
+        ]
+        ISTATSchemaManager(optimizer.manager).insert_dataset_metadata(
+            {"dataset_id": "DS1", "dataset_name": "Sample", "category": "economia"}
+        )
+        for row_id, territory, measure, year, values in rows:
+            optimizer.manager.execute_statement(
+                "INSERT INTO istat.istat_datasets (id, dataset_id, year, "
+                "territory_code, territory_name, time_period, measure_code, "
+                "measure_name) VALUES (?, 'DS1', ?, ?, ?, ?, ?, ?)",
+                [row_id, year, territory, territory, str(year), measure, measure],
+            )
+            for value in values:
+                optimizer.manager.execute_statement(
+                    "INSERT INTO istat.istat_observations (dataset_row_id, "
+                    "dataset_id, year, territory_code, obs_value) "
+                    "VALUES (?, 'DS1', ?, ?, ?)",
+                    [row_id, year, territory, value],
+                )
+
+        unfiltered = optimizer.get_territory_comparison(["M1"], 2020)
+        filtered = optimizer.get_territory_comparison(["M1"], 2020, ["IT", "ITC1"])
+
+        assert list(unfiltered["territory_code"]) == ["IT", "ITF3", "ITC1"]
+        assert list(unfiltered["avg_value"]) == [15.0, 7.0, 4.0]
+
+        assert list(filtered["territory_code"]) == ["IT", "ITC1"]
+        assert set(filtered["measure_code"]) == {"M1"}
+        assert list(filtered["avg_value"]) == [15.0, 4.0]
+        assert list(filtered["obs_count"]) == [2, 1]
+        assert list(filtered["value_rank"]) == [1, 2]
+
+    def test_cache_key_is_stable_content_hash(self):
+        """Test cache keys are deterministic and order-insensitive."""
+        key = make_cache_key(QueryType.TIME_SERIES, dataset_ids=["A", "B"], year=1)
+
+        assert key == make_cache_key(
+            QueryType.TIME_SERIES, year=1, dataset_ids=["A", "B"]
+        )
+        assert key.startswith("time_series:")
+
+        payload = b'{"dataset_ids":["A","B"],"year":1}'
+        digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+        assert key == f"time_series:{digest}"
+
+    def test_equivalent_requests_share_cache_entry(self, optimizer):
+        """Test that list order and duplicates do not split the cache."""
+        optimizer.get_time_series_data(["B", "A"], 2020, 2022, ["IT"])
+        optimizer.get_time_series_data(["A", "B", "A"], 2020, 2022, ["IT"])
+
+        assert len(optimizer.query_cache) == 1
+
     def test_clear_cache(self, optimizer):
         """Test cache clearing functionality."""
         # Add something to cache first
@@ -20,6 +20,7 @@ import pytest
 from src.database.duckdb.manager import DuckDBManager
 from src.database.duckdb.query_builder import (
     AggregateFunction,
+    ConditionGroup,
     DuckDBQueryBuilder,
     FilterCondition,
     FilterOperator,
@@ -28,6 +29,7 @@ from src.database.duckdb.query_builder import (
     create_query_builder,
     get_global_cache,
 )
+from src.utils.pagination import decode_cursor, encode_cursor
 
 
 class TestFilterCondition:
@@ -83,6 +85,37 @@ class TestFilterCondition:
             condition = FilterCondition("category", FilterOperator.IN, "single_value")
             condition.to_sql()
 
+    def test_condition_group(self):
+        """Test nested OR/NOT groups and function operators."""
+        group = ConditionGroup(
+            [
+                FilterCondition("name", FilterOperator.CONTAINS, "ana"),
+                ConditionGroup(
+                    [FilterCondition("city", FilterOperator.DISTINCT_FROM, "Rome")],
+                    negated=True,
+                ),
+            ],
+            conjunction="OR",
+        )
+        sql, params = group.to_sql()
+
+        assert (
+            sql
+            == "(contains(name, ?) OR NOT COALESCE((city IS DISTINCT FROM ?), FALSE))"
+        )
+        assert params == ["ana", "Rome"]
+
+        builder = DuckDBQueryBuilder(Mock(), QueryCache())
+        sql, params = (
+            builder.select("*")
+            .from_table("people")
+            .where("age", FilterOperator.GT, 18)
+            .where_condition(group)
+            .build_sql()
+        )
+        assert "WHERE age > ? AND (contains(name, ?) OR" in sql
+        assert params == [18, "ana", "Rome"]
+
 
 class TestQueryCache:
     """Test QueryCache functionality."""
@@ -500,6 +533,155 @@ class TestDuckDBQueryBuilder:
         key3 = builder1._generate_cache_key("SELECT * FROM posts", [])
         assert key1 != key3
 
+    def test_keyset_seek_single_key(self, query_builder):
+        """Test after() with a single ORDER BY key."""
+        sql, params = (
+            query_builder.select("id", "value")
+            .from_table("items")
+            .where("category", FilterOperator.EQ, "A")
+            .order_by("id")
+            .after([42])
+            .limit(10)
+            .build_sql()
+        )
+
+        expected_lines = [
+            "SELECT id, value",
+            "FROM items",
+            "WHERE category = ? AND id > ?",
+            "ORDER BY id ASC",
+            "LIMIT 10",
+        ]
+        assert sql == "\n".join(expected_lines)
+        assert params == ["A", 42]
+
+    def test_keyset_seek_uniform_direction(self, query_builder):
+        """Test after() uses a row-value comparison for uniform directions."""
+        sql, params = (
+            query_builder.select("*")
+            .from_table("items")
+            .order_by("year", "DESC")
+            .order_by("id", "DESC")
+            .after({"year": 2020, "id": 7})
+            .build_sql()
+        )
+
+        assert "WHERE year <= ? AND (year, id) < (?, ?)" in sql
+        assert params == [2020, 2020, 7]
+
+    def test_keyset_seek_mixed_direction(self, query_builder):
+        """Test after() expands mixed directions and keeps OR filters grouped."""
+        query_builder.select("*").from_table("items")
+        query_builder.where("a", FilterOperator.EQ, 1)
+        query_builder.where("b", FilterOperator.EQ, 2)
+        query_builder._where_conditions[-1].logical_operator = "OR"
+        sql, params = (
+            query_builder.order_by("year").order_by("id", "DESC").after([2020, 7])
+        ).build_sql()
+
+        assert (
+            "WHERE (a = ? OR b = ?) AND year >= ? AND "
+            "((year > ?) OR (year = ? AND id < ?))"
+        ) in sql
+        assert params == [1, 2, 2020, 2020, 2020, 7]
+
+    def test_keyset_seek_nullable_keys(self, query_builder):
+        """Test after() on nullable keys sorts and seeks with NULLs last."""
+        sql, params = (
+            query_builder.select("*")
+            .from_table("items")
+            .order_by("year", "DESC", nullable=True)
+            .order_by("id")
+            .after([2020, 7])
+            .build_sql()
+        )
+
+        assert "WHERE (((year < ? OR year IS NULL)) OR (year = ? AND id > ?))" in sql
+        assert "ORDER BY year DESC NULLS LAST, id ASC" in sql
+        assert params == [2020, 2020, 7]
+
+        query_builder._reset_query_state()
+        sql, params = (
+            query_builder.select("*")
+            .from_table("items")
+            .order_by("year", nullable=True)
+            .order_by("id")
+            .after([None, 7])
+            .build_sql()
+        )
+        assert "WHERE year IS NULL AND ((year IS NULL AND id > ?))" in sql
+        assert params == [7]
+
+    def test_grouped_seek_and_count(self, query_builder):
+        """Test that grouped queries seek in HAVING and count their groups."""
+        sql, params = (
+            query_builder.select("year", "SUM(value) AS total")
+            .from_table("items")
+            .where("category", FilterOperator.EQ, "A")
+            .group_by("year")
+            .having_condition(FilterCondition("total", FilterOperator.GT, 10))
+            .order_by("total", "DESC", nullable=True)
+            .order_by("year")
+            .after([50.0, 2020])
+            .build_sql()
+        )
+        assert "WHERE category = ?\nGROUP BY year\nHAVING total > ? AND " in sql
+        assert params == ["A", 10, 50.0, 50.0, 2020]
+
+        query_builder._reset_query_state()
+        query_builder.manager.execute_query.return_value = pd.DataFrame(
+            {"row_count": [3]}
+        )
+        count = (
+            query_builder.select("year", "SUM(value) AS total")
+            .from_table("items")
+            .group_by("year")
+            .order_by("year")
+            .count()
+        )
+        assert count == 3
+        sql = query_builder.manager.execute_query.call_args[0][0]
+        assert sql.startswith("SELECT COUNT(*) AS row_count FROM (SELECT year")
+        assert "ORDER BY" not in sql
+
+    def test_keyset_validation(self, query_builder):
+        """Test after() validation errors."""
+        with pytest.raises(ValueError, match="requires ORDER BY"):
+            query_builder.select("*").from_table("items").after([1]).build_sql()
+
+        query_builder._reset_query_state()
+        with pytest.raises(ValueError, match="expects 2 values"):
+            (
+                query_builder.select("*")
+                .from_table("items")
+                .order_by("a")
+                .order_by("b")
+                .after([1])
+                .build_sql()
+            )
+
+        with pytest.raises(ValueError):
+            query_builder.after([])
+
+    def test_cursor_roundtrip(self, query_builder):
+        """Test continuation tokens are tied to the ORDER BY keys."""
+        token = encode_cursor([2020, "ITC1"], ["year", "territory_code"])
+
+        sql, params = (
+            query_builder.select("*")
+            .from_table("items")
+            .order_by("year")
+            .order_by("territory_code")
+            .after_cursor(token)
+            .build_sql()
+        )
+        assert params == [2020, 2020, "ITC1"]
+
+        with pytest.raises(ValueError):
+            query_builder.order_by("other").after_cursor(token)
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
 
 class TestQueryBuilderIntegration:
     """Integration tests with real DuckDB (if available)."""
@@ -591,6 +773,57 @@ class TestQueryBuilderIntegration:
         except ImportError:
             pytest.skip("DuckDB not available for integration test")
 
+    @pytest.mark.integration
+    def test_keyset_pagination_execution(self, temp_db):
+        """Test execute_page() walks every row exactly once."""
+        from src.database.duckdb.config import get_duckdb_config
+
+        config = get_duckdb_config()
+        config["database"] = temp_db
+        manager = DuckDBManager(config)
+
+        with manager.get_connection() as conn:
+            conn.execute(
+                "CREATE TABLE obs AS SELECT i % 3 AS year, i AS id FROM range(10) t(i)"
+            )
+
+        builder = DuckDBQueryBuilder(manager, QueryCache())
+        seen = []
+        cursor = None
+        while True:
+            builder.select("year", "id").from_table("obs")
+            builder.order_by("year").order_by("id", "DESC")
+            if cursor:
+                builder.after_cursor(cursor)
+            page, cursor = builder.execute_page(4, use_cache=False)
+            assert len(page) <= 4
+            seen.extend(zip(page["year"], page["id"]))
+            if cursor is None:
+                break
+
+        expected = sorted(((i % 3, i) for i in range(10)), key=lambda r: (r[0], -r[1]))
+        assert seen == expected
+
+        # Nullable leading key: NULLs come last and are paged through too
+        with manager.get_connection() as conn:
+            conn.execute(
+                "CREATE TABLE sparse AS SELECT nullif(year, 1) AS year, id FROM obs"
+            )
+        seen = []
+        cursor = None
+        while True:
+            builder.select("year", "id").from_table("sparse")
+            builder.order_by("year", "DESC", nullable=True)
+            builder.order_by("id")
+            if cursor:
+                builder.after_cursor(cursor)
+            page, cursor = builder.execute_page(3, use_cache=False)
+            seen.extend(page["id"])
+            if cursor is None:
+                break
+
+        assert seen == [2, 5, 8, 0, 3, 6, 9, 1, 4, 7]
+
 
 class TestPerformance:
     """Performance tests for query builder."""
@@ -15,10 +15,13 @@ from src.api.dependencies import (
     get_repository,
 )
 from src.api.fastapi_app import app
+from src.api.odata import ODATA_CONFIG
 from src.auth.jwt_manager import JWTManager
 from src.auth.rate_limiter import SQLiteRateLimiter
 from src.auth.sqlite_auth import SQLiteAuthManager
+from src.database.duckdb.executor import QueryTimeoutError, get_query_executor
 from src.database.sqlite import DatasetManager
+from src.database.sqlite.audit_sink import get_audit_sink
 from src.database.sqlite.repository import get_unified_repository
 
 
@@ -249,6 +252,60 @@ class TestFastAPIIntegration:
         response = client.get("/datasets?page=0&page_size=5000", headers=auth_headers)
         assert response.status_code == 422  # Pydantic validation error
 
+    def test_dataset_cursor_pagination(self, client, auth_headers, test_db_setup):
+        """Test dataset listing with keyset continuation tokens"""
+        response = client.get("/datasets?page_size=1", headers=auth_headers)
+        assert response.status_code == 200
+        first = response.json()
+        assert first["has_next"] is True
+        assert first["next_cursor"]
+
+        response = client.get(
+            f"/datasets?page_size=1&cursor={first['next_cursor']}",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        second = response.json()
+        assert len(second["datasets"]) == 1
+        assert second["datasets"][0]["dataset_id"] != first["datasets"][0]["dataset_id"]
+        assert second["has_next"] is False
+        assert second["next_cursor"] is None
+
+        response = client.get("/datasets?cursor=garbage", headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_dataset_page_total_and_sort(self, client, auth_headers, test_db_setup):
+        """Test that totals cover all pages and sort orders are applied"""
+        response = client.get(
+            "/datasets?page=2&page_size=1&sort=name", headers=auth_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] == 2
+        assert data["has_next"] is False
+        assert [d["dataset_id"] for d in data["datasets"]] == ["TEST_DATASET_2"]
+
+        response = client.get("/datasets?page=5", headers=auth_headers)
+        assert response.json()["total_count"] == 2
+
+        response = client.get("/datasets?sort=size", headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_search_datasets(self, client, auth_headers, test_db_setup):
+        """Test text search across name, description and dataset ID"""
+        response = client.get("/search?q=another", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] == 1
+        assert data["datasets"][0]["dataset_id"] == "TEST_DATASET_2"
+
+        response = client.get("/search?q=test_dataset", headers=auth_headers)
+        assert response.json()["total_count"] == 2
+
+        # LIKE wildcards in the query are matched literally
+        response = client.get("/search?q=%25", headers=auth_headers)
+        assert response.json()["total_count"] == 0
+
     def test_dataset_filtering(self, client, auth_headers, test_db_setup):
         """Test dataset filtering"""
         # Filter by category
@@ -307,6 +364,18 @@ class TestFastAPIIntegration:
         assert "total_points" in data
         assert isinstance(data["data"], list)
 
+    def test_metadata_queries_skip_duckdb_executor(
+        self, client, auth_headers, test_db_setup
+    ):
+        """Test that SQLite-only lookups do not take DuckDB executor slots"""
+        executor = get_query_executor()
+        submitted = executor.get_stats()["submitted"]
+
+        for url in ("/datasets", "/datasets/TEST_DATASET_1", "/odata/Datasets"):
+            assert client.get(url, headers=auth_headers).status_code == 200
+
+        assert executor.get_stats()["submitted"] == submitted
+
     def test_timeseries_filtering(self, client, auth_headers, test_db_setup):
         """Test time series with filters"""
         response = client.get(
@@ -443,6 +512,37 @@ class TestFastAPIIntegration:
         assert "edmx:Edmx" in xml_content
         assert "EntityType" in xml_content
         assert "EntityContainer" in xml_content
+        assert '<PropertyRef Name="MeasureCode" />' in xml_content
+
+        # The document is built once; clients revalidate it by ETag
+        revalidated = client.get(
+            "/odata/$metadata", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+
+    def test_odata_dimensions(self, client, auth_headers, test_db_setup):
+        """Test Territories and Measures query options on the dimension tables"""
+        response = client.get(
+            "/odata/Territories?$filter=Level eq 'Region'&$orderby=TerritoryName"
+            "&$select=TerritoryCode,ParentCode&$count=true",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["@odata.context"].endswith("$metadata#Territories")
+        assert isinstance(data["@odata.count"], int)
+        assert all(set(t) == {"TerritoryCode", "ParentCode"} for t in data["value"])
+
+        response = client.get(
+            "/odata/Measures?$filter=DatasetId eq 'TEST_DATASET_1'&$top=1",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert len(response.json()["value"]) <= 1
+
+        for query in ("Territories?$filter=Unit eq 'x'", "Measures?$select=Level"):
+            response = client.get(f"/odata/{query}", headers=auth_headers)
+            assert response.status_code == 400
 
     def test_odata_datasets_entity_set(self, client, auth_headers, test_db_setup):
         """Test OData Datasets entity set"""
@@ -482,6 +582,87 @@ class TestFastAPIIntegration:
             "/odata/Datasets?$filter=Category eq 'demographics'", headers=auth_headers
         )
         assert response.status_code == 200
+        assert [d["DatasetId"] for d in response.json()["value"]] == ["TEST_DATASET_1"]
+
+        # Test $orderby and $select
+        response = client.get(
+            "/odata/Datasets?$orderby=Priority asc&$select=DatasetId,Priority",
+            headers=auth_headers,
+        )
+        assert response.json()["value"] == [
+            {"DatasetId": "TEST_DATASET_1", "Priority": 5},
+            {"DatasetId": "TEST_DATASET_2", "Priority": 7},
+        ]
+
+        # Unparseable options are rejected instead of ignored
+        for query in (
+            "$filter=Category eq",
+            "$filter=Unknown eq 'x'",
+            "$orderby=Priority sideways",
+            "$select=Unknown",
+        ):
+            response = client.get(f"/odata/Datasets?{query}", headers=auth_headers)
+            assert response.status_code == 400
+
+    def test_odata_skiptoken_paging(
+        self, client, auth_headers, test_db_setup, monkeypatch
+    ):
+        """Test OData $skiptoken continuation via @odata.nextLink"""
+        # $top limits the whole result: no continuation
+        response = client.get("/odata/Datasets?$top=1", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["value"]) == 1
+        assert "@odata.nextLink" not in data
+
+        monkeypatch.setitem(ODATA_CONFIG, "max_page_size", 1)
+        response = client.get("/odata/Datasets", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["value"]) == 1
+        assert "%24skiptoken=" in data["@odata.nextLink"]
+
+        response = client.get(data["@odata.nextLink"], headers=auth_headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["value"]) == 1
+        assert page["value"][0]["DatasetId"] != data["value"][0]["DatasetId"]
+        assert "@odata.nextLink" not in page
+
+    def test_odata_server_driven_paging(
+        self, client, auth_headers, test_db_setup, monkeypatch
+    ):
+        """Test the server page size, Prefer: odata.maxpagesize and streaming"""
+        monkeypatch.setitem(ODATA_CONFIG, "max_page_size", 1)
+        response = client.get("/odata/Datasets", headers=auth_headers)
+        data = response.json()
+        assert len(data["value"]) == 1
+        assert "%24skiptoken=" in data["@odata.nextLink"]
+        assert "preference-applied" not in response.headers
+
+        monkeypatch.setitem(ODATA_CONFIG, "max_page_size", 100)
+        prefer = {**auth_headers, "Prefer": "odata.maxpagesize=1"}
+        response = client.get("/odata/Datasets?$top=5", headers=prefer)
+        assert response.headers["preference-applied"] == "odata.maxpagesize=1"
+        data = response.json()
+        assert len(data["value"]) == 1
+        # The next page asks for the rest of $top
+        assert "%24top=4" in data["@odata.nextLink"]
+        # The preference is part of the representation
+        unpreferred = client.get("/odata/Datasets?$top=5", headers=auth_headers)
+        assert len(unpreferred.json()["value"]) == 2
+        assert unpreferred.headers["etag"] != response.headers["etag"]
+
+        response = client.get(
+            "/odata/Observations?$filter=DatasetId eq 'TEST_DATASET_1'&$count=true",
+            headers=prefer,
+        )
+        assert response.status_code == 200
+        assert response.headers["preference-applied"] == "odata.maxpagesize=1"
+        assert response.headers["content-type"].startswith("application/json")
+        data = response.json()
+        assert list(data) == ["@odata.context", "@odata.count", "value"]
+        assert data["value"] == []
 
     def test_odata_observations_requires_dataset_filter(
         self, client, auth_headers, test_db_setup
@@ -501,6 +682,39 @@ class TestFastAPIIntegration:
         )
         assert response.status_code == 200
 
+    def test_odata_observations_apply(self, client, auth_headers, test_db_setup):
+        """Test $apply aggregation and the query options on its result"""
+        response = client.get(
+            "/odata/Observations?$apply=filter(DatasetId eq 'TEST_DATASET_1')"
+            "/groupby((Year),aggregate(ObsValue with sum as Total))"
+            "&$orderby=Total desc&$count=true",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["@odata.context"].endswith("$metadata#Observations(Year,Total)")
+        assert isinstance(data["@odata.count"], int)
+        assert isinstance(data["value"], list)
+
+        # A $filter on a grouped DatasetId scopes the query as well
+        response = client.get(
+            "/odata/Observations?$apply=groupby((DatasetId),"
+            "aggregate(ObsValue with max as Peak))"
+            "&$filter=DatasetId eq 'TEST_DATASET_1'",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+
+        for query in (
+            "$apply=groupby((Year))",
+            "$apply=groupby((Year)&$filter=DatasetId eq 'TEST_DATASET_1'",
+            "$apply=groupby((Year))&$filter=DatasetId eq 'TEST_DATASET_1'",
+            "$apply=filter(DatasetId eq 'TEST_DATASET_1')/groupby((Year))"
+            "&$orderby=ObsValue",
+        ):
+            response = client.get(f"/odata/Observations?{query}", headers=auth_headers)
+            assert response.status_code == 400
+
     def test_rate_limiting_headers(self, client, auth_headers, test_db_setup):
         """Test that rate limiting headers are included"""
         response = client.get("/datasets", headers=auth_headers)
@@ -511,6 +725,97 @@ class TestFastAPIIntegration:
         # This is more of a smoke test
         # Headers might be added by middleware
 
+    def test_authorize_request_limits_and_audits(
+        self, client, auth_headers, test_db_setup
+    ):
+        """Test that the fused dependency rate limits and audits in one pass"""
+        response = client.get("/datasets", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert "x-ratelimit-limit" in response.headers
+
+        audit_manager = test_db_setup["repository"].audit_manager
+        assert get_audit_sink(audit_manager).flush()
+        logs = audit_manager.get_audit_logs(
+            action="api_request", resource_id="/datasets"
+        )
+        assert len(logs) == 1
+        assert logs[0]["details"]["api_key_id"] == str(test_db_setup["api_key"].id)
+
+    def test_conditional_get(self, client, auth_headers, test_db_setup):
+        """Test ETag revalidation of dataset list and time series"""
+        response = client.get("/datasets", headers=auth_headers)
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, no-cache"
+
+        revalidated = client.get(
+            "/datasets", headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+
+        timeseries_url = "/datasets/TEST_DATASET_1/timeseries?territory_code=IT"
+        timeseries = client.get(timeseries_url, headers=auth_headers)
+        assert timeseries.headers["etag"] != etag
+        assert (
+            client.get(
+                timeseries_url,
+                headers={**auth_headers, "If-None-Match": timeseries.headers["etag"]},
+            ).status_code
+            == 304
+        )
+        # Cache hits replay the body, including the time it was built
+        replayed = client.get(timeseries_url, headers=auth_headers)
+        assert replayed.json()["timestamp"] == timeseries.json()["timestamp"]
+
+        # Any dataset change gives the catalog a new version
+        test_db_setup["repository"].register_dataset_complete(
+            "TEST_DATASET_3", "Test Dataset 3", "economy"
+        )
+        changed = client.get(
+            "/datasets", headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert changed.json()["total_count"] == 3
+
+    def test_timeseries_caches_complete_results_only(
+        self, client, auth_headers, test_db_setup, monkeypatch
+    ):
+        """Test that failed or superseded time series queries are not cached"""
+        repository = test_db_setup["repository"]
+        url = "/datasets/TEST_DATASET_1/timeseries?measure_code=M1"
+        query = repository.get_dataset_time_series_columns
+
+        def timeout(*args, **kwargs):
+            raise QueryTimeoutError("budget exceeded")
+
+        monkeypatch.setattr(repository, "get_dataset_time_series_columns", timeout)
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 504
+        assert "etag" not in response.headers
+
+        def ingest_during_query(*args, **kwargs):
+            table = query(*args, **kwargs)
+            repository.dataset_manager.bump_data_versions(["TEST_DATASET_1"])
+            return table
+
+        monkeypatch.setattr(
+            repository, "get_dataset_time_series_columns", ingest_during_query
+        )
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+
+        monkeypatch.setattr(repository, "get_dataset_time_series_columns", query)
+        response = client.get(url, headers=auth_headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert (
+            client.get(url, headers={**auth_headers, "If-None-Match": etag}).status_code
+            == 304
+        )
+
     def test_response_time_headers(self, client, auth_headers, test_db_setup):
         """Test that process time headers are included"""
         response = client.get("/datasets", headers=auth_headers)
@@ -0,0 +1,151 @@
+"""
+Unit tests for OData query option parsing
+
+Tests that $filter expressions parse with the right precedence, are checked
+against the entity set properties, compile to DuckDBQueryBuilder conditions
+and evaluate on in-memory records with the same semantics, and that $apply
+transformations parse into grouping, aggregates and their result properties.
+"""
+
+import pytest
+
+from src.api.odata_query import (
+    ODataQueryError,
+    compile_aggregates,
+    compile_filter,
+    matches,
+    parse_apply,
+    parse_filter,
+    parse_orderby,
+    parse_select,
+    required_value,
+)
+
+PROPERTIES = {
+    "DatasetId": "Edm.String",
+    "Year": "Edm.Int32",
+    "ObsValue": "Edm.Double",
+    "TerritoryCode": "Edm.String",
+}
+
+
+def test_filter_compiles_to_sql():
+    """Test precedence, functions, in and not in the generated SQL"""
+    node = parse_filter(
+        "DatasetId eq 'DS' and (2020 le Year or startswith(TerritoryCode, 'IT'))"
+        " and not TerritoryCode in ('ITC1', null) and ObsValue ne null",
+        PROPERTIES,
+    )
+
+    sql, params = compile_filter(node).to_sql()
+
+    assert sql == (
+        "(DatasetId = ? AND (Year >= ? OR starts_with(TerritoryCode, ?))"
+        " AND NOT COALESCE(((TerritoryCode IN (?) OR TerritoryCode IS NULL)), FALSE)"
+        " AND ObsValue IS NOT NULL)"
+    )
+    assert params == ["DS", 2020, "IT", "ITC1"]
+    assert required_value(node, "DatasetId") == "DS"
+    assert required_value(node, "Year") is None
+
+
+def test_filter_evaluates_records():
+    """Test in-memory evaluation, including null semantics"""
+    node = parse_filter(
+        "TerritoryCode ne 'ITC1' and (Year gt 2020 or contains(DatasetId, 'O''B'))",
+        PROPERTIES,
+    )
+
+    assert matches(node, {"TerritoryCode": None, "Year": 2021, "DatasetId": "X"})
+    assert matches(node, {"TerritoryCode": "IT", "Year": None, "DatasetId": "O'B"})
+    assert not matches(node, {"TerritoryCode": "ITC1", "Year": 2021})
+    assert not matches(node, {"TerritoryCode": "IT", "Year": None, "DatasetId": "X"})
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "",
+        "Unknown eq 1",
+        "Year eq '2020'",
+        "DatasetId eq",
+        "DatasetId eq 'DS' or",
+        "(Year eq 1",
+        "Year eq 1)",
+        "Year eq DatasetId",
+        "contains(Year, '1')",
+        "Year % 2",
+        "DatasetId eq 'unterminated",
+    ],
+)
+def test_invalid_filter_raises(expression):
+    """Test that unsupported or malformed filters are rejected, not ignored"""
+    with pytest.raises(ODataQueryError):
+        parse_filter(expression, PROPERTIES)
+
+
+def test_orderby_and_select():
+    """Test $orderby keys and $select validation"""
+    assert parse_orderby("Year desc, DatasetId", PROPERTIES) == [
+        ("Year", True),
+        ("DatasetId", False),
+    ]
+    assert parse_select("Year,DatasetId", PROPERTIES) == ["DatasetId", "Year"]
+
+    for invalid in ("Year sideways", "Unknown", "Year,"):
+        with pytest.raises(ODataQueryError):
+            parse_orderby(invalid, PROPERTIES)
+    with pytest.raises(ODataQueryError):
+        parse_select("Year,Unknown", PROPERTIES)
+
+
+def test_apply_groupby_aggregate():
+    """Test $apply filter/groupby/aggregate/filter and the result properties"""
+    apply = parse_apply(
+        "filter(DatasetId eq 'DS')/groupby((TerritoryCode, Year),"
+        "aggregate(ObsValue with sum as Total, Year with countdistinct as Years))"
+        "/filter(Total gt 10)",
+        PROPERTIES,
+    )
+
+    assert required_value(apply.filter, "DatasetId") == "DS"
+    assert apply.groupby == ("TerritoryCode", "Year")
+    assert apply.properties == {
+        "TerritoryCode": "Edm.String",
+        "Year": "Edm.Int32",
+        "Total": "Edm.Double",
+        "Years": "Edm.Int64",
+    }
+    assert compile_aggregates(apply) == [
+        ("ObsValue", "sum", "Total"),
+        ("Year", "count_distinct", "Years"),
+    ]
+    assert compile_filter(apply.having).to_sql() == ("Total > ?", [10])
+
+    apply = parse_apply("aggregate(Year with average as Mean)", PROPERTIES)
+    assert apply.groupby == ()
+    assert apply.properties == {"Mean": "Edm.Double"}
+    assert not parse_apply("filter(Year eq 2020)", PROPERTIES).grouped
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "",
+        "groupby(TerritoryCode)",
+        "groupby((Unknown))",
+        "groupby((Year),sum(ObsValue))",
+        "aggregate(ObsValue with median as M)",
+        "aggregate(TerritoryCode with sum as S)",
+        "aggregate(ObsValue with sum as Year)",
+        "aggregate(ObsValue with sum as S, Year with max as S)",
+        "aggregate(ObsValue with sum as S)/aggregate(Year with max as M)",
+        "groupby((Year))/filter(ObsValue gt 1)",
+        "compute(Year add 1 as Next)",
+        "filter(Year eq 1",
+    ],
+)
+def test_invalid_apply_raises(expression):
+    """Test that unsupported $apply transformations are rejected"""
+    with pytest.raises(ODataQueryError):
+        parse_apply(expression, PROPERTIES)
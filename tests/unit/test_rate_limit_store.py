@@ -0,0 +1,139 @@
+"""
+Unit tests for rate limit counter stores
+
+Tests the sliding window algorithm and the in-process, shared memory and
+Redis backends.
+"""
+
+import os
+import uuid
+
+import pytest
+
+from src.auth.rate_limit_store import (
+    MemoryRateLimitStore,
+    RateLimitStore,
+    RedisRateLimitStore,
+    SharedMemoryRateLimitStore,
+    evaluate_windows,
+)
+
+WINDOWS = [("minute", 60, 3), ("hour", 3600, 100), ("day", 86400, 1000)]
+# 15 seconds into a minute bucket
+NOW = 1_700_000_040.0 + 15
+
+
+def test_incomplete_store_rejected_on_creation():
+    """Test that a backend without hit/seed cannot be instantiated"""
+
+    class CountOnlyStore(RateLimitStore):
+        def hit(self, key, windows, now):
+            return evaluate_windows([(0, 0)] * len(windows), windows, now)
+
+    with pytest.raises(TypeError):
+        CountOnlyStore()
+
+
+def test_sliding_window_weights_previous_bucket():
+    """Test that the previous bucket counts by its remaining overlap"""
+    result = evaluate_windows([(1, 4), (0, 0), (0, 0)], WINDOWS, NOW)
+
+    assert result.estimates[0] == pytest.approx(1 + 4 * 0.75)
+    assert result.allowed is False
+    assert result.denied == 0
+
+
+class StoreContract:
+    """Behaviour every store must implement"""
+
+    def test_hits_counted_until_limit(self, store):
+        results = [store.hit("api_key:1:/datasets", WINDOWS, NOW) for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.estimates[0] for r in results[:3]] == [0, 1, 2]
+
+    def test_keys_independent(self, store):
+        for _ in range(3):
+            store.hit("api_key:1:/a", WINDOWS, NOW)
+
+        assert store.hit("api_key:1:/b", WINDOWS, NOW).allowed
+
+    def test_previous_bucket_carries_over(self, store):
+        for _ in range(3):
+            store.hit("ip:x:/a", WINDOWS, NOW)
+
+        # Early in the next minute most of the previous bucket still counts
+        assert store.hit("ip:x:/a", WINDOWS, NOW + 50).estimates[0] == 2.75
+        assert not store.hit("ip:x:/a", WINDOWS, NOW + 50).allowed
+        # Two minutes later it no longer does
+        assert store.hit("ip:x:/a", WINDOWS, NOW + 120).allowed
+
+    def test_seed_only_applies_to_new_keys(self, store):
+        store.seed("ip:y:/a", {("minute", int(NOW // 60 * 60)): 3}, NOW)
+        assert not store.hit("ip:y:/a", WINDOWS, NOW).allowed
+
+        store.hit("ip:z:/a", WINDOWS, NOW)
+        store.seed("ip:z:/a", {("minute", int(NOW // 60 * 60)): 3}, NOW)
+        assert store.hit("ip:z:/a", WINDOWS, NOW).allowed
+
+
+class TestMemoryStore(StoreContract):
+    @pytest.fixture
+    def store(self):
+        return MemoryRateLimitStore()
+
+    def test_prune_drops_stale_keys(self, store):
+        store.hit("ip:x:/a", WINDOWS, NOW)
+
+        assert store.prune(NOW + 3 * 86400) == 1
+
+
+@pytest.mark.skipif(os.name != "posix", reason="shared memory store needs flock")
+class TestSharedMemoryStore(StoreContract):
+    @pytest.fixture
+    def store(self):
+        store = SharedMemoryRateLimitStore(f"test_rl_{uuid.uuid4().hex[:8]}", 64)
+        yield store
+        store.unlink()
+        store.close()
+
+    def test_counts_shared_between_attachments(self, store):
+        """Test that a second attachment (another worker) sees the same counts"""
+        other = SharedMemoryRateLimitStore(store.name, store.slots)
+        try:
+            store.hit("api_key:1:/a", WINDOWS, NOW)
+            other.hit("api_key:1:/a", WINDOWS, NOW)
+            store.hit("api_key:1:/a", WINDOWS, NOW)
+
+            assert not other.hit("api_key:1:/a", WINDOWS, NOW).allowed
+        finally:
+            other.close()
+
+    def test_stale_slots_reused_when_full(self, store):
+        """Test that a full table reclaims slots of inactive keys"""
+        for i in range(store.slots):
+            store.hit(f"ip:{i}:/a", WINDOWS, NOW)
+
+        later = NOW + 3 * 86400
+        for i in range(store.slots):
+            assert store.hit(f"ip:new{i}:/a", WINDOWS, later).allowed
+        assert store.hit("ip:new0:/a", WINDOWS, later).estimates[0] == 1
+
+
+class TestRedisStore(StoreContract):
+    @pytest.fixture
+    def store(self):
+        redis = pytest.importorskip("redis")
+        client = redis.Redis.from_url(
+            os.getenv("TEST_REDIS_URL", "redis://localhost:6379/1")
+        )
+        try:
+            client.ping()
+        except redis.exceptions.ConnectionError:
+            pytest.skip("Redis server not available")
+
+        prefix = f"test:rl:{uuid.uuid4().hex[:8]}"
+        yield RedisRateLimitStore(prefix=prefix, client=client)
+        for key in client.scan_iter(f"{prefix}:*"):
+            client.delete(key)
+        client.close()
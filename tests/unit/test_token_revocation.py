@@ -0,0 +1,85 @@
+"""
+Unit tests for the token revocation store
+
+Tests the bloom filter and the SQLite-backed store: persistence, sharing
+between workers and automatic expiry.
+"""
+
+import time
+import uuid
+
+import pytest
+
+from src.auth.token_revocation import BloomFilter, TokenRevocationStore
+
+CONFIG = {"refresh_interval": 0, "cleanup_interval": 3600, "bloom_capacity": 16}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "revocations.db")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test membership and the false positive rate at capacity"""
+    bloom = BloomFilter(1000, 0.01)
+    added = [uuid.uuid4().hex for _ in range(1000)]
+    for item in added:
+        bloom.add(item)
+
+    assert all(item in bloom for item in added)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_revocation_survives_restart(db_path):
+    """Test that a new store (e.g. after restart) sees earlier revocations"""
+    store = TokenRevocationStore(db_path, CONFIG)
+    assert store.revoke("jti-1", time.time() + 60, "logout")
+    assert store.is_revoked("jti-1")
+    assert not store.is_revoked("jti-2")
+
+    restarted = TokenRevocationStore(db_path, CONFIG)
+
+    assert restarted.is_revoked("jti-1")
+    assert restarted.get_stats()["revoked"] == 1
+
+
+def test_revocation_shared_between_workers(db_path):
+    """Test that revocations written by one store reach another on refresh"""
+    worker_a = TokenRevocationStore(db_path, CONFIG)
+    worker_b = TokenRevocationStore(db_path, CONFIG)
+
+    worker_a.revoke("jti-shared", time.time() + 60)
+
+    assert worker_b.is_revoked("jti-shared")
+
+
+def test_expired_revocations_removed(db_path):
+    """Test that entries go away once the token would have expired"""
+    store = TokenRevocationStore(db_path, {**CONFIG, "cleanup_interval": 0})
+    store.revoke("short", time.time() + 0.2)
+    store.revoke("long", time.time() + 60)
+    # Already expired tokens are not stored at all
+    store.revoke("expired", time.time() - 1)
+
+    time.sleep(0.3)
+
+    # The refresh before the check also purges expired entries
+    assert not store.is_revoked("short")
+    rows = store.audit_manager.execute_query("SELECT jti FROM revoked_tokens")
+    assert [row["jti"] for row in rows] == ["long"]
+    assert store.get_stats()["revoked"] == 1
+    assert store.is_revoked("long")
+
+
+def test_bloom_filter_grows_past_capacity(db_path):
+    """Test that exceeding the bloom capacity rebuilds a larger filter"""
+    store = TokenRevocationStore(db_path, CONFIG)
+    expires_at = time.time() + 60
+    for i in range(40):
+        store.revoke(f"jti-{i}", expires_at)
+
+    stats = store.get_stats()
+    assert stats["bloom_capacity"] > CONFIG["bloom_capacity"]
+    assert all(store.is_revoked(f"jti-{i}") for i in range(40))